@@ -248,6 +248,9 @@ def segment_to_segment_distance(a: Segment, b: Segment) -> float:
 # ── Main analysis ─────────────────────────────────────────────────
 
 def analyze(threshold: float = 0.15, verbose: bool = True):
+    from collections import defaultdict
+    from clearance import candidates, capsules, circles, pairs, rects
+
     if verbose:
         print(f"Parsing: {PCB_FILE}")
     pads, vias, segments = parse_pcb(PCB_FILE)
@@ -258,88 +261,90 @@ def analyze(threshold: float = 0.15, verbose: bool = True):
 
     violations = []
 
+    # Every pass below asks the clearance kernel for the pairs closer than
+    # the threshold (grid broad phase, exact gap) and keeps the nested-loop
+    # order the report always had; only the skip rules stay here.
+
     # ── Pad-to-pad ───────────────────────────────────────────────
-    # Group pads by layer for efficiency
-    from collections import defaultdict
     by_layer: dict[str, list[Pad]] = defaultdict(list)
     for p in pads:
         by_layer[p.layer].append(p)
+    pad_shapes = {layer: rects(layer_pads)
+                  for layer, layer_pads in by_layer.items()}
 
-    checked_pairs = 0
+    checked_pairs = close_pairs = 0
     for layer, layer_pads in by_layer.items():
-        n = len(layer_pads)
-        for i in range(n):
-            a = layer_pads[i]
-            for j in range(i + 1, n):
-                b = layer_pads[j]
-
-                # Skip same-net pads (e.g. power rail pads that are intentionally
-                # adjacent, or multi-pin components with bridged nets)
-                if a.net != 0 and b.net != 0 and a.net == b.net:
-                    continue
-
-                # Fast reject: bounding box pre-filter
-                if abs(a.x - b.x) > (a.w + b.w) / 2 + threshold + 1.0:
-                    continue
-                if abs(a.y - b.y) > (a.h + b.h) / 2 + threshold + 1.0:
-                    continue
-
-                dist = pad_edge_distance(a, b)
-                checked_pairs += 1
-
-                if dist < threshold:
-                    violations.append({
-                        "type": "pad-pad",
-                        "layer": layer,
-                        "dist": dist,
-                        "a": f"{a.ref}[{a.num}]",
-                        "b": f"{b.ref}[{b.num}]",
-                        "a_pos": (round(a.x, 4), round(a.y, 4)),
-                        "b_pos": (round(b.x, 4), round(b.y, 4)),
-                        "a_size": (round(a.w, 4), round(a.h, 4)),
-                        "b_size": (round(b.w, 4), round(b.h, 4)),
-                        "a_shape": a.shape,
-                        "b_shape": b.shape,
-                    })
+        # "Checked" keeps the count the nested loop reported: different-net
+        # pairs whose boxes come within threshold + 1 mm on both axes.
+        net = pad_shapes[layer]["net"]
+        ci, cj = candidates(pad_shapes[layer], margin=threshold + 1.0)
+        checked_pairs += int(((net[ci] == 0) | (net[cj] == 0)
+                              | (net[ci] != net[cj])).sum())
+        for i, j, dist in zip(*pairs(pad_shapes[layer], threshold=threshold)):
+            a, b = layer_pads[i], layer_pads[j]
+            close_pairs += 1
+
+            # Skip same-net pads (e.g. power rail pads that are intentionally
+            # adjacent, or multi-pin components with bridged nets)
+            if a.net != 0 and b.net != 0 and a.net == b.net:
+                continue
+
+            violations.append({
+                "type": "pad-pad",
+                "layer": layer,
+                "dist": float(dist),
+                "a": f"{a.ref}[{a.num}]",
+                "b": f"{b.ref}[{b.num}]",
+                "a_pos": (round(a.x, 4), round(a.y, 4)),
+                "b_pos": (round(b.x, 4), round(b.y, 4)),
+                "a_size": (round(a.w, 4), round(a.h, 4)),
+                "b_size": (round(b.w, 4), round(b.h, 4)),
+                "a_shape": a.shape,
+                "b_shape": b.shape,
+            })
 
     if verbose:
         print(f"Pad-to-pad pairs checked: {checked_pairs}")
+        print(f"Pad-to-pad pairs within {threshold}mm: {close_pairs}")
 
     # ── Via-to-pad ───────────────────────────────────────────────
     # Vias appear on both F.Cu and B.Cu.
     # Skip same-net pairs (when net info available) and skip vias that land
     # exactly at a pad center (connected via-in-pad, intentional).
+    hits = []
+    for rank, layer in enumerate(("F.Cu", "B.Cu")):
+        if layer not in pad_shapes:
+            continue
+        found = pairs(circles(vias, layer=layer), pad_shapes[layer],
+                      threshold=threshold)
+        hits += [(vi, rank, pi, dist) for vi, pi, dist in zip(*found)]
+    hits.sort(key=lambda h: h[:3])      # via-major, as the loop used to be
+
     via_violations = 0
-    for v in vias:
-        for layer in ("F.Cu", "B.Cu"):
-            for p in by_layer[layer]:
-                # Skip same-net (valid connection)
-                if v.net != 0 and p.net != 0 and v.net == p.net:
-                    continue
-                # Skip via that sits exactly at pad center (intentional connection)
-                ax1, ay1, ax2, ay2 = pad_bbox(p)
-                if ax1 <= v.x <= ax2 and ay1 <= v.y <= ay2:
-                    continue
-                if abs(v.x - p.x) > (p.w / 2 + v.size / 2 + threshold + 1.0):
-                    continue
-                if abs(v.y - p.y) > (p.h / 2 + v.size / 2 + threshold + 1.0):
-                    continue
-                dist = via_to_pad_distance(v, p)
-                if dist < threshold:
-                    violations.append({
-                        "type": "via-pad",
-                        "layer": layer,
-                        "dist": dist,
-                        "a": f"VIA@({v.x:.3f},{v.y:.3f}) size={v.size}",
-                        "b": f"{p.ref}[{p.num}]",
-                        "a_pos": (round(v.x, 4), round(v.y, 4)),
-                        "b_pos": (round(p.x, 4), round(p.y, 4)),
-                        "a_size": (round(v.size, 4), round(v.size, 4)),
-                        "b_size": (round(p.w, 4), round(p.h, 4)),
-                        "a_shape": "circle",
-                        "b_shape": p.shape,
-                    })
-                    via_violations += 1
+    for vi, rank, pi, dist in hits:
+        v, layer = vias[vi], ("F.Cu", "B.Cu")[rank]
+        p = by_layer[layer][pi]
+        # Skip same-net (valid connection)
+        if v.net != 0 and p.net != 0 and v.net == p.net:
+            continue
+        # Skip via that sits exactly at pad center (intentional connection)
+        ax1, ay1, ax2, ay2 = pad_bbox(p)
+        if ax1 <= v.x <= ax2 and ay1 <= v.y <= ay2:
+            continue
+        violations.append({
+            "type": "via-pad",
+            "layer": layer,
+            "dist": float(dist),
+            "a": f"VIA@({v.x:.3f},{v.y:.3f}) size={v.size}",
+            "b": f"{p.ref}[{p.num}]",
+            "a_pos": (round(v.x, 4), round(v.y, 4)),
+            "b_pos": (round(p.x, 4), round(p.y, 4)),
+            "a_size": (round(v.size, 4), round(v.size, 4)),
+            "b_size": (round(p.w, 4), round(p.h, 4)),
+            "a_shape": "circle",
+            "b_shape": p.shape,
+        })
+        via_violations += 1
 
     if verbose:
         print(f"Via-to-pad violations found: {via_violations}")
@@ -359,77 +364,74 @@ def analyze(threshold: float = 0.15, verbose: bool = True):
                 return True
         return False
 
-    trace_pad_violations = 0
+    by_seg_layer: dict[str, list[Segment]] = defaultdict(list)
     for s in segments:
-        for p in by_layer[s.layer]:
-            # Skip same-net (valid connection, not a spacing violation)
-            if s.net != 0 and p.net != 0 and s.net == p.net:
-                continue
-            # Skip if a trace endpoint terminates at this pad (connected trace)
-            if _endpoint_on_pad(s, p):
-                continue
-            # Fast reject
-            sx1, sx2 = min(s.x1, s.x2), max(s.x1, s.x2)
-            sy1, sy2 = min(s.y1, s.y2), max(s.y1, s.y2)
-            if p.x < sx1 - p.w/2 - s.width/2 - threshold - 1.0:
-                continue
-            if p.x > sx2 + p.w/2 + s.width/2 + threshold + 1.0:
-                continue
-            if p.y < sy1 - p.h/2 - s.width/2 - threshold - 1.0:
-                continue
-            if p.y > sy2 + p.h/2 + s.width/2 + threshold + 1.0:
-                continue
-            dist = segment_to_pad_distance(s, p)
-            if dist < threshold:
-                violations.append({
-                    "type": "trace-pad",
-                    "layer": s.layer,
-                    "dist": dist,
-                    "a": f"TRACE({s.x1:.3f},{s.y1:.3f})->({s.x2:.3f},{s.y2:.3f}) w={s.width} net={s.net}",
-                    "b": f"{p.ref}[{p.num}]",
-                    "a_pos": (round((s.x1+s.x2)/2, 4), round((s.y1+s.y2)/2, 4)),
-                    "b_pos": (round(p.x, 4), round(p.y, 4)),
-                    "a_size": (round(s.width, 4), round(s.width, 4)),
-                    "b_size": (round(p.w, 4), round(p.h, 4)),
-                    "a_shape": "segment",
-                    "b_shape": p.shape,
-                })
-                trace_pad_violations += 1
+        by_seg_layer[s.layer].append(s)
+    seg_shapes = {layer: capsules(segs) for layer, segs in by_seg_layer.items()}
+
+    # The gap is the exact capsule-to-rectangle distance; it used to be
+    # the distance from the trace axis to the pad's corners and centre,
+    # which misses a trace passing a pad's long edge mid-span.
+    hits = []
+    for layer, segs in by_seg_layer.items():
+        if layer not in pad_shapes:
+            continue
+        found = pairs(seg_shapes[layer], pad_shapes[layer], threshold=threshold)
+        hits += [(segs[si], by_layer[layer][pi], dist)
+                 for si, pi, dist in zip(*found)]
+    order = {id(s): k for k, s in enumerate(segments)}
+    hits.sort(key=lambda h: order[id(h[0])])    # segment-major, file order
+
+    trace_pad_violations = 0
+    for s, p, dist in hits:
+        # Skip same-net (valid connection, not a spacing violation)
+        if s.net != 0 and p.net != 0 and s.net == p.net:
+            continue
+        # Skip if a trace endpoint terminates at this pad (connected trace)
+        if _endpoint_on_pad(s, p):
+            continue
+        violations.append({
+            "type": "trace-pad",
+            "layer": s.layer,
+            "dist": float(dist),
+            "a": f"TRACE({s.x1:.3f},{s.y1:.3f})->({s.x2:.3f},{s.y2:.3f}) w={s.width} net={s.net}",
+            "b": f"{p.ref}[{p.num}]",
+            "a_pos": (round((s.x1+s.x2)/2, 4), round((s.y1+s.y2)/2, 4)),
+            "b_pos": (round(p.x, 4), round(p.y, 4)),
+            "a_size": (round(s.width, 4), round(s.width, 4)),
+            "b_size": (round(p.w, 4), round(p.h, 4)),
+            "a_shape": "segment",
+            "b_shape": p.shape,
+        })
+        trace_pad_violations += 1
 
     if verbose:
         print(f"Trace-to-pad violations found: {trace_pad_violations}")
 
     # ── Trace-to-trace ───────────────────────────────────────────
+    # Copper gap between capsules, floored at zero (see
+    # segment_to_segment_distance, which remains the scalar reference).
     trace_trace_violations = 0
-    by_seg_layer: dict[str, list[Segment]] = defaultdict(list)
-    for s in segments:
-        by_seg_layer[s.layer].append(s)
-
     for layer, segs in by_seg_layer.items():
-        n = len(segs)
-        for i in range(n):
-            a = segs[i]
-            for j in range(i + 1, n):
-                b = segs[j]
-                # Same net — skip (not a spacing violation)
-                if a.net != 0 and a.net == b.net:
-                    continue
-                dist = segment_to_segment_distance(a, b)
-                if dist < threshold:
-                    violations.append({
-                        "type": "trace-trace",
-                        "layer": layer,
-                        "dist": dist,
-                        "a": f"TRACE({a.x1:.3f},{a.y1:.3f})->({a.x2:.3f},{a.y2:.3f}) w={a.width} net={a.net}",
-                        "b": f"TRACE({b.x1:.3f},{b.y1:.3f})->({b.x2:.3f},{b.y2:.3f}) w={b.width} net={b.net}",
-                        "a_pos": (round((a.x1+a.x2)/2, 4), round((a.y1+a.y2)/2, 4)),
-                        "b_pos": (round((b.x1+b.x2)/2, 4), round((b.y1+b.y2)/2, 4)),
-                        "a_size": (round(a.width, 4), round(a.width, 4)),
-                        "b_size": (round(b.width, 4), round(b.width, 4)),
-                        "a_shape": "segment",
-                        "b_shape": "segment",
-                    })
-                    trace_trace_violations += 1
+        for i, j, dist in zip(*pairs(seg_shapes[layer], threshold=threshold)):
+            a, b = segs[i], segs[j]
+            # Same net — skip (not a spacing violation)
+            if a.net != 0 and a.net == b.net:
+                continue
+            violations.append({
+                "type": "trace-trace",
+                "layer": layer,
+                "dist": max(0.0, float(dist)),
+                "a": f"TRACE({a.x1:.3f},{a.y1:.3f})->({a.x2:.3f},{a.y2:.3f}) w={a.width} net={a.net}",
+                "b": f"TRACE({b.x1:.3f},{b.y1:.3f})->({b.x2:.3f},{b.y2:.3f}) w={b.width} net={b.net}",
+                "a_pos": (round((a.x1+a.x2)/2, 4), round((a.y1+a.y2)/2, 4)),
+                "b_pos": (round((b.x1+b.x2)/2, 4), round((b.y1+b.y2)/2, 4)),
+                "a_size": (round(a.width, 4), round(a.width, 4)),
+                "b_size": (round(b.width, 4), round(b.width, 4)),
+                "a_shape": "segment",
+                "b_shape": "segment",
+            })
+            trace_trace_violations += 1
 
     if verbose:
         print(f"Trace-to-trace violations found: {trace_trace_violations}\n")
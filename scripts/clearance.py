@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Batched copper clearance kernel shared by the spacing gates.
+
+Provides:
+  SHAPE                       — structured dtype for one copper primitive
+  capsules(segs, ...)         — trace segments   -> SHAPE array (CAPSULE)
+  circles(items, ...)         — vias / round pads -> SHAPE array (CIRCLE)
+  rects(pads, ...)            — pads as AABBs    -> SHAPE array (RECT)
+  gaps(a, b)                  — exact edge-to-edge gap of a[k] vs b[k]
+  pairs(a, b=None, threshold) — every pair with gap < threshold, as
+                                (i, j, gap) arrays sorted by (i, j)
+
+Shapes
+------
+Every primitive is a centre line (x1, y1)-(x2, y2) grown by a radius r:
+
+  CAPSULE  a trace: the segment, r = half the width
+  CIRCLE   a via or round pad: a zero-length segment, r = radius
+  RECT     a pad: (x1, y1) / (x2, y2) are the min / max corners of the
+           axis-aligned box, r rounds the corners (0 for a plain box)
+
+so there are only three distance cases — segment/segment, segment/box and
+box/box — each minus both radii. A negative gap means the copper overlaps.
+For two boxes the negative value is the penetration depth along the
+shallower axis, which is what analyze_pad_distances always reported; for
+the other cases an overlap is the centre-line distance minus both radii.
+
+Broad phase
+-----------
+Each shape's bounding box is grown by threshold / 2 and dropped into a
+uniform grid. Two shapes are candidates when they share a cell, and a pair
+that shares several cells is kept only in the cell holding the low corner
+of the two boxes' intersection — so each candidate is produced once,
+without a set. Pairs are then filtered on the exact gap. All of it is
+array arithmetic: the cost follows the number of shapes and of close
+pairs, not the square of the board.
+
+`layer` keeps the layers apart (shapes on different layers are never
+paired), and a shape built without one sits on NO_LAYER, which pairs only
+with other layerless shapes; `net` rides along for the caller's same-net skips, and the
+returned indices point back into the caller's own lists.
+
+Usage:
+    from clearance import capsules, rects, pairs
+    segs = capsules(cache["segments"])
+    pads = rects(cache["pads"])
+    for i, j, gap in zip(*pairs(segs, pads, threshold=0.10)):
+        ...
+"""
+
+import numpy as np
+
+CAPSULE, CIRCLE, RECT = 0, 1, 2
+
+SHAPE = np.dtype([
+    ("kind", "u1"),
+    ("x1", "f8"), ("y1", "f8"), ("x2", "f8"), ("y2", "f8"),
+    ("r", "f8"),
+    ("layer", "i4"),
+    ("net", "i4"),
+])
+
+# Layer names are interned to small ints on first sight, so callers can
+# pass the cache's strings straight through. NO_LAYER is never handed out:
+# shapes without a layer cannot land on whichever name came first.
+_LAYERS: dict = {}
+NO_LAYER = -1
+
+
+def layer_id(name):
+    """Stable small int for a layer name (ints pass through unchanged)."""
+    if isinstance(name, (int, np.integer)):
+        return int(name)
+    return _LAYERS.setdefault(name, len(_LAYERS))
+
+
+def _build(kind, n):
+    out = np.zeros(n, dtype=SHAPE)
+    out["kind"] = kind
+    return out
+
+
+def _column(items, key):
+    if callable(key):
+        return [key(it) for it in items]
+    return [it[key] if isinstance(it, dict) else getattr(it, key)
+            for it in items]
+
+
+def capsules(segs, width="width", layer="layer", net="net"):
+    """SHAPE array of traces from dicts or objects with x1/y1/x2/y2.
+
+    `width`, `layer` and `net` name the fields to read (or are callables
+    taking the item) — verify_dfm_v2 calls its width "w".
+    """
+    out = _build(CAPSULE, len(segs))
+    for f in ("x1", "y1", "x2", "y2"):
+        out[f] = _column(segs, f)
+    out["r"] = np.asarray(_column(segs, width), dtype=float) / 2.0
+    out["layer"] = [layer_id(v) for v in _column(segs, layer)]
+    out["net"] = _column(segs, net)
+    return out
+
+
+def circles(items, radius=None, layer=None, net="net"):
+    """SHAPE array of round copper at (x, y).
+
+    `radius` is a field name or callable; by default half of "size" (a
+    via's annular ring). Vias sit on every layer, so `layer` is the one
+    the caller is checking (a name or id; omitted, NO_LAYER).
+    """
+    out = _build(CIRCLE, len(items))
+    out["x1"] = out["x2"] = _column(items, "x")
+    out["y1"] = out["y2"] = _column(items, "y")
+    if radius is None:
+        out["r"] = np.asarray(_column(items, "size"), dtype=float) / 2.0
+    else:
+        out["r"] = _column(items, radius)
+    out["layer"] = NO_LAYER if layer is None else layer_id(layer)
+    out["net"] = _column(items, net)
+    return out
+
+
+def rects(pads, layer="layer", net="net"):
+    """SHAPE array of axis-aligned pads centred on (x, y), w x h."""
+    out = _build(RECT, len(pads))
+    x = np.asarray(_column(pads, "x"), dtype=float)
+    y = np.asarray(_column(pads, "y"), dtype=float)
+    hw = np.asarray(_column(pads, "w"), dtype=float) / 2.0
+    hh = np.asarray(_column(pads, "h"), dtype=float) / 2.0
+    out["x1"], out["x2"] = x - hw, x + hw
+    out["y1"], out["y2"] = y - hh, y + hh
+    out["layer"] = [layer_id(v) for v in _column(pads, layer)]
+    out["net"] = _column(pads, net)
+    return out
+
+
+# ── Narrow phase ──────────────────────────────────────────────────
+
+def _point_seg(px, py, x1, y1, x2, y2):
+    """Distance from points to segments (all arrays, broadcast)."""
+    dx, dy = x2 - x1, y2 - y1
+    d2 = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = ((px - x1) * dx + (py - y1) * dy) / d2
+    t = np.where(d2 > 0.0, np.clip(t, 0.0, 1.0), 0.0)
+    return np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def _seg_seg(ax1, ay1, ax2, ay2, bx1, by1, bx2, by2):
+    """Exact distance between two batches of finite segments."""
+    d1x, d1y = ax2 - ax1, ay2 - ay1
+    d2x, d2y = bx2 - bx1, by2 - by1
+    denom = d1x * d2y - d1y * d2x
+    sx, sy = bx1 - ax1, by1 - ay1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (sx * d2y - sy * d2x) / denom
+        u = (sx * d1y - sy * d1x) / denom
+    cross = (denom != 0.0) & (t >= 0.0) & (t <= 1.0) & (u >= 0.0) & (u <= 1.0)
+    # Otherwise the minimum is attained at an endpoint of one of the two.
+    d = np.minimum(
+        np.minimum(_point_seg(ax1, ay1, bx1, by1, bx2, by2),
+                   _point_seg(ax2, ay2, bx1, by1, bx2, by2)),
+        np.minimum(_point_seg(bx1, by1, ax1, ay1, ax2, ay2),
+                   _point_seg(bx2, by2, ax1, ay1, ax2, ay2)))
+    return np.where(cross, 0.0, d)
+
+
+def _point_box(px, py, x1, y1, x2, y2):
+    return np.hypot(np.maximum(0.0, np.maximum(x1 - px, px - x2)),
+                    np.maximum(0.0, np.maximum(y1 - py, py - y2)))
+
+
+def _seg_box(sx1, sy1, sx2, sy2, x1, y1, x2, y2):
+    """Exact distance from segments to axis-aligned boxes (0 if touching)."""
+    # Liang-Barsky clip: does any part of the segment lie in the box?
+    dx, dy = sx2 - sx1, sy2 - sy1
+    lo = np.zeros_like(dx)
+    hi = np.ones_like(dx)
+    inside = np.ones(dx.shape, dtype=bool)
+    for p, q0, q1 in ((dx, x1 - sx1, x2 - sx1), (dy, y1 - sy1, y2 - sy1)):
+        flat = p == 0.0
+        inside &= ~flat | ((q0 <= 0.0) & (q1 >= 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ta, tb = q0 / p, q1 / p
+        lo = np.where(flat, lo, np.maximum(lo, np.minimum(ta, tb)))
+        hi = np.where(flat, hi, np.minimum(hi, np.maximum(ta, tb)))
+    hit = inside & (lo <= hi)
+    # Apart, the nearest points are a segment end or a box corner.
+    d = np.minimum(_point_box(sx1, sy1, x1, y1, x2, y2),
+                   _point_box(sx2, sy2, x1, y1, x2, y2))
+    for cx, cy in ((x1, y1), (x2, y1), (x1, y2), (x2, y2)):
+        d = np.minimum(d, _point_seg(cx, cy, sx1, sy1, sx2, sy2))
+    return np.where(hit, 0.0, d)
+
+
+def _box_box(a, b):
+    dx = np.maximum(0.0, np.maximum(a["x1"], b["x1"]) - np.minimum(a["x2"], b["x2"]))
+    dy = np.maximum(0.0, np.maximum(a["y1"], b["y1"]) - np.minimum(a["y2"], b["y2"]))
+    ox = np.minimum(a["x2"], b["x2"]) - np.maximum(a["x1"], b["x1"])
+    oy = np.minimum(a["y2"], b["y2"]) - np.maximum(a["y1"], b["y1"])
+    return np.where((dx == 0.0) & (dy == 0.0), -np.minimum(ox, oy),
+                    np.hypot(dx, dy))
+
+
+def gaps(a, b):
+    """Exact copper gap between a[k] and b[k] for every k (same length)."""
+    out = np.empty(len(a))
+    ra, rb = a["kind"] == RECT, b["kind"] == RECT
+    both = ra & rb
+    if both.any():
+        out[both] = _box_box(a[both], b[both])
+    for seg, box, m in ((a, b, ~ra & rb), (b, a, ra & ~rb)):
+        if m.any():
+            s, x = seg[m], box[m]
+            out[m] = _seg_box(s["x1"], s["y1"], s["x2"], s["y2"],
+                              x["x1"], x["y1"], x["x2"], x["y2"])
+    m = ~ra & ~rb
+    if m.any():
+        s, t = a[m], b[m]
+        out[m] = _seg_seg(s["x1"], s["y1"], s["x2"], s["y2"],
+                          t["x1"], t["y1"], t["x2"], t["y2"])
+    return out - a["r"] - b["r"]
+
+
+# ── Broad phase ───────────────────────────────────────────────────
+
+def bounds(shapes):
+    """(xmin, ymin, xmax, ymax) arrays of each shape's copper."""
+    r = shapes["r"]
+    return (np.minimum(shapes["x1"], shapes["x2"]) - r,
+            np.minimum(shapes["y1"], shapes["y2"]) - r,
+            np.maximum(shapes["x1"], shapes["x2"]) + r,
+            np.maximum(shapes["y1"], shapes["y2"]) + r)
+
+
+def _cells(box, cell):
+    """Explode boxes into (shape index, cell key) rows."""
+    x0, y0, x1, y1 = (np.floor(v / cell).astype(np.int64) for v in box)
+    nx, ny = x1 - x0 + 1, y1 - y0 + 1
+    count = nx * ny
+    idx = np.repeat(np.arange(len(count)), count)
+    k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    cx = x0[idx] + k // ny[idx]
+    cy = y0[idx] + k % ny[idx]
+    return idx, cx, cy
+
+
+def candidates(a, b=None, margin=0.0, cell=None):
+    """Index pairs (i, j) whose bounds come within `margin` of each other.
+
+    With `b` omitted, pairs are drawn from `a` alone with i < j. Only
+    shapes on the same layer are paired. Each pair appears once.
+    """
+    self_join = b is None
+    if self_join:
+        b = a
+    if not len(a) or not len(b):
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    half = max(margin, 0.0) / 2.0
+    ba = tuple(v + d for v, d in zip(bounds(a), (-half, -half, half, half)))
+    bb = ba if self_join else tuple(
+        v + d for v, d in zip(bounds(b), (-half, -half, half, half)))
+    if cell is None:
+        ext = np.concatenate([ba[2] - ba[0], ba[3] - ba[1],
+                              bb[2] - bb[0], bb[3] - bb[1]])
+        cell = max(float(np.median(ext)) * 2.0, 0.25)
+    ia, xa, ya = _cells(ba, cell)
+    ib, xb, yb = (ia, xa, ya) if self_join else _cells(bb, cell)
+
+    # One sortable key per (layer, cell); the grid offset keeps it positive.
+    ox, oy = min(xa.min(), xb.min()), min(ya.min(), yb.min())
+    w = max(xa.max(), xb.max()) - ox + 1
+    h = max(ya.max(), yb.max()) - oy + 1
+    la, lb = a["layer"].astype(np.int64), b["layer"].astype(np.int64)
+    ka = (la[ia] * w + (xa - ox)) * h + (ya - oy)
+    kb = (lb[ib] * w + (xb - ox)) * h + (yb - oy)
+
+    order = np.argsort(kb, kind="stable")
+    kb, ib_sorted = kb[order], ib[order]
+    lo = np.searchsorted(kb, ka, side="left")
+    hi = np.searchsorted(kb, ka, side="right")
+    n = hi - lo
+    row = np.repeat(np.arange(len(ka)), n)
+    pos = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + lo[row]
+    i, j = ia[row], ib_sorted[pos]
+    cx, cy = xa[row], ya[row]
+
+    keep = np.ones(len(i), dtype=bool)
+    if self_join:
+        keep &= i < j
+    # Bounds must overlap (within the margin) ...
+    keep &= (ba[0][i] <= bb[2][j]) & (bb[0][j] <= ba[2][i])
+    keep &= (ba[1][i] <= bb[3][j]) & (bb[1][j] <= ba[3][i])
+    # ... and the pair is reported only from the cell holding the low
+    # corner of the intersection, so shared cells don't duplicate it.
+    keep &= cx == np.floor(np.maximum(ba[0][i], bb[0][j]) / cell)
+    keep &= cy == np.floor(np.maximum(ba[1][i], bb[1][j]) / cell)
+    return i[keep], j[keep]
+
+
+def pairs(a, b=None, threshold=0.0, cell=None):
+    """Every pair closer than `threshold`: (i, j, gap) sorted by (i, j).
+
+    `i` indexes `a` and `j` indexes `b` (or `a` again, with i < j, when
+    `b` is omitted) — the order a nested `for i ... for j ...` loop would
+    have produced them in, so callers keep their report order.
+    """
+    i, j = candidates(a, b, margin=threshold, cell=cell)
+    g = gaps(a[i], (a if b is None else b)[j])
+    keep = g < threshold
+    i, j, g = i[keep], j[keep], g[keep]
+    order = np.lexsort((j, i))
+    return i[order], j[order], g[order]
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Declarative pairwise DFM rules, compiled into shared clearance passes.
+
+verify_dfm_v2 grew one nested loop per spacing rule: trace/trace twice,
+via/trace twice, hole/trace twice, via/pad twice, ... each walking the same
+pair set on its own. Here a rule is a row — which two kinds of object, on
+which layers, between which nets, under what gap — and the engine runs one
+clearance.pairs() sweep per pair of kinds, at the loosest threshold of the
+rules that share it, and hands every rule its hits from that one sweep.
+
+Provides:
+  Rule                  — one table row (see below)
+  Hit                   — (a, b, gap, layer) for one violating pair
+  RuleResult            — a rule's hits, its structural count and its time
+  RuleEngine(cache, rules)
+    .result(name)       — RuleResult for one rule (runs every pass once)
+    .timing()           — [(name, pass, seconds)] per rule, slowest first
+  hole_items(cache)     — vias and drilled pads as one deduplicated list
+
+Rule rows
+---------
+  name        the key verify_dfm_v2 asks for
+  a, b        object kinds: "trace", "pad", "via" or "hole". `b` None
+              pairs `a` with itself (each pair once, i < j)
+  layers      copper layers to check, in report order; None for every
+              layer the layered side has. Pairs of two through-board
+              kinds (via, hole) have no layer.
+  nets        "differ"          nets differ (net 0 counts as a net)
+              "differ-netted"   both netted and different
+              "not-joined"      anything but the same non-zero net
+              "any"
+  threshold   hits are gap < threshold
+  metric      (metric_a, metric_b): "copper", or "drill" for a via's hole
+              instead of its annular ring
+  where       (pred_a, pred_b) on the objects, None for all
+  exclude     pred(a, b): pairs the rule does not report at all
+  structural  pred(a, b): pairs counted as accepted structural exceptions
+
+Kinds
+-----
+  trace   cache segments, as verify_dfm_v2 reads them ("w" is the width)
+  pad     cache pads: axis-aligned rectangles on their own layer
+  via     cache vias: a circle of size / 2 (or drill / 2) on every layer
+  hole    hole_items(): every drilled hole as a circle of drill / 2
+
+A circle's gap to anything is its centre's distance less its radius, so
+a via's drill gap is its copper gap plus (size - drill) / 2. Passes are
+therefore shared by metric too: the pass measures copper, and a drill
+rule adds the ring back per via. The ring only widens gaps, so nothing
+a drill rule needs falls outside the copper pass.
+
+Hits come back in the order the loops they replaced produced them: by
+`a`, then layer (in the rule's order), then `b`.
+
+Usage:
+    engine = RuleEngine(cache, RULES)
+    res = engine.result("trace_spacing")
+    for hit in res.hits:
+        ...
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from clearance import capsules, circles, pairs, rects
+
+Rule = namedtuple("Rule", "name a b layers nets threshold metric where "
+                          "exclude structural")
+Rule.__new__.__defaults__ = (None, None, "differ", 0.0, ("copper", "copper"),
+                             (None, None), None, None)
+
+Hit = namedtuple("Hit", "a b gap layer")
+RuleResult = namedtuple("RuleResult", "rule hits structural seconds")
+
+_KINDS = ("trace", "pad", "via", "hole")
+_THROUGH = frozenset({"via", "hole"})
+_NETS = ("differ", "differ-netted", "not-joined", "any")
+_METRICS = ("copper", "drill")
+
+
+def hole_items(cache):
+    """Vias then drilled pads as {x, y, drill, net, type, ref, num, label}.
+
+    Deduplicated by (x, y, drill): the cache repeats a through-hole pad
+    once per copper layer, and a hole is one hole however many layers its
+    pad is on.
+    """
+    out, seen = [], set()
+
+    def add(item):
+        key = (round(item["x"], 3), round(item["y"], 3),
+               round(item["drill"], 3))
+        if key not in seen:
+            seen.add(key)
+            out.append(item)
+
+    for v in cache["vias"]:
+        add({"x": v["x"], "y": v["y"], "drill": v["drill"], "net": v["net"],
+             "type": "via", "ref": None, "num": None,
+             "label": f"via@({v['x']},{v['y']})"})
+    for p in cache["pads"]:
+        if p.get("type") in ("thru_hole", "np_thru_hole") \
+                and p.get("drill", 0) > 0:
+            add({"x": p["x"], "y": p["y"], "drill": p["drill"],
+                 "net": p["net"], "type": p["type"], "ref": p["ref"],
+                 "num": p["num"],
+                 "label": f"{p['ref']}[{p['num']}]@({p['x']},{p['y']})"})
+    return out
+
+
+class _Side:
+    """One kind's objects as a SHAPE array, plus each shape's object index."""
+
+    def __init__(self, items, shapes, index, layers):
+        self.items = items
+        self.shapes = shapes
+        self.index = index
+        self.layer = layers
+        self.net = np.asarray([it["net"] for it in items], dtype=np.int64)
+
+
+class RuleEngine:
+    """Evaluate a rule table against one board cache.
+
+    Every pass runs on the first result() call; the rules of a pass are
+    then answered from its pairs. The cache is read, never written.
+    """
+
+    def __init__(self, cache, rules):
+        self.rules = {}
+        for rule in rules:
+            if rule.name in self.rules:
+                raise ValueError(f"duplicate rule {rule.name!r}")
+            if rule.a not in _KINDS or rule.b not in _KINDS + (None,):
+                raise ValueError(f"{rule.name}: kinds must be in {_KINDS}")
+            if rule.nets not in _NETS:
+                raise ValueError(f"{rule.name}: nets must be one of {_NETS}")
+            if not set(rule.metric) <= set(_METRICS):
+                raise ValueError(f"{rule.name}: metric must be in {_METRICS}")
+            if "drill" in rule.metric and "via" not in (rule.a, rule.b or rule.a):
+                raise ValueError(f"{rule.name}: only a via has a drill metric")
+            if rule.layers is not None and {rule.a, rule.b or rule.a} <= _THROUGH:
+                raise ValueError(f"{rule.name}: {rule.a} x {rule.b or rule.a} "
+                                 f"pairs have no layer")
+            self.rules[rule.name] = rule
+        self._cache = cache
+        self._items = {}
+        self._sides = {}
+        self._results = None
+
+    # ── Objects ───────────────────────────────────────────────────
+
+    def items(self, kind):
+        """The objects of `kind`, in the order hits index them."""
+        if kind not in self._items:
+            cache = self._cache
+            if kind == "trace":
+                found = [{"x1": s["x1"], "y1": s["y1"], "x2": s["x2"],
+                          "y2": s["y2"], "w": s["width"], "layer": s["layer"],
+                          "net": s["net"]} for s in cache["segments"]]
+            elif kind == "pad":
+                found = list(cache["pads"])
+            elif kind == "via":
+                found = list(cache["vias"])
+            elif kind == "hole":
+                found = hole_items(cache)
+            else:
+                raise ValueError(f"unknown object kind {kind!r}")
+            self._items[kind] = found
+        return self._items[kind]
+
+    def _side(self, kind, layers):
+        """`kind` as shapes on `layers` (None: one layer-less copy)."""
+        key = (kind, None if layers is None else tuple(layers))
+        if key in self._sides:
+            return self._sides[key]
+        items = self.items(kind)
+        n = len(items)
+        if kind in _THROUGH:
+            field = "drill" if kind == "hole" else "size"
+            copies = [None] if layers is None else list(layers)
+            shapes = np.concatenate([
+                circles(items, radius=lambda it: it[field] / 2.0, layer=layer)
+                for layer in copies])
+            index = np.tile(np.arange(n), len(copies))
+            names = np.repeat(np.asarray(copies, dtype=object), n)
+        else:
+            shapes = (capsules(items, width="w") if kind == "trace"
+                      else rects(items))
+            names = np.asarray([it["layer"] for it in items], dtype=object)
+            index = np.arange(n)
+            if layers is not None:
+                index = np.flatnonzero(np.isin(names, list(layers)))
+            shapes, names = shapes[index], names[index]
+        side = self._sides[key] = _Side(items, shapes, index, names)
+        return side
+
+    # ── Passes ────────────────────────────────────────────────────
+
+    def passes(self):
+        """{(a, b): [rule, ...]} — one clearance sweep per key."""
+        out = {}
+        for rule in self.rules.values():
+            out.setdefault((rule.a, rule.b), []).append(rule)
+        return out
+
+    def _layers(self, a, b, rules):
+        if a in _THROUGH and (b or a) in _THROUGH:
+            return None
+        if any(rule.layers is None for rule in rules):
+            layered = a if a not in _THROUGH else b
+            found = []
+            for it in self.items(layered):
+                if it["layer"] not in found:
+                    found.append(it["layer"])
+            return found
+        found = []
+        for rule in rules:
+            found += [layer for layer in rule.layers if layer not in found]
+        return found
+
+    def _run(self):
+        self._results = {}
+        for (a, b), rules in self.passes().items():
+            t0 = time.perf_counter()
+            layers = self._layers(a, b, rules)
+            sa = self._side(a, layers)
+            sb = sa if b is None else self._side(b, layers)
+            threshold = max(rule.threshold for rule in rules)
+            i, j, gap = pairs(sa.shapes, None if b is None else sb.shapes,
+                              threshold=threshold)
+            rows = (sa.index[i], sb.index[j], gap, sa.layer[i])
+            spent = time.perf_counter() - t0
+            for rule in rules:
+                t1 = time.perf_counter()
+                hits, structural = self._evaluate(rule, sa, sb, *rows)
+                self._results[rule.name] = RuleResult(
+                    rule, hits, structural,
+                    time.perf_counter() - t1 + spent / len(rules))
+
+    def _adjust(self, side, kind, metric, index):
+        """Per-row gap correction from the pass's copper to `metric`."""
+        if metric == "drill" and kind == "via":
+            ring = np.asarray([(it["size"] - it["drill"]) / 2.0
+                               for it in side.items])
+            return ring[index]
+        return 0.0
+
+    def _evaluate(self, rule, sa, sb, ia, ib, gap, layer):
+        b_kind = rule.b or rule.a
+        gap = (gap + self._adjust(sa, rule.a, rule.metric[0], ia)
+               + self._adjust(sb, b_kind, rule.metric[1], ib))
+        keep = gap < rule.threshold
+        na, nb = sa.net[ia], sb.net[ib]
+        if rule.nets == "differ":
+            keep &= na != nb
+        elif rule.nets == "differ-netted":
+            keep &= (na != nb) & (na != 0) & (nb != 0)
+        elif rule.nets == "not-joined":
+            keep &= (na != nb) | (na == 0) | (nb == 0)
+        for pred, side, index in zip(rule.where, (sa, sb), (ia, ib)):
+            if pred is not None:
+                mask = np.fromiter((pred(it) for it in side.items), bool,
+                                   len(side.items))
+                keep &= mask[index]
+        rank = {name: k for k, name in enumerate(rule.layers or ())}
+        if rule.layers is not None:
+            keep &= np.isin(layer, list(rule.layers))
+
+        rows = np.flatnonzero(keep)
+        order = sorted(rows, key=lambda k: (ia[k], rank.get(layer[k], 0),
+                                            ib[k]))
+        hits, structural = [], 0
+        for k in order:
+            a, b = sa.items[ia[k]], sb.items[ib[k]]
+            if rule.exclude is not None and rule.exclude(a, b):
+                continue
+            if rule.structural is not None and rule.structural(a, b):
+                structural += 1
+                continue
+            hits.append(Hit(a, b, float(gap[k]), layer[k]))
+        return hits, structural
+
+    # ── Results ───────────────────────────────────────────────────
+
+    def result(self, name):
+        if self._results is None:
+            self._run()
+        return self._results[name]
+
+    def timing(self):
+        """[(rule name, "a x b", seconds)], slowest first.
+
+        A rule's time is its own filtering plus an even share of the sweep
+        it rode on.
+        """
+        if self._results is None:
+            self._run()
+        rows = [(name, f"{r.rule.a} x {r.rule.b or r.rule.a}", r.seconds)
+                for name, r in self._results.items()]
+        return sorted(rows, key=lambda row: -row[2])
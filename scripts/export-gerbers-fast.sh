@@ -1,6 +1,7 @@
 #!/usr/bin/env bash
 # Fast gerber export using local kicad-cli (no Docker overhead for gerbers/drill).
-# Docker is still needed for zone fill (pcbnew Python API not available in kicad-cli).
+# Docker is still needed for zone fill (pcbnew Python API not available in kicad-cli),
+# unless ZONE_FILL=native (see scripts/fill-zones.sh).
 #
 # Benchmarks on M1 Max:
 #   Docker version:  ~4.7s (3 container starts)
@@ -23,11 +24,11 @@ if [ ! -f "$KICAD_DIR/$PCB_FILE" ]; then
     exit 1
 fi
 
-# Step 1: Zone fill via Docker (pcbnew Python API — no local alternative).
+# Step 1: Zone fill via Docker (pcbnew Python API), or natively with ZONE_FILL=native.
 # Shared with the render targets via scripts/fill-zones.sh so that both
 # consumers of the generated board fill it the same way — see that script for
 # why an unfilled board is not a harmless intermediate state.
-echo "==> Step 1: Filling zones via Docker (pcbnew API)..."
+echo "==> Step 1: Filling zones (${ZONE_FILL:-kicad})..."
 "$SCRIPT_DIR/fill-zones.sh" "$PCB_FILE"
 
 # Step 2+3: Local kicad-cli (no Docker overhead)
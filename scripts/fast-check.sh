@@ -1,6 +1,7 @@
 #!/usr/bin/env bash
 # Fast full check pipeline: generate + DRC + DFM + gerbers
-# Uses local kicad-cli where possible, Docker only for zone fill.
+# Uses local kicad-cli where possible. ZONE_FILL=native fills zones on the host
+# instead of in Docker (see scripts/fill-zones.sh for what that trades away).
 #
 # Benchmarks on M1 Max:
 #   Full Docker pipeline:  ~15-20s
@@ -57,8 +58,15 @@ else
 fi
 elapsed
 
-# ── Step 4: Zone fill (Docker) + Gerber export (local) ───────
-step "4/5" "Exporting gerbers (zone fill via Docker, export local)..."
+# ── Step 4: Zone fill + Gerber export (local) ────────────────
+# The board, gerbers/ and jlcpcb/gerbers.zip written here are tracked
+# fabrication outputs, so the fill is pcbnew's unless ZONE_FILL=native is
+# asked for. The native fill skips the Docker start-up but is an
+# approximation: do not commit what a native run leaves behind.
+step "4/5" "Exporting gerbers (zone fill ${ZONE_FILL:-kicad}, export local)..."
+if [ "${ZONE_FILL:-kicad}" = native ]; then
+    echo "  NOTE: native fill — board and gerbers are not for release"
+fi
 "$SCRIPT_DIR/export-gerbers-fast.sh" 2>&1 | grep -E "^==>|ZIP:|files exported"
 elapsed
 
@@ -13,6 +13,14 @@
 #     runs that gate, an unrelated commit gets blocked citing zone fills.
 #
 # All three happened. See docs/known-issues.md section C.
+#
+# ZONE_FILL=native fills on the host with scripts/zone_fill_native.py instead
+# (shapely, no Docker, ~1-2 s). It is an approximation: on the committed board
+# its fill differs from KiCad's by under 0.1% of the poured area (about 0.07%
+# on the In1.Cu and In2.Cu planes, `zone_fill_native.py --compare`). It is
+# opt-in everywhere, for the inner check loop only; the default is KiCad's own
+# filler, so gerbers and releases ship pcbnew's fill. Do not commit a board or
+# gerbers filled natively.
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
@@ -26,10 +34,21 @@ if [ ! -f "$KICAD_DIR/$PCB_FILE" ]; then
     exit 1
 fi
 
-docker compose -f "$PROJECT_ROOT/docker-compose.yml" run --rm \
-    --entrypoint python3 \
-    kicad-pcb \
-    /scripts/kicad_fill_zones.py "/project/$PCB_FILE"
+case "${ZONE_FILL:-kicad}" in
+    native)
+        python3 "$SCRIPT_DIR/zone_fill_native.py" "$KICAD_DIR/$PCB_FILE"
+        ;;
+    kicad)
+        docker compose -f "$PROJECT_ROOT/docker-compose.yml" run --rm \
+            --entrypoint python3 \
+            kicad-pcb \
+            /scripts/kicad_fill_zones.py "/project/$PCB_FILE"
+        ;;
+    *)
+        echo "ERROR: ZONE_FILL must be 'kicad' or 'native', got '$ZONE_FILL'" >&2
+        exit 1
+        ;;
+esac
 
 # Fail loudly rather than leaving an unfilled board behind: a silent no-op here
 # is exactly the failure this script exists to prevent.
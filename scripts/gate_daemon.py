@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""Gate daemon — keep the board resident, fork warm workers per gate.
+
+Why
+---
+`make verify-all` runs ~100 gates, and every caller that runs gates
+(run-verifiers.sh, verify_isolation, open_issues_report, issue_dispatch)
+starts one fresh `python3` per gate. Each of those pays interpreter
+startup, imports numpy and shapely, reads the board and maps the parse
+cache — the same work a hundred times over, for a board that usually
+did not change between two runs.
+
+This is one long-lived process, listening on a Unix socket, that does all
+of that ONCE: it imports the shared helpers, loads the parse cache and
+indexes the board text. Each gate then runs in a child forked from that
+warm parent, so it starts with everything already in memory, and a crash
+or a mutated module global in one gate dies with its child. The parent
+re-checks the board's stat fingerprint before every batch and reloads
+only when it changed. If a helper module under the repo is edited, the
+next child drops every repo module and imports them fresh, and the parent
+re-executes itself once it is idle, so a stale import is never served.
+
+Every client falls back to the old subprocess path when no daemon is
+running (or GATE_DAEMON=0), so nothing depends on it being up.
+
+Gates still run exactly as `python3 scripts/<gate>.py [args]` would: as
+__main__, with that argv, that cwd and the caller's environment; the exit
+code, stdout and stderr are returned separately.
+
+Protocol: one JSON request line per connection, one JSON line back per
+result.
+    {"op": "ping"}                       -> {"pid", "board", "uptime", ...}
+    {"op": "stop"}                       -> {"stopping": true}
+    {"op": "run", "gates": [...], "timeout": s, "merge": bool, "env": {...}}
+        -> {"gate", "rc", "seconds", "stdout", "stderr"} per gate, in
+           completion order (rc is null on timeout), then {"done": true}
+
+verify_gate_coverage does NOT use it: its gates run in a sandbox copy of
+the tree, and a daemon serves only the checkout it was started in.
+
+Usage:
+    python3 scripts/gate_daemon.py start        # background, returns when ready
+    python3 scripts/gate_daemon.py serve        # foreground
+    python3 scripts/gate_daemon.py status
+    python3 scripts/gate_daemon.py stop
+    python3 scripts/gate_daemon.py run [--log-dir DIR] [--timeout S] GATE...
+
+    from gate_daemon import run_gate
+    r = run_gate("verify_polarity", timeout=30)   # daemon or subprocess
+    r.rc, r.stdout, r.stderr, r.seconds
+"""
+
+import collections
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+import gate_registry
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPTS_DIR)
+BOARD = os.path.join(PROJECT_DIR, "hardware", "kicad",
+                     "esp32-emu-turbo.kicad_pcb")
+
+# One daemon per checkout: the socket name carries a hash of the tree's
+# path, so two clones never answer for each other.
+SOCKET_PATH = os.environ.get("GATE_DAEMON_SOCKET") or os.path.join(
+    tempfile.gettempdir(),
+    f"gate-daemon-{os.getuid()}-"
+    f"{hashlib.sha1(PROJECT_DIR.encode()).hexdigest()[:10]}.sock")
+
+# Third-party and repo modules most gates import. A failed import here is
+# not an error — the gate that needs it will import it itself and fail
+# loudly in its own output.
+PRELOAD = (
+    "numpy",
+    "shapely.geometry",
+    "shapely.strtree",
+    "kicad_sexpr",
+    "pcb_cache",
+    "pcb_copper_graph",
+    "vbench",
+    "scripts.generate_pcb",
+)
+
+_GATE_RE = re.compile(r"^[A-Za-z0-9_]+$")
+
+GateRun = collections.namedtuple(
+    "GateRun",
+    "gate rc seconds stdout stderr verdict findings passed failed inputs",
+    defaults=(None, None, None, None, None))
+GateRun.__doc__ = """One gate's outcome. rc is None when it timed out.
+
+verdict/findings/passed/failed are gate_registry's structured result; they
+are filled on the daemon path and None on the subprocess fallback. inputs
+is gate_store's record of what the gate read, when run with trace=True.
+"""
+
+
+class DaemonUnavailable(RuntimeError):
+    """No daemon is listening, or it went away mid-request."""
+
+
+# ── Client ───────────────────────────────────────────────────────────
+
+def _connect():
+    if os.environ.get("GATE_DAEMON", "") == "0":
+        raise DaemonUnavailable("disabled by GATE_DAEMON=0")
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(SOCKET_PATH)
+    except OSError as e:
+        s.close()
+        raise DaemonUnavailable(str(e)) from None
+    return s
+
+
+def _request(msg):
+    """Send one request, yield each reply line as a dict."""
+    s = _connect()
+    try:
+        s.sendall(json.dumps(msg).encode() + b"\n")
+        with s.makefile("rb") as f:
+            for line in f:
+                yield json.loads(line)
+    except OSError as e:
+        raise DaemonUnavailable(str(e)) from None
+    finally:
+        s.close()
+
+
+def ping():
+    """The daemon's status dict, or None if none is listening."""
+    try:
+        return next(_request({"op": "ping"}), None)
+    except DaemonUnavailable:
+        return None
+
+
+def run_gates(gates, timeout=None, merge=False, trace=False):
+    """Run `gates` on the daemon; yield a GateRun as each one finishes.
+
+    merge=True sends stderr into stdout, interleaved as `2>&1` would
+    (GateRun.stderr is then empty). trace=True fills GateRun.inputs.
+
+    Raises DaemonUnavailable if there is no daemon, or if it stops
+    answering before every gate has reported.
+    """
+    pending = set(gates)
+    msg = {"op": "run", "gates": list(gates), "timeout": timeout,
+           "merge": merge, "trace": trace, "env": dict(os.environ)}
+    for r in _request(msg):
+        if r.get("done"):
+            break
+        if "error" in r:
+            raise DaemonUnavailable(r["error"])
+        pending.discard(r["gate"])
+        yield GateRun(r["gate"], r["rc"], r["seconds"], r["stdout"],
+                      r["stderr"], r["verdict"], r["findings"], r["passed"],
+                      r["failed"], r.get("inputs"))
+    if pending:
+        raise DaemonUnavailable(f"no result for {sorted(pending)}")
+
+
+def _run_subprocess(gate, timeout):
+    script, *args = gate.split()
+    t0 = time.monotonic()
+    try:
+        p = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, f"{script}.py"), *args],
+            cwd=PROJECT_DIR, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        return GateRun(gate, None, time.monotonic() - t0,
+                       _text(e.stdout), _text(e.stderr))
+    return GateRun(gate, p.returncode, time.monotonic() - t0,
+                   p.stdout or "", p.stderr or "")
+
+
+def _text(b):
+    if isinstance(b, bytes):
+        return b.decode("utf-8", "replace")
+    return b or ""
+
+
+def run_gate(gate, timeout=None):
+    """Run one gate ("script [args]") — on the daemon if one is up.
+
+    Same contract as `subprocess.run([python, scripts/<script>.py, *args],
+    cwd=<repo>)`, whichever path it takes.
+    """
+    try:
+        for r in run_gates([gate], timeout):
+            return r
+    except DaemonUnavailable:
+        pass
+    return _run_subprocess(gate, timeout)
+
+
+# ── Server ───────────────────────────────────────────────────────────
+
+def _fingerprint(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _repo_modules():
+    """{module name: fingerprint of its source} for modules under the repo."""
+    out = {}
+    for name, mod in list(sys.modules.items()):
+        path = getattr(mod, "__file__", None)
+        if path and os.path.abspath(path).startswith(PROJECT_DIR + os.sep) \
+                and name != "__main__":
+            out[name] = (path, _fingerprint(path))
+    return out
+
+
+class _Warm:
+    """What the parent keeps resident between batches."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.board = None
+        self.context = None
+        self.served = 0
+        path = list(sys.path)
+        sys.path.insert(1, PROJECT_DIR)     # for scripts.* packages
+        for name in PRELOAD:
+            try:
+                __import__(name)
+            except Exception:
+                pass
+        sys.path[:] = path
+        self.modules = _repo_modules()
+        self.refresh()
+
+    def refresh(self):
+        """Reload the board if its fingerprint moved. True if it did."""
+        fp = _fingerprint(BOARD)
+        if fp == self.board and self.context is not None:
+            return False
+        self.board = fp
+        if self.context is not None:
+            self.context.uninstall()
+            self.context = None
+        try:
+            # Builds or re-stamps the cache once, here, instead of letting
+            # a batch of children race to rewrite it; children inherit the
+            # installed context and its board index.
+            self.context = gate_registry.BoardContext()
+            self.context.install()
+        except Exception:
+            traceback.print_exc()
+        return True
+
+    def stale_modules(self):
+        return [name for name, (path, fp) in self.modules.items()
+                if _fingerprint(path) != fp]
+
+
+class _Job:
+    __slots__ = ("conn", "gate", "timeout", "env", "merge", "trace", "pid",
+                 "t0", "out", "err", "res", "expired")
+
+    def __init__(self, conn, gate, timeout, env, merge, trace):
+        self.conn, self.gate, self.timeout, self.env = conn, gate, timeout, env
+        self.merge, self.trace = merge, trace
+        self.pid = self.t0 = self.out = self.err = self.res = None
+        self.expired = False
+
+
+def _child(job, warm, fds_to_close):
+    """Body of a forked worker: run one gate as __main__, never return.
+
+    The worker ends in SystemExit with the gate's exit code, so the
+    interpreter shuts down as it would after `python3 <gate>.py`: the
+    gate's atexit handlers and weakref finalizers run and stdio is flushed.
+    serve() lets it through without its own cleanup.
+    """
+    rc, checks, crashed, inputs = 1, None, False, None
+    try:
+        os.setpgid(0, 0)
+        for fd in fds_to_close:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.dup2(job.out, 1)
+        os.dup2(job.out if job.merge else job.err, 2)
+        os.environ.clear()
+        os.environ.update(job.env)
+        # A gate that runs gates (verify_isolation) must not queue them
+        # behind itself on this daemon: with every worker busy waiting for
+        # its own members, nothing would ever start. Nested runs go cold.
+        os.environ["GATE_DAEMON"] = "0"
+        # Buffer as a fresh interpreter writing to a file would: stdout in
+        # blocks, stderr per line, both unbuffered under PYTHONUNBUFFERED.
+        # With merge=True that decides how the two streams interleave.
+        raw = bool(os.environ.get("PYTHONUNBUFFERED"))
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False),
+                                      encoding="utf-8", write_through=raw)
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False),
+                                      encoding="utf-8",
+                                      errors="backslashreplace",
+                                      line_buffering=True, write_through=raw)
+        os.chdir(PROJECT_DIR)
+
+        if warm.stale_modules():
+            # Something under the repo was edited since the parent imported
+            # it. Drop them all, not just the edited one: the others hold
+            # references into it.
+            for name in warm.modules:
+                sys.modules.pop(name, None)
+
+        script, *args = job.gate.split()
+        path = os.path.join(SCRIPTS_DIR, f"{script}.py")
+        if not _GATE_RE.match(script) or not os.path.exists(path):
+            print(f"{sys.executable}: can't open file {path!r}: "
+                  f"[Errno 2] No such file or directory", file=sys.stderr)
+            rc = 2
+        else:
+            module = types.ModuleType("__main__")
+            tracer = contextlib.nullcontext()
+            if job.trace:
+                import gate_store
+                tracer = gate_store.trace()
+            with tracer as t:
+                rc, checks, crashed = gate_registry.execute(path, args,
+                                                            module)
+            if job.trace and (keys := t.inputs(job.gate, module)):
+                inputs = gate_store.fingerprint(keys)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.write(job.res,
+                     json.dumps([checks, crashed, inputs]).encode())
+        finally:
+            sys.exit(rc & 0xFF)
+
+
+def _listen(path):
+    try:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        probe.connect(path)
+        probe.close()
+        raise SystemExit(f"gate daemon already listening on {path}")
+    except OSError:
+        pass
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old = os.umask(0o177)        # socket is 0600: it runs code as this user
+    try:
+        s.bind(path)
+    finally:
+        os.umask(old)
+    s.listen(64)
+    return s
+
+
+def serve(path=SOCKET_PATH, jobs=None, listen_fd=None):
+    """Run the daemon in the foreground until a stop request or SIGTERM."""
+    jobs = jobs or os.cpu_count() or 4
+    if listen_fd is None:
+        listener = _listen(path)
+    else:
+        listener = socket.socket(fileno=listen_fd)
+    listener.setblocking(False)
+    warm = _Warm()
+    daemon_pid = os.getpid()
+    print(f"gate daemon {daemon_pid} on {path} "
+          f"({jobs} workers, board "
+          f"{'loaded' if warm.context else 'NOT loaded'})",
+          flush=True)
+
+    sel = selectors.DefaultSelector()
+    sel.register(listener, selectors.EVENT_READ)
+    buffers = {}                     # client socket -> bytes read so far
+    queue = collections.deque()      # _Job not started yet
+    running = {}                     # pid -> _Job
+    owed = collections.Counter()     # client socket -> results still owed
+    stopping = False
+
+    def on_term(signum, frame):
+        nonlocal stopping
+        stopping = True
+    signal.signal(signal.SIGTERM, on_term)
+
+    def close(conn):
+        if conn in buffers:
+            del buffers[conn]
+            sel.unregister(conn)
+        owed.pop(conn, None)
+        conn.close()
+
+    def drop(conn):
+        """The client is gone: cancel its queued gates, kill its running ones."""
+        for job in [j for j in queue if j.conn is conn]:
+            queue.remove(job)
+        for job in running.values():
+            if job.conn is conn:
+                _kill(job)
+        close(conn)
+
+    def reply(conn, msg, last=False):
+        try:
+            conn.sendall(json.dumps(msg).encode() + b"\n")
+        except OSError:
+            drop(conn)
+            return
+        if last:
+            close(conn)
+
+    def handle(conn, msg):
+        nonlocal stopping
+        op = msg.get("op")
+        if op == "ping":
+            reply(conn, {"pid": os.getpid(), "root": PROJECT_DIR,
+                         "board": warm.board,
+                         "loaded": warm.context is not None,
+                         "uptime": round(time.time() - warm.started, 1),
+                         "served": warm.served, "workers": jobs,
+                         "stale": warm.stale_modules()}, last=True)
+        elif op == "stop":
+            stopping = True
+            reply(conn, {"stopping": True}, last=True)
+        elif op == "run":
+            gates = msg.get("gates") or []
+            if not gates:
+                reply(conn, {"done": True}, last=True)
+                return
+            if not queue and not running:
+                warm.refresh()
+            env = msg.get("env") or dict(os.environ)
+            for gate in gates:
+                queue.append(_Job(conn, gate, msg.get("timeout"), env,
+                                  bool(msg.get("merge")),
+                                  bool(msg.get("trace"))))
+            owed[conn] += len(gates)
+        else:
+            reply(conn, {"error": f"unknown op {op!r}"}, last=True)
+
+    def start(job):
+        for attr in ("out", "err", "res"):
+            fd, name = tempfile.mkstemp(prefix=f"gate-daemon-{attr}-")
+            os.unlink(name)
+            setattr(job, attr, fd)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        inherited = [listener.fileno()] + [c.fileno() for c in buffers]
+        for other in running.values():
+            inherited += [other.out, other.err, other.res]
+        job.t0 = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            _child(job, warm, inherited)
+        try:
+            os.setpgid(pid, pid)   # also in the child; whichever runs first
+        except OSError:
+            pass
+        job.pid = pid
+        running[pid] = job
+
+    def finish(job, rc):
+        out, err = _drain(job.out), _drain(job.err)
+        try:
+            checks, crashed, inputs = json.loads(_drain(job.res))
+        except ValueError:             # killed before it could report
+            checks, crashed, inputs = None, False, None
+        warm.served += 1
+        conn = job.conn
+        if conn not in owed:           # its client already left
+            return
+        if job.expired:
+            rc, verdict = None, "TIMEOUT"
+        else:
+            verdict = "ERROR" if crashed else "PASS" if rc == 0 else "FAIL"
+        rows, passed, failed = gate_registry.findings(checks, out + err, rc)
+        reply(conn, {"gate": job.gate, "rc": rc,
+                     "seconds": round(time.monotonic() - job.t0, 3),
+                     "stdout": out, "stderr": err, "verdict": verdict,
+                     "findings": rows, "passed": passed, "failed": failed,
+                     "inputs": None if job.expired else inputs})
+        if conn in owed:
+            owed[conn] -= 1
+            if owed[conn] == 0:
+                reply(conn, {"done": True}, last=True)
+
+    try:
+        while True:
+            if stopping and not running:
+                break
+            while queue and len(running) < jobs and not stopping:
+                start(queue.popleft())
+
+            for key, _ in sel.select(0.01 if running else 1.0):
+                if key.fileobj is listener:
+                    try:
+                        conn, _ = listener.accept()
+                    except BlockingIOError:
+                        continue
+                    conn.setblocking(True)
+                    buffers[conn] = b""
+                    sel.register(conn, selectors.EVENT_READ)
+                    continue
+                conn = key.fileobj
+                if conn not in buffers:
+                    continue
+                try:
+                    chunk = conn.recv(65536)
+                except OSError:
+                    chunk = b""
+                if not chunk:          # client hung up
+                    drop(conn)
+                    continue
+                if conn in owed:       # one request per connection
+                    continue
+                buffers[conn] += chunk
+                if b"\n" in buffers[conn]:
+                    line = buffers[conn].split(b"\n", 1)[0]
+                    try:
+                        msg = json.loads(line)
+                    except ValueError:
+                        reply(conn, {"error": "bad request"}, last=True)
+                        continue
+                    handle(conn, msg)
+
+            now = time.monotonic()
+            for job in list(running.values()):
+                if job.timeout and not job.expired \
+                        and now - job.t0 > job.timeout:
+                    job.expired = True
+                    _kill(job)
+            while running:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                job = running.pop(pid, None)
+                if job is not None:
+                    finish(job, os.waitstatus_to_exitcode(status))
+
+            if not queue and not running and not buffers \
+                    and not stopping and warm.stale_modules():
+                # Idle with stale imports: start over as a fresh process on
+                # the same listening socket.
+                sel.close()
+                listener.set_inheritable(True)
+                os.execv(sys.executable, [
+                    sys.executable, os.path.abspath(__file__), "serve",
+                    "--jobs", str(jobs), "--fd", str(listener.fileno())])
+    finally:
+        # A worker unwinds through here on its way to exit (see _child);
+        # the socket and the other workers are not its to clean up.
+        if os.getpid() == daemon_pid:
+            for job in running.values():
+                _kill(job)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def _kill(job):
+    try:
+        os.killpg(job.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _drain(fd):
+    os.lseek(fd, 0, os.SEEK_SET)
+    chunks = []
+    while True:
+        b = os.read(fd, 1 << 20)
+        if not b:
+            break
+        chunks.append(b)
+    os.close(fd)
+    return b"".join(chunks).decode("utf-8", "replace")
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+def _start():
+    if ping():
+        print(f"gate daemon already running ({SOCKET_PATH})")
+        return 0
+    log = os.path.join(tempfile.gettempdir(),
+                       os.path.basename(SOCKET_PATH)[:-5] + ".log")
+    with open(log, "ab") as f:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve"],
+                         cwd=PROJECT_DIR, stdin=subprocess.DEVNULL,
+                         stdout=f, stderr=f, start_new_session=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        info = ping()
+        if info:
+            print(f"gate daemon {info['pid']} ready on {SOCKET_PATH}")
+            return 0
+        time.sleep(0.1)
+    print(f"gate daemon did not come up — see {log}", file=sys.stderr)
+    return 1
+
+
+def _run_cli(argv):
+    """`run`: run gates on the daemon; --log-dir writes <gate>.log and .rc.
+
+    Exit 0 once every gate has a result (whatever the results are), 3 if
+    the daemon is not available.
+    """
+    log_dir, timeout, gates = None, None, []
+    it = iter(argv)
+    for a in it:
+        if a == "--log-dir":
+            log_dir = next(it)
+        elif a == "--timeout":
+            timeout = float(next(it))
+        else:
+            gates.append(a)
+    try:
+        for r in run_gates(gates, timeout, merge=True):
+            name = r.gate.split()[0]
+            if log_dir:
+                with open(os.path.join(log_dir, f"{name}.log"), "w") as f:
+                    f.write(r.stdout + r.stderr)
+                with open(os.path.join(log_dir, f"{name}.rc"), "w") as f:
+                    f.write(f"{124 if r.rc is None else r.rc}\n")
+            else:
+                print(f"  {name:<44} rc={r.rc}  {r.seconds:6.2f}s")
+    except DaemonUnavailable as e:
+        print(f"gate daemon unavailable: {e}", file=sys.stderr)
+        return 3
+    return 0
+
+
+def main(argv):
+    cmd = argv[1] if len(argv) > 1 else "status"
+    if cmd == "serve":
+        jobs = fd = None
+        if "--jobs" in argv:
+            jobs = int(argv[argv.index("--jobs") + 1])
+        if "--fd" in argv:
+            fd = int(argv[argv.index("--fd") + 1])
+        serve(jobs=jobs, listen_fd=fd)
+        return 0
+    if cmd == "start":
+        return _start()
+    if cmd == "stop":
+        try:
+            list(_request({"op": "stop"}))
+        except DaemonUnavailable:
+            print("gate daemon not running")
+            return 0
+        print("gate daemon stopping")
+        return 0
+    if cmd == "status":
+        info = ping()
+        if not info:
+            print(f"gate daemon not running ({SOCKET_PATH})")
+            return 1
+        print(f"gate daemon {info['pid']}: up {info['uptime']}s, "
+              f"{info['served']} gates served, {info['workers']} workers, "
+              f"board {'loaded' if info['loaded'] else 'NOT loaded'}")
+        if info["stale"]:
+            print(f"  stale imports (reloaded per gate): "
+                  f"{', '.join(info['stale'])}")
+        return 0
+    if cmd == "run":
+        return _run_cli(argv[2:])
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
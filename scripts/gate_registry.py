@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""Gate registry — run verifiers in-process, with structured results.
+
+Why
+---
+Every verifier is a script: module-level PASS/FAIL counters, a `check()`
+helper that prints, a `main()` (or an inline `__main__` block) that exits
+0 or 1. The only way to run one used to be a fresh interpreter, and the
+only way to learn what failed was to grep its stdout for FAIL lines.
+
+This runs a gate's own code, unchanged, inside an existing process:
+
+  * the script is executed as __main__ in a FRESH namespace each run, so
+    its PASS/FAIL counters and other globals start from zero every time;
+  * a gate's `check(name, condition, detail)` helper — the convention
+    most of them share — is wrapped before the gate's `__main__` block
+    runs, so every check is recorded as data, not reconstructed from
+    print output (gates without that helper fall back to their FAIL lines);
+  * pcb_cache.load_cache() is answered from one BoardContext validated up
+    front, instead of every gate stat-ing and hashing the board again;
+  * run_gates(jobs=N) runs them in forked workers, one fork per gate, so
+    state a gate leaves in a shared helper module dies with its worker.
+
+The standalone CLIs are untouched: `python3 scripts/<gate>.py` is still
+the contract, and this is measured against it (see test_gate_registry.py).
+
+Usage:
+    python3 scripts/gate_registry.py                    # every verify-all gate
+    python3 scripts/gate_registry.py -j 8 verify_dfa verify_polarity
+    python3 scripts/gate_registry.py --json --in-process verify_stackup
+
+    from gate_registry import run_gates
+    for r in run_gates(["verify_dfa"], jobs=1):
+        r.verdict, r.seconds, r.findings, r.passed, r.failed
+"""
+
+import __future__
+import argparse
+import ast
+import atexit
+import collections
+import contextlib
+import dataclasses
+import inspect
+import io
+import json
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPTS_DIR)
+
+# A line that names a failure: "FAIL ..." at the start, or a status column
+# ("  U2   FAIL  rotation 90") further in.
+_FAIL_LINE = re.compile(r"^\s*(?:FAIL|ERROR|ABORT)\b|  FAIL\b")
+
+
+# ── Registry ─────────────────────────────────────────────────────────
+
+@dataclasses.dataclass(frozen=True)
+class Gate:
+    """One runnable gate: a script under scripts/ plus its argv."""
+    name: str                  # "verify_via_in_pad --diff-net-only"
+    script: str                # "verify_via_in_pad"
+    args: tuple = ()
+
+    @property
+    def path(self):
+        return os.path.join(SCRIPTS_DIR, f"{self.script}.py")
+
+    @classmethod
+    def parse(cls, name):
+        script, *args = name.split()
+        return cls(name, script, tuple(args))
+
+
+def registry():
+    """{name: Gate} for every gate the repo runs as a suite.
+
+    The union of `make verify-all` (parsed from the Makefile, as
+    issue_dispatch does), the isolation set and the session-start set —
+    derived from those lists, never a fourth copy of them.
+    """
+    from issue_dispatch import fast_gates, gates_from_makefile
+    from verify_isolation import CHECKS
+    names = list(gates_from_makefile()) + [n for n, _ in CHECKS] + fast_gates()
+    return {n: Gate.parse(n) for n in dict.fromkeys(names)}
+
+
+# ── Results ──────────────────────────────────────────────────────────
+
+@dataclasses.dataclass
+class GateResult:
+    """What one gate run produced.
+
+    verdict   PASS / FAIL (non-zero exit) / ERROR (uncaught exception) /
+              MISSING (no such script) / TIMEOUT
+    findings  one line per failed check — from the gate's check() calls
+              when it has that helper, else its FAIL lines
+    passed, failed
+              check() counts; None when the gate has no check() helper
+    inputs    {input: [digest, stat]} the gate read, when run with
+              trace=True and its trace is complete (see gate_store)
+    cached    True when replayed from gate_store instead of run
+    """
+    name: str
+    verdict: str
+    rc: object
+    seconds: float
+    findings: list
+    passed: object = None
+    failed: object = None
+    output: str = ""
+    inputs: object = None
+    cached: bool = False
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+
+# ── Board context ────────────────────────────────────────────────────
+
+class BoardContext:
+    """The parsed board, validated once and handed to every gate.
+
+    While active, pcb_cache.load_cache() for the default board maps the
+    already-validated cache file directly: no stat-and-hash per gate, no
+    chance of a gate rebuilding it under another. Each call still gets
+    its own cache object, so a gate that mutates what it loaded cannot
+    leak into the next one. If the board changes on disk the real
+    load_cache() answers again.
+    """
+
+    def __init__(self):
+        import kicad_sexpr
+        import pcb_cache
+        self._pcb_cache = pcb_cache
+        self._real_load = pcb_cache.load_cache
+        self.pcb_path = os.path.abspath(pcb_cache._DEFAULT_PCB)
+        self.cache_path = os.path.abspath(
+            pcb_cache._default_cache_path(pcb_cache._DEFAULT_PCB))
+        self.stat = pcb_cache._stat_fingerprint(self.pcb_path)
+        self.cache = self._real_load()
+        # kicad_sexpr.index() is keyed on the text: a gate that reads the
+        # same board gets this scan back instead of repeating it.
+        self.index = kicad_sexpr.index(kicad_sexpr.read_text(self.pcb_path))
+
+    def fresh(self):
+        return self.stat is not None and \
+            self._pcb_cache._stat_fingerprint(self.pcb_path) == self.stat
+
+    def load_cache(self, pcb_path=None, cache_path=None, strict=None):
+        if (pcb_path is None or os.path.abspath(pcb_path) == self.pcb_path) \
+                and (cache_path is None
+                     or os.path.abspath(cache_path) == self.cache_path) \
+                and not strict \
+                and os.environ.get("PCB_CACHE_STRICT", "") != "1" \
+                and self.fresh():
+            data = self._pcb_cache.read_binary(self.cache_path)
+            if data is not None:
+                return data
+        return self._real_load(pcb_path, cache_path, strict)
+
+    def install(self):
+        """Answer load_cache() from this context from now on."""
+        self._pcb_cache.load_cache = self.load_cache
+
+    def uninstall(self):
+        self._pcb_cache.load_cache = self._real_load
+
+    @contextlib.contextmanager
+    def active(self):
+        self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall()
+
+
+# ── Executing one gate ───────────────────────────────────────────────
+
+_CODE = {}      # path -> (mtime_ns, body code, __main__ block code or None)
+
+
+def _compile(path):
+    """The script split into (body, trailing `if __name__ == "__main__"`).
+
+    Splitting lets check() be wrapped after the gate's functions exist
+    but before its entry point calls them. A script whose __main__ block
+    is not the last statement runs as one piece, unwrapped.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    hit = _CODE.get(path)
+    if hit and hit[0] == mtime:
+        return hit[1], hit[2]
+    with open(path, "rb") as f:
+        src = f.read()
+    tree = ast.parse(src, path)
+    flags = 0
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            for alias in node.names:
+                feature = getattr(__future__, alias.name, None)
+                if feature is not None:
+                    flags |= feature.compiler_flag
+    last = tree.body[-1] if tree.body else None
+    if isinstance(last, ast.If) and _is_main_test(last.test):
+        body = ast.Module(body=tree.body[:-1], type_ignores=[])
+        main = ast.Module(body=[last], type_ignores=[])
+        codes = (compile(body, path, "exec", flags, dont_inherit=True),
+                 compile(main, path, "exec", flags, dont_inherit=True))
+    else:
+        codes = (compile(tree, path, "exec", dont_inherit=True), None)
+    _CODE[path] = (mtime, *codes)
+    return codes
+
+
+def _is_main_test(test):
+    return (isinstance(test, ast.Compare) and len(test.ops) == 1
+            and isinstance(test.ops[0], ast.Eq)
+            and {ast.dump(test.left), ast.dump(test.comparators[0])} ==
+            {ast.dump(ast.Name("__name__", ast.Load())),
+             ast.dump(ast.Constant("__main__"))})
+
+
+def _recorder(check, log):
+    """Wrap a gate's check() so each call is also kept as data."""
+    try:
+        params = list(inspect.signature(check).parameters)
+    except (TypeError, ValueError):
+        return check
+    if len(params) < 2:
+        return check
+
+    def recorded(*args, **kwargs):
+        result = check(*args, **kwargs)
+        try:
+            bound = inspect.signature(check).bind(*args, **kwargs)
+            bound.apply_defaults()
+            values = list(bound.arguments.values())
+            detail = values[2] if len(values) > 2 else ""
+            log.append((str(values[0]), bool(values[1]),
+                        "" if detail is None else str(detail)))
+        except TypeError:
+            pass
+        return result
+    recorded.__wrapped__ = check
+    return recorded
+
+
+def execute(path, args=(), module=None):
+    """Run the script at `path` as __main__ in this process.
+
+    Returns (rc, checks, crashed). `rc` follows the interpreter's rules
+    for SystemExit and uncaught exceptions (the traceback is printed from
+    the gate's own frame, and `crashed` is True); `checks` is
+    [(name, ok, detail)] from the gate's check() helper, or None if it has
+    none. sys.argv, sys.path and sys.modules["__main__"] are set for the
+    run and restored after; the caller owns cwd, the environment and
+    stdout/stderr. Pass `module` to keep hold of the gate's namespace.
+    """
+    body, main = _compile(path)
+    if module is None:
+        module = types.ModuleType("__main__")
+    module.__file__ = path
+    module.__builtins__ = __builtins__
+    saved = sys.argv, list(sys.path), sys.modules.get("__main__")
+    sys.argv = [path, *args]
+    sys.path[0] = os.path.dirname(path)
+    sys.modules["__main__"] = module
+    checks = None
+    rc, crashed = 0, False
+    try:
+        ns = module.__dict__
+        exec(body, ns)
+        if main is not None:
+            check = ns.get("check")
+            if isinstance(check, types.FunctionType) \
+                    and check.__globals__ is ns:
+                checks = []
+                ns["check"] = _recorder(check, checks)
+            exec(main, ns)
+    except SystemExit as e:
+        rc = _exit_code(e.code)
+    except BaseException as e:
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+        rc, crashed = 1, True
+    finally:
+        sys.argv, sys.path[:] = saved[0], saved[1]
+        if saved[2] is not None:
+            sys.modules["__main__"] = saved[2]
+    return rc, checks, crashed
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return int(code)        # unittest.main() exits with a bool
+    print(code, file=sys.stderr)
+    return 1
+
+
+def findings(checks, output, rc):
+    """(findings, passed, failed): recorded checks first, output second.
+
+    A gate that failed without a failing check() — it aborted before its
+    checks, or reports through plain prints — is described by its FAIL /
+    ERROR / ABORT lines, or failing that by the tail of its output, so a
+    red verdict never arrives with an empty explanation.
+    """
+    passed = failed = None
+    rows = []
+    if checks is not None:
+        rows = [f"{name}  {detail}".rstrip() for name, ok, detail in checks
+                if not ok]
+        failed = len(rows)
+        passed = len(checks) - failed
+    if not rows and rc != 0:
+        lines = [ln for ln in output.splitlines() if ln.strip()]
+        rows = [ln.strip() for ln in lines if _FAIL_LINE.search(ln)] \
+            or [ln.strip() for ln in lines[-5:]]
+    return rows, passed, failed
+
+
+@contextlib.contextmanager
+def _captured(sink=None):
+    """Send fd 1 and 2 — and sys.stdout/err over them — to one temp file.
+
+    At the fd level so that output from subprocesses a gate starts is
+    captured too. `sink` is a binary file to use instead of a private
+    temp file — one the caller can still read if this process is killed.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    saved_streams = sys.stdout, sys.stderr
+    buf = sink if sink is not None else tempfile.TemporaryFile()
+    out = {"text": ""}
+    try:
+        os.dup2(buf.fileno(), 1)
+        os.dup2(buf.fileno(), 2)
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False),
+                                      encoding="utf-8", write_through=True)
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False),
+                                      encoding="utf-8",
+                                      errors="backslashreplace",
+                                      write_through=True)
+        yield out
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except (OSError, ValueError):
+            pass
+        sys.stdout, sys.stderr = saved_streams
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        os.close(saved_fds[0])
+        os.close(saved_fds[1])
+        buf.seek(0)
+        out["text"] = buf.read().decode("utf-8", "replace")
+        if sink is None:
+            buf.close()
+
+
+def run_here(gate, trace=False, sink=None):
+    """Run one gate in THIS process, output captured. Returns GateResult.
+
+    trace=True also records what it read (GateResult.inputs); `sink` is
+    passed on to _captured().
+    """
+    if isinstance(gate, str):
+        gate = Gate.parse(gate)
+    if not os.path.exists(gate.path):
+        return GateResult(gate.name, "MISSING", None, 0.0,
+                          [f"scripts/{gate.script}.py does not exist"])
+    cwd = os.getcwd()
+    env = dict(os.environ)
+    module = types.ModuleType("__main__")
+    tracer = contextlib.nullcontext()
+    if trace:
+        import gate_store
+        tracer = gate_store.trace()
+    t0 = time.perf_counter()
+    try:
+        os.chdir(PROJECT_DIR)
+        with _captured(sink) as out, tracer as t:
+            rc, checks, crashed = execute(gate.path, gate.args, module)
+    finally:
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(env)
+    seconds = time.perf_counter() - t0
+    rows, passed, failed = findings(checks, out["text"], rc)
+    verdict = "ERROR" if crashed else "PASS" if rc == 0 else "FAIL"
+    inputs = None
+    if trace and (keys := t.inputs(gate.name, module)) is not None:
+        inputs = gate_store.fingerprint(keys)
+    return GateResult(gate.name, verdict, rc, seconds,
+                      rows, passed, failed, out["text"], inputs)
+
+
+# ── Running many ─────────────────────────────────────────────────────
+
+POLL_S = 0.01
+
+
+class _Fork:
+    """One gate in a forked worker: its output, its result, its clock."""
+    __slots__ = ("index", "name", "sink", "res", "pid", "t0", "expired")
+
+    def __init__(self, index, name):
+        self.index, self.name = index, name
+        self.sink = tempfile.TemporaryFile()
+        fd, path = tempfile.mkstemp(prefix="gate-registry-res-")
+        os.unlink(path)
+        self.res = fd
+        self.pid = self.t0 = None
+        self.expired = False
+
+    def close(self):
+        self.sink.close()
+        os.close(self.res)
+
+
+def _fork(task, trace, running):
+    """Start `task` in a child of this process; its clock starts here.
+
+    The child ends as the gate's own interpreter would: the gate's atexit
+    handlers run (into its output) and stdio is flushed before os._exit(),
+    which is 1 if the worker itself failed. The handlers it inherited from
+    this process are dropped at the fork — they are not the gate's.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    task.t0 = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.setpgid(0, 0)
+            atexit._clear()
+            for other in running.values():
+                other.close()
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            r = run_here(task.name, trace, task.sink)
+            doc = r.to_dict()
+            doc.pop("output")
+            os.write(task.res, json.dumps(doc).encode())
+            with _captured(task.sink):
+                atexit._run_exitfuncs()
+            code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            with contextlib.suppress(OSError, ValueError):
+                sys.stdout.flush()
+                sys.stderr.flush()
+            os._exit(code)
+    with contextlib.suppress(OSError):
+        os.setpgid(pid, pid)        # also in the child; whichever runs first
+    task.pid = pid
+
+
+def _reap(task, status, timeout):
+    """The GateResult of a finished (or killed) worker."""
+    seconds = time.monotonic() - task.t0
+    task.sink.seek(0)
+    output = task.sink.read().decode("utf-8", "replace")
+    os.lseek(task.res, 0, os.SEEK_SET)
+    raw = b"".join(iter(lambda: os.read(task.res, 65536), b""))
+    task.close()
+    if task.expired:
+        return GateResult(task.name, "TIMEOUT", None, seconds,
+                          [f"exceeded {timeout:g}s"], output=output)
+    if raw:
+        result = GateResult(**json.loads(raw))
+        result.output = output
+        return result
+    sig = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+    return GateResult(task.name, "ERROR", None, seconds,
+                      [f"killed by signal {sig}" if sig else "worker died"]
+                      + findings(None, output, 1)[0], output=output)
+
+
+def run_gates(names, jobs=None, timeout=None, context=True, trace=False):
+    """Run `names`; yield a GateResult per gate, in the order given.
+
+    jobs=1 runs them one after another in this process (fresh globals per
+    gate, shared helper modules). jobs>1 — the default is one per core —
+    forks a worker per gate from this process, at most `jobs` at a time,
+    so the imports and the board context are inherited warm and nothing a
+    gate does outlives it. `timeout` (seconds, per gate, from that gate's
+    own start) applies to the forked mode only: a gate past it is killed
+    with its process group and reported TIMEOUT, and the next queued gate
+    takes its place. trace=True records each gate's inputs for gate_store.
+    """
+    names = list(names)
+    jobs = jobs or os.cpu_count() or 1
+    ctx = BoardContext() if context else None
+    with (ctx.active() if ctx else contextlib.nullcontext()):
+        if jobs == 1:
+            for name in names:
+                yield run_here(name, trace)
+            return
+        queue = collections.deque(enumerate(names))
+        running = {}                # pid -> _Fork
+        done, nxt = {}, 0           # index -> GateResult not yet yielded
+        try:
+            while queue or running:
+                while queue and len(running) < jobs:
+                    task = _Fork(*queue.popleft())
+                    _fork(task, trace, running)
+                    running[task.pid] = task
+                now = time.monotonic()
+                for task in running.values():
+                    if timeout and not task.expired \
+                            and now - task.t0 > timeout:
+                        task.expired = True
+                        with contextlib.suppress(OSError):
+                            os.killpg(task.pid, signal.SIGKILL)
+                # Wait on our own pids, not -1: the caller may have
+                # children of its own.
+                reaped = False
+                for pid in list(running):
+                    wpid, status = os.waitpid(pid, os.WNOHANG)
+                    if wpid:
+                        task = running.pop(pid)
+                        done[task.index] = _reap(task, status, timeout)
+                        reaped = True
+                while nxt in done:
+                    yield done.pop(nxt)
+                    nxt += 1
+                if running and not reaped:
+                    time.sleep(POLL_S)
+        finally:
+            for task in running.values():
+                with contextlib.suppress(OSError):
+                    os.killpg(task.pid, signal.SIGKILL)
+                with contextlib.suppress(ChildProcessError):
+                    os.waitpid(task.pid, 0)
+                task.close()
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("gates", nargs="*",
+                    help="gate names (default: every registered gate)")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="forked workers (default: one per core)")
+    ap.add_argument("--in-process", action="store_true",
+                    help="run sequentially in this process (same as -j 1)")
+    ap.add_argument("--timeout", type=float, default=None,
+                    help="per-gate timeout in seconds (forked mode)")
+    ap.add_argument("--json", action="store_true",
+                    help="one JSON object per gate on stdout")
+    opts = ap.parse_args(argv)
+
+    names = opts.gates or list(registry())
+    jobs = 1 if opts.in_process else opts.jobs
+    t0 = time.perf_counter()
+    bad = []
+    for r in run_gates(names, jobs=jobs, timeout=opts.timeout):
+        if r.verdict != "PASS":
+            bad.append(r.name)
+        if opts.json:
+            d = r.to_dict()
+            d.pop("output")
+            print(json.dumps(d), flush=True)
+            continue
+        counts = "" if r.passed is None else f"{r.passed}/{r.passed + r.failed}"
+        print(f"  [{r.verdict:<7}] {r.name:<44} {r.seconds:6.2f}s  {counts}",
+              flush=True)
+        for row in r.findings[:5]:
+            print(f"             {row[:110]}")
+        if len(r.findings) > 5:
+            print(f"             ... and {len(r.findings) - 5} more")
+    if not opts.json:
+        print(f"\n  {len(names) - len(bad)}/{len(names)} passed in "
+              f"{time.perf_counter() - t0:.1f}s")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
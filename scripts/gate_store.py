@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Gate result store — rerun only the gates whose inputs changed.
+
+Why
+---
+`make verify-all` ran every gate after every edit. A BOM-only change
+re-ran the copper geometry checks; a firmware board_config.h change
+re-ran the zone checks. Most of the suite's wall time after an edit was
+spent re-proving things nothing had touched.
+
+So each gate's verdict is stored with the inputs it read:
+
+  * a gate run through gate_registry with trace=True records every repo
+    file it opens for reading, every repo path whose existence it probes,
+    every repo directory it lists, every repo module it uses and every
+    external tool it starts — found at run time through a Python audit
+    hook and a wrapped os.stat/os.lstat, not from a hand-kept list. A
+    board consumer that may answer without reading the board
+    (pcb_cache.load_cache, pcb_copper_graph.board_graph) raises a
+    "pcb.board" audit event with its path, and a board or parse cache
+    that was only probed counts as read: a board is never an
+    existence-only input;
+  * each input is stored with its content hash (and a stat fingerprint,
+    so an untouched file is not re-hashed to prove it — see pcb_cache);
+    a path only probed is stored with whether it existed, so a gate that
+    checks for a file reruns when the file appears or disappears;
+  * next time, a gate whose inputs all hash the same replays its stored
+    verdict and output instead of running. `--force` runs everything.
+
+What tracing cannot see is declared in DECLARED (the date, for a gate
+that ages its claims) or makes the gate uncacheable: a gate that starts
+another Python script, or a VOLATILE one that reads the network, always
+runs. ERROR and TIMEOUT results are never stored.
+
+The store is one JSON file at the repo root (.gate-results.json, not
+committed); deleting it is always safe. It also keeps every gate's last
+run time, which run_verifiers.py schedules by.
+
+Usage:
+    python3 scripts/gate_store.py run [--force] [-j N] [gates...]
+    python3 scripts/gate_store.py inputs verify_dfa            # what it read
+    python3 scripts/gate_store.py clear
+"""
+
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+import gate_registry  # noqa: E402
+import pcb_cache  # noqa: E402
+
+STORE_PATH = os.path.join(PROJECT_DIR, ".gate-results.json")
+STORE_VERSION = 2
+
+# Inputs a trace cannot show, per gate script. Globs are repo-relative;
+# "@today" is the date, for gates whose verdict ages.
+DECLARED = {
+    "verify_claims_ledger": ["@today"],
+}
+
+# Gates whose verdict depends on something outside the tree — here, a
+# part library fetched over the network. Always run.
+VOLATILE = {"verify_easyeda_footprint"}
+
+# An external tool handed one of these reads its siblings too (a root
+# schematic pulls in its sheets, DRC reads the project's rules).
+_KICAD_SUFFIXES = (".kicad_pcb", ".kicad_sch", ".kicad_pro", ".kicad_dru",
+                   ".kicad_prl")
+
+_SKIP_PARTS = {".git", "__pycache__", ".pytest_cache"}
+
+# The harness that runs a gate is not one of its inputs (a change to how
+# results are stored bumps STORE_VERSION instead).
+_HARNESS = {os.path.join("scripts", f"{m}.py")
+            for m in ("gate_daemon", "gate_registry", "gate_store")}
+
+
+# ── Tracing ──────────────────────────────────────────────────────────
+
+# Raised as sys.audit(BOARD_EVENT, path) by a board consumer whenever it
+# answers for a board, from disk or from memory. Kept a plain string so
+# the consumers need not import this module.
+BOARD_EVENT = "pcb.board"
+
+_ACTIVE = []            # the Trace being recorded, if any
+_HOOKED = False
+_EVENTS = frozenset({"open", "os.listdir", "os.scandir", "subprocess.Popen",
+                     "os.system", "os.exec", "os.posix_spawn", "os.spawn",
+                     BOARD_EVENT})
+
+
+def _audit(event, args):
+    if not _ACTIVE or event not in _EVENTS:
+        return
+    # The import system's own reads and listings are not the gate's;
+    # the modules it loads are accounted for by Trace.modules().
+    caller = sys._getframe(1).f_code.co_filename
+    if caller.startswith("<frozen importlib"):
+        return
+    _ACTIVE[-1].event(event, args)
+
+
+def _probing(stat):
+    """`stat` that also records the path it is handed in the active Trace.
+
+    There is no audit event for a stat, and os.path.exists, os.path.isfile
+    and Path.exists all come down to os.stat — so this is where a gate's
+    "is that file there?" is seen. The import system calls posix.stat
+    directly and never reaches it.
+    """
+    def probe(path, *args, **kwargs):
+        if _ACTIVE and isinstance(path, (str, bytes, os.PathLike)):
+            _ACTIVE[-1].probes.add(os.path.abspath(os.fsdecode(path)))
+        return stat(path, *args, **kwargs)
+    probe.__wrapped__ = stat
+    return probe
+
+
+class Trace:
+    """What one gate touched while it ran: raw absolute paths and tools."""
+
+    def __init__(self):
+        self.reads = set()
+        self.writes = set()
+        self.dirs = set()
+        self.probes = set()         # stat()ed: existence is an input
+        self.tools = set()
+        self.argv_files = set()
+        self.opaque = None          # why the trace is incomplete, if it is
+        self.before = set(sys.modules)
+
+    def event(self, event, args):
+        if event == "open":
+            path, mode, flags = args
+            if not isinstance(path, (str, bytes)):
+                return              # an fd, already accounted for
+            path = os.path.abspath(os.fsdecode(path))
+            if mode is None:        # os.open(): flags only
+                writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+            else:
+                writing = any(c in mode for c in "wax+")
+            (self.writes if writing else self.reads).add(path)
+        elif event == BOARD_EVENT:
+            self.reads.add(os.path.abspath(os.fsdecode(args[0])))
+        elif event in ("os.listdir", "os.scandir"):
+            if isinstance(args[0], (str, bytes)):
+                self.dirs.add(os.path.abspath(os.fsdecode(args[0])))
+        elif event == "subprocess.Popen":
+            executable, argv = args[0], args[1]
+            if isinstance(argv, (str, bytes)):
+                argv = [argv]
+            argv = [os.fsdecode(a) for a in argv or ()
+                    if isinstance(a, (str, bytes, os.PathLike))]
+            exe = os.fsdecode(executable) if executable else \
+                (argv[0] if argv else "")
+            if os.path.basename(exe).startswith("python") or \
+                    os.path.realpath(shutil.which(exe) or exe) == \
+                    os.path.realpath(sys.executable):
+                self.opaque = f"starts a Python subprocess ({exe})"
+                return
+            self.tools.add(os.path.basename(exe))
+            for a in argv[1:]:
+                a = a.split("=", 1)[-1]
+                if os.path.isfile(a):
+                    self.argv_files.add(os.path.abspath(a))
+        elif event in ("os.system", "os.exec", "os.posix_spawn", "os.spawn"):
+            self.opaque = f"runs an untraced command ({event})"
+
+    def modules(self, module):
+        """Source files of the repo modules the gate imported or uses."""
+        files = set()
+        for name in set(sys.modules) - self.before:
+            f = getattr(sys.modules.get(name), "__file__", None)
+            if f:
+                files.add(os.path.abspath(f))
+        seen, stack = set(), [vars(module)]
+        while stack:
+            for value in list(stack.pop().values()):
+                try:
+                    if isinstance(value, types.ModuleType):
+                        mod = value
+                    else:
+                        # "__main__" is the gate itself — and, by now, the
+                        # harness's own script again in sys.modules.
+                        owner = getattr(value, "__module__", None)
+                        mod = None if owner == "__main__" else \
+                            sys.modules.get(owner or "")
+                except Exception:
+                    continue
+                if mod is None or id(mod) in seen:
+                    continue
+                seen.add(id(mod))
+                f = getattr(mod, "__file__", None)
+                if f and _rel(f) is not None:
+                    files.add(os.path.abspath(f))
+                    stack.append(vars(mod))
+        return files
+
+    def inputs(self, gate, module):
+        """Repo-relative input keys, or None if the trace is incomplete."""
+        script = gate.split()[0]
+        if script in VOLATILE:
+            self.opaque = "declared VOLATILE"
+        if self.opaque:
+            return None
+        keys = {"@python"}
+        keys.update(f"@exe:{t}" for t in self.tools)
+        keys.update(DECLARED.get(script, ()))
+        files = (self.reads - self.writes) | self.argv_files \
+            | self.modules(module) | set(filter(_is_board, self.probes))
+        if module.__file__:
+            files.add(os.path.abspath(module.__file__))
+        for path in self.argv_files:
+            if path.endswith(_KICAD_SUFFIXES):
+                d = os.path.dirname(path)
+                files.update(os.path.join(d, n) for n in os.listdir(d)
+                             if n.endswith(_KICAD_SUFFIXES))
+        for path in files:
+            rel = _rel(path)
+            if rel is None:
+                continue
+            if _is_board(rel) and not rel.endswith(".kicad_pcb"):
+                # The parse caches stand for the board they cache; their
+                # own bytes change on every re-stamp.
+                d = os.path.dirname(path)
+                keys.update(_rel(os.path.join(d, n)) for n in os.listdir(d)
+                            if n.endswith(".kicad_pcb"))
+            elif not rel.endswith((".pyc", ".so")):
+                keys.add(rel)
+        keys.update(f"dir:{r}" for r in map(_rel, self.dirs)
+                    if r is not None)
+        for path in self.probes - self.writes - files:
+            rel = _rel(path)
+            if rel is not None:
+                keys.add(f"exists:{rel}")
+        return sorted(keys)
+
+
+def _is_board(path):
+    """A board, or one of the parse caches that stand for it."""
+    name = os.path.basename(path)
+    return name.endswith(".kicad_pcb") or \
+        name.startswith((".pcb_cache", ".copper_graph"))
+
+
+def _rel(path):
+    """`path` relative to the repo, or None if outside it (or skipped)."""
+    rel = os.path.relpath(os.path.abspath(path), PROJECT_DIR)
+    if rel.startswith(os.pardir) or rel == STORE_PATH_REL or rel in _HARNESS:
+        return None
+    if _SKIP_PARTS.intersection(rel.split(os.sep)):
+        return None
+    return rel
+
+
+STORE_PATH_REL = os.path.relpath(STORE_PATH, PROJECT_DIR)
+
+
+@contextlib.contextmanager
+def trace():
+    """Record what the code run inside touches; yields the Trace."""
+    global _HOOKED
+    if not _HOOKED:
+        sys.addaudithook(_audit)    # cannot be removed; idle when inactive
+        os.stat = _probing(os.stat)     # likewise left in place
+        os.lstat = _probing(os.lstat)
+        _HOOKED = True
+    t = Trace()
+    _ACTIVE.append(t)
+    try:
+        yield t
+    finally:
+        _ACTIVE.remove(t)
+
+
+# ── Fingerprints ─────────────────────────────────────────────────────
+
+_DIGESTS = {}       # (abs path, stat) -> digest, for this process
+
+
+def _digest(key):
+    """(digest, stat) of one input key; digest None means absent."""
+    if key == "@python":
+        return sys.version, None
+    if key == "@today":
+        return datetime.date.today().isoformat(), None
+    if key.startswith("@exe:"):
+        exe = shutil.which(key[5:])
+        st = pcb_cache._stat_fingerprint(exe) if exe else None
+        return (f"{exe}:{st[0]}:{st[1]}" if st else None), None
+    if key.startswith("dir:"):
+        try:
+            names = sorted(os.listdir(os.path.join(PROJECT_DIR, key[4:])))
+        except OSError:
+            return None, None
+        return hashlib.sha256("\n".join(names).encode()).hexdigest(), None
+    if key.startswith("exists:"):
+        path = os.path.join(PROJECT_DIR, key[7:])
+        if os.path.isdir(path):
+            return "dir", None
+        return ("file" if os.path.lexists(path) else None), None
+    path = os.path.join(PROJECT_DIR, key)
+    if any(c in key for c in "*?["):
+        # A declared glob: the matches and their contents, as one digest.
+        h = hashlib.sha256()
+        for p in sorted(glob.glob(path)):
+            h.update(f"{_rel(p)}\0{_digest(_rel(p))[0]}\0".encode())
+        return h.hexdigest(), None
+    stat = pcb_cache._stat_fingerprint(path)
+    if stat is None:
+        return None, None
+    memo = (path, tuple(stat))
+    if memo not in _DIGESTS:
+        try:
+            _DIGESTS[memo] = pcb_cache._sha256(path)
+        except OSError:         # a directory, or gone since the stat
+            return None, None
+    return _DIGESTS[memo], pcb_cache._settled(stat)
+
+
+def fingerprint(keys):
+    """{key: [digest, stat]} for input `keys`, as the store records them."""
+    return {k: list(_digest(k)) for k in keys}
+
+
+def _unchanged(key, recorded):
+    digest, stat = recorded
+    if stat is not None and not key.startswith(("@", "dir:")) and \
+            pcb_cache._stat_fingerprint(os.path.join(PROJECT_DIR, key)) \
+            == stat:
+        return True
+    return _digest(key)[0] == digest
+
+
+# ── Store ────────────────────────────────────────────────────────────
+
+class ResultStore:
+    """Stored GateResults, each with the input fingerprint it was run on.
+
+    `durations` is {gate: seconds} of each gate's last real run, stored
+    or not — a history to schedule by, not a result.
+    """
+
+    def __init__(self, path=None):
+        self.path = path = path or STORE_PATH
+        self.entries = {}
+        self.durations = {}
+        try:
+            with open(path) as f:
+                doc = json.load(f)
+            if doc.get("version") == STORE_VERSION:
+                self.entries = doc["gates"]
+                self.durations = doc.get("durations", {})
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def replay(self, name):
+        """The stored GateResult for `name` if its inputs are unchanged."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        for key, recorded in entry["inputs"].items():
+            if not _unchanged(key, recorded):
+                return None
+        result = gate_registry.GateResult(**entry["result"])
+        result.cached = True
+        return result
+
+    def stale_input(self, name):
+        """First input of `name` that changed, for reporting; None if none."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return "no stored result"
+        for key, recorded in entry["inputs"].items():
+            if not _unchanged(key, recorded):
+                return key
+        return None
+
+    def record(self, result):
+        if result.verdict != "MISSING":
+            self.durations[result.name] = round(result.seconds, 3)
+        if result.inputs is None or result.verdict not in ("PASS", "FAIL"):
+            self.entries.pop(result.name, None)
+            return
+        stored = result.to_dict()
+        inputs = stored.pop("inputs")
+        stored.pop("cached")
+        self.entries[result.name] = {"inputs": inputs, "result": stored,
+                                     "recorded": time.time()}
+
+    def save(self):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                   prefix=".gate-results.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": STORE_VERSION, "gates": self.entries,
+                           "durations": self.durations},
+                          f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+
+
+# ── Running ──────────────────────────────────────────────────────────
+
+def _run_fresh(names, jobs, timeout):
+    """GateResults (with inputs) for `names`, in order: daemon if up."""
+    import gate_daemon
+    if names and gate_daemon.ping() is not None:
+        try:
+            runs = {r.gate: r for r in gate_daemon.run_gates(
+                names, timeout, merge=True, trace=True)}
+        except gate_daemon.DaemonUnavailable:
+            pass
+        else:
+            for name in names:
+                r = runs[name]
+                yield gate_registry.GateResult(
+                    name, r.verdict, r.rc, r.seconds, r.findings or [],
+                    r.passed, r.failed, r.stdout + r.stderr, r.inputs)
+            return
+    yield from gate_registry.run_gates(names, jobs=jobs, timeout=timeout,
+                                       trace=True)
+
+
+def run_gates(names, jobs=None, timeout=None, force=False, store=None,
+              runner=None):
+    """Yield a GateResult per gate: unchanged ones replayed, first.
+
+    Replayed results have .cached set. The rest are run by `runner`
+    (names -> GateResults with inputs, in any order; default: the daemon
+    if up, else gate_registry's workers), recorded as they arrive, and
+    the store is saved once every gate has reported.
+    """
+    store = store if store is not None else ResultStore()
+    names = list(names)
+    replayed = {} if force else {
+        n: r for n in names if (r := store.replay(n)) is not None}
+    stale = [n for n in names if n not in replayed]
+    try:
+        yield from (replayed[n] for n in names if n in replayed)
+        if runner is None:
+            fresh = _run_fresh(stale, jobs, timeout)
+        else:
+            fresh = runner(stale)
+        for result in fresh:
+            store.record(result)
+            yield result
+    finally:
+        store.save()
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+def _cmd_run(opts):
+    t0 = time.perf_counter()
+    names = opts.gates or list(gate_registry.registry())
+    bad = cached = 0
+    for r in run_gates(names, jobs=opts.jobs, timeout=opts.timeout,
+                       force=opts.force):
+        cached += r.cached
+        bad += r.verdict != "PASS"
+        how = "cached" if r.cached else f"{r.seconds:6.2f}s"
+        print(f"  [{r.verdict:<7}] {r.name:<44} {how}", flush=True)
+        for row in r.findings[:5]:
+            print(f"             {row[:110]}")
+    print(f"\n  {len(names) - bad}/{len(names)} passed, {cached} replayed "
+          f"unchanged, in {time.perf_counter() - t0:.1f}s")
+    return 1 if bad else 0
+
+
+def _cmd_inputs(opts):
+    store = ResultStore()
+    for name in opts.gates:
+        entry = store.entries.get(name)
+        if entry is None:
+            print(f"{name}: no stored result")
+            continue
+        stale = store.stale_input(name)
+        state = "replayable" if stale is None else f"stale ({stale})"
+        print(f"{name}: {entry['result']['verdict']}, {state}")
+        for key in entry["inputs"]:
+            if opts.all or not fnmatch.fnmatch(key, "scripts/*.py"):
+                print(f"    {key}")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run gates, replaying unchanged ones")
+    run.add_argument("gates", nargs="*",
+                     help="gate names (default: every registered gate)")
+    run.add_argument("--force", action="store_true",
+                     help="run every gate, ignoring stored results")
+    run.add_argument("-j", "--jobs", type=int, default=None,
+                     help="forked workers when no daemon is up")
+    run.add_argument("--timeout", type=float, default=None,
+                     help="per-gate timeout in seconds")
+    inputs = sub.add_parser("inputs", help="show a gate's recorded inputs")
+    inputs.add_argument("gates", nargs="+")
+    inputs.add_argument("--all", action="store_true",
+                        help="include the scripts/*.py modules")
+    sub.add_parser("clear", help="forget every stored result")
+    opts = ap.parse_args(argv)
+
+    if opts.cmd == "run":
+        return _cmd_run(opts)
+    if opts.cmd == "inputs":
+        return _cmd_inputs(opts)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(STORE_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,6 +31,8 @@ import sys
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(PROJECT_DIR, "scripts"))
 
+import kicad_sexpr  # noqa: E402
+
 PCB = os.path.join(PROJECT_DIR, "hardware/kicad/esp32-emu-turbo.kicad_pcb")
 OUT = os.path.join(PROJECT_DIR, "website/static/net-explorer-data.json")
 
@@ -315,35 +317,12 @@ def zone_geometry():
 
 # ── footprint metadata + board outline (parsed from the .kicad_pcb) ───
 
-def _balanced(text, start):
-    """Return the span of the s-expression whose '(' sits at `start`."""
-    depth, i, in_str = 0, start, False
-    while i < len(text):
-        ch = text[i]
-        if in_str:
-            if ch == "\\":
-                i += 2
-                continue
-            if ch == '"':
-                in_str = False
-        elif ch == '"':
-            in_str = True
-        elif ch == "(":
-            depth += 1
-        elif ch == ")":
-            depth -= 1
-            if depth == 0:
-                return text[start:i + 1]
-        i += 1
-    return text[start:]
-
-
 def parse_footprints(text):
     """ref -> {footprint, value, side, x, y, rot}."""
     out = {}
     for m in re.finditer(r'\(footprint\s+"([^"]+)"\s+\(at\s+'
                          r'(-?[\d.]+)\s+(-?[\d.]+)(?:\s+(-?[\d.]+))?\)', text):
-        body = _balanced(text, m.start())
+        body = kicad_sexpr.span(text, m.start())
         ref = re.search(r'\(property\s+"Reference"\s+"([^"]*)"', body)
         if not ref:
             ref = re.search(r'\(fp_text\s+reference\s+"([^"]*)"', body)
@@ -4,7 +4,7 @@ import os
 import sys
 from pathlib import Path
 
-from .board import generate_board
+from .board import board_fragments
 from .jlcpcb_export import export_cpl
 
 
@@ -14,17 +14,18 @@ def main(output_dir: str):
 
     # Generate PCB
     pcb_path = os.path.join(output_dir, "esp32-emu-turbo.kicad_pcb")
-    content = generate_board()
-    with open(pcb_path, "w") as f:
-        f.write(content)
-    print(f"  PCB: {pcb_path}")
-
-    # Build parse cache for downstream analysis scripts
     _scripts_dir = str(Path(__file__).resolve().parent.parent)
     if _scripts_dir not in sys.path:
         sys.path.insert(0, _scripts_dir)
-    from pcb_cache import build_cache
-    build_cache(Path(pcb_path))
+    from pcb_cache import PcbWriter
+
+    # Stream the board to disk (atomically) and build the parse cache for
+    # downstream analysis scripts from the same fragments — no re-read.
+    with PcbWriter(Path(pcb_path)) as out:
+        for fragment in board_fragments():
+            out.write(fragment)
+    print(f"  PCB: {pcb_path}")
+    out.store_cache()
 
     # Generate JLCPCB CPL
     jlcpcb_dir = os.path.join(output_dir, "jlcpcb")
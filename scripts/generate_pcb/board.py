@@ -758,30 +758,36 @@ def _all_routing():
     return routing.generate_all_traces()
 
 
-def generate_board() -> str:
-    """Generate the complete .kicad_pcb content."""
-    parts = [
-        P.header(),
-        P.layers_4layer(),
-        P.setup_4layer(),
-        "\n",
-        P.nets(),
-        "\n",
-        _board_outline(),
-        "\n",
-        _mounting_holes(),
-        "\n",
-        _display_outline(),
-        "\n",
-        _silkscreen_labels(),
-        "\n",
-    ]
+def board_fragments():
+    """Yield the .kicad_pcb content in order, one top-level run at a time.
+
+    Each fragment holds whole items, so pcb_cache.PcbWriter can stream it
+    to disk and build the parse cache from it as it goes.
+    """
+    yield P.header()
+    yield P.layers_4layer()
+    yield P.setup_4layer()
+    yield "\n"
+    yield P.nets()
+    yield "\n"
+    yield _board_outline()
+    yield "\n"
+    yield _mounting_holes()
+    yield "\n"
+    yield _display_outline()
+    yield "\n"
+    yield _silkscreen_labels()
+    yield "\n"
     # Generate routing FIRST to populate pad-net mapping (_PAD_NETS),
     # then generate footprints with correct net assignments injected.
     routing_str = _all_routing()
     comp_str, _placements = _component_placeholders()
-    parts.append(comp_str)
-    parts.append("\n")
-    parts.append(routing_str)
-    parts.append(P.footer())
-    return "".join(parts)
+    yield comp_str
+    yield "\n"
+    yield routing_str
+    yield P.footer()
+
+
+def generate_board() -> str:
+    """Generate the complete .kicad_pcb content."""
+    return "".join(board_fragments())
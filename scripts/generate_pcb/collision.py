@@ -5,18 +5,41 @@ holes.  Every segment and via is checked against existing obstacles before
 placement.  Violations are collected and reported at the end of generation.
 
 Architecture:
-  - SpatialHash: cell-based AABB index (cell_size=5mm, ~480 cells for 160x75mm)
-  - CollisionGrid: high-level API used by routing._seg() and routing._via_net()
+  - SpatialHash: cell-based AABB index over all four copper layers
+    (cell_size tunable, default 5mm, ~480 cells per layer for 160x75mm);
+    occupancy() reports how full it is, per layer
+  - CollisionGrid: high-level API used by routing._seg(), routing._via_net()
+    and routing._zone_fill()
   - All traces are Manhattan (H/V), so segments expanded by half-width are
     exact axis-aligned bounding boxes — no approximation needed.
+  - Zone outlines are kept per layer BESIDE the index: a board-sized pour
+    would sit in every cell and come back from every query. The only zone
+    conflicts are a via cut off from its own plane by a higher-priority
+    pour (R22-CRIT-1) and two nets' pours overlapping at equal priority.
+  - batch() defers the checks of a whole domain route to one NumPy sweep
+    (check_segments / check_vias) with the same verdicts, in the same
+    order, as checking each piece as it is placed.
 """
 
 import math
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 
+try:
+    import numpy as np
+except ImportError:     # batch() then checks piece by piece; same result
+    np = None
+
 # ── Layer indices for the spatial hash ────────────────────────────
-LAYER_IDX = {"F.Cu": 0, "B.Cu": 1}
+LAYER_IDX = {"F.Cu": 0, "B.Cu": 1, "In1.Cu": 2, "In2.Cu": 3}
+LAYER_NAMES = list(LAYER_IDX)
+ALL_LAYERS = tuple(range(len(LAYER_NAMES)))
+# Through copper (vias, THT pads, drills, board outline) exists on every
+# layer, and its spacing to other through copper is the same on each. The
+# outer two are the ones a via is checked on; an inner-layer repeat of the
+# same pair would only report it twice more.
+OUTER_LAYERS = (0, 1)
 
 # ── DFM clearance rules (edge-to-edge minimums, mm) ─────────────
 # JLCPCB absolute minimum is 0.15mm; we target 0.175mm design margin
@@ -47,6 +70,12 @@ _EPS = 0.001  # 1µm — well below manufacturing precision
 # Sentinel net that collides with everything (slot, edges, mounting holes)
 NET_BARRIER = -999
 
+# How far around a piece's copper to look: the widest rule it can breach.
+_SEGMENT_MARGIN = max(CLEARANCE_TRACE_TRACE, CLEARANCE_TRACE_PAD,
+                      CLEARANCE_VIA_TRACE, CLEARANCE_EDGE)
+_VIA_MARGIN = max(CLEARANCE_VIA_TRACE, CLEARANCE_VIA_VIA,
+                  CLEARANCE_VIA_PAD, CLEARANCE_EDGE)
+
 
 # ── Data classes ──────────────────────────────────────────────────
 
@@ -58,7 +87,8 @@ class Obstacle:
     xmax: float
     ymax: float
     net: int
-    kind: str       # "segment", "via", "pad", "slot", "edge", "mounting_hole"
+    kind: str       # "segment", "via", "pad", "slot", "edge", "mounting_hole",
+                    # "zone"
     label: str = ""
     # Vias only. The AABB above is the annular ring's bounding SQUARE, which is
     # what the spatial index needs, but a via is a CIRCLE: for two vias offset
@@ -69,6 +99,12 @@ class Obstacle:
     cy: float = 0.0
     size: float = 0.0    # annular ring diameter
     drill: float = 0.0   # hole diameter
+    # Zones only: the pour outline and its fill priority.
+    points: tuple = ()
+    priority: int = 0
+    # Insertion order in the SpatialHash, which is also the order a query
+    # returns obstacles sharing a cell in — the batch path sorts on it.
+    seq: int = field(default=0, compare=False, repr=False)
 
 
 @dataclass
@@ -92,29 +128,48 @@ class SpatialHash:
         # {(layer_idx, gx, gy): [Obstacle, ...]}
         self._buckets: Dict[Tuple[int, int, int], List[Obstacle]] = {}
         # All obstacles per layer (for linear scans when needed)
-        self._all: Dict[int, List[Obstacle]] = {0: [], 1: []}
+        self._all: Dict[int, List[Obstacle]] = {i: [] for i in ALL_LAYERS}
+        self._seq = 0
+        # How many of each layer's obstacles are in _buckets. Bucketing is
+        # deferred to the next query(): a batch() never queries, it reads
+        # the NumPy columns() instead.
+        self._bucketed: Dict[int, int] = dict.fromkeys(ALL_LAYERS, 0)
+        self._columns: Dict[int, dict] = {}
+        self.nets_dirty: Dict[int, bool] = {}
 
     def clear(self):
         """Remove all obstacles."""
         self._buckets.clear()
-        self._all = {0: [], 1: []}
+        self._all = {i: [] for i in ALL_LAYERS}
+        self._seq = 0
+        self._bucketed = dict.fromkeys(ALL_LAYERS, 0)
+        self._columns = {}
+        self.nets_dirty = {}
 
     def insert(self, layer_idx: int, obs: Obstacle):
         """Insert an obstacle into the hash."""
+        obs.seq = self._seq
+        self._seq += 1
         self._all[layer_idx].append(obs)
+
+    def _fill_buckets(self, layer_idx: int):
+        """Bucket the obstacles inserted on a layer since the last call."""
+        obstacles = self._all[layer_idx]
         cs = self.cell_size
-        gx1 = int(math.floor(obs.xmin / cs))
-        gy1 = int(math.floor(obs.ymin / cs))
-        gx2 = int(math.floor(obs.xmax / cs))
-        gy2 = int(math.floor(obs.ymax / cs))
-        for gx in range(gx1, gx2 + 1):
-            for gy in range(gy1, gy2 + 1):
-                key = (layer_idx, gx, gy)
-                bucket = self._buckets.get(key)
-                if bucket is None:
-                    bucket = []
-                    self._buckets[key] = bucket
-                bucket.append(obs)
+        for obs in obstacles[self._bucketed[layer_idx]:]:
+            gx1 = int(math.floor(obs.xmin / cs))
+            gy1 = int(math.floor(obs.ymin / cs))
+            gx2 = int(math.floor(obs.xmax / cs))
+            gy2 = int(math.floor(obs.ymax / cs))
+            for gx in range(gx1, gx2 + 1):
+                for gy in range(gy1, gy2 + 1):
+                    key = (layer_idx, gx, gy)
+                    bucket = self._buckets.get(key)
+                    if bucket is None:
+                        bucket = []
+                        self._buckets[key] = bucket
+                    bucket.append(obs)
+        self._bucketed[layer_idx] = len(obstacles)
 
     def query(self, layer_idx: int,
               xmin: float, ymin: float, xmax: float, ymax: float,
@@ -124,6 +179,8 @@ class SpatialHash:
         exclude_net: skip obstacles with this net (same-net = OK).
         Obstacles with net=NET_BARRIER always match (never excluded).
         """
+        if self._bucketed[layer_idx] != len(self._all[layer_idx]):
+            self._fill_buckets(layer_idx)
         results: List[Obstacle] = []
         seen: Set[int] = set()
         cs = self.cell_size
@@ -148,7 +205,7 @@ class SpatialHash:
                     # a trace could be laid straight across it with nothing
                     # reported. Pad nets are now seeded from the routed map
                     # before the first trace is placed (routing._assemble
-                    # generate_all_traces, two passes), so net 0 no longer
+                    # generate_all_traces), so net 0 no longer
                     # means "unknown" — it means "unconnected copper", which
                     # nothing may overlap. Default-closed.
                     # AABB overlap test
@@ -161,6 +218,63 @@ class SpatialHash:
         """Return all obstacles on a given layer."""
         return self._all.get(layer_idx, [])
 
+    def columns(self, layer_idx: int) -> dict:
+        """NumPy columns of a layer's obstacles and bucket entries.
+
+        Geometry never changes once inserted, so the arrays are extended,
+        not rebuilt, as the layer grows. A pad's net can change
+        (CollisionGrid.update_pad_net), which sets nets_dirty.
+        """
+        obstacles = self._all[layer_idx]
+        cols = self._columns.get(layer_idx)
+        if cols is None or cols["n"] != len(obstacles):
+            done = cols["n"] if cols else 0
+            fresh = _obstacle_columns(obstacles[done:], self.cell_size)
+            fresh["net"] = np.array([o.net for o in obstacles[done:]],
+                                    dtype=np.int64)
+            owner, gx, gy = _expand_cells(fresh["gx1"], fresh["gy1"],
+                                          fresh["gx2"], fresh["gy2"])
+            fresh["keys"] = _cell_key(gx, gy)
+            fresh["owners"] = owner + done
+            if cols:
+                fresh = {k: np.concatenate([cols[k], v])
+                         for k, v in fresh.items()}
+            cols = self._columns[layer_idx] = fresh
+            cols["n"] = len(obstacles)
+            order = np.argsort(cols["keys"], kind="stable")
+            cols["cell_key"] = cols["keys"][order]
+            cols["cell_owner"] = cols["owners"][order]
+        if self.nets_dirty.get(layer_idx):
+            cols["net"] = np.array([o.net for o in obstacles],
+                                   dtype=np.int64)
+            self.nets_dirty[layer_idx] = False
+        return cols
+
+    def occupancy(self) -> Dict[str, dict]:
+        """Per-layer fill of the index, for tuning cell_size.
+
+        {layer: {"obstacles", "cells", "entries", "max_per_cell",
+                 "mean_per_cell", "kinds": {kind: count}}}
+        entries / obstacles is how many cells the average obstacle spans.
+        """
+        report = {}
+        for layer_idx in ALL_LAYERS:
+            self._fill_buckets(layer_idx)
+            sizes = [len(b) for (li, _gx, _gy), b in self._buckets.items()
+                     if li == layer_idx]
+            kinds: Dict[str, int] = {}
+            for obs in self._all[layer_idx]:
+                kinds[obs.kind] = kinds.get(obs.kind, 0) + 1
+            report[LAYER_NAMES[layer_idx]] = {
+                "obstacles": len(self._all[layer_idx]),
+                "cells": len(sizes),
+                "entries": sum(sizes),
+                "max_per_cell": max(sizes, default=0),
+                "mean_per_cell": sum(sizes) / len(sizes) if sizes else 0.0,
+                "kinds": kinds,
+            }
+        return report
+
 
 # ── Collision Grid (main API) ─────────────────────────────────────
 
@@ -175,18 +289,29 @@ class CollisionGrid:
         grid.register_board_edges()
         grid.register_mounting_holes([(x, y), ...])
 
-        # During routing (called by _seg / _via_net):
+        # During routing (called by _seg / _via_net / _zone_fill):
         violations = grid.check_segment(x1, y1, x2, y2, layer, width, net)
         grid.add_segment(x1, y1, x2, y2, layer, width, net)
+
+        # or check-and-add in one, deferred to a single sweep per route:
+        with grid.batch():
+            grid.place_segment(x1, y1, x2, y2, layer, width, net)
+            grid.place_via(x, y, net, size, drill)
     """
 
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, cell_size: float = 5.0):
         self.enabled = enabled
-        self.index = SpatialHash(cell_size=5.0)
+        self.index = SpatialHash(cell_size=cell_size)
         self.violations: List[Violation] = []
         self._populated = False
         # Track pad obstacles for net updates: {(ref, pad_num): Obstacle}
         self._pad_obstacles: Dict[Tuple[str, str], List[Obstacle]] = {}
+        # Pour outlines per layer, in registration order: {layer_idx: [...]}
+        self.zones: Dict[int, List[Obstacle]] = {i: [] for i in ALL_LAYERS}
+        # place_* calls queued by an open batch() or record(), else None
+        self._pending: Optional[list] = None
+        # record() also queues update_pad_net, and never sweeps the queue
+        self._recording = False
 
     def reset(self):
         """Clear all state for a fresh generation run."""
@@ -194,6 +319,9 @@ class CollisionGrid:
         self.violations.clear()
         self._populated = False
         self._pad_obstacles.clear()
+        self.zones = {i: [] for i in ALL_LAYERS}
+        self._pending = None
+        self._recording = False
 
     # ── Pre-population ────────────────────────────────────────
 
@@ -268,19 +396,21 @@ class CollisionGrid:
                     label=f"{ref}:{num}",
                 )
                 self.index.insert(layer_idx, obs)
-                # Also insert on the other layer if it's a THT pad
-                # (through-hole pads appear on both layers)
+                # Also insert on the other layers if it's a THT pad
+                # (through-hole pads appear on every copper layer)
                 if _is_tht_pad(ref, str(num)):
-                    other_idx = 1 - layer_idx
-                    obs2 = Obstacle(
-                        xmin=obs.xmin, ymin=obs.ymin,
-                        xmax=obs.xmax, ymax=obs.ymax,
-                        net=pad_net, kind="pad",
-                        label=f"{ref}:{num}",
-                    )
-                    self.index.insert(other_idx, obs2)
-                    self._pad_obstacles.setdefault(
-                        (ref, str(num)), []).append(obs2)
+                    for other_idx in ALL_LAYERS:
+                        if other_idx == layer_idx:
+                            continue
+                        obs2 = Obstacle(
+                            xmin=obs.xmin, ymin=obs.ymin,
+                            xmax=obs.xmax, ymax=obs.ymax,
+                            net=pad_net, kind="pad",
+                            label=f"{ref}:{num}",
+                        )
+                        self.index.insert(other_idx, obs2)
+                        self._pad_obstacles.setdefault(
+                            (ref, str(num)), []).append(obs2)
 
                 self._pad_obstacles.setdefault(
                     (ref, str(num)), []).append(obs)
@@ -289,8 +419,8 @@ class CollisionGrid:
 
     def register_slot(self, x1: float = 125.5, y1: float = 23.5,
                       x2: float = 128.5, y2: float = 47.5):
-        """Register the FPC slot as a no-go zone on both layers."""
-        for layer_idx in (0, 1):
+        """Register the FPC slot as a no-go zone on every copper layer."""
+        for layer_idx in ALL_LAYERS:
             obs = Obstacle(
                 xmin=x1, ymin=y1, xmax=x2, ymax=y2,
                 net=NET_BARRIER, kind="slot", label="FPC_SLOT",
@@ -300,7 +430,7 @@ class CollisionGrid:
     def register_board_edges(self, board_w: float = 160.0,
                              board_h: float = 75.0,
                              keepout: float = 0.01):
-        """Register board edge keepout strips on both layers.
+        """Register board edge keepout strips on every copper layer.
 
         keepout: thin strip width representing the board edge itself.
         CLEARANCE_EDGE (0.30mm) is the actual copper-to-edge gap requirement.
@@ -314,7 +444,7 @@ class CollisionGrid:
             (board_w - keepout, 0, board_w, board_h, "right_edge"),
         ]
         for xmin, ymin, xmax, ymax, label in edges:
-            for layer_idx in (0, 1):
+            for layer_idx in ALL_LAYERS:
                 obs = Obstacle(
                     xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax,
                     net=NET_BARRIER, kind="edge", label=label,
@@ -323,10 +453,10 @@ class CollisionGrid:
 
     def register_mounting_holes(self, positions: list,
                                 drill: float = 2.5):
-        """Register mounting holes as obstacles on both layers."""
+        """Register mounting holes as obstacles on every copper layer."""
         r = drill / 2
         for x, y in positions:
-            for layer_idx in (0, 1):
+            for layer_idx in ALL_LAYERS:
                 obs = Obstacle(
                     xmin=x - r, ymin=y - r, xmax=x + r, ymax=y + r,
                     net=NET_BARRIER, kind="mounting_hole",
@@ -350,59 +480,21 @@ class CollisionGrid:
         if layer_idx < 0:
             return []
 
-        hw = width / 2
-        # Segment AABB (actual copper)
-        seg_xmin = round(min(x1, x2) - hw, 4)
-        seg_ymin = round(min(y1, y2) - hw, 4)
-        seg_xmax = round(max(x1, x2) + hw, 4)
-        seg_ymax = round(max(y1, y2) + hw, 4)
+        seg_obs = _segment_obstacle(x1, y1, x2, y2, layer, width, net)
 
         # Query AABB expanded by max clearance to catch nearby obstacles
-        margin = max(CLEARANCE_TRACE_TRACE, CLEARANCE_TRACE_PAD,
-                     CLEARANCE_VIA_TRACE, CLEARANCE_EDGE)
-        q_xmin = seg_xmin - margin
-        q_ymin = seg_ymin - margin
-        q_xmax = seg_xmax + margin
-        q_ymax = seg_ymax + margin
-
-        hits = self.index.query(layer_idx, q_xmin, q_ymin,
-                                q_xmax, q_ymax, exclude_net=net)
+        hits = self.index.query(layer_idx,
+                                seg_obs.xmin - _SEGMENT_MARGIN,
+                                seg_obs.ymin - _SEGMENT_MARGIN,
+                                seg_obs.xmax + _SEGMENT_MARGIN,
+                                seg_obs.ymax + _SEGMENT_MARGIN,
+                                exclude_net=net)
 
         violations = []
-        seg_obs = Obstacle(
-            xmin=seg_xmin, ymin=seg_ymin,
-            xmax=seg_xmax, ymax=seg_ymax,
-            net=net, kind="segment",
-            label=f"net{net} {layer} ({x1:.2f},{y1:.2f})->({x2:.2f},{y2:.2f})",
-        )
-
-        # A trace's copper is a capsule (rounded rectangle swept along the
-        # centreline), which the segment AABB represents EXACTLY while the
-        # segment is horizontal or vertical — true of almost every trace on
-        # this board. For a diagonal the AABB is the bounding box of the
-        # capsule and badly overstates the copper near the corners, which
-        # reports collisions that do not exist. Use the exact capsule
-        # distance in that case instead of loosening the rule.
-        diagonal = abs(x2 - x1) > _EPS and abs(y2 - y1) > _EPS
-
         for obs in hits:
-            required = _required_clearance("segment", obs.kind)
-            if diagonal:
-                gap = _capsule_rect_gap(x1, y1, x2, y2, hw,
-                                        obs.xmin, obs.ymin, obs.xmax, obs.ymax)
-            else:
-                gap = _aabb_gap(seg_xmin, seg_ymin, seg_xmax, seg_ymax,
-                                obs.xmin, obs.ymin, obs.xmax, obs.ymax)
-            if gap < required - _EPS:
-                violations.append(Violation(
-                    obstacle_a=seg_obs,
-                    obstacle_b=obs,
-                    layer=layer,
-                    gap_mm=round(gap, 4),
-                    required_mm=required,
-                    suggestion=_suggest_nudge(x1, y1, x2, y2, obs),
-                ))
-
+            v = _segment_violation(x1, y1, x2, y2, layer, width, seg_obs, obs)
+            if v is not None:
+                violations.append(v)
         return violations
 
     def check_via(self, x: float, y: float, net: int,
@@ -410,68 +502,83 @@ class CollisionGrid:
                   ) -> List[Violation]:
         """Check if a via would violate clearance rules.
 
-        Does NOT add the via to the index.  Checks both F.Cu and B.Cu.
+        Does NOT add the via to the index.  Checks the spacing on F.Cu and
+        B.Cu (see OUTER_LAYERS) and the pours on every layer.
         """
         if not self.enabled or net == 0:
             return []
 
-        vr = size / 2  # annular ring radius
-        via_xmin = round(x - vr, 4)
-        via_ymin = round(y - vr, 4)
-        via_xmax = round(x + vr, 4)
-        via_ymax = round(y + vr, 4)
-
-        margin = max(CLEARANCE_VIA_TRACE, CLEARANCE_VIA_VIA,
-                     CLEARANCE_VIA_PAD, CLEARANCE_EDGE)
-
         violations = []
-        layer_names = ["F.Cu", "B.Cu"]
-
-        for layer_idx in (0, 1):
+        for layer_idx in OUTER_LAYERS:
+            via_obs = _via_obstacle(x, y, net, size, drill)
             hits = self.index.query(
                 layer_idx,
-                via_xmin - margin, via_ymin - margin,
-                via_xmax + margin, via_ymax + margin,
+                via_obs.xmin - _VIA_MARGIN, via_obs.ymin - _VIA_MARGIN,
+                via_obs.xmax + _VIA_MARGIN, via_obs.ymax + _VIA_MARGIN,
                 exclude_net=net,
             )
-            via_obs = Obstacle(
-                xmin=via_xmin, ymin=via_ymin,
-                xmax=via_xmax, ymax=via_ymax,
-                net=net, kind="via",
-                label=f"via net{net}@({x:.2f},{y:.2f})",
-                cx=x, cy=y, size=size, drill=drill,
-            )
             for obs in hits:
-                if obs.kind == "via" and obs.size > 0:
-                    # Two circles, and TWO rules — copper spacing and hole
-                    # spacing are different limits and must be measured on
-                    # different geometry. Report whichever is breached, with
-                    # the number that actually breaches it, so the suggestion
-                    # names a real problem.
-                    cop, hole = _via_pair_gaps(
-                        x, y, size, drill,
-                        obs.cx, obs.cy, obs.size, obs.drill)
-                    if hole < CLEARANCE_VIA_VIA - _EPS:
-                        gap, required = hole, CLEARANCE_VIA_VIA
-                    elif cop < CLEARANCE_VIA_VIA_COPPER - _EPS:
-                        gap, required = cop, CLEARANCE_VIA_VIA_COPPER
-                    else:
-                        continue
-                else:
-                    required = _required_clearance("via", obs.kind)
-                    gap = _aabb_gap(via_xmin, via_ymin, via_xmax, via_ymax,
-                                    obs.xmin, obs.ymin, obs.xmax, obs.ymax)
-                    if gap >= required - _EPS:
-                        continue
+                v = _via_violation(x, y, size, drill,
+                                   LAYER_NAMES[layer_idx], via_obs, obs)
+                if v is not None:
+                    violations.append(v)
+        violations.extend(self._zone_violations(x, y, net, size, drill))
+        return violations
+
+    def check_zone(self, layer: str, points, net: int, priority: int = 0,
+                   label: str = "") -> List[Violation]:
+        """Check what pouring a zone would break.
+
+        Does NOT add the zone. Two conflicts, both invisible to the index:
+
+        - a via the pour cuts off from its own net's plane — it sits inside
+          a pour of its net on this layer, and this zone outranks it there.
+          R22-CRIT-1: the +5V zone swallowed the +3V3 regulator vias on
+          In2.Cu and the board was dead;
+        - another net's pour overlapping this one at the same priority,
+          whose fill then depends on the order the filler visits them.
+        """
+        if not self.enabled:
+            return []
+        layer_idx = LAYER_IDX.get(layer, -1)
+        if layer_idx < 0:
+            return []
+        zone = _zone_obstacle(layer, points, net, priority, label)
+        zones = self.zones[layer_idx]
+
+        violations = []
+        for other in zones:
+            if (other.priority == priority and other.net != net
+                    and _polygons_overlap(zone.points, other.points)):
                 violations.append(Violation(
-                    obstacle_a=via_obs,
-                    obstacle_b=obs,
-                    layer=layer_names[layer_idx],
-                    gap_mm=round(gap, 4),
-                    required_mm=required,
-                    suggestion=f"move via from ({x:.2f},{y:.2f})",
+                    obstacle_a=zone,
+                    obstacle_b=other,
+                    layer=layer,
+                    gap_mm=round(_aabb_gap(
+                        zone.xmin, zone.ymin, zone.xmax, zone.ymax,
+                        other.xmin, other.ymin, other.xmax, other.ymax), 4),
+                    required_mm=0.0,
+                    suggestion="give one of the two pours a higher priority",
                 ))
+        # A via's verdict can change either way round: this zone is the one
+        # that swallows it, or the plane it is swallowed FROM.
+        vias = [o for o in self.index.all_on_layer(layer_idx)
+                if o.kind == "via" and o.net != 0]
+        before = _swallowers(vias, zones)
+        for obs, was, cut in zip(vias, before,
+                                 _swallowers(vias, zones + [zone])):
+            if cut is not None and cut is not was:
+                violations.append(_swallow_violation(obs, cut, layer))
+        return violations
 
+    def _zone_violations(self, x, y, net, size, drill) -> List[Violation]:
+        violations = []
+        for layer_idx in ALL_LAYERS:
+            cut = _swallower(x, y, net, self.zones[layer_idx])
+            if cut is not None:
+                violations.append(_swallow_violation(
+                    _via_obstacle(x, y, net, size, drill), cut,
+                    LAYER_NAMES[layer_idx]))
         return violations
 
     # ── Add methods (insert after checking) ───────────────────
@@ -485,51 +592,411 @@ class CollisionGrid:
         layer_idx = LAYER_IDX.get(layer, -1)
         if layer_idx < 0:
             return
-        hw = width / 2
-        obs = Obstacle(
-            xmin=round(min(x1, x2) - hw, 4),
-            ymin=round(min(y1, y2) - hw, 4),
-            xmax=round(max(x1, x2) + hw, 4),
-            ymax=round(max(y1, y2) + hw, 4),
-            net=net, kind="segment",
-            label=f"net{net} {layer} ({x1:.2f},{y1:.2f})->({x2:.2f},{y2:.2f})",
-        )
-        self.index.insert(layer_idx, obs)
+        self.index.insert(layer_idx,
+                          _segment_obstacle(x1, y1, x2, y2, layer, width, net))
 
     def add_via(self, x: float, y: float, net: int,
                 size: float = 0.9, drill: float = 0.35):
-        """Register a placed via as an obstacle on both layers."""
+        """Register a placed via as an obstacle on every copper layer.
+
+        One obstacle serves all four: a via's geometry and net never
+        change, and the layers are inserted back to back, so the seq it
+        ends with still orders it correctly on each.
+        """
         if not self.enabled:
             return
-        vr = size / 2
-        for layer_idx in (0, 1):
-            obs = Obstacle(
-                xmin=round(x - vr, 4), ymin=round(y - vr, 4),
-                xmax=round(x + vr, 4), ymax=round(y + vr, 4),
-                net=net, kind="via",
-                label=f"via net{net}@({x:.2f},{y:.2f})",
-                cx=x, cy=y, size=size, drill=drill,
-            )
+        obs = _via_obstacle(x, y, net, size, drill)
+        for layer_idx in ALL_LAYERS:
+            self.index.insert(layer_idx, obs)
+
+    def add_zone(self, layer: str, points, net: int, priority: int = 0,
+                 label: str = ""):
+        """Register a pour outline on its layer."""
+        if not self.enabled:
+            return
+        layer_idx = LAYER_IDX.get(layer, -1)
+        if layer_idx < 0:
+            return
+        self.zones[layer_idx].append(
+            _zone_obstacle(layer, points, net, priority, label))
+
+    # ── Place methods (check + add, batchable) ────────────────
+
+    def place_segment(self, x1: float, y1: float, x2: float, y2: float,
+                      layer: str, width: float, net: int):
+        """check_segment into self.violations, then add_segment.
+
+        Queued until the end of an open batch().
+        """
+        if self._pending is not None:
+            self._pending.append(
+                ("segment", (x1, y1, x2, y2, layer, width, net)))
+            return
+        self.violations.extend(
+            self.check_segment(x1, y1, x2, y2, layer, width, net))
+        self.add_segment(x1, y1, x2, y2, layer, width, net)
+
+    def place_via(self, x: float, y: float, net: int,
+                  size: float = 0.9, drill: float = 0.35):
+        """check_via into self.violations, then add_via.
+
+        Queued until the end of an open batch().
+        """
+        if self._pending is not None:
+            self._pending.append(("via", (x, y, net, size, drill)))
+            return
+        self.violations.extend(self.check_via(x, y, net, size, drill))
+        self.add_via(x, y, net, size, drill)
+
+    def place_zone(self, layer: str, points, net: int, priority: int = 0,
+                   label: str = ""):
+        """check_zone into self.violations, then add_zone.
+
+        Queued until the end of an open batch(), in order with the rest.
+        """
+        if self._pending is not None:
+            self._pending.append(
+                ("zone", (layer, points, net, priority, label)))
+            return
+        self.violations.extend(
+            self.check_zone(layer, points, net, priority, label))
+        self.add_zone(layer, points, net, priority, label)
+
+    @contextmanager
+    def batch(self):
+        """Defer place_segment / place_via to one sweep when the block exits.
+
+        The sweep reaches the verdicts placing them one by one would, in
+        the same order: each piece is checked against everything placed
+        before it — earlier pieces of the same batch included — and
+        nothing after. The one thing it cannot replay is a pad acquiring
+        its net mid-batch (update_pad_net runs at call time, the check at
+        exit); with pad nets seeded before the first trace
+        (routing._assemble) that only happens on a discovery pass, whose
+        report is never printed.
+
+        Without NumPy, or nested in another batch, this is a no-op and
+        every place_* call checks immediately.
+        """
+        if np is None or self._pending is not None or not self.enabled:
+            yield
+            return
+        self._pending = []
+        try:
+            yield
+        except BaseException:
+            self._pending = None
+            raise
+        pending, self._pending = self._pending, None
+        run = []
+        for kind, args in pending:
+            if kind == "zone":
+                self._place_run(run)
+                run = []
+                self.place_zone(*args)
+            else:
+                run.append((kind, args))
+        self._place_run(run)
+
+    @contextmanager
+    def record(self):
+        """Queue place_* and update_pad_net calls without touching the grid.
+
+        Yields the queue: plain tuples, so it pickles, for replay() on this
+        grid or on another process's. routing._assemble routes each domain
+        under record(), which is what lets the domains run in parallel and
+        still be checked in the order a serial run would check them.
+        """
+        if self._pending is not None:
+            raise RuntimeError("record() inside an open batch() or record()")
+        self._pending, self._recording = [], True
+        try:
+            yield self._pending
+        finally:
+            self._pending, self._recording = None, False
+
+    def replay(self, pieces, check: bool = True):
+        """Make the calls record() queued, in order, on this grid.
+
+        check=False adds the pieces without checking them, for a caller
+        that already holds their verdicts (routing._assemble's memo).
+        """
+        if check:
+            place = {"segment": self.place_segment, "via": self.place_via,
+                     "zone": self.place_zone}
+        else:
+            place = {"segment": self.add_segment, "via": self.add_via,
+                     "zone": self.add_zone}
+        place["pad_net"] = self.update_pad_net
+        for kind, args in pieces:
+            place[kind](*args)
+
+    def _place_run(self, rows):
+        if not rows:
+            return
+        violations, inserts = self._sweep(rows, mutual=True)
+        self.violations.extend(violations)
+        for layer_idx, obs in inserts:
             self.index.insert(layer_idx, obs)
 
+    # ── Batch checks ──────────────────────────────────────────
+
+    def check_segments(self, segs) -> List[Violation]:
+        """check_segment for many segments in one vectorised pass.
+
+        segs: (n, 7) array-like — x1, y1, x2, y2, layer index (LAYER_IDX),
+        width, net. Returns what check_segment on each row in turn would,
+        in that order. Nothing is added; the rows do not see each other.
+        """
+        rows = [("segment", (x1, y1, x2, y2, LAYER_NAMES[int(li)], w,
+                             int(net)))
+                for x1, y1, x2, y2, li, w, net in _rows(segs, 7)]
+        if np is None:
+            return [v for _kind, args in rows
+                    for v in self.check_segment(*args)]
+        return self._sweep(rows, mutual=False)[0]
+
+    def check_vias(self, vias) -> List[Violation]:
+        """check_via for many vias in one vectorised pass.
+
+        vias: (n, 5) array-like — x, y, net, size, drill. Returns what
+        check_via on each row in turn would, in that order. Nothing is
+        added; the rows do not see each other.
+        """
+        rows = [("via", (x, y, int(net), size, drill))
+                for x, y, net, size, drill in _rows(vias, 5)]
+        if np is None:
+            return [v for _kind, args in rows for v in self.check_via(*args)]
+        return self._sweep(rows, mutual=False)[0]
+
+    def _sweep(self, rows, mutual):
+        """Violations of `rows` ("segment" / "via", place_* args), in order.
+
+        Per layer: the rows' query boxes are joined with the index through
+        the same cells SpatialHash.query walks, each (row, obstacle) pair
+        kept once — in the first cell the walk would meet it in — and
+        ordered as the walk would return it. A vectorised gap over every
+        pair leaves the few near the limit, and those are judged by the
+        same _segment_violation / _via_violation as the per-piece checks,
+        so a verdict never rests on a NumPy rounding.
+
+        mutual: row k also sees rows j < k, as if each had been added when
+        placed. Returns (violations, [(layer_idx, obstacle) to insert]).
+        """
+        if not self.enabled:
+            return [], []
+        queries = {i: [] for i in ALL_LAYERS}   # layer -> [(pos, obs, args)]
+        inserts = []
+        vias = []
+        for pos, (kind, args) in enumerate(rows):
+            if kind == "segment":
+                layer_idx = LAYER_IDX.get(args[4], -1)
+                if layer_idx < 0:
+                    continue
+                obs = _segment_obstacle(*args)
+                if args[6] != 0:
+                    queries[layer_idx].append((pos, obs, args))
+                inserts.append((layer_idx, obs, pos))
+            else:
+                obs = _via_obstacle(*args)
+                if args[2] != 0:
+                    for layer_idx in OUTER_LAYERS:
+                        queries[layer_idx].append((pos, obs, args))
+                    vias.append((pos, args))
+                inserts.extend((layer_idx, obs, pos)
+                               for layer_idx in ALL_LAYERS)
+
+        found = []      # (sort key, Violation)
+        for layer_idx in ALL_LAYERS:
+            if queries[layer_idx]:
+                extra = [(obs, pos) for li, obs, pos in inserts
+                         if li == layer_idx] if mutual else []
+                found.extend(self._sweep_layer(layer_idx, queries[layer_idx],
+                                               extra))
+        for pos, args in vias:
+            for v in self._zone_violations(*args):
+                found.append(((pos, len(ALL_LAYERS)), v))
+        found.sort(key=lambda kv: kv[0])
+        return ([v for _key, v in found],
+                [(li, obs) for li, obs, _pos in inserts] if mutual else [])
+
+    def _sweep_layer(self, layer_idx, queries, extra):
+        cs = self.index.cell_size
+        layer = LAYER_NAMES[layer_idx]
+
+        # Obstacles: the index, then this batch's earlier pieces.
+        base = self.index.columns(layer_idx)
+        n_base = base["n"]
+        ext = _obstacle_columns([obs for obs, _pos in extra], cs)
+        col = {k: np.concatenate([base[k], ext[k]]) for k in ext}
+        col["net"] = np.concatenate([
+            base["net"],
+            np.array([obs.net for obs, _pos in extra], dtype=np.int64)])
+        order = np.concatenate([np.full(n_base, -1, dtype=np.int64),
+                                np.array([pos for _obs, pos in extra],
+                                         dtype=np.int64)])
+        owner, gx, gy = _expand_cells(ext["gx1"], ext["gy1"],
+                                      ext["gx2"], ext["gy2"])
+        keys = np.concatenate([base["cell_key"], _cell_key(gx, gy)])
+        owners = np.concatenate([base["cell_owner"], owner + n_base])
+        by_key = np.argsort(keys, kind="stable")
+        keys, owners = keys[by_key], owners[by_key]
+
+        # Query boxes: the piece's copper grown by its kind's margin.
+        is_via = np.array([obs.kind == "via" for _p, obs, _a in queries])
+        margin = np.where(is_via, _VIA_MARGIN, _SEGMENT_MARGIN)
+        box = np.array([(obs.xmin, obs.ymin, obs.xmax, obs.ymax)
+                        for _p, obs, _a in queries], dtype=float)
+        qx1, qy1 = box[:, 0] - margin, box[:, 1] - margin
+        qx2, qy2 = box[:, 2] + margin, box[:, 3] + margin
+        qgx1, qgy1 = np.floor(qx1 / cs).astype(np.int64), \
+            np.floor(qy1 / cs).astype(np.int64)
+        qgx2, qgy2 = np.floor(qx2 / cs).astype(np.int64), \
+            np.floor(qy2 / cs).astype(np.int64)
+        qnet = np.array([obs.net for _p, obs, _a in queries], dtype=np.int64)
+        qpos = np.array([pos for pos, _o, _a in queries], dtype=np.int64)
+
+        # Join query cells with obstacle cells; keep each pair in its
+        # reference cell only — the first one the query walk visits.
+        qown, cgx, cgy = _expand_cells(qgx1, qgy1, qgx2, qgy2)
+        ckey = _cell_key(cgx, cgy)
+        lo = np.searchsorted(keys, ckey, side="left")
+        cnt = np.searchsorted(keys, ckey, side="right") - lo
+        total = int(cnt.sum())
+        if total == 0:
+            return []
+        qi = np.repeat(qown, cnt)
+        step = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        oi = owners[np.repeat(lo, cnt) + step]
+        cgx, cgy = np.repeat(cgx, cnt), np.repeat(cgy, cnt)
+        ref_gx = np.maximum(qgx1[qi], col["gx1"][oi])
+        ref_gy = np.maximum(qgy1[qi], col["gy1"][oi])
+        onet = col["net"][oi]
+        keep = ((cgx == ref_gx) & (cgy == ref_gy)
+                & (qx1[qi] < col["xmax"][oi]) & (qx2[qi] > col["xmin"][oi])
+                & (qy1[qi] < col["ymax"][oi]) & (qy2[qi] > col["ymin"][oi])
+                & ((onet == NET_BARRIER) | (onet != qnet[qi]))
+                & (order[oi] < qpos[qi]))
+        qi, oi = qi[keep], oi[keep]
+        ref_gx, ref_gy = ref_gx[keep], ref_gy[keep]
+
+        # Vectorised gap, loose by _TOL, to pick the pairs worth judging.
+        kind = col["kind"][oi]
+        gap = _aabb_gaps(box[qi, 0], box[qi, 1], box[qi, 2], box[qi, 3],
+                         col["xmin"][oi], col["ymin"][oi],
+                         col["xmax"][oi], col["ymax"][oi])
+        seg = ~is_via[qi]
+        required = np.where(seg, _REQUIRED_SEGMENT[kind],
+                            _REQUIRED_VIA[kind])
+        near = gap < required - _EPS + _TOL
+        # Per pair: the segment's x1, y1, x2, y2, width, or the via's
+        # x, y, size, drill.
+        geo = np.array([a[:4] + (a[5],) if o.kind == "segment"
+                        else (a[0], a[1], a[3], a[4], 0.0)
+                        for _p, o, a in queries], dtype=float)[qi]
+        x1, y1, x2, y2 = geo[:, 0], geo[:, 1], geo[:, 2], geo[:, 3]
+        diag = seg & (np.abs(x2 - x1) > _EPS) & (np.abs(y2 - y1) > _EPS)
+        if diag.any():
+            cap = _capsule_rect_gaps(
+                x1[diag], y1[diag], x2[diag], y2[diag], geo[diag, 4] / 2,
+                col["xmin"][oi[diag]], col["ymin"][oi[diag]],
+                col["xmax"][oi[diag]], col["ymax"][oi[diag]])
+            near[diag] = cap < required[diag] - _EPS + _TOL
+        ring = ~seg & (kind == _KIND_CODE["via"]) & (col["size"][oi] > 0)
+        if ring.any():
+            o = oi[ring]
+            size, drill = geo[ring, 2], geo[ring, 3]
+            centre = np.hypot(x1[ring] - col["cx"][o],
+                              y1[ring] - col["cy"][o])
+            cop = centre - (size + col["size"][o]) / 2.0
+            hole = centre - (drill + col["drill"][o]) / 2.0
+            near[ring] = ((hole < CLEARANCE_VIA_VIA - _EPS + _TOL)
+                          | (cop < CLEARANCE_VIA_VIA_COPPER - _EPS + _TOL))
+
+        obstacles = self.index.all_on_layer(layer_idx)
+        found = []
+        for k in np.flatnonzero(near):
+            pos, q_obs, args = queries[qi[k]]
+            o = int(oi[k])
+            obs = obstacles[o] if o < n_base else extra[o - n_base][0]
+            if q_obs.kind == "segment":
+                x1, y1, x2, y2, _layer, width, _net = args
+                v = _segment_violation(x1, y1, x2, y2, layer, width,
+                                       q_obs, obs)
+            else:
+                x, y, _net, size, drill = args
+                v = _via_violation(x, y, size, drill, layer, q_obs, obs)
+            if v is not None:
+                found.append(((pos, layer_idx, int(ref_gx[k]),
+                               int(ref_gy[k]), int(order[o]),
+                               int(col["seq"][o])), v))
+        return found
+
     # ── Pad net sync ──────────────────────────────────────────
 
     def update_pad_net(self, ref: str, pad_num: str, net: int):
         """Update the net of a registered pad obstacle.
 
         Called when the first trace touches a pad, so future same-net
-        traces to that pad are not flagged as violations.
+        traces to that pad are not flagged as violations. Queued under
+        record().
         """
+        if self._recording:
+            self._pending.append(("pad_net", (ref, str(pad_num), net)))
+            return
         for obs in self._pad_obstacles.get((ref, str(pad_num)), ()):
             if obs.net == 0:
                 obs.net = net
+                self.index.nets_dirty = dict.fromkeys(ALL_LAYERS, True)
 
     # ── Reporting ─────────────────────────────────────────────
 
+    def obstacles(self, layer_idx: int) -> List[Obstacle]:
+        """Everything on a layer: the index, then pieces queued but unplaced.
+
+        The queue is an open batch()'s or record()'s — the copper the
+        current route has laid but not yet checked. The maze router
+        (routing.autoroute) must avoid it as much as the placed copper.
+        """
+        out = list(self.index.all_on_layer(layer_idx))
+        for kind, args in self._pending or ():
+            if kind == "via":
+                out.append(_via_obstacle(*args))
+            elif kind == "segment" and LAYER_IDX.get(args[4]) == layer_idx:
+                out.append(_segment_obstacle(*args))
+        return out
+
+    def zone_outlines(self, layer_idx: int) -> List[Obstacle]:
+        """The layer's pours, placed then queued, in pour order."""
+        out = list(self.zones[layer_idx])
+        for kind, args in self._pending or ():
+            if kind == "zone" and LAYER_IDX.get(args[0]) == layer_idx:
+                out.append(_zone_obstacle(*args))
+        return out
+
     def get_violations(self) -> List[Violation]:
         """Return all accumulated violations (excluding suppressed)."""
         return [v for v in self.violations if not _is_suppressed(v)]
 
+    def print_occupancy(self):
+        """Print the index occupancy per layer to stderr.
+
+        For tuning cell_size: a mean far above a handful of obstacles per
+        cell means every query scans too much; most obstacles spanning
+        many cells means the cells are too small.
+        """
+        import sys
+        print(f"  Collision grid occupancy "
+              f"(cell {self.index.cell_size:g}mm):", file=sys.stderr)
+        for layer, r in self.index.occupancy().items():
+            kinds = ", ".join(f"{k} {n}" for k, n in sorted(r["kinds"].items()))
+            print(f"    {layer:<7} {r['obstacles']:5d} obstacles "
+                  f"in {r['cells']:4d} cells "
+                  f"(mean {r['mean_per_cell']:.1f}, "
+                  f"max {r['max_per_cell']}/cell), "
+                  f"{len(self.zones[LAYER_IDX[layer]])} zone(s)"
+                  + (f"  [{kinds}]" if kinds else ""), file=sys.stderr)
+
     def print_report(self):
         """Print a summary of all violations to stderr."""
         import sys
@@ -644,6 +1111,21 @@ def _required_clearance(kind_a: str, kind_b: str) -> float:
     return CLEARANCE_TRACE_TRACE
 
 
+# Obstacle kinds as small ints for the batch path, and the clearance each
+# needs from a segment / a via (indexed by kind code).
+_KINDS = ("segment", "via", "pad", "slot", "edge", "mounting_hole", "zone")
+_KIND_CODE = {k: i for i, k in enumerate(_KINDS)}
+_REQUIRED_SEGMENT = [_required_clearance("segment", k) for k in _KINDS]
+_REQUIRED_VIA = [_required_clearance("via", k) for k in _KINDS]
+if np is not None:
+    _REQUIRED_SEGMENT = np.array(_REQUIRED_SEGMENT)
+    _REQUIRED_VIA = np.array(_REQUIRED_VIA)
+
+# Slack on the vectorised pre-filter. The verdict is always the scalar
+# check's; this only has to be wider than any float disagreement.
+_TOL = 1e-9
+
+
 def _via_pair_gaps(ax: float, ay: float, a_size: float, a_drill: float,
                    bx: float, by: float, b_size: float, b_drill: float):
     """Copper and hole gaps between two vias, measured as CIRCLES.
@@ -733,6 +1215,343 @@ def _suggest_nudge(x1: float, y1: float, x2: float, y2: float,
     return "adjust position"
 
 
+def _segment_obstacle(x1: float, y1: float, x2: float, y2: float,
+                      layer: str, width: float, net: int) -> Obstacle:
+    """A segment's copper as the Obstacle the index stores."""
+    hw = width / 2
+    return Obstacle(
+        xmin=round(min(x1, x2) - hw, 4),
+        ymin=round(min(y1, y2) - hw, 4),
+        xmax=round(max(x1, x2) + hw, 4),
+        ymax=round(max(y1, y2) + hw, 4),
+        net=net, kind="segment",
+        label=f"net{net} {layer} ({x1:.2f},{y1:.2f})->({x2:.2f},{y2:.2f})",
+    )
+
+
+def _via_obstacle(x: float, y: float, net: int,
+                  size: float, drill: float) -> Obstacle:
+    """A via's annular ring as the Obstacle the index stores (one layer)."""
+    vr = size / 2  # annular ring radius
+    return Obstacle(
+        xmin=round(x - vr, 4), ymin=round(y - vr, 4),
+        xmax=round(x + vr, 4), ymax=round(y + vr, 4),
+        net=net, kind="via",
+        label=f"via net{net}@({x:.2f},{y:.2f})",
+        cx=x, cy=y, size=size, drill=drill,
+    )
+
+
+def _zone_obstacle(layer: str, points, net: int, priority: int,
+                   label: str) -> Obstacle:
+    """A pour outline as an Obstacle (bounding box + the polygon)."""
+    points = tuple((float(x), float(y)) for x, y in points)
+    xs = [x for x, _y in points]
+    ys = [y for _x, y in points]
+    return Obstacle(
+        xmin=min(xs), ymin=min(ys), xmax=max(xs), ymax=max(ys),
+        net=net, kind="zone",
+        label=label or f"zone net{net} {layer} p{priority}",
+        points=points, priority=priority,
+    )
+
+
+def _segment_violation(x1: float, y1: float, x2: float, y2: float,
+                       layer: str, width: float,
+                       seg_obs: Obstacle, obs: Obstacle
+                       ) -> Optional[Violation]:
+    """The Violation between a segment and one obstacle, or None."""
+    required = _required_clearance("segment", obs.kind)
+    # A trace's copper is a capsule (rounded rectangle swept along the
+    # centreline), which the segment AABB represents EXACTLY while the
+    # segment is horizontal or vertical — true of almost every trace on
+    # this board. For a diagonal the AABB is the bounding box of the
+    # capsule and badly overstates the copper near the corners, which
+    # reports collisions that do not exist. Use the exact capsule
+    # distance in that case instead of loosening the rule.
+    if abs(x2 - x1) > _EPS and abs(y2 - y1) > _EPS:
+        gap = _capsule_rect_gap(x1, y1, x2, y2, width / 2,
+                                obs.xmin, obs.ymin, obs.xmax, obs.ymax)
+    else:
+        gap = _aabb_gap(seg_obs.xmin, seg_obs.ymin,
+                        seg_obs.xmax, seg_obs.ymax,
+                        obs.xmin, obs.ymin, obs.xmax, obs.ymax)
+    if gap >= required - _EPS:
+        return None
+    return Violation(
+        obstacle_a=seg_obs,
+        obstacle_b=obs,
+        layer=layer,
+        gap_mm=round(gap, 4),
+        required_mm=required,
+        suggestion=_suggest_nudge(x1, y1, x2, y2, obs),
+    )
+
+
+def _via_violation(x: float, y: float, size: float, drill: float,
+                   layer: str, via_obs: Obstacle, obs: Obstacle
+                   ) -> Optional[Violation]:
+    """The Violation between a via and one obstacle, or None."""
+    if obs.kind == "via" and obs.size > 0:
+        # Two circles, and TWO rules — copper spacing and hole
+        # spacing are different limits and must be measured on
+        # different geometry. Report whichever is breached, with
+        # the number that actually breaches it, so the suggestion
+        # names a real problem.
+        cop, hole = _via_pair_gaps(
+            x, y, size, drill,
+            obs.cx, obs.cy, obs.size, obs.drill)
+        if hole < CLEARANCE_VIA_VIA - _EPS:
+            gap, required = hole, CLEARANCE_VIA_VIA
+        elif cop < CLEARANCE_VIA_VIA_COPPER - _EPS:
+            gap, required = cop, CLEARANCE_VIA_VIA_COPPER
+        else:
+            return None
+    else:
+        required = _required_clearance("via", obs.kind)
+        gap = _aabb_gap(via_obs.xmin, via_obs.ymin,
+                        via_obs.xmax, via_obs.ymax,
+                        obs.xmin, obs.ymin, obs.xmax, obs.ymax)
+        if gap >= required - _EPS:
+            return None
+    return Violation(
+        obstacle_a=via_obs,
+        obstacle_b=obs,
+        layer=layer,
+        gap_mm=round(gap, 4),
+        required_mm=required,
+        suggestion=f"move via from ({x:.2f},{y:.2f})",
+    )
+
+
+# ── Zones ─────────────────────────────────────────────────────────
+
+def _swallower(x: float, y: float, net: int,
+               zones: List[Obstacle]) -> Optional[Obstacle]:
+    """The pour that cuts a via at (x, y) off from its own net's plane.
+
+    The via sits inside a pour of its own net, and a pour of another net
+    outranks that one there — so the filler hands the spot to the other
+    net and the via connects to nothing on this layer. None if the via
+    has no plane of its own here, or its plane wins.
+    """
+    inside = [z for z in zones if _point_in_polygon(x, y, z.points)]
+    own = [z.priority for z in inside if z.net == net]
+    if not own:
+        return None
+    top = max(inside, key=lambda z: z.priority)
+    if top.net == net or max(own) >= top.priority:
+        return None
+    return top
+
+
+def _swallowers(vias: List[Obstacle],
+                zones: List[Obstacle]) -> List[Optional[Obstacle]]:
+    """_swallower for many vias, testing each zone against all at once."""
+    if not zones or not vias:
+        return [None] * len(vias)
+    if np is None:
+        return [_swallower(v.cx, v.cy, v.net, zones) for v in vias]
+    xs = np.array([v.cx for v in vias])
+    ys = np.array([v.cy for v in vias])
+    inside = np.stack([_points_in_polygon(xs, ys, z.points) for z in zones])
+    out = []
+    for k, via in enumerate(vias):
+        hit = [z for z, i in zip(zones, inside[:, k]) if i]
+        own = [z.priority for z in hit if z.net == via.net]
+        top = max(hit, key=lambda z: z.priority) if own else None
+        out.append(None if top is None or top.net == via.net
+                   or max(own) >= top.priority else top)
+    return out
+
+
+def _swallow_violation(via_obs: Obstacle, zone: Obstacle,
+                       layer: str) -> Violation:
+    """A via cut off from its plane. gap_mm is how deep inside it sits."""
+    depth = _point_outline_distance(via_obs.cx, via_obs.cy, zone.points)
+    return Violation(
+        obstacle_a=via_obs,
+        obstacle_b=zone,
+        layer=layer,
+        gap_mm=round(-depth, 4),
+        required_mm=0.0,
+        suggestion=(f"via is {depth:.2f}mm inside {zone.label}, off its "
+                    f"own plane — move it out or pull the zone back"),
+    )
+
+
+def _point_in_polygon(x: float, y: float, points) -> bool:
+    """Even-odd ray cast; a point on the outline counts as inside."""
+    if _point_outline_distance(x, y, points) < _EPS:
+        return True
+    inside = False
+    n = len(points)
+    for i in range(n):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % n]
+        if (ay > y) != (by > y):
+            if x < ax + (y - ay) * (bx - ax) / (by - ay):
+                inside = not inside
+    return inside
+
+
+def _point_outline_distance(x: float, y: float, points) -> float:
+    """Distance from (x, y) to the nearest edge of a closed polygon."""
+    best = math.inf
+    n = len(points)
+    for i in range(n):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % n]
+        vx, vy = bx - ax, by - ay
+        L2 = vx * vx + vy * vy
+        t = 0.0 if L2 <= 0.0 else \
+            max(0.0, min(1.0, ((x - ax) * vx + (y - ay) * vy) / L2))
+        best = min(best, math.hypot(x - (ax + t * vx), y - (ay + t * vy)))
+    return best
+
+
+def _points_in_polygon(xs, ys, points):
+    """_point_in_polygon over arrays of points."""
+    inside = np.zeros(len(xs), dtype=bool)
+    near = np.full(len(xs), math.inf)
+    n = len(points)
+    for i in range(n):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % n]
+        crosses = (ay > ys) != (by > ys)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            at = ax + (ys - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (xs < at)
+        vx, vy = bx - ax, by - ay
+        L2 = vx * vx + vy * vy
+        t = np.zeros(len(xs)) if L2 <= 0.0 else \
+            np.clip(((xs - ax) * vx + (ys - ay) * vy) / L2, 0.0, 1.0)
+        near = np.minimum(near, np.hypot(xs - (ax + t * vx),
+                                         ys - (ay + t * vy)))
+    return inside | (near < _EPS)
+
+
+def _polygons_overlap(a, b) -> bool:
+    """True if two closed polygons share area (touching edges do not)."""
+    def strictly_inside(x, y, pts):
+        return (_point_outline_distance(x, y, pts) >= _EPS
+                and _point_in_polygon(x, y, pts))
+
+    if any(strictly_inside(x, y, b) for x, y in a) or \
+            any(strictly_inside(x, y, a) for x, y in b):
+        return True
+
+    def cross(o, p, q):
+        return (p[0] - o[0]) * (q[1] - o[1]) - (p[1] - o[1]) * (q[0] - o[0])
+
+    for i in range(len(a)):
+        p1, p2 = a[i], a[(i + 1) % len(a)]
+        for j in range(len(b)):
+            q1, q2 = b[j], b[(j + 1) % len(b)]
+            if (cross(p1, p2, q1) * cross(p1, p2, q2) < 0
+                    and cross(q1, q2, p1) * cross(q1, q2, p2) < 0):
+                return True
+
+    # Outlines that only meet along shared or collinear edges (two pours
+    # drawn to the same line, or the same outline twice) have no vertex
+    # inside and no proper crossing. Probe just either side of every
+    # edge's midpoint.
+    for pts in (a, b):
+        for i in range(len(pts)):
+            (x1, y1), (x2, y2) = pts[i], pts[(i + 1) % len(pts)]
+            length = math.hypot(x2 - x1, y2 - y1)
+            if length < _EPS:
+                continue
+            nx, ny = (y1 - y2) / length * 2 * _EPS, \
+                (x2 - x1) / length * 2 * _EPS
+            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+            for x, y in ((mx + nx, my + ny), (mx - nx, my - ny)):
+                if strictly_inside(x, y, a) and strictly_inside(x, y, b):
+                    return True
+    return False
+
+
+# ── Batch-path helpers (NumPy) ────────────────────────────────────
+
+_CELL_BIAS = 1 << 20
+
+
+def _cell_key(gx, gy):
+    """One integer per (gx, gy) cell, for sorting and joining (or arrays)."""
+    return ((gx + _CELL_BIAS) << 21) | (gy + _CELL_BIAS)
+
+
+def _expand_cells(gx1, gy1, gx2, gy2):
+    """(owner, gx, gy) for every cell of every [gx1..gx2]x[gy1..gy2] box."""
+    w = gy2 - gy1 + 1
+    counts = (gx2 - gx1 + 1) * w
+    owner = np.repeat(np.arange(len(counts)), counts)
+    start = np.repeat(np.cumsum(counts) - counts, counts)
+    step = np.arange(int(counts.sum())) - start
+    return (owner, gx1[owner] + step // w[owner],
+            gy1[owner] + step % w[owner])
+
+
+def _obstacle_columns(obstacles: List[Obstacle], cell_size: float) -> dict:
+    """The fixed per-obstacle columns the batch path reads."""
+    xmin = np.array([o.xmin for o in obstacles], dtype=float)
+    ymin = np.array([o.ymin for o in obstacles], dtype=float)
+    xmax = np.array([o.xmax for o in obstacles], dtype=float)
+    ymax = np.array([o.ymax for o in obstacles], dtype=float)
+    return {
+        "xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax,
+        "kind": np.array([_KIND_CODE[o.kind] for o in obstacles],
+                         dtype=np.int64),
+        "cx": np.array([o.cx for o in obstacles], dtype=float),
+        "cy": np.array([o.cy for o in obstacles], dtype=float),
+        "size": np.array([o.size for o in obstacles], dtype=float),
+        "drill": np.array([o.drill for o in obstacles], dtype=float),
+        "seq": np.array([o.seq for o in obstacles], dtype=np.int64),
+        "gx1": np.floor(xmin / cell_size).astype(np.int64),
+        "gy1": np.floor(ymin / cell_size).astype(np.int64),
+        "gx2": np.floor(xmax / cell_size).astype(np.int64),
+        "gy2": np.floor(ymax / cell_size).astype(np.int64),
+    }
+
+
+def _rows(data, width: int) -> list:
+    """An (n, width) array-like as a list of tuples of Python floats."""
+    if np is None:
+        return [tuple(float(v) for v in r) for r in data]
+    return [tuple(r) for r in
+            np.asarray(data, dtype=float).reshape(-1, width).tolist()]
+
+
+def _aabb_gaps(ax1, ay1, ax2, ay2, bx1, by1, bx2, by2):
+    """_aabb_gap over arrays."""
+    dx = np.maximum(np.maximum(bx1 - ax2, ax1 - bx2), 0.0)
+    dy = np.maximum(np.maximum(by1 - ay2, ay1 - by2), 0.0)
+    overlap = -np.minimum(np.minimum(ax2 - bx1, bx2 - ax1),
+                          np.minimum(ay2 - by1, by2 - ay1))
+    return np.where((dx > 0) | (dy > 0), np.sqrt(dx * dx + dy * dy), overlap)
+
+
+def _capsule_rect_gaps(x1, y1, x2, y2, hw, bx1, by1, bx2, by2):
+    """_capsule_rect_gap over arrays."""
+    def point_rect(px, py):
+        return np.hypot(np.maximum(np.maximum(bx1 - px, 0.0), px - bx2),
+                        np.maximum(np.maximum(by1 - py, 0.0), py - by2))
+
+    vx, vy = x2 - x1, y2 - y1
+    L2 = vx * vx + vy * vy
+    safe = np.where(L2 > 0.0, L2, 1.0)
+
+    def point_seg(px, py):
+        t = np.clip(((px - x1) * vx + (py - y1) * vy) / safe, 0.0, 1.0)
+        t = np.where(L2 > 0.0, t, 0.0)
+        return np.hypot(px - (x1 + t * vx), py - (y1 + t * vy))
+
+    dist = np.minimum(point_rect(x1, y1), point_rect(x2, y2))
+    for cx, cy in ((bx1, by1), (bx2, by1), (bx1, by2), (bx2, by2)):
+        dist = np.minimum(dist, point_seg(cx, cy))
+    return dist - hw
+
+
 def _is_tht_pad(ref: str, num: str) -> bool:
     """Check if a specific pad is through-hole type.
 
@@ -13,6 +13,11 @@ Pad dimensions sourced from:
 import math
 import re
 
+try:
+    import numpy as np
+except ImportError:     # place_pads() then transforms pad by pad; same numbers
+    np = None
+
 from . import primitives as P
 
 
@@ -1082,3 +1087,98 @@ def get_pads(footprint_name, layer=None, rotation=0):
     if actual_layer == "B":
         pads = [_mirror_pad_x(p) for p in pads]
     return pads
+
+
+# ── Pad tables ───────────────────────────────────────────────────
+# routing._shared._compute_pads() and pad_positions.get_pads_and_layers()
+# both want every placement's pads as numbers, and both used to call gen()
+# per placement and regex each pad string back apart. A footprint's local
+# geometry does not depend on where it is placed, so it is parsed once per
+# (footprint, side) and each placement is one rotate -> mirror -> translate
+# over the whole table.
+_PAD_NUM_RE = re.compile(r'\(pad\s+"([^"]*)"')
+_PAD_AT_RE = re.compile(r'\(at\s+([-\d.]+)\s+([-\d.]+)\)')
+_PAD_SIZE_RE = re.compile(r'\(size\s+([\d.]+)\s+([\d.]+)\)')
+
+# {(footprint_name, layer_char): (nums, local_xy, sizes, uids)}
+_PAD_TABLES = {}
+
+
+def pad_table(footprint_name, layer):
+    """Footprint-local pads of `footprint_name` generated for `layer`.
+
+    Returns (nums, local_xy, sizes, uids), one row per pad with an (at),
+    in gen() order: `nums[i]` is None for a pad without a number and
+    `sizes[i]` None for one without a (size). `local_xy` is an (n, 2)
+    array (a list of (x, y) without NumPy). `uids` is how many UUIDs
+    gen() draws, which place_pads() goes on spending — see there.
+
+    Parsed once per (footprint, side); building it draws no UUIDs.
+    """
+    key = (footprint_name, layer)
+    table = _PAD_TABLES.get(key)
+    if table is None:
+        gen, _default_layer = FOOTPRINTS[footprint_name]
+        mark = P.uid_mark()
+        raw_pads = gen(layer)
+        uids = P.uid_mark() - mark
+        P.uid_restore(mark)
+        nums, xy, sizes = [], [], []
+        for pad_str in raw_pads:
+            at_m = _PAD_AT_RE.search(pad_str)
+            if not at_m:
+                continue
+            num_m = _PAD_NUM_RE.search(pad_str)
+            sz_m = _PAD_SIZE_RE.search(pad_str)
+            nums.append(num_m.group(1) if num_m else None)
+            xy.append((float(at_m.group(1)), float(at_m.group(2))))
+            sizes.append((float(sz_m.group(1)), float(sz_m.group(2)))
+                         if sz_m else None)
+        if np is not None:
+            xy = np.array(xy, dtype=float).reshape(-1, 2)
+        table = _PAD_TABLES[key] = (tuple(nums), xy, tuple(sizes), uids)
+    return table
+
+
+def place_pads(footprint_name, cx, cy, rot, layer):
+    """Absolute pads of one placement: [(num, x, y, size), ...].
+
+    The transform order matches get_pads() / the .kicad_pcb file:
+    pre-rotate by `rot` degrees, mirror X on B.Cu, translate to (cx, cy).
+    `size` is (w, h) swapped for 90/270 degree placements, or None; `num`
+    is None for an unnumbered pad. Rows are in pad_table() order.
+
+    Each element is the same float the per-pad arithmetic gives: cos/sin
+    are taken once, and NumPy's elementwise multiply/subtract/add round
+    exactly as Python's do.
+
+    Callers used to call gen() here, and gen() draws a UUID per pad. The
+    first of them run before routing marks the UUID counter, so the
+    counter is advanced by what gen() would have drawn — otherwise every
+    uuid in the emitted board would shift.
+    """
+    nums, xy, sizes, uids = pad_table(footprint_name, layer)
+    P.uid_restore(P.uid_mark() + uids)
+    rotated = rot % 360 != 0
+    if rotated:
+        rad = math.radians(rot)
+        cos_r, sin_r = math.cos(rad), math.sin(rad)
+    if np is not None:
+        lx, ly = xy[:, 0], xy[:, 1]
+        if rotated:
+            lx, ly = lx * cos_r - ly * sin_r, lx * sin_r + ly * cos_r
+        if layer == "B":
+            lx = -lx
+        xs, ys = (cx + lx).tolist(), (cy + ly).tolist()
+    else:
+        xs, ys = [], []
+        for lx, ly in xy:
+            if rotated:
+                lx, ly = lx * cos_r - ly * sin_r, lx * sin_r + ly * cos_r
+            if layer == "B":
+                lx = -lx
+            xs.append(cx + lx)
+            ys.append(cy + ly)
+    if abs(rot % 360) in (90, 270):
+        sizes = [size[::-1] if size else size for size in sizes]
+    return list(zip(nums, xs, ys, sizes))
@@ -15,9 +15,6 @@ Usage:
     pos = get_pad(pads, "J4", "11") # FPC pin 11
 """
 
-import math
-import re
-
 from . import footprints as FP
 from .board import _component_placeholders
 
@@ -74,50 +71,13 @@ def get_pads_and_layers():
         if fp_name not in FP.FOOTPRINTS:
             continue
 
-        gen, _default_layer = FP.FOOTPRINTS[fp_name]
-        # Raw pads: x/y are footprint-local, NOT yet mirrored
-        raw_pads = gen(layer_char)
-
-        ref_pads = {}
-        for pad_str in raw_pads:
-            at_match = re.search(r'\(at\s+([-\d.]+)\s+([-\d.]+)\)', pad_str)
-            sz_match = re.search(r'\(size\s+([\d.]+)\s+([\d.]+)\)', pad_str)
-            num_match = re.search(r'\(pad\s+"([^"]*)"', pad_str)
-
-            if not at_match or not sz_match:
-                continue
-
-            px = float(at_match.group(1))
-            py = float(at_match.group(2))
-            pw = float(sz_match.group(1))
-            ph = float(sz_match.group(2))
-            pad_num = num_match.group(1) if num_match else "?"
-
-            # Transform order: rotate → mirror_X → translate
-            # (matches _compute_pads in routing.py and KiCad convention)
-
-            # Step 1: Apply rotation
-            rot_rad = math.radians(rot)
-            cos_r = math.cos(rot_rad)
-            sin_r = math.sin(rot_rad)
-            rx = px * cos_r - py * sin_r
-            ry = px * sin_r + py * cos_r
-
-            # Step 2: B.Cu mirroring: negate X (after rotation)
-            if layer_char == "B":
-                rx = -rx
-
-            # Step 3: Translate to board coordinates
-            abs_x = fx + rx
-            abs_y = fy + ry
-
-            # Rotate pad dimensions
-            if abs(rot % 360) in (90, 270):
-                pw, ph = ph, pw
-
-            ref_pads[pad_num] = (abs_x, abs_y, pw, ph)
-
-        result[ref] = ref_pads
+        # Transform order: rotate → mirror_X → translate, with pad
+        # dimensions swapped for 90/270 (FP.place_pads, shared with
+        # _compute_pads in routing and matching the KiCad convention)
+        result[ref] = {("?" if num is None else num): (abs_x, abs_y, *size)
+                       for num, abs_x, abs_y, size
+                       in FP.place_pads(fp_name, fx, fy, rot, layer_char)
+                       if size is not None}
 
     return result, layers
 
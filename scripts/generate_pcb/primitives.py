@@ -1,5 +1,7 @@
 """KiCad PCB S-expression primitives."""
 
+import re
+
 
 class PcbUid:
     """Sequential UUID generator for PCB elements."""
@@ -27,15 +29,36 @@ def uid_mark() -> int:
 def uid_restore(mark: int) -> None:
     """Rewind the UUID counter to `mark`.
 
-    routing.generate_all_traces() routes the board twice: once to discover
-    every pad's net, so the collision detector can be seeded default-closed,
-    and once to emit. The discovery pass consumes UUIDs like any other run;
+    routing.generate_all_traces() routes the board a second time when its
+    cached pad->net seed turns out stale: the first run becomes a discovery
+    pass, so the collision detector can be seeded default-closed, and the
+    second is emitted. The discovery pass consumes UUIDs like any other run;
     without this rewind every id in the emitted board would shift and a
     change that moves no copper would produce a whole-file diff.
     """
     _uid._n = mark
 
 
+_UID_RE = re.compile(r"([0-9a-f]{8})-dead-4000-a000-[0-9a-f]{12}")
+
+
+def uid_shift(text: str, offset: int) -> str:
+    """Renumber every uid() in `text` by `offset`.
+
+    routing._assemble routes domains in worker processes, each counting
+    from where the parent stood when it forked; the merge shifts each
+    domain's ids to where a serial run would have put them.
+    """
+    if not offset:
+        return text
+
+    def shifted(m):
+        n = int(m.group(1), 16) + offset
+        return f"{n:08x}-dead-4000-a000-{n:012x}"
+
+    return _UID_RE.sub(shifted, text)
+
+
 def header() -> str:
     return (
         '(kicad_pcb\n'
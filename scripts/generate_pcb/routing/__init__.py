@@ -25,6 +25,7 @@ from ._shared import (  # helper defs — never rebound
     _seg,
     _segment_crosses_circle,
     _via_net,
+    _zone_fill,
     enc,
     get_collision_violations,
     get_pad_nets,
@@ -2,7 +2,19 @@
 byte-identical regenerated .kicad_pcb. One domain per module; every helper
 and every constant lives in _shared (original order, so import-time
 execution is unchanged). See routing/__init__.py for the contract."""
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+from dataclasses import astuple, dataclass
+from pathlib import Path
+
 from .. import primitives as P
+from ..collision import Obstacle, Violation
 from ._shared import (
     NET_ID,
     _GRID,
@@ -12,6 +24,7 @@ from ._shared import (
     _PAD_POS_LOOKUP,
     _SEED_PAD_NETS,
     _init_keepout_zones,
+    _init_pads,
 )
 from .buttons import _button_pullup_bridges
 from .buttons import _button_traces
@@ -30,6 +43,299 @@ from .usb import _usb_c_reversibility_traces
 from .usb import _usb_traces
 
 
+# ── Domain routing ────────────────────────────────────────────────
+#
+# The domain routers, in emission order. No domain reads what another
+# writes: each reads the pad tables _init_pads() builds and writes only its
+# own copper, pad-net claims (_PAD_NETS), collision pieces (_GRID) and
+# mounting-hole detour slots (_MH_DETOUR_IDX). So each is routed on its
+# own — in forked workers if ROUTE_JOBS asks for them — and the results
+# are merged in this order (_merge_domains). A router that starts
+# READING one of those tables breaks that, and must be folded into the
+# domain that writes it.
+
+_DOMAINS = (
+    _power_traces,
+    _display_traces,
+    _spi_traces,
+    _i2s_traces,
+    _pam_passive_traces,
+    _usb_traces,
+    _usb_c_reversibility_traces,
+    _button_traces,
+    _passive_traces,
+    _led_traces,
+    _diag_led_traces,
+    _reset_boot_traces,
+    _menu_diode_traces,
+    _button_pullup_bridges,
+    _power_zones,
+)
+
+
+@dataclass
+class _DomainRoute:
+    """One domain routed in isolation: everything it would have written."""
+    name: str
+    parts: list         # S-expression strings, ids from uid_start + 1
+    uid_start: int
+    uid_end: int
+    pad_nets: dict      # its _PAD_NETS writes, in write order
+    detours: dict       # its _MH_DETOUR_IDX slots
+    pieces: list        # its _GRID calls, from CollisionGrid.record()
+    stderr: str
+
+
+def _route_domain(index):
+    """Route _DOMAINS[index] from a clean slate and return what it wrote."""
+    domain = _DOMAINS[index]
+    _PAD_NETS.clear()
+    _MH_DETOUR_IDX.clear()
+    start = P.uid_mark()
+    err = io.StringIO()
+    with _GRID.record() as pieces, contextlib.redirect_stderr(err):
+        parts = domain()
+    return _DomainRoute(domain.__name__, parts, start, P.uid_mark(),
+                        dict(_PAD_NETS), dict(_MH_DETOUR_IDX), pieces,
+                        err.getvalue())
+
+
+def _route_domains(jobs=None, keys=None):
+    """_route_domain() for every domain, results in _DOMAINS order.
+
+    keys (from _domain_keys) splices every domain whose key is in the
+    domain memo from there; only the rest are routed, and stored.
+
+    jobs (default: ROUTE_JOBS, else 1) > 1 hands the domains to forked
+    workers, which inherit the initialised pad tables and collision grid.
+    Serial is the default because today's fifteen domains route in about
+    10 ms together, less than starting the pool costs.
+    """
+    memo = _load_domain_memo() if keys else {"routes": {}}
+    routes = [None] * len(_DOMAINS)
+    for index, key in enumerate(keys or ()):
+        if key in memo["routes"]:
+            routes[index] = _DomainRoute(**memo["routes"][key])
+    todo = [i for i, route in enumerate(routes) if route is None]
+
+    if jobs is None:
+        jobs = int(os.environ.get("ROUTE_JOBS", 1))
+    jobs = min(jobs, len(todo))
+    if jobs <= 1:
+        fresh = [_route_domain(i) for i in todo]
+    else:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            fresh = pool.map(_route_domain, todo, chunksize=1)
+    for index, route in zip(todo, fresh):
+        routes[index] = route
+        if keys:
+            memo["routes"][keys[index]] = vars(route)
+            memo["dirty"] = True
+    return routes
+
+
+def _merge_domains(routes, uid_mark, check_keys=None):
+    """Fold isolated domain routes into the board, in _DOMAINS order.
+
+    Exactly what routing the domains one after another from `uid_mark`
+    would leave: ids renumbered to follow on from the previous domain,
+    pad-net claims applied in order (a later write wins, an earlier one
+    keeps its place), warnings in order, and the collision pieces replayed
+    one domain per CollisionGrid.batch(), so every domain is checked
+    against the ones before it. Returns the S-expression parts.
+
+    check_keys (from _check_keys) takes a domain's verdicts from the
+    domain memo instead of re-checking it, when neither it, any domain
+    before it, nor the pad-net seed has changed since they were stored.
+    """
+    memo = _load_domain_memo() if check_keys else {"checks": {}}
+    checks = memo["checks"]
+    parts = []
+    _PAD_NETS.clear()
+    _MH_DETOUR_IDX.clear()
+    uid = uid_mark
+    for index, route in enumerate(routes):
+        parts.extend(P.uid_shift(part, uid - route.uid_start)
+                     for part in route.parts)
+        uid += route.uid_end - route.uid_start
+        _PAD_NETS.update(route.pad_nets)
+        shared = _MH_DETOUR_IDX.keys() & route.detours.keys()
+        if shared:
+            # Two domains took the same detour slot around a hole, so their
+            # detours sit on top of each other.
+            raise RuntimeError(
+                f"{route.name} detours around mounting hole(s) "
+                f"{sorted(shared, key=str)} already detoured by an earlier domain; "
+                "route them in one domain")
+        _MH_DETOUR_IDX.update(route.detours)
+        sys.stderr.write(route.stderr)
+        key = check_keys[index] if check_keys else None
+        if key in checks:
+            _GRID.replay(route.pieces, check=False)
+            _GRID.violations.extend(_violation_from_state(v)
+                                    for v in checks[key])
+            continue
+        done = len(_GRID.violations)
+        with _GRID.batch():
+            _GRID.replay(route.pieces)
+        if key is not None:
+            checks[key] = [astuple(v) for v in _GRID.violations[done:]]
+            memo["dirty"] = True
+    P.uid_restore(uid)
+    return parts
+
+
+# ── Pad-net seed cache ────────────────────────────────────────────
+#
+# The pad->net map a routing run leaves in _PAD_NETS, kept per routing
+# source fingerprint: in memory for repeat calls in one process, and in
+# scripts/generate_pcb/.pad_nets.json for the next `make generate-pcb`.
+# It is only ever a HINT — generate_all_traces checks it against the run
+# it seeds — so a stale entry costs one extra pass, never a wrong board.
+# That is also why a map left by OTHER sources is still loaded: most edits
+# move no pad net, and then it is right.
+
+_PKG_DIR = Path(__file__).resolve().parent.parent
+_SEED_CACHE = _PKG_DIR / ".pad_nets.json"
+_SEED_MEMO = {}         # {fingerprint: {(ref, pad_num_str): net_id}}
+
+
+def _source_digests():
+    """{package-relative path: SHA-256} of every module of the generator."""
+    return {path.relative_to(_PKG_DIR).as_posix():
+            hashlib.sha256(path.read_bytes()).hexdigest()
+            for path in sorted(_PKG_DIR.rglob("*.py"))}
+
+
+def _source_fingerprint(digests=None):
+    """SHA-256 over every module of the generator (it reads no data files)."""
+    h = hashlib.sha256()
+    for rel, digest in sorted((digests or _source_digests()).items()):
+        h.update(rel.encode())
+        h.update(b"\0")
+        h.update(digest.encode())
+    return h.hexdigest()
+
+
+def _load_seed(fingerprint):
+    if fingerprint in _SEED_MEMO:
+        return _SEED_MEMO[fingerprint]
+    try:
+        with open(_SEED_CACHE) as f:
+            data = json.load(f)
+        seed = {(ref, num): net for ref, num, net in data["pad_nets"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    if data.get("fingerprint") == fingerprint:
+        _SEED_MEMO[fingerprint] = seed
+    return seed
+
+
+def _store_seed(fingerprint, pad_nets):
+    _SEED_MEMO.clear()
+    _SEED_MEMO[fingerprint] = dict(pad_nets)
+    data = {"fingerprint": fingerprint,
+            "pad_nets": sorted([ref, num, net]
+                               for (ref, num), net in pad_nets.items())}
+    tmp_path = _SEED_CACHE.with_name(f"{_SEED_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, _SEED_CACHE)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+# ── Domain memo ───────────────────────────────────────────────────
+#
+# What each domain routed (_DomainRoute) and the collision verdicts its
+# pieces drew, kept in memory and in scripts/generate_pcb/.domain_routes.pkl
+# so that an edit to one domain module re-routes only that module's
+# domains and re-checks only from the first of them on.
+#
+# A route is keyed by its own module and every module that is not a
+# domain module: the shared tables, the primitives, and the placements
+# _init_pads reads. A verdict also depends on every domain checked before
+# it and on the pad nets the grid was seeded with, so its key chains
+# those in too. Plain builtins only, so the file does not depend on the
+# import path the generator was run under.
+
+_DOMAIN_CACHE = _PKG_DIR / ".domain_routes.pkl"
+_DOMAIN_VERSION = 1
+_DOMAIN_MEMO = {}       # {"routes": {key: fields}, "checks": {key: [...]},
+                        #  "dirty": added to since loaded / stored}
+
+
+def _domain_module(domain):
+    return f"routing/{domain.__module__.rsplit('.', 1)[1]}.py"
+
+
+def _domain_keys(digests):
+    """One key per _DOMAINS entry, for the route memo."""
+    own = {_domain_module(d) for d in _DOMAINS}
+    shared = hashlib.sha256(json.dumps(
+        sorted(kv for kv in digests.items() if kv[0] not in own)).encode())
+    keys = []
+    for domain in _DOMAINS:
+        h = shared.copy()
+        module = _domain_module(domain)
+        h.update(f"{_DOMAIN_VERSION}:{module}:{digests[module]}:"
+                 f"{domain.__name__}".encode())
+        keys.append(h.hexdigest())
+    return keys
+
+
+def _check_keys(keys):
+    """One key per _DOMAINS entry, for the verdict memo of this pass."""
+    h = hashlib.sha256(json.dumps(
+        [_GRID.enabled, sorted([ref, num, net] for (ref, num), net
+                               in _SEED_PAD_NETS.items())]).encode())
+    chained = []
+    for key in keys:
+        h.update(key.encode())
+        chained.append(h.hexdigest())
+    return chained
+
+
+def _load_domain_memo():
+    if not _DOMAIN_MEMO:
+        _DOMAIN_MEMO.update(routes={}, checks={}, dirty=False)
+        try:
+            with open(_DOMAIN_CACHE, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == _DOMAIN_VERSION:
+                _DOMAIN_MEMO.update(routes=data["routes"],
+                                    checks=data["checks"])
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                KeyError, TypeError):
+            pass
+    return _DOMAIN_MEMO
+
+
+def _store_domain_memo(keys, check_keys):
+    """Keep only what this run used, and persist it if anything is new."""
+    memo = _load_domain_memo()
+    routes = {k: memo["routes"][k] for k in keys if k in memo["routes"]}
+    checks = {k: memo["checks"][k] for k in check_keys
+              if k in memo["checks"]}
+    dirty = memo["dirty"]
+    memo.update(routes=routes, checks=checks, dirty=False)
+    if not dirty:
+        return
+    data = {"version": _DOMAIN_VERSION, "routes": routes, "checks": checks}
+    tmp_path = _DOMAIN_CACHE.with_name(
+        f"{_DOMAIN_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _DOMAIN_CACHE)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _violation_from_state(state):
+    a, b, *rest = state
+    return Violation(Obstacle(*a), Obstacle(*b), *rest)
 
 
 # ── Main entry point ──────────────────────────────────────────────
@@ -39,48 +345,76 @@ def generate_all_traces():
 
     Returns a single string of KiCad S-expressions.
 
-    Routes the board TWICE, and the reason is the collision detector:
+    The collision grid has to know every pad's net BEFORE the first trace
+    is placed, and the pad->net map is itself an output of routing:
 
     A pad only learns its net when a trace endpoint lands on it
-    (`_seg`/`_via_net` -> `_GRID.update_pad_net`). So on a single pass every
-    pad starts at net 0, and net-0 pads used to be skipped by collision
-    queries — which made the detector default-OPEN. A pad the router never
-    targets never acquired a net, stayed invisible for the whole run, and a
-    trace could be laid straight across it with nothing reported. The
-    post-hoc gates (verify_trace_through_pad, short_circuit_analysis,
-    analyze_pad_distances) were the only thing standing behind that.
-
-    Pass 1 is a discovery run whose OUTPUT IS DISCARDED; all it is for is
-    the pad->net map it leaves in `_PAD_NETS`. Pass 2 seeds the grid with
-    that map before the first trace is placed, so every routed pad is known
-    from the start and net 0 now means "unconnected copper" — a thing
-    nothing may overlap — rather than "not known yet".
+    (`_seg`/`_via_net` -> `_GRID.update_pad_net`). So on an unseeded run
+    every pad starts at net 0, and net-0 pads used to be skipped by
+    collision queries — which made the detector default-OPEN. A pad the
+    router never targets never acquired a net, stayed invisible for the
+    whole run, and a trace could be laid straight across it with nothing
+    reported. The post-hoc gates (verify_trace_through_pad,
+    short_circuit_analysis, analyze_pad_distances) were the only thing
+    standing behind that.
+
+    The run is therefore seeded (`_SEED_PAD_NETS`) with the map the last
+    run produced, and net 0 means "unconnected copper" — a thing nothing
+    may overlap — rather than "not known yet". Collision results never
+    steer the router, so the map a run produces does not depend on its
+    seed: if it equals the seed, this run IS the seeded run and is emitted
+    as is. Otherwise (first run, a router edit that moved a pad net, lost
+    cache) the UUID counter is rewound (`P.uid_restore`) and the board is
+    routed once more, seeded with the map just produced — the old
+    discovery-then-emit sequence, paid only on a miss.
+
+    Domains whose sources did not change are spliced from the domain memo
+    rather than routed, and their collision verdicts reused up to the
+    first domain that did change (see _route_domains, _merge_domains).
 
     Three properties this rests on, all checked by
     scripts/test_collision_pad_nets.py:
 
-    - the pass is free of side effects on the emitted board. The collision
+    - routing is free of side effects on the emitted board. The collision
       result is only appended to `_GRID.violations`; `_seg`/`_via_net` place
       copper either way. Two consecutive runs are byte-identical.
-    - the UUID counter is rewound between passes (`P.uid_restore`), so the
-      emitted board is unchanged down to the ids.
-    - the discovery pass prints no report. One run, one report.
+    - a rerun starts from the same UUID mark, so the emitted board is
+      unchanged down to the ids.
+    - only the emitted run prints a report. One run, one report.
     """
-    # ── Pass 1: discovery ─────────────────────────────────────────
-    _SEED_PAD_NETS.clear()
+    digests = _source_digests()
+    fingerprint = _source_fingerprint(digests)
+    keys = _domain_keys(digests)
+    seed = _load_seed(fingerprint)
     _uid_mark = P.uid_mark()
-    _route_once(report=False)
-    _discovered = dict(_PAD_NETS)
 
-    # ── Pass 2: the run that is emitted ───────────────────────────
-    P.uid_restore(_uid_mark)
     _SEED_PAD_NETS.clear()
-    _SEED_PAD_NETS.update(_discovered)
-    return _route_once(report=True)
+    _SEED_PAD_NETS.update(seed)
+    out = _route_once(keys)
+    if _PAD_NETS != seed:
+        # Stale or missing seed: the run just made was the discovery pass.
+        discovered = dict(_PAD_NETS)
+        P.uid_restore(_uid_mark)
+        _SEED_PAD_NETS.clear()
+        _SEED_PAD_NETS.update(discovered)
+        out = _route_once(keys)
+        _store_seed(fingerprint, discovered)
+    elif fingerprint not in _SEED_MEMO:
+        _store_seed(fingerprint, seed)     # right, but stored for other code
+    _store_domain_memo(keys, _check_keys(keys))
 
+    _GRID.print_report()
+    if os.environ.get("COLLISION_STATS"):
+        _GRID.print_occupancy()
+    return out
 
-def _route_once(report: bool = True):
-    """One full routing pass. See generate_all_traces for why there are two."""
+
+def _route_once(keys=None):
+    """One full routing pass, seeded from `_SEED_PAD_NETS`.
+
+    keys (from _domain_keys) reuses the domain memo; without them every
+    domain is routed and checked afresh.
+    """
     # Reset collision grid and pad state for fresh generation.
     #
     # IN PLACE, not rebound. This module and every domain module import
@@ -99,27 +433,13 @@ def _route_once(report: bool = True):
     _init_keepout_zones()
     # Reset detour Y counter for unique spacing
     _MH_DETOUR_IDX.clear()
+    # Pads and the pre-populated grid, before the domains (or the workers
+    # routing them) need them. Consumes UUIDs, so it stays ahead of the mark.
+    _init_pads()
 
-    all_parts = []
-    all_parts.extend(_power_traces())
-    all_parts.extend(_display_traces())
-    all_parts.extend(_spi_traces())
-    all_parts.extend(_i2s_traces())
-    all_parts.extend(_pam_passive_traces())
-    all_parts.extend(_usb_traces())
-    all_parts.extend(_usb_c_reversibility_traces())
-    all_parts.extend(_button_traces())
-    all_parts.extend(_passive_traces())
-    all_parts.extend(_led_traces())
-    all_parts.extend(_diag_led_traces())
-    all_parts.extend(_reset_boot_traces())
-    all_parts.extend(_menu_diode_traces())
-    all_parts.extend(_button_pullup_bridges())
-    all_parts.extend(_power_zones())
-
-    # Report collision violations (discovery pass stays silent)
-    if report:
-        _GRID.print_report()
+    uid_mark = P.uid_mark()
+    all_parts = _merge_domains(_route_domains(keys=keys), uid_mark,
+                               _check_keys(keys) if keys else None)
 
     # ── Explicit pad-net assignments ──────────────────────────────
     # Assign nets to pads that connect via zone fill or where the overlapping
@@ -20,15 +20,18 @@ Layout notes:
 """
 
 import math
-import re
+import os
 
 from .. import primitives as P
 from .. import footprints as FP
 from ..primitives import NET_ID
 from ..collision import CollisionGrid
 
-# ── Collision detection grid (populated in _init_pads, used by _seg/_via_net)
-_GRID = CollisionGrid()
+# ── Collision detection grid (populated in _init_pads, used by _seg/_via_net/
+# _zone_fill). COLLISION_CELL_MM tunes its cell size; COLLISION_STATS=1 makes
+# generate_all_traces print its per-layer occupancy.
+_GRID = CollisionGrid(cell_size=float(os.environ.get("COLLISION_CELL_MM",
+                                                     "5.0")))
 
 # ── Trace widths ──────────────────────────────────────────────────
 # These are the CLASS FLOORS, not per-net current ratings. The single
@@ -940,37 +943,26 @@ def _compute_pads(fp_name, cx, cy, rot, layer_char):
       2. Pre-rotate by `rot` degrees (same as _pre_rotate_element)
       3. Mirror X for B.Cu pads (same as _mirror_pad_x)
       4. Translate to board coordinates (cx, cy)
+    Steps 2-4 are FP.place_pads() over the footprint's parsed pad table.
 
     Returns dict: {pad_num_str: (abs_x, abs_y), ...}
     """
     if fp_name not in FP.FOOTPRINTS:
         return {}
-    gen, _ = FP.FOOTPRINTS[fp_name]
-    raw_pads = gen(layer_char)
-    result = {}
-    for pad_str in raw_pads:
-        at_m = re.search(r'\(at\s+([-\d.]+)\s+([-\d.]+)\)', pad_str)
-        num_m = re.search(r'\(pad\s+"([^"]*)"', pad_str)
-        if not at_m or not num_m:
-            continue
-        lx, ly = float(at_m.group(1)), float(at_m.group(2))
-
-        # Step 1: pre-rotate by footprint rotation angle
-        if rot % 360 != 0:
-            rot_rad = math.radians(rot)
-            cos_r, sin_r = math.cos(rot_rad), math.sin(rot_rad)
-            rx = lx * cos_r - ly * sin_r
-            ry = lx * sin_r + ly * cos_r
-        else:
-            rx, ry = lx, ly
+    return {num: (x, y)
+            for num, x, y, _size in FP.place_pads(fp_name, cx, cy, rot,
+                                                   layer_char)
+            if num is not None}
+
 
-        # Step 2: mirror X for B.Cu
-        if layer_char == "B":
-            rx = -rx
+def _pad_key(x, y):
+    """Key of _PAD_POS_LOOKUP: (x, y) quantised to the 0.01 mm grid.
 
-        # Step 3: translate to absolute board position
-        result[num_m.group(1)] = (cx + rx, cy + ry)
-    return result
+    Integer hundredths rather than round(v, 2): the same bucket for every
+    coordinate the router produces, at a fraction of the cost of decimal
+    rounding on each _seg()/_via_net() endpoint.
+    """
+    return (round(x * 100), round(y * 100))
 
 
 # Precomputed pad positions for all routed components
@@ -993,11 +985,12 @@ _PAD_BOXES = {}
 # a segment/via endpoint matches a known pad position. Used by board.py
 # to inject correct net assignments into footprint pads.
 _PAD_NETS = {}          # {(ref, pad_num_str): net_id}
-_PAD_POS_LOOKUP = {}    # {(round_x, round_y): [(ref, num_str), ...]}
+_PAD_POS_LOOKUP = {}    # {_pad_key(x, y): [(ref, num_str), ...]}
 
 # Pad nets known BEFORE the first trace is placed, consumed by _init_pads()
 # when it seeds the collision grid. Filled by _assemble.generate_all_traces
-# from the previous (discovery) pass's _PAD_NETS; empty during that pass.
+# from the cached map of the last run, or from the _PAD_NETS of a discovery
+# pass; empty during that pass.
 #
 # Without it the collision detector was default-OPEN: a pad only acquired a
 # net when a trace endpoint reached it, so a pad the router never targets
@@ -1149,8 +1142,7 @@ def _init_pads():
     # Build position lookup for auto pad-net detection in _seg()/_via_net()
     for ref, pad_dict in _PADS.items():
         for num, (px, py) in pad_dict.items():
-            key = (round(px, 2), round(py, 2))
-            _PAD_POS_LOOKUP.setdefault(key, []).append((ref, num))
+            _PAD_POS_LOOKUP.setdefault(_pad_key(px, py), []).append((ref, num))
 
     # Pre-populate collision grid with pads, slot, edges, mounting holes
     if not _GRID._populated:
@@ -1181,8 +1173,8 @@ def _init_pads():
             ("J3", "1"): NET_ID["BAT_IN"],  # JST pin 1 — through Q1 RPP MOSFET
             ("J3", "2"): NET_ID["GND"],     # JST pin 2
         }
-        # The routed pad->net map from the discovery pass (see
-        # _assemble.generate_all_traces). Empty on the discovery pass itself.
+        # The routed pad->net map of the last run (see
+        # _assemble.generate_all_traces). Empty on a discovery pass.
         # The explicit four above win on conflict: they describe pads the
         # discovery pass gets wrong, not pads it misses.
         for _key, _net in _SEED_PAD_NETS.items():
@@ -1260,14 +1252,12 @@ def _seg(x1, y1, x2, y2, layer="B.Cu", width=W_DATA, net=0):
     if net != 0:
         _init_pads()
         for x, y in [(x1, y1), (x2, y2)]:
-            key = (round(x, 2), round(y, 2))
+            key = _pad_key(x, y)
             for ref, num in _PAD_POS_LOOKUP.get(key, []):
                 _PAD_NETS[(ref, num)] = net
                 _GRID.update_pad_net(ref, num, net)
         # Collision check + register
-        violations = _GRID.check_segment(x1, y1, x2, y2, layer, width, net)
-        _GRID.violations.extend(violations)
-        _GRID.add_segment(x1, y1, x2, y2, layer, width, net)
+        _GRID.place_segment(x1, y1, x2, y2, layer, width, net)
     # Keepout zone warning (all segments, including net=0)
     # B.Cu traces crossing NPTH mounting holes are OK — NPTH has no barrel
     # plating, so copper on internal/back layers can safely pass under the
@@ -1306,21 +1296,26 @@ def _via_net(x, y, net=0, size=None, drill=None):
     """Create a via. Auto-registers pad-net associations."""
     if net != 0:
         _init_pads()
-        key = (round(x, 2), round(y, 2))
+        key = _pad_key(x, y)
         for ref, num in _PAD_POS_LOOKUP.get(key, []):
             _PAD_NETS[(ref, num)] = net
             _GRID.update_pad_net(ref, num, net)
         # Collision check + register
         _size = size if size is not None else 0.9
         _drill = drill if drill is not None else 0.35
-        violations = _GRID.check_via(x, y, net, _size, _drill)
-        _GRID.violations.extend(violations)
-        _GRID.add_via(x, y, net, _size, _drill)
+        _GRID.place_via(x, y, net, _size, _drill)
     if size is not None and drill is not None:
         return P.via(x, y, size=size, drill=drill, net=net)
     return P.via(x, y, net=net)
 
 
+def _zone_fill(layer, pts, net, net_name, priority=0):
+    """Copper pour zone. Registers its outline with the collision grid."""
+    _GRID.place_zone(layer, pts, net, priority,
+                     f"zone {net_name} {layer} p{priority}")
+    return P.zone_fill(layer, pts, net, net_name, priority=priority)
+
+
 def _hv_route(x1, y1, x2, y2, net, width=W_DATA,
               h_layer="F.Cu", v_layer="B.Cu"):
     """Route from (x1,y1) to (x2,y2) using H-V Manhattan path.
@@ -0,0 +1,654 @@
+"""Opt-in maze router: A* over the collision grid, for nets not yet routed.
+
+Every route in the domain modules is a hand-placed Manhattan call sequence
+with literal coordinates, and adding a net meant trial and error against
+the collision report. _maze_route() finds one instead. It rasterises what
+the collision grid already holds — pads, the FPC slot, board edges,
+mounting holes, placed traces and vias, and any pieces queued by an open
+record() — plus the F.Cu mounting-hole keepouts of _init_keepout_zones(),
+onto a pitch grid per copper layer, and runs A* with a cost per mm, per
+bend and per via. The answer is the literal calls to paste into a domain
+module (MazeRoute.source), or ordinary _seg() / _via_net() copper placed
+on the finished board (MazeRoute.emit).
+
+Nothing calls it by default: no domain's output changes, and none may
+call it. A domain routes in isolation under record() (see _DOMAINS in
+_assemble.py), where the grid holds the pads and that domain's own queued
+pieces but no other domain's copper, and reading _GRID there breaks the
+_DOMAINS contract. So route against the fully routed board, paste
+source() into the domain module, and let it place the calls itself;
+emit() refuses inside record().
+
+Clearance model — collision.py's, not an approximation of it. Every
+obstacle is a box and a trace is its centreline swept by a square of half
+its width, so a cell is blocked for a horizontal step when the box
+(x +- (w/2 + pitch/2), y +- w/2) comes nearer an obstacle than
+_required_clearance() allows; vertical steps likewise. Any segment joining
+two free cells is then clear along its whole length, not just at the
+cells. A via cell is checked on the outer layers as check_via() does
+(circles for via-to-via) and refused where another net's higher-priority
+pour would cut it off from its own plane. The finished route is still run
+through check_segment / check_via, for the off-grid tail onto the last pad.
+
+Every pad other than the two being joined blocks, whatever its net: a
+pad's net in the grid comes from the seed, and a domain's copper must not
+depend on the seed (the domain memo keys on the sources alone).
+
+Interactive use, against the fully routed board:
+
+    python3 -m scripts.generate_pcb.routing.autoroute LCD_D1 J4.23 U1.5
+    python3 -m scripts.generate_pcb.routing.autoroute +3V3 C3.1 150,30,B.Cu \\
+        --width pwr
+"""
+
+import argparse
+import contextlib
+import heapq
+import io
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+except ImportError:     # _maze_route() refuses; nothing else needs it
+    np = None
+
+from ..collision import (
+    ALL_LAYERS,
+    CLEARANCE_VIA_VIA,
+    CLEARANCE_VIA_VIA_COPPER,
+    LAYER_IDX,
+    LAYER_NAMES,
+    NET_BARRIER,
+    OUTER_LAYERS,
+    _points_in_polygon,
+    _required_clearance,
+)
+from ._shared import (
+    BOARD_H,
+    BOARD_W,
+    NET_ID,
+    VIA_PWR,
+    VIA_PWR_DRILL,
+    VIA_STD,
+    VIA_STD_DRILL,
+    W_AUDIO,
+    W_DATA,
+    W_PWR,
+    W_PWR_HIGH,
+    W_SIG,
+    _GRID,
+    _KEEPOUT_CIRCLES,
+    _init_pads,
+    _pad,
+    _seg,
+    _via_net,
+)
+
+# Width classes by name, for the CLI and for MazeRoute.source()
+WIDTH_CLASSES = {
+    "data": ("W_DATA", W_DATA),
+    "sig": ("W_SIG", W_SIG),
+    "audio": ("W_AUDIO", W_AUDIO),
+    "pwr": ("W_PWR", W_PWR),
+    "pwr_high": ("W_PWR_HIGH", W_PWR_HIGH),
+}
+
+PITCH = 0.1         # mm per grid cell
+MARGIN = 10.0       # mm searched around the two endpoints before the board
+BEND_COST = 0.5     # mm of track a bend is worth
+VIA_COST = 3.0      # mm of track a via is worth
+GREED = 1.0         # A* estimate weight (>1 searches less, bends more)
+
+# Margin under every clearance: a cell this close to the limit is blocked
+_SLACK = 1e-6
+
+# A* moves: +x, -x, +y, -y (index = direction); 4 = arrived by via/start
+_MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_NO_DIR = 4
+
+
+@dataclass
+class MazeRoute:
+    """A found route, not yet placed.
+
+    steps, in path order: ("segment", (x1, y1, x2, y2, layer)) or
+    ("via", (x, y)). violations: what check_segment / check_via say about
+    them against the grid as it was searched (empty on a clean route).
+    """
+    net: int
+    width: float
+    via_size: float
+    via_drill: float
+    steps: list
+    violations: list = field(default_factory=list)
+    expanded: int = 0
+    ms: float = 0.0
+
+    def emit(self):
+        """Place the route through _seg / _via_net; returns the parts.
+
+        Not inside a domain: raises RuntimeError under _GRID.record(),
+        where the route was found without the other domains' copper.
+        """
+        if _GRID._recording:
+            raise RuntimeError("emit() inside a domain's record(); paste "
+                               "source() into the domain module instead")
+        parts = []
+        for kind, args in self.steps:
+            if kind == "via":
+                parts.append(_via_net(*args, self.net,
+                                      self.via_size, self.via_drill))
+            else:
+                parts.append(_seg(*args, self.width, self.net))
+        return parts
+
+    def source(self, net_name=None):
+        """The route as the literal calls a domain module would make."""
+        net_name = net_name or _net_name(self.net)
+        width = next((name for name, w in WIDTH_CLASSES.values()
+                      if w == self.width), repr(self.width))
+        via = next((f"{s}, {d}" for s, d, v, vd in (
+            ("VIA_STD", "VIA_STD_DRILL", VIA_STD, VIA_STD_DRILL),
+            ("VIA_PWR", "VIA_PWR_DRILL", VIA_PWR, VIA_PWR_DRILL))
+            if (v, vd) == (self.via_size, self.via_drill)),
+            f"{self.via_size}, {self.via_drill}")
+        lines = [f'net = NET_ID["{net_name}"]', "parts += ["]
+        for kind, args in self.steps:
+            if kind == "via":
+                x, y = args
+                lines.append(f"    _via_net({x}, {y}, net, {via}),")
+            else:
+                x1, y1, x2, y2, layer = args
+                lines.append(f'    _seg({x1}, {y1}, {x2}, {y2}, "{layer}", '
+                             f"{width}, net),")
+        lines.append("]")
+        return "\n".join(lines)
+
+
+def _net_name(net):
+    return next((name for name, nid in NET_ID.items() if nid == net),
+                str(net))
+
+
+def _endpoint(spec, layers):
+    """(x, y, {layer_idx}, pad label or None) for a pad or a point.
+
+    A pad is (ref, num); a point is (x, y, layer).
+    """
+    if isinstance(spec[0], str):
+        ref, num = spec[0], str(spec[1])
+        pos = _pad(ref, num)
+        if pos is None:
+            raise ValueError(f"no pad {ref}.{num}")
+        x, y = pos
+        label = f"{ref}:{num}"
+        on = {li for li in layers
+              if any(o.kind == "pad" and o.label == label
+                     for o in _GRID.index.query(li, x, y, x, y))}
+        if not on:
+            # A pad the grid skips (U1's thermal pad, three J4 pins) takes
+            # the side of its part's other pads
+            on = {li for li in layers
+                  if any(o.kind == "pad" and o.label.startswith(f"{ref}:")
+                         for o in _GRID.index.all_on_layer(li))}
+        if not on:
+            raise ValueError(
+                f"pad {ref}.{num} has no copper on {_layer_names(layers)} "
+                f"in the collision grid — give the point as (x, y, layer)")
+        return x, y, on, label
+    x, y, layer = spec
+    if LAYER_IDX.get(layer) not in layers:
+        raise ValueError(f"{layer} is not one of the routing layers")
+    return float(x), float(y), {LAYER_IDX[layer]}, None
+
+
+def _layer_names(layers):
+    return ", ".join(LAYER_NAMES[li] for li in layers)
+
+
+class _Raster:
+    """The search window: a pitch grid aligned on the start point."""
+
+    def __init__(self, sx, sy, ex, ey, pitch, margin):
+        lo_x = max(min(sx, ex) - margin, 0.0)
+        hi_x = min(max(sx, ex) + margin, BOARD_W)
+        lo_y = max(min(sy, ey) - margin, 0.0)
+        hi_y = min(max(sy, ey) + margin, BOARD_H)
+        self.pitch = pitch
+        self.x0 = sx - math.floor((sx - lo_x) / pitch) * pitch
+        self.y0 = sy - math.floor((sy - lo_y) / pitch) * pitch
+        self.nx = int(math.floor((hi_x - self.x0) / pitch)) + 1
+        self.ny = int(math.floor((hi_y - self.y0) / pitch)) + 1
+        self.xs = self.x0 + pitch * np.arange(self.nx)
+        self.ys = self.y0 + pitch * np.arange(self.ny)
+
+    def cell(self, x, y):
+        ix = min(max(int(round((x - self.x0) / self.pitch)), 0), self.nx - 1)
+        iy = min(max(int(round((y - self.y0) / self.pitch)), 0), self.ny - 1)
+        return ix, iy
+
+    def point(self, ix, iy):
+        return (round(self.x0 + ix * self.pitch, 4),
+                round(self.y0 + iy * self.pitch, 4))
+
+    def _span(self, lo, hi, origin, n):
+        i1 = max(int(math.floor((lo - origin) / self.pitch)), 0)
+        i2 = min(int(math.ceil((hi - origin) / self.pitch)), n - 1)
+        return i1, i2
+
+    def block_boxes(self, mask, boxes, ex, ey):
+        """Block every cell whose (x +- ex, y +- ey) box comes nearer a box
+        than its clearance. boxes: (xmin, ymin, xmax, ymax, required)."""
+        for bx1, by1, bx2, by2, req in boxes:
+            ix1, ix2 = self._span(bx1 - ex - req, bx2 + ex + req,
+                                  self.x0, self.nx)
+            iy1, iy2 = self._span(by1 - ey - req, by2 + ey + req,
+                                  self.y0, self.ny)
+            if ix1 > ix2 or iy1 > iy2:
+                continue
+            xs = self.xs[ix1:ix2 + 1]
+            ys = self.ys[iy1:iy2 + 1]
+            dx = np.maximum(np.maximum(bx1 - (xs + ex), (xs - ex) - bx2), 0.0)
+            dy = np.maximum(np.maximum(by1 - (ys + ey), (ys - ey) - by2), 0.0)
+            mask[iy1:iy2 + 1, ix1:ix2 + 1] |= (
+                dy[:, None] ** 2 + dx[None, :] ** 2 < (req + _SLACK) ** 2)
+
+    def block_circles(self, mask, circles):
+        """Block every cell within r of a centre. circles: (x, y, r)."""
+        for cx, cy, r in circles:
+            ix1, ix2 = self._span(cx - r, cx + r, self.x0, self.nx)
+            iy1, iy2 = self._span(cy - r, cy + r, self.y0, self.ny)
+            if ix1 > ix2 or iy1 > iy2:
+                continue
+            dx = self.xs[ix1:ix2 + 1] - cx
+            dy = self.ys[iy1:iy2 + 1] - cy
+            mask[iy1:iy2 + 1, ix1:ix2 + 1] |= (
+                dy[:, None] ** 2 + dx[None, :] ** 2 < (r + _SLACK) ** 2)
+
+
+def _passes(obs, net, ends):
+    """True if a route of `net` may touch obstacle `obs`."""
+    if obs.kind == "pad":
+        return obs.label in ends
+    return obs.net == net and obs.net != NET_BARRIER
+
+
+def _trace_masks(raster, layers, net, width, ends):
+    """Blocked cells per layer, for horizontal and for vertical steps."""
+    shape = (len(layers), raster.ny, raster.nx)
+    blocked_h = np.zeros(shape, dtype=bool)
+    blocked_v = np.zeros(shape, dtype=bool)
+    hw, half = width / 2, raster.pitch / 2
+    for k, li in enumerate(layers):
+        boxes = [(o.xmin, o.ymin, o.xmax, o.ymax,
+                  _required_clearance("segment", o.kind))
+                 for o in _GRID.obstacles(li) if not _passes(o, net, ends)]
+        raster.block_boxes(blocked_h[k], boxes, hw + half, hw)
+        raster.block_boxes(blocked_v[k], boxes, hw, hw + half)
+        if LAYER_NAMES[li] == "F.Cu":
+            # _seg() warns on F.Cu copper inside a mounting-hole keepout
+            circles = [(kx, ky, kr + hw + half)
+                       for kx, ky, kr in _KEEPOUT_CIRCLES]
+            raster.block_circles(blocked_h[k], circles)
+            raster.block_circles(blocked_v[k], circles)
+    return blocked_h, blocked_v
+
+
+def _via_mask(raster, net, size, drill):
+    """Cells a via of `net` may not sit on."""
+    blocked = np.zeros((raster.ny, raster.nx), dtype=bool)
+    seen = set()
+    boxes, circles = [], []
+    for li in OUTER_LAYERS:
+        for o in _GRID.obstacles(li):
+            if id(o) in seen or (o.net == net and o.net != NET_BARRIER):
+                continue
+            seen.add(id(o))
+            if o.kind == "via" and o.size > 0:
+                circles.append((o.cx, o.cy, max(
+                    (drill + o.drill) / 2 + CLEARANCE_VIA_VIA,
+                    (size + o.size) / 2 + CLEARANCE_VIA_VIA_COPPER)))
+            else:
+                boxes.append((o.xmin, o.ymin, o.xmax, o.ymax,
+                              _required_clearance("via", o.kind)))
+    raster.block_boxes(blocked, boxes, size / 2, size / 2)
+    raster.block_circles(blocked, circles)
+
+    # Another net's higher-priority pour over this net's plane
+    xs = np.tile(raster.xs, raster.ny)
+    ys = np.repeat(raster.ys, raster.nx)
+    for li in ALL_LAYERS:
+        zones = _GRID.zone_outlines(li)
+        if not any(z.net == net for z in zones):
+            continue
+        own = np.full(len(xs), -math.inf)
+        top = np.full(len(xs), -math.inf)
+        for z in zones:
+            inside = _points_in_polygon(xs, ys, z.points)
+            top = np.where(inside, np.maximum(top, z.priority), top)
+            if z.net == net:
+                own = np.where(inside, np.maximum(own, z.priority), own)
+        blocked |= ((own > -math.inf) & (own < top)).reshape(blocked.shape)
+    return blocked
+
+
+def _search(raster, blocked_h, blocked_v, via_blocked, start, goal,
+            start_layers, goal_layers, bend_cost, via_cost, greed):
+    """A* from start to goal cell. Returns ([(ix, iy, k)...], expanded).
+
+    A state is a cell; a step that turns from the direction its cell was
+    reached in pays the bend. (Keeping the direction in the state as well
+    would make that exact, at four times the cells searched, for routes
+    that come out the same here.) The estimate is the Manhattan distance,
+    a bend while off both of the goal's axes and a via while off the
+    goal's layers, times `greed` (1 = cheapest route; more searches fewer
+    cells and bends more).
+    """
+    nl, ny, nx = blocked_h.shape
+    plane = nx * ny
+    free_h = (~blocked_h).ravel().tobytes()
+    free_v = (~blocked_v).ravel().tobytes()
+    via_ok = (~via_blocked).ravel().tobytes()
+    pitch = raster.pitch
+    gx, gy = goal
+    sx, sy = start
+    step = [(d2, dx + dy * nx, dx, dy, free_h if dy == 0 else free_v)
+            for d2, (dx, dy) in enumerate(_MOVES)]
+    off_layer = [0.0 if k in goal_layers else via_cost * greed
+                 for k in range(nl)]
+    unit, bend_h = pitch * greed, bend_cost * greed
+
+    def h(ix, iy, k):
+        return ((abs(ix - gx) + abs(iy - gy)) * unit + off_layer[k]
+                + (bend_h if ix != gx and iy != gy else 0.0))
+
+    inf = math.inf
+    g = [inf] * (nl * plane)
+    parent = {}
+    came = bytearray(nl * plane)
+    heap = []
+    push, pop = heapq.heappush, heapq.heappop
+    for k in start_layers:
+        c = (k * plane) + sy * nx + sx
+        g[c] = 0.0
+        parent[c] = None
+        came[c] = _NO_DIR
+        push(heap, (h(sx, sy, k), 0.0, c))
+
+    expanded = 0
+    found = None
+    while heap:
+        _f, neg, c = pop(heap)
+        cost = -neg
+        if cost > g[c]:
+            continue
+        expanded += 1
+        d = came[c]
+        k, rem = divmod(c, plane)
+        iy, ix = divmod(rem, nx)
+        if ix == gx and iy == gy and k in goal_layers:
+            found = c
+            break
+        for d2, dc, dx, dy, free in step:
+            jx, jy = ix + dx, iy + dy
+            if not (0 <= jx < nx and 0 <= jy < ny):
+                continue
+            c2 = c + dc
+            if not (free[c] and free[c2]):
+                continue
+            cost2 = cost + pitch
+            if d != d2 and d != _NO_DIR:
+                cost2 += bend_cost
+            if cost2 < g[c2]:
+                g[c2] = cost2
+                parent[c2] = c
+                came[c2] = d2
+                push(heap, (cost2 + h(jx, jy, k), -cost2, c2))
+        if via_ok[rem]:
+            cost2 = cost + via_cost
+            for k2 in range(nl):
+                if k2 == k:
+                    continue
+                c2 = k2 * plane + rem
+                if cost2 < g[c2]:
+                    g[c2] = cost2
+                    parent[c2] = c
+                    came[c2] = _NO_DIR
+                    push(heap, (cost2 + h(ix, iy, k2), -cost2, c2))
+    if found is None:
+        return None, expanded
+    path = []
+    c = found
+    while c is not None:
+        k, rem = divmod(c, plane)
+        iy, ix = divmod(rem, nx)
+        path.append((ix, iy, k))
+        c = parent[c]
+    path.reverse()
+    return path, expanded
+
+
+def _steps(points):
+    """[(x, y, layer)...] → segments and vias, collinear runs merged."""
+    steps = []
+    run = [points[0]]
+
+    def flush():
+        verts = [run[0]]
+        for p in run[1:]:
+            if p[:2] == verts[-1][:2]:
+                continue
+            if len(verts) >= 2:
+                a, b = verts[-2], verts[-1]
+                if (a[0] == b[0] == p[0]) or (a[1] == b[1] == p[1]):
+                    verts[-1] = p
+                    continue
+            verts.append(p)
+        for a, b in zip(verts, verts[1:]):
+            steps.append(("segment", (a[0], a[1], b[0], b[1], a[2])))
+
+    for p in points[1:]:
+        if p[2] != run[-1][2]:
+            flush()
+            steps.append(("via", p[:2]))
+            run[:] = [p]
+        else:
+            run.append(p)
+    flush()
+    return steps
+
+
+def _maze_route(net, start, end, width=W_DATA, layers=("F.Cu", "B.Cu"),
+                via_size=None, via_drill=None, pitch=PITCH, margin=MARGIN,
+                bend_cost=BEND_COST, via_cost=VIA_COST, greed=GREED):
+    """Find a route for `net` from `start` to `end`; see the module docstring.
+
+    net: NET_ID name or id. start / end: a pad (ref, num) or a point
+    (x, y, layer). The search stays within `margin` mm of the endpoints and
+    falls back to the whole board. Vias default to the standard barrel, or
+    the power barrel from W_PWR up. Raises RuntimeError if there is no
+    route. Places nothing — see MazeRoute.source() and .emit().
+    """
+    if np is None:
+        raise RuntimeError("the maze router needs NumPy")
+    if not _GRID.enabled:
+        raise RuntimeError("the maze router needs the collision grid enabled")
+    t0 = time.perf_counter()
+    _init_pads()
+    net_id = NET_ID[net] if isinstance(net, str) else net
+    if via_size is None:
+        via_size, via_drill = ((VIA_PWR, VIA_PWR_DRILL) if width >= W_PWR
+                               else (VIA_STD, VIA_STD_DRILL))
+    layer_ids = [LAYER_IDX[name] for name in layers]
+    sx, sy, s_on, s_label = _endpoint(start, layer_ids)
+    ex, ey, e_on, e_label = _endpoint(end, layer_ids)
+    ends = {s_label, e_label} - {None}
+
+    path, expanded = None, 0
+    for reach in (margin, math.inf):
+        raster = _Raster(sx, sy, ex, ey, pitch, reach)
+        blocked_h, blocked_v = _trace_masks(raster, layer_ids, net_id,
+                                            width, ends)
+        via_blocked = _via_mask(raster, net_id, via_size, via_drill)
+        s_cell, e_cell = raster.cell(sx, sy), raster.cell(ex, ey)
+        s_layers = {layer_ids.index(li) for li in s_on}
+        e_layers = {layer_ids.index(li) for li in e_on}
+        # The endpoints sit on their own pads, whatever the pads' neighbours
+        for (ix, iy), ks in ((s_cell, s_layers), (e_cell, e_layers)):
+            for k in ks:
+                blocked_h[k, iy, ix] = blocked_v[k, iy, ix] = False
+        path, n = _search(raster, blocked_h, blocked_v, via_blocked,
+                          s_cell, e_cell, s_layers, e_layers,
+                          bend_cost, via_cost, greed)
+        expanded += n
+        if path is not None or reach == math.inf:
+            break
+    if path is None:
+        raise RuntimeError(
+            f"no route for {_net_name(net_id)} from {start} to {end} on "
+            f"{', '.join(layers)} at width {width}")
+
+    # The end pad is off the grid (the grid is aligned on the start). Slide
+    # the last straight line onto it, else jog to it. Take the first tail
+    # that is clean with no leg shorter than the pitch (these calls get
+    # pasted into domain modules), else the first clean one.
+    points = [(*raster.point(ix, iy), layers[k]) for ix, iy, k in path]
+    ex, ey = round(ex, 4), round(ey, 4)
+    last = points[-1][2]
+    best = None
+    for tail in (*_slid(points, ex, ey),
+                 points + [(ex, points[-1][1], last), (ex, ey, last)]):
+        route = MazeRoute(net_id, width, via_size, via_drill, _steps(tail),
+                          expanded=expanded)
+        route.violations = _violations(route, ends)
+        if not route.violations and not _slivers(route, pitch):
+            break
+        if best is None or best.violations and not route.violations:
+            best = route
+    else:
+        route = best
+    route.ms = (time.perf_counter() - t0) * 1000
+    return route
+
+
+def _slid(points, ex, ey):
+    """points with the final straight line moved across onto (ex, ey).
+
+    One candidate per axis. The line runs back to its first bend in plan,
+    through any vias on it, which move with it; the leg into that bend
+    stretches or shrinks by the offset, less than the pitch, so no new
+    sliver is made. None for an axis whose line reaches back to the start,
+    which must not move.
+    """
+    out = []
+    for axis in (0, 1):
+        i = len(points) - 1
+        while i > 0 and points[i - 1][axis] == points[-1][axis]:
+            i -= 1
+        if i == len(points) - 1 or i == 0:
+            continue
+        if axis == 0:
+            run = [(ex, y, layer) for _x, y, layer in points[i:]]
+        else:
+            run = [(x, ey, layer) for x, _y, layer in points[i:]]
+        out.append(points[:i] + run + [(ex, ey, points[-1][2])])
+    return out
+
+
+def _slivers(route, pitch):
+    """Segments of the route shorter than one grid pitch."""
+    return [args for kind, args in route.steps if kind == "segment"
+            and abs(args[2] - args[0]) + abs(args[3] - args[1])
+            < pitch - 1e-9]
+
+
+def _violations(route, ends):
+    """check_segment / check_via over a route, bar its own end pads."""
+    out = []
+    for kind, args in route.steps:
+        if kind == "via":
+            found = _GRID.check_via(*args, route.net,
+                                    route.via_size, route.via_drill)
+        else:
+            found = _GRID.check_segment(*args, route.width, route.net)
+        out += [v for v in found if v.obstacle_b.label not in ends]
+    return out
+
+
+# ── CLI ───────────────────────────────────────────────────────────
+
+def _parse_endpoint(text):
+    """REF.PAD → (ref, num); X,Y,LAYER → (x, y, layer)."""
+    if "," in text:
+        try:
+            x, y, layer = text.split(",")
+            return float(x), float(y), layer
+        except ValueError:
+            raise ValueError(f"bad endpoint {text!r}: expected X,Y,LAYER")
+    ref, _, num = text.partition(".")
+    return ref, num
+
+
+def _parse_width(text):
+    if text in WIDTH_CLASSES:
+        return WIDTH_CLASSES[text][1]
+    return float(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m scripts.generate_pcb.routing.autoroute",
+        description="Maze-route one net against the fully routed board and "
+                    "print the _seg / _via_net calls.")
+    parser.add_argument("net", help="net name, as in NET_ID")
+    parser.add_argument("start", help="REF.PAD or X,Y,LAYER")
+    parser.add_argument("end", help="REF.PAD or X,Y,LAYER")
+    parser.add_argument("--width", type=_parse_width, default=W_DATA,
+                        help=f"{' | '.join(WIDTH_CLASSES)} | mm "
+                             f"(default data)")
+    parser.add_argument("--layers", default="F.Cu,B.Cu",
+                        help="copper layers to use (default F.Cu,B.Cu)")
+    parser.add_argument("--pitch", type=float, default=PITCH)
+    parser.add_argument("--via-cost", type=float, default=VIA_COST)
+    parser.add_argument("--bend-cost", type=float, default=BEND_COST)
+    args = parser.parse_args(argv)
+
+    if args.net not in NET_ID:
+        parser.error(f"unknown net {args.net}")
+    layers = tuple(args.layers.split(","))
+    unknown = [name for name in layers if name not in LAYER_IDX]
+    if unknown:
+        parser.error(f"unknown layer {', '.join(unknown)}")
+
+    from . import generate_all_traces
+    with contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        generate_all_traces()
+    try:
+        route = _maze_route(args.net, _parse_endpoint(args.start),
+                            _parse_endpoint(args.end), width=args.width,
+                            layers=layers,
+                            pitch=args.pitch, bend_cost=args.bend_cost,
+                            via_cost=args.via_cost)
+    except ValueError as e:
+        parser.error(str(e))
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    print(route.source(args.net))
+    vias = sum(kind == "via" for kind, _args in route.steps)
+    print(f"# {len(route.steps) - vias} segments, {vias} vias, "
+          f"{route.expanded} cells expanded, {route.ms:.0f} ms",
+          file=sys.stderr)
+    for v in route.violations:
+        print(f"# VIOLATION {v.layer}: {v.obstacle_a.label} vs "
+              f"{v.obstacle_b.label} gap {v.gap_mm} < {v.required_mm}",
+              file=sys.stderr)
+    return 1 if route.violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,6 @@ from ._shared import (
     NET_ID,
     R34_PWR_SW_VIA_OD,
     R34_PWR_SW_VIA_X,
-    P,
     VIA_MIN,
     VIA_MIN_DRILL,
     VIA_PWR,
@@ -26,6 +25,7 @@ from ._shared import (
     _pad,
     _seg,
     _via_net,
+    _zone_fill,
 )
 
 
@@ -1862,10 +1862,10 @@ def _power_zones():
     ]
 
     # GND zone on In1.Cu (full board)
-    parts.append(P.zone_gnd("In1.Cu", board_pts))
+    parts.append(_zone_fill("In1.Cu", board_pts, NET_ID["GND"], "GND"))
 
     # +3V3 zone on In2.Cu (full board, will be split by +5V island)
-    parts.append(P.zone_fill("In2.Cu", board_pts, NET_ID["+3V3"], "+3V3"))
+    parts.append(_zone_fill("In2.Cu", board_pts, NET_ID["+3V3"], "+3V3"))
 
     # +5V zone on In2.Cu — power management area (IP5306 / U3 buck input)
     # Start at x=105 — historical boundary from when R19 pull-up vias
@@ -1898,8 +1898,8 @@ def _power_zones():
     v5_pts = [
         (105, 35), (V5_EAST, 35), (V5_EAST, V5_SOUTH), (105, V5_SOUTH),
     ]
-    parts.append(P.zone_fill("In2.Cu", v5_pts, NET_ID["+5V"], "+5V",
-                             priority=1))
+    parts.append(_zone_fill("In2.Cu", v5_pts, NET_ID["+5V"], "+5V",
+                            priority=1))
 
     # +5V zone island for PAM8403 audio amp (x=20..42, y=24..53)
     # DFM FIX: replaces the F.Cu bridge trace that crossed 8+ LCD data bus
@@ -1925,8 +1925,8 @@ def _power_zones():
     v5_pam_pts = [
         (20, 24), (V5_PAM_EAST, 24), (V5_PAM_EAST, 53), (20, 53),
     ]
-    parts.append(P.zone_fill("In2.Cu", v5_pam_pts, NET_ID["+5V"], "+5V",
-                             priority=2))
+    parts.append(_zone_fill("In2.Cu", v5_pam_pts, NET_ID["+5V"], "+5V",
+                            priority=2))
 
     # ── +5V_VOUT sub-island (SW16 respin) ─────────────────────────────
     # Q2 breaks the +5V rail between the IP5306 boost and every load, and
@@ -1961,7 +1961,7 @@ def _power_zones():
         (105, 35), (V5_VOUT_EAST, 35),
         (V5_VOUT_EAST, V5_VOUT_SOUTH), (105, V5_VOUT_SOUTH),
     ]
-    parts.append(P.zone_fill("In2.Cu", v5_vout_pts, NET_ID["+5V_VOUT"],
-                             "+5V_VOUT", priority=3))
+    parts.append(_zone_fill("In2.Cu", v5_vout_pts, NET_ID["+5V_VOUT"],
+                            "+5V_VOUT", priority=3))
 
     return parts
@@ -43,10 +43,13 @@ import concurrent.futures
 import json
 import os
 import re
-import subprocess
 import sys
 
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(PROJECT_DIR, "scripts"))
+from gate_daemon import run_gate as _daemon_run_gate  # noqa: E402
+
 MAKEFILE = os.path.join(PROJECT_DIR, "Makefile")
 OUT_DIR = os.path.join(PROJECT_DIR, ".claude/issues")
 
@@ -373,15 +376,12 @@ def run_gate(gate):
     if not os.path.exists(path):
         return {"gate": gate, "status": "MISSING", "rc": None,
                 "log": f"scripts/{gate}.py does not exist"}
-    try:
-        p = subprocess.run([sys.executable, path], cwd=PROJECT_DIR,
-                           capture_output=True, text=True, timeout=TIMEOUT_S)
-    except subprocess.TimeoutExpired:
+    p = _daemon_run_gate(gate, timeout=TIMEOUT_S)   # daemon, else subprocess
+    if p.rc is None:
         return {"gate": gate, "status": "TIMEOUT", "rc": None,
                 "log": f"exceeded {TIMEOUT_S}s"}
-    out = (p.stdout or "") + (p.stderr or "")
-    return {"gate": gate, "status": "PASS" if p.returncode == 0 else "FAIL",
-            "rc": p.returncode, "log": out}
+    return {"gate": gate, "status": "PASS" if p.rc == 0 else "FAIL",
+            "rc": p.rc, "log": p.stdout + p.stderr}
 
 
 def evidence(log):
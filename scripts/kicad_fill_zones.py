@@ -35,7 +35,6 @@ Usage:
     python3 scripts/kicad_fill_zones.py hardware/kicad/esp32-emu-turbo.kicad_pcb
 """
 
-import fcntl
 import os
 import re
 import sys
@@ -43,7 +42,7 @@ import tempfile
 
 import pcbnew
 
-from zone_fill_inject import inject_fills
+from zone_fill_inject import atomic_write, fill_lock, inject_fills
 
 
 def _extract_zone_fills_from_pcbnew(filled_path):
@@ -105,15 +104,8 @@ def main():
     print(f"Loading PCB: {pcb_path}")
 
     # Serialize concurrent fills across the whole read-fill-write cycle.
-    # Sidecar lockfile rather than the PCB itself: the atomic replace swaps
-    # the PCB's inode, which would drop a lock held on it.
-    lock_path = pcb_path + ".fill.lock"
-    with open(lock_path, "w") as lock_f:
-        fcntl.flock(lock_f, fcntl.LOCK_EX)
-        try:
-            _fill_locked(pcb_path)
-        finally:
-            fcntl.flock(lock_f, fcntl.LOCK_UN)
+    with fill_lock(pcb_path + ".fill.lock"):
+        _fill_locked(pcb_path)
 
 
 def _fill_locked(pcb_path):
@@ -157,18 +149,8 @@ def _fill_locked(pcb_path):
         sys.exit(1)
 
     # Atomic write: a concurrent reader sees either the old file or the new
-    # one, never a truncated mix. Temp file lives in the same directory so
-    # os.replace() stays within one filesystem.
-    pcb_dir = os.path.dirname(os.path.abspath(pcb_path)) or "."
-    fd, tmp_out = tempfile.mkstemp(suffix=".kicad_pcb", dir=pcb_dir)
-    try:
-        with os.fdopen(fd, "w") as f:
-            f.write(result)
-        os.replace(tmp_out, pcb_path)
-    except BaseException:
-        if os.path.exists(tmp_out):
-            os.unlink(tmp_out)
-        raise
+    # one, never a truncated mix.
+    atomic_write(pcb_path, result)
     print(f"Saved PCB with filled zones: {pcb_path}")
 
 
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Single-pass S-expression tokenizer shared by every .kicad_pcb / .kicad_sch reader.
+
+Provides:
+  read_text(path)          — the utf-8 / latin-1 / cp1252 decode every parser
+                             used to carry its own copy of
+  SexprIndex(text)         — ONE linear scan of the text; maps the offset of
+                             every '(' to the offset of its matching ')'
+  blocks(text, tok)        — every balanced block starting with `tok`
+                             (drop-in for the old per-module helpers)
+  span(text, start)        — the block whose '(' sits at `start`
+  top_level(text)          — stream of the root's children as (head, start, end)
+  parse(text)              — full typed node tree (Node / Symbol / str atoms)
+
+Why this exists
+---------------
+Ten modules used to find balanced parens by walking the 1.3 MB board one
+character at a time in Python, each of them again for every kind of block
+it wanted (footprint, pad, zone, filled_polygon, via, segment ...). Here the
+text is scanned once: with NumPy the paren depth is a vectorised running sum
+(~25 ms for the board); without it a single ``re.finditer`` over '(', ')'
+and quoted strings does the same job. Everything after that — including the
+blocks nested inside a block — is a dictionary lookup.
+
+Offsets are indices into the decoded text. KiCad writes ASCII outside of
+quoted strings, so for the boards in this repo they are byte offsets too.
+
+Strings are honoured: a '(' inside ``"..."`` is text, not structure. The
+old char-walkers counted it, which only stayed harmless because nobody had
+typed an unbalanced paren into a property value yet.
+
+Usage:
+    from kicad_sexpr import SexprIndex, read_text
+    idx = SexprIndex(read_text(pcb_path))
+    for fp in idx.blocks("(footprint "):
+        ...
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:     # pure-Python scan below; same result, ~3x slower
+    np = None
+
+# A quoted string (with backslash escapes) or a single paren. Atoms between
+# them are never visited during the structural scan.
+_STRUCT_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[()]', re.S)
+
+# Full tokenizer used by parse(): parens, quoted strings, bare atoms.
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))', re.S)
+
+_UNESCAPE_RE = re.compile(r'\\(.)', re.S)
+
+
+class SexprError(ValueError):
+    """The text is not a well-formed S-expression."""
+
+
+def read_text(path):
+    """Decode a KiCad file, trying utf-8, latin-1 then cp1252."""
+    path = Path(path)
+    for enc in ("utf-8", "latin-1", "cp1252"):
+        try:
+            return path.read_text(encoding=enc)
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError("utf-8", b"", 0, 1,
+                             f"Cannot decode {path} with utf-8/latin-1/cp1252")
+
+
+# ── Structural index ────────────────────────────────────────────────
+
+def _scan_python(text):
+    """[(open, close)] via one regex pass over parens and quoted strings."""
+    pairs = []
+    stack = []
+    push, pop, add = stack.append, stack.pop, pairs.append
+    for m in _STRUCT_RE.finditer(text):
+        s = m.start()
+        c = text[s]
+        if c == "(":
+            push(s)
+        elif c == ")":
+            if not stack:
+                raise SexprError(f"unbalanced ')' at offset {s}")
+            add((pop(), s))
+    if stack:
+        raise SexprError(f"unclosed '(' at offset {stack[-1]}")
+    return pairs
+
+
+def _scan_numpy(text):
+    """Same result as _scan_python, vectorised.
+
+    Only valid for ASCII text without backslash escapes, where a character
+    offset is a byte offset and every '"' toggles string state. The depth
+    of each paren is a running sum; sorting the parens by (level, offset)
+    makes every '(' sit directly before its own ')'.
+    """
+    b = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    inside = np.bitwise_xor.accumulate(b == 34)
+    opens = (b == 40) & ~inside
+    pos = np.flatnonzero(opens | ((b == 41) & ~inside))
+    if not len(pos):
+        return []
+    is_open = opens[pos]
+    depth = np.cumsum(np.where(is_open, 1, -1))
+    if depth.min() < 0:
+        raise SexprError(
+            f"unbalanced ')' at offset {int(pos[np.argmax(depth < 0)])}")
+    if depth[-1] != 0:
+        raise SexprError("unclosed '(' in text")
+    level = np.where(is_open, depth, depth + 1)
+    paired = pos[np.lexsort((pos, level))]
+    return zip(paired[0::2].tolist(), paired[1::2].tolist())
+
+
+class SexprIndex:
+    """Matching-paren table for one text, built in a single linear pass.
+
+    Attributes:
+      text   — the indexed text
+      close  — {offset of '(' : offset of its matching ')'}
+    """
+
+    __slots__ = ("text", "close", "_top")
+
+    def __init__(self, text):
+        self.text = text
+        if np is not None and text.isascii() and "\\" not in text:
+            pairs = _scan_numpy(text)
+        else:
+            pairs = _scan_python(text)
+        self.close = dict(pairs)
+        self._top = None
+
+    @property
+    def top(self):
+        """[(start, end)] children of the root list, in file order.
+
+        `end` is inclusive (it is the offset of the ')'). Computed on first
+        use: walk the opens in file order and keep each one that starts
+        after the previous top-level block ended.
+        """
+        if self._top is None:
+            top = []
+            close = self.close
+            if close:
+                root = min(close)
+                root_end = close[root]
+                last = root
+                for start in sorted(close):
+                    if start > last and close[start] < root_end:
+                        top.append((start, close[start]))
+                        last = close[start]
+            self._top = top
+        return self._top
+
+    def end(self, start):
+        """Offset of the ')' closing the '(' at `start` (KeyError if none)."""
+        return self.close[start]
+
+    def span(self, start):
+        """The text of the block whose '(' sits at `start`."""
+        return self.text[start:self.close[start] + 1]
+
+    def find_blocks(self, tok, lo=0, hi=None):
+        """[(start, end)] of every outermost block starting with `tok`.
+
+        Same semantics as the char-walking helpers this replaces: scan left
+        to right, take a match, resume AFTER its block — so a `tok` nested
+        inside an earlier match is not reported separately. `tok` must start
+        with '('; occurrences inside quoted strings are skipped.
+        """
+        text, close = self.text, self.close
+        if hi is None:
+            hi = len(text)
+        out = []
+        i = lo
+        while True:
+            i = text.find(tok, i, hi)
+            if i < 0:
+                return out
+            j = close.get(i)
+            if j is None:          # inside a quoted string
+                i += 1
+                continue
+            out.append((i, j))
+            i = j + 1
+
+    def blocks(self, tok, lo=0, hi=None):
+        """Text of every outermost block starting with `tok`."""
+        text = self.text
+        return [text[i:j + 1] for i, j in self.find_blocks(tok, lo, hi)]
+
+    def top_level(self):
+        """Yield (head, start, end) for every child of the root list."""
+        text = self.text
+        for start, end in self.top:
+            m = _HEAD_RE.match(text, start + 1)
+            yield (m.group(1) if m else ""), start, end
+
+
+_HEAD_RE = re.compile(r'\s*([^\s()"]+)')
+
+
+@lru_cache(maxsize=8)
+def _index(text):
+    # Keyed on the text itself: str caches its hash, and the cache hit is an
+    # identity compare, so repeated blocks() calls on one board share a scan.
+    return SexprIndex(text)
+
+
+def index(text):
+    """Shared SexprIndex for `text` (built once per distinct text)."""
+    return _index(text)
+
+
+def blocks(text, tok):
+    """Every balanced-paren block starting with `tok`."""
+    return _index(text).blocks(tok)
+
+
+def span(text, start):
+    """Return the s-expression whose '(' sits at `start`."""
+    return _index(text).span(start)
+
+
+def top_level(text):
+    """Stream of the root list's children as (head, start, end)."""
+    return _index(text).top_level()
+
+
+# ── Typed tree ──────────────────────────────────────────────────────
+
+class Symbol(str):
+    """A bare (unquoted) atom: a keyword, a number, a layer name like F.Cu."""
+
+    __slots__ = ()
+
+
+class Node:
+    """One parenthesised list.
+
+    head  — first atom (``"footprint"``, ``"pad"`` ...), or "" for ``()``
+    items — the remaining children: Node, Symbol (bare atom) or str (quoted)
+    start, end — offsets of the '(' and ')' in the source text
+    """
+
+    __slots__ = ("head", "items", "start", "end")
+
+    def __init__(self, head, items, start, end):
+        self.head = head
+        self.items = items
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Node({self.head!r}, {len(self.items)} items, @{self.start})"
+
+    def children(self, head=None):
+        """Child nodes, optionally only those with the given head."""
+        return [c for c in self.items
+                if isinstance(c, Node) and (head is None or c.head == head)]
+
+    def find(self, head):
+        """First child node with `head`, or None."""
+        for c in self.items:
+            if isinstance(c, Node) and c.head == head:
+                return c
+        return None
+
+    def atoms(self):
+        """The non-list children, in order."""
+        return [c for c in self.items if not isinstance(c, Node)]
+
+    def number(self, i=0, default=None):
+        """The i-th atom as a float, or `default` if absent / not numeric."""
+        a = self.atoms()
+        try:
+            return float(a[i])
+        except (IndexError, ValueError):
+            return default
+
+    def walk(self, head=None):
+        """Depth-first iterator over this node and every descendant."""
+        stack = [self]
+        while stack:
+            n = stack.pop()
+            if head is None or n.head == head:
+                yield n
+            stack.extend(reversed([c for c in n.items if isinstance(c, Node)]))
+
+
+def parse(text, start=0):
+    """Parse the S-expression at `start` into a Node tree."""
+    stack = []
+    root = None
+    pos = start
+    n = len(text)
+    while pos < n:
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            if text[pos:].strip():
+                raise SexprError(f"unexpected character at offset {pos}")
+            break
+        pos = m.end()
+        if m.group(1):
+            node = Node(None, [], m.start(1), -1)
+            if stack:
+                stack[-1].items.append(node)
+            stack.append(node)
+        elif m.group(2):
+            if not stack:
+                raise SexprError(f"unbalanced ')' at offset {m.start(2)}")
+            node = stack.pop()
+            node.end = m.start(2)
+            if node.head is None:
+                node.head = ""
+            if not stack:
+                root = node
+                break
+        else:
+            if not stack:
+                raise SexprError(f"atom outside a list at offset {m.start()}")
+            if m.group(3) is not None:
+                atom = _UNESCAPE_RE.sub(r"\1", m.group(3))
+            else:
+                atom = Symbol(m.group(4))
+            top = stack[-1]
+            if top.head is None and not top.items:
+                top.head = str(atom)
+            else:
+                top.items.append(atom)
+    if stack:
+        raise SexprError(f"unclosed '(' at offset {stack[-1].start}")
+    return root
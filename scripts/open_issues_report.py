@@ -23,14 +23,15 @@ Usage:
     python3 scripts/open_issues_report.py            # hook JSON on stdout
     python3 scripts/open_issues_report.py --text     # plain text
 """
-import concurrent.futures
 import json
 import os
-import subprocess
 import sys
 
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+sys.path.insert(0, os.path.join(PROJECT_DIR, "scripts"))
+from gate_registry import run_gates  # noqa: E402
+
 # Gates that guard known-open hardware work. Each entry is
 # (script, one-line meaning when it fails).
 #
@@ -78,35 +79,29 @@ TIMEOUT_S = 30
 
 # Per-gate cap on reported failing rows. This report is injected into every
 # session's context, so one gate that fails on 200 rows must not crowd out the
-# other five — but the cap ANNOUNCES what it hid (see run_gate), because a
+# other five — but the cap ANNOUNCES what it hid (see summarize), because a
 # silent truncation reads as "that was the whole list".
 MAX_DETAIL_ROWS = 12
 
 
-def run_gate(entry):
-    script, meaning = entry
-    path = os.path.join(PROJECT_DIR, "scripts", f"{script}.py")
-    if not os.path.exists(path):
+def summarize(result, meaning):
+    """(script, meaning, status, detail rows) for one GateResult."""
+    script, status = result.name, result.verdict
+    if status == "MISSING":
         # A renamed or deleted gate must be loud, not silently skipped —
         # a check that vanished looks exactly like a check that passes.
-        return script, meaning, "MISSING", ["script not found"]
-    try:
-        p = subprocess.run([sys.executable, path], cwd=PROJECT_DIR,
-                           capture_output=True, text=True, timeout=TIMEOUT_S)
-    except subprocess.TimeoutExpired:
-        return script, meaning, "TIMEOUT", [f"exceeded {TIMEOUT_S}s"]
-    if p.returncode == 0:
-        return script, meaning, "PASS", []
-    # EVERY line that names a failure, not just the first. Reporting one row
-    # of a multi-row failure is its own way of going stale: verify_cpl_rotation_law
+        return script, meaning, status, ["script not found"]
+    if status == "TIMEOUT":
+        return script, meaning, status, [f"exceeded {TIMEOUT_S}s"]
+    if status == "PASS":
+        return script, meaning, status, []
+    # EVERY failing row, not just the first. Reporting one row of a
+    # multi-row failure is its own way of going stale: verify_cpl_rotation_law
     # failed on U2 *and* J4 for months while this report named only U2, so the
     # second one was invisible to every session that read the injected context
-    # and trusted it to be the whole list.
-    detail = []
-    for line in (p.stdout or "").splitlines():
-        s = line.strip()
-        if s.startswith("FAIL") or "  FAIL" in line:
-            detail.append(s)
+    # and trusted it to be the whole list. The registry hands them over as
+    # data — one row per failed check(), or the gate's FAIL lines.
+    detail = list(result.findings)
     if len(detail) > MAX_DETAIL_ROWS:
         hidden = len(detail) - MAX_DETAIL_ROWS
         detail = detail[:MAX_DETAIL_ROWS]
@@ -116,8 +111,11 @@ def run_gate(entry):
 
 
 def main():
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(GATES)) as ex:
-        results = list(ex.map(run_gate, GATES))
+    # One forked worker per gate from this process, so the board is parsed
+    # and validated once for all of them — this runs at every session start.
+    results = [summarize(r, meaning) for r, (_, meaning) in
+               zip(run_gates([g for g, _ in GATES], jobs=len(GATES),
+                             timeout=TIMEOUT_S), GATES)]
 
     bad = [r for r in results if r[2] != "PASS"]
 
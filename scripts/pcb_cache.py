@@ -1,29 +1,44 @@
 #!/usr/bin/env python3
-"""PCB parse cache — parse .kicad_pcb once, cache as JSON for all consumers.
+"""PCB parse cache — parse .kicad_pcb once, cache as mmap-able columns for all consumers.
 
 Provides:
-  build_cache(pcb_path) — parse PCB, write .pcb_cache.json
-  load_cache(pcb_path)  — load JSON (auto-rebuilds if stale/missing)
+  build_cache(pcb_path) — parse PCB, write .pcb_cache.bin
+  load_cache(pcb_path)  — mmap the cache (auto-rebuilds if stale/missing)
+  read_binary(path)     — mmap a cache file without the freshness check
+  PcbWriter(pcb_path)   — stream a board to disk, building its cache as it goes
 
-Cache invalidation: SHA-256 hash of .kicad_pcb stored in JSON.
-If the file changes, the cache auto-rebuilds on next load_cache() call.
+Cache invalidation: the .kicad_pcb's (size, mtime_ns, inode) and its SHA-256
+are stored in the cache header. A matching stat short-circuits the hash; if
+the content changed, the cache auto-rebuilds on next load_cache() call.
+Set PCB_CACHE_STRICT=1 to always compare the hash.
 
 Usage:
     from pcb_cache import load_cache
     cache = load_cache()
     # cache["segments"], cache["vias"], cache["pads"], cache["nets"], ...
+    xs = cache.columns("vias").column("x")   # zero-copy memoryview
 """
 
+import array
 import hashlib
 import json
 import math
+import mmap
 import os
 import re
+import struct
+import sys
 import time
 from pathlib import Path
 
+# Sibling import also works when this module is loaded as scripts.pcb_cache
+_SCRIPTS_DIR = str(Path(__file__).resolve().parent)
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+from kicad_sexpr import index, read_text  # noqa: E402
+
 _DEFAULT_PCB = Path(__file__).parent.parent / "hardware" / "kicad" / "esp32-emu-turbo.kicad_pcb"
-_CACHE_VERSION = 1
+_CACHE_VERSION = 2
 
 
 # ── Helpers ──────────────────────────────────────────────────────────
@@ -37,6 +52,40 @@ def _sha256(path):
     return f"sha256:{h.hexdigest()}"
 
 
+# A file modified within this window of the moment its fingerprint is
+# taken could be modified again without its mtime moving (coarse-timestamp
+# filesystems tick at 1-2 s). Such a fingerprint is not stored — the same
+# "racily clean" rule git applies to its index — so the hash decides until
+# the file has settled.
+_RACY_NS = 2_000_000_000
+
+
+def _stat_fingerprint(path):
+    """[size, mtime_ns, inode] of a file, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _settled(stat):
+    """The fingerprint if it is safe to trust later, else None."""
+    if stat is None or time.time_ns() - stat[1] < _RACY_NS:
+        return None
+    return stat
+
+
+def _restamp(data, cache_path, stat):
+    """Rewrite a content-fresh cache with the board's current fingerprint."""
+    full = dict(data.items())
+    full["pcb_stat"] = _settled(stat)
+    try:
+        _write_binary(full, Path(cache_path))
+    except OSError:
+        pass    # read-only checkout: stay on the hash path, still correct
+
+
 def _rotate(x, y, angle_deg):
     rad = math.radians(angle_deg)
     c, s = math.cos(rad), math.sin(rad)
@@ -56,271 +105,530 @@ def parse_pcb_full(path=None):
     """
     if path is None:
         path = _DEFAULT_PCB
-    for _enc in ("utf-8", "latin-1", "cp1252"):
-        try:
-            text = Path(path).read_text(encoding=_enc)
-            break
-        except UnicodeDecodeError:
-            continue
-    else:
-        raise UnicodeDecodeError("utf-8", b"", 0, 1,
-                                 f"Cannot decode {path} with utf-8/latin-1/cp1252")
-
-    nets = []
-    pads = []
-    vias = []
-    segments = []
-    zones = []
-    refs = set()
-
-    # ── Net declarations ──────────────────────────────────────────
-    for m in re.finditer(r'^\s+\(net\s+(\d+)\s+"([^"]*)"\)', text, re.M):
-        nets.append({"id": int(m.group(1)), "name": m.group(2)})
-
-    # ── Footprints → pads + refs ──────────────────────────────────
-    i = 0
-    while True:
-        idx = text.find("(footprint ", i)
-        if idx == -1:
-            break
-        depth = 0
-        j = idx
-        while j < len(text):
-            if text[j] == '(':
-                depth += 1
-            elif text[j] == ')':
-                depth -= 1
-                if depth == 0:
-                    break
-            j += 1
-        fp_block = text[idx:j + 1]
-        i = j + 1
-
-        at_m = re.search(
-            r'\(footprint\s+"[^"]*"\s+\(at\s+([-\d.]+)\s+([-\d.]+)'
-            r'(?:\s+([-\d.]+))?\)',
-            fp_block)
-        if not at_m:
-            continue
-        fp_x = float(at_m.group(1))
-        fp_y = float(at_m.group(2))
-        fp_rot = float(at_m.group(3)) if at_m.group(3) else 0.0
-
-        ref_m = re.search(r'\(property\s+"Reference"\s+"([^"]+)"', fp_block)
-        ref = ref_m.group(1) if ref_m else "?"
-        if (ref and ref != "?" and not ref.startswith('#')
-                and '?' not in ref and not re.match(r'^[A-Z]+$', ref)):
-            refs.add(ref)
-
-        # Extract pad sub-blocks
-        k = 0
-        while True:
-            pidx = fp_block.find("(pad ", k)
-            if pidx == -1:
-                break
-            pdepth = 0
-            pk = pidx
-            while pk < len(fp_block):
-                if fp_block[pk] == '(':
-                    pdepth += 1
-                elif fp_block[pk] == ')':
-                    pdepth -= 1
-                    if pdepth == 0:
-                        break
-                pk += 1
-            pad_block = fp_block[pidx:pk + 1]
-            k = pk + 1
-
-            pad_m = re.match(
-                r'\(pad\s+"([^"]*)"\s+(\S+)\s+(\S+)'
-                r'\s+\(at\s+([-\d.]+)\s+([-\d.]+)(?:\s+([-\d.]+))?\)',
-                pad_block)
-            if not pad_m:
-                continue
+    builder = CacheBuilder()
+    builder.feed(read_text(path))
+    return builder.finish()
 
-            pnum = pad_m.group(1)
-            ptype = pad_m.group(2)   # smd, thru_hole, np_thru_hole
-            pshape = pad_m.group(3)  # rect, circle, oval, roundrect
-            plx = float(pad_m.group(4))
-            ply = float(pad_m.group(5))
-            pad_rot_local = float(pad_m.group(6)) if pad_m.group(6) else 0.0
 
-            size_m = re.search(r'\(size\s+([\d.]+)\s+([\d.]+)\)', pad_block)
-            if not size_m:
-                continue
-            pw = float(size_m.group(1))
-            ph = float(size_m.group(2))
-
-            # Support both circular "(drill 0.6)" and oval "(drill oval 0.65 1.6)"
-            drill_oval_m = re.search(
-                r'\(drill\s+oval\s+([\d.]+)\s+([\d.]+)\)', pad_block)
-            drill_circ_m = re.search(r'\(drill\s+([\d.]+)\)', pad_block)
-            if drill_oval_m:
-                drill = float(drill_oval_m.group(1))  # slot width (narrowest)
-            elif drill_circ_m:
-                drill = float(drill_circ_m.group(1))
-            else:
-                drill = 0.0
-
-            layers_m = re.search(r'\(layers\s+([^)]+)\)', pad_block)
-            layers_str = layers_m.group(1) if layers_m else ""
-
-            copper_layers = []
-            if '"F.Cu"' in layers_str or 'F.Cu' in layers_str:
-                copper_layers.append("F.Cu")
-            if '"B.Cu"' in layers_str or 'B.Cu' in layers_str:
-                copper_layers.append("B.Cu")
-            if '"*.Cu"' in layers_str or '*.Cu' in layers_str:
-                copper_layers.extend(["F.Cu", "B.Cu"])
-            copper_layers = list(set(copper_layers))
-            if not copper_layers:
-                continue
+_ZONE_PAT = re.compile(
+    r'\(zone\s*\n'
+    r'\s+\(net\s+(\d+)\)\s*\n'
+    r'\s+\(net_name\s+"([^"]+)"\)\s*\n'
+    r'\s+\(layer\s+"([^"]+)"\)\s*\n'
+    r'[\s\S]*?\(priority\s+(\d+)\)?',
+    re.M)
 
-            # Absolute position
-            total_rot = fp_rot + pad_rot_local
-            if total_rot != 0:
-                rlx, rly = _rotate(plx, ply, total_rot)
-            else:
-                rlx, rly = plx, ply
-            abs_x = fp_x + rlx
-            abs_y = fp_y + rly
-
-            # Rotate pad size for 90/270 deg
-            eff_rot = total_rot % 360
-            if (eff_rot in (90, 270) or
-                    (eff_rot not in (0, 180) and abs(eff_rot % 180 - 90) < 5)):
-                pw, ph = ph, pw
-
-            # Net
-            net_m = re.search(r'\(net\s+(\d+)\s+"[^"]*"\)', pad_block)
-            if not net_m:
-                net_m = re.search(r'\(net\s+(\d+)\)', pad_block)
-            pad_net = int(net_m.group(1)) if net_m else 0
-
-            for clayer in copper_layers:
-                pads.append({
-                    "ref": ref, "num": pnum,
-                    "x": round(abs_x, 4), "y": round(abs_y, 4),
-                    "w": round(pw, 4), "h": round(ph, 4),
-                    "shape": pshape, "layer": clayer,
-                    "net": pad_net,
-                    "fp_x": round(fp_x, 4), "fp_y": round(fp_y, 4),
-                    "type": ptype, "drill": round(drill, 4),
-                })
 
-    # ── Vias ──────────────────────────────────────────────────────
-    for m in re.finditer(
-        r'\(via\s+\(at\s+([-\d.]+)\s+([-\d.]+)\)\s+'
-        r'\(size\s+([\d.]+)\)\s+\(drill\s+([\d.]+)\)\s+'
-        r'\(layers[^)]*\)'
-        r'(?:\s+\(net\s+(\d+)\))?',
-        text
-    ):
-        vias.append({
-            "x": round(float(m.group(1)), 4),
-            "y": round(float(m.group(2)), 4),
-            "size": round(float(m.group(3)), 4),
-            "drill": round(float(m.group(4)), 4),
-            "net": int(m.group(5)) if m.group(5) else 0,
-        })
-
-    # ── Segments ──────────────────────────────────────────────────
-    for m in re.finditer(
-        r'\(segment\s+\(start\s+([-\d.]+)\s+([-\d.]+)\)\s+'
-        r'\(end\s+([-\d.]+)\s+([-\d.]+)\)\s+'
-        r'\(width\s+([\d.]+)\)\s+'
-        r'\(layer\s+"([^"]+)"\)'
-        r'(?:\s+\(net\s+(\d+)\))?',
-        text
-    ):
-        segments.append({
-            "x1": float(m.group(1)), "y1": float(m.group(2)),
-            "x2": float(m.group(3)), "y2": float(m.group(4)),
-            "width": float(m.group(5)),
-            "layer": m.group(6),
-            "net": int(m.group(7)) if m.group(7) else 0,
-        })
-
-    # ── Zones ─────────────────────────────────────────────────────
-    zone_pat = re.compile(
-        r'\(zone\s*\n'
-        r'\s+\(net\s+(\d+)\)\s*\n'
-        r'\s+\(net_name\s+"([^"]+)"\)\s*\n'
-        r'\s+\(layer\s+"([^"]+)"\)\s*\n'
-        r'[\s\S]*?\(priority\s+(\d+)\)?',
-        re.M)
-    for m in zone_pat.finditer(text):
-        zones.append({
-            "net": int(m.group(1)),
-            "net_name": m.group(2),
-            "layer": m.group(3),
-            "priority": int(m.group(4)) if m.group(4) else -1,
-        })
-    # Fallback
-    if not zones:
+class CacheBuilder:
+    """parse_pcb_full() over a board fed in top-level pieces.
+
+    The generator streams the board to disk (PcbWriter) and feeds each
+    piece here as it is written, so the cache is ready when the file is,
+    without reading it back. A piece must hold whole top-level items — a
+    footprint, a run of segments — since no pattern below may match
+    across two; fed the whole file at once, this is parse_pcb_full.
+    """
+
+    def __init__(self):
+        self.nets = []
+        self.pads = []
+        self.vias = []
+        self.segments = []
+        self.zones = []
+        self._fallback_zones = []
+        self.refs = set()
+        self.filled_polygons = 0
+
+    def feed(self, text):
+        """Parse one piece of the board into the tables."""
+        nets, vias, segments = self.nets, self.vias, self.segments
+
+        # ── Net declarations ──────────────────────────────────────────
+        for m in re.finditer(r'^\s+\(net\s+(\d+)\s+"([^"]*)"\)', text,
+                             re.M):
+            nets.append({"id": int(m.group(1)), "name": m.group(2)})
+
+        if "(footprint " in text:
+            self._feed_footprints(text)
+
+        # ── Vias ──────────────────────────────────────────────────────
         for m in re.finditer(
-            r'\(zone\s*\n\s+\(net\s+(\d+)\)\s*\n'
-            r'\s+\(net_name\s+"([^"]+)"\)\s*\n'
-            r'\s+\(layer\s+"([^"]+)"\)',
+            r'\(via\s+\(at\s+([-\d.]+)\s+([-\d.]+)\)\s+'
+            r'\(size\s+([\d.]+)\)\s+\(drill\s+([\d.]+)\)\s+'
+            r'\(layers[^)]*\)'
+            r'(?:\s+\(net\s+(\d+)\))?',
             text
         ):
-            pr = re.search(r'\(priority\s+(\d+)\)',
-                           text[m.start():m.start() + 500])
-            zones.append({
-                "net": int(m.group(1)),
-                "net_name": m.group(2),
-                "layer": m.group(3),
-                "priority": int(pr.group(1)) if pr else -1,
+            vias.append({
+                "x": round(float(m.group(1)), 4),
+                "y": round(float(m.group(2)), 4),
+                "size": round(float(m.group(3)), 4),
+                "drill": round(float(m.group(4)), 4),
+                "net": int(m.group(5)) if m.group(5) else 0,
             })
 
-    # ── filled_polygon count ──────────────────────────────────────
-    filled_polygons = len(re.findall(r'\(filled_polygon\b', text))
-
-    # ── Net type classification ───────────────────────────────────
-    _POWER_PREFIXES = ("+", "VCC", "VBUS", "BAT+", "LX")
-    net_types: dict[str, str] = {}
-    for n in nets:
-        name = n["name"]
-        if name == "GND" or name.startswith("GND"):
-            net_types[name] = "gnd"
-        elif any(name.startswith(p) for p in _POWER_PREFIXES):
-            net_types[name] = "power"
-        else:
-            net_types[name] = "signal"
-
-    return {
-        "version": _CACHE_VERSION,
-        "pcb_hash": "",  # filled by build_cache
-        "stats": {
-            "pads": len(pads), "vias": len(vias),
-            "segments": len(segments), "zones": len(zones),
-            "nets": len(nets), "refs": len(refs),
+        # ── Segments ──────────────────────────────────────────────────
+        for m in re.finditer(
+            r'\(segment\s+\(start\s+([-\d.]+)\s+([-\d.]+)\)\s+'
+            r'\(end\s+([-\d.]+)\s+([-\d.]+)\)\s+'
+            r'\(width\s+([\d.]+)\)\s+'
+            r'\(layer\s+"([^"]+)"\)'
+            r'(?:\s+\(net\s+(\d+)\))?',
+            text
+        ):
+            segments.append({
+                "x1": float(m.group(1)), "y1": float(m.group(2)),
+                "x2": float(m.group(3)), "y2": float(m.group(4)),
+                "width": float(m.group(5)),
+                "layer": m.group(6),
+                "net": int(m.group(7)) if m.group(7) else 0,
+            })
+
+        # ── Zones ─────────────────────────────────────────────────────
+        found = [{
+            "net": int(m.group(1)),
+            "net_name": m.group(2),
+            "layer": m.group(3),
+            "priority": int(m.group(4)) if m.group(4) else -1,
+        } for m in _ZONE_PAT.finditer(text)]
+        self.zones.extend(found)
+        # Fallback, used by finish() if no piece matched the pattern above
+        if not found:
+            for m in re.finditer(
+                r'\(zone\s*\n\s+\(net\s+(\d+)\)\s*\n'
+                r'\s+\(net_name\s+"([^"]+)"\)\s*\n'
+                r'\s+\(layer\s+"([^"]+)"\)',
+                text
+            ):
+                pr = re.search(r'\(priority\s+(\d+)\)',
+                               text[m.start():m.start() + 500])
+                self._fallback_zones.append({
+                    "net": int(m.group(1)),
+                    "net_name": m.group(2),
+                    "layer": m.group(3),
+                    "priority": int(pr.group(1)) if pr else -1,
+                })
+
+        # ── filled_polygon count ──────────────────────────────────────
+        self.filled_polygons += len(re.findall(r'\(filled_polygon\b', text))
+        return self
+
+    def _feed_footprints(self, text):
+        """Footprints → pads + refs."""
+        sx = index(text)
+        pads, refs = self.pads, self.refs
+        for fp_start, fp_end in sx.find_blocks("(footprint "):
+            fp_block = text[fp_start:fp_end + 1]
+
+            at_m = re.search(
+                r'\(footprint\s+"[^"]*"\s+\(at\s+([-\d.]+)\s+([-\d.]+)'
+                r'(?:\s+([-\d.]+))?\)',
+                fp_block)
+            if not at_m:
+                continue
+            fp_x = float(at_m.group(1))
+            fp_y = float(at_m.group(2))
+            fp_rot = float(at_m.group(3)) if at_m.group(3) else 0.0
+
+            ref_m = re.search(r'\(property\s+"Reference"\s+"([^"]+)"', fp_block)
+            ref = ref_m.group(1) if ref_m else "?"
+            if (ref and ref != "?" and not ref.startswith('#')
+                    and '?' not in ref and not re.match(r'^[A-Z]+$', ref)):
+                refs.add(ref)
+
+            # Pad sub-blocks: same index, bounded to this footprint
+            for pad_block in sx.blocks("(pad ", fp_start, fp_end):
+                pad_m = re.match(
+                    r'\(pad\s+"([^"]*)"\s+(\S+)\s+(\S+)'
+                    r'\s+\(at\s+([-\d.]+)\s+([-\d.]+)(?:\s+([-\d.]+))?\)',
+                    pad_block)
+                if not pad_m:
+                    continue
+
+                pnum = pad_m.group(1)
+                ptype = pad_m.group(2)   # smd, thru_hole, np_thru_hole
+                pshape = pad_m.group(3)  # rect, circle, oval, roundrect
+                plx = float(pad_m.group(4))
+                ply = float(pad_m.group(5))
+                pad_rot_local = float(pad_m.group(6)) if pad_m.group(6) else 0.0
+
+                size_m = re.search(r'\(size\s+([\d.]+)\s+([\d.]+)\)', pad_block)
+                if not size_m:
+                    continue
+                pw = float(size_m.group(1))
+                ph = float(size_m.group(2))
+
+                # Support both circular "(drill 0.6)" and oval "(drill oval 0.65 1.6)"
+                drill_oval_m = re.search(
+                    r'\(drill\s+oval\s+([\d.]+)\s+([\d.]+)\)', pad_block)
+                drill_circ_m = re.search(r'\(drill\s+([\d.]+)\)', pad_block)
+                if drill_oval_m:
+                    drill = float(drill_oval_m.group(1))  # slot width (narrowest)
+                elif drill_circ_m:
+                    drill = float(drill_circ_m.group(1))
+                else:
+                    drill = 0.0
+
+                layers_m = re.search(r'\(layers\s+([^)]+)\)', pad_block)
+                layers_str = layers_m.group(1) if layers_m else ""
+
+                copper_layers = []
+                if '"F.Cu"' in layers_str or 'F.Cu' in layers_str:
+                    copper_layers.append("F.Cu")
+                if '"B.Cu"' in layers_str or 'B.Cu' in layers_str:
+                    copper_layers.append("B.Cu")
+                if '"*.Cu"' in layers_str or '*.Cu' in layers_str:
+                    copper_layers.extend(["F.Cu", "B.Cu"])
+                copper_layers = list(set(copper_layers))
+                if not copper_layers:
+                    continue
+
+                # Absolute position
+                total_rot = fp_rot + pad_rot_local
+                if total_rot != 0:
+                    rlx, rly = _rotate(plx, ply, total_rot)
+                else:
+                    rlx, rly = plx, ply
+                abs_x = fp_x + rlx
+                abs_y = fp_y + rly
+
+                # Rotate pad size for 90/270 deg
+                eff_rot = total_rot % 360
+                if (eff_rot in (90, 270) or
+                        (eff_rot not in (0, 180) and abs(eff_rot % 180 - 90) < 5)):
+                    pw, ph = ph, pw
+
+                # Net
+                net_m = re.search(r'\(net\s+(\d+)\s+"[^"]*"\)', pad_block)
+                if not net_m:
+                    net_m = re.search(r'\(net\s+(\d+)\)', pad_block)
+                pad_net = int(net_m.group(1)) if net_m else 0
+
+                for clayer in copper_layers:
+                    pads.append({
+                        "ref": ref, "num": pnum,
+                        "x": round(abs_x, 4), "y": round(abs_y, 4),
+                        "w": round(pw, 4), "h": round(ph, 4),
+                        "shape": pshape, "layer": clayer,
+                        "net": pad_net,
+                        "fp_x": round(fp_x, 4), "fp_y": round(fp_y, 4),
+                        "type": ptype, "drill": round(drill, 4),
+                    })
+
+    def finish(self):
+        """The cache dict (pcb_hash / pcb_stat left for the caller)."""
+        nets, pads, vias = self.nets, self.pads, self.vias
+        segments, refs = self.segments, self.refs
+        zones = self.zones or self._fallback_zones
+        filled_polygons = self.filled_polygons
+
+        # ── Net type classification ───────────────────────────────────
+        _POWER_PREFIXES = ("+", "VCC", "VBUS", "BAT+", "LX")
+        net_types: dict[str, str] = {}
+        for n in nets:
+            name = n["name"]
+            if name == "GND" or name.startswith("GND"):
+                net_types[name] = "gnd"
+            elif any(name.startswith(p) for p in _POWER_PREFIXES):
+                net_types[name] = "power"
+            else:
+                net_types[name] = "signal"
+
+        return {
+            "version": _CACHE_VERSION,
+            "pcb_hash": "",  # filled by build_cache
+            "pcb_stat": None,  # filled by build_cache
+            "stats": {
+                "pads": len(pads), "vias": len(vias),
+                "segments": len(segments), "zones": len(zones),
+                "nets": len(nets), "refs": len(refs),
+                "filled_polygons": filled_polygons,
+            },
+            "nets": nets,
+            "net_types": net_types,
+            "pads": pads,
+            "vias": vias,
+            "segments": segments,
+            "zones": zones,
+            "refs": sorted(refs),
             "filled_polygons": filled_polygons,
-        },
-        "nets": nets,
-        "net_types": net_types,
-        "pads": pads,
-        "vias": vias,
-        "segments": segments,
-        "zones": zones,
-        "refs": sorted(refs),
-        "filled_polygons": filled_polygons,
-    }
+        }
+
+
+# ── Binary columnar format ───────────────────────────────────────────
+#
+# The three big tables (pads, vias, segments) are stored one column per
+# field, each column a flat little array of doubles / int32 / string-table
+# indices, 8-byte aligned. Readers mmap the file and take zero-copy
+# memoryviews of the columns, so the ~60 verifiers of a `verify-all` fan-out
+# share one set of page-cache pages instead of each json.loads-ing its own
+# copy. Everything small (nets, zones, refs, stats ...) rides in the JSON
+# header.
+#
+#   magic "PCBCACHE" | u32 format | u32 header bytes | header JSON | pad
+#   column 0 | pad | column 1 | pad | ...
+#
+# String columns (ref, layer, shape ...) hold uint16 indices into a
+# per-column string table kept in the header.
+
+_MAGIC = b"PCBCACHE"
+_FORMAT = 1
+_PREAMBLE = struct.Struct("<8sII")
+
+#: Column layout of the row tables, in the key order the JSON cache used.
+#: Type codes are array-module codes; "s" means an interned string column.
+_TABLES = {
+    "pads": (("ref", "s"), ("num", "s"), ("x", "d"), ("y", "d"),
+             ("w", "d"), ("h", "d"), ("shape", "s"), ("layer", "s"),
+             ("net", "i"), ("fp_x", "d"), ("fp_y", "d"), ("type", "s"),
+             ("drill", "d")),
+    "vias": (("x", "d"), ("y", "d"), ("size", "d"), ("drill", "d"),
+             ("net", "i")),
+    "segments": (("x1", "d"), ("y1", "d"), ("x2", "d"), ("y2", "d"),
+                 ("width", "d"), ("layer", "s"), ("net", "i")),
+}
+
+
+def _align8(n):
+    return (n + 7) & ~7
+
+
+def _encode_binary(data):
+    """Serialise a parse_pcb_full() dict into the columnar byte layout."""
+    blobs = []
+    tables = {}
+    for name, cols in _TABLES.items():
+        rows = data[name]
+        layout = []
+        for key, code in cols:
+            values = [r[key] for r in rows]
+            strings = None
+            if code == "s":
+                strings = sorted(set(values))
+                if len(strings) > 0xFFFF:
+                    raise ValueError(f"{name}.{key}: too many distinct strings")
+                lookup = {v: i for i, v in enumerate(strings)}
+                arr = array.array("H", [lookup[v] for v in values])
+            else:
+                arr = array.array(code, values)
+            if sys.byteorder != "little":
+                arr.byteswap()
+            blobs.append(arr.tobytes())
+            layout.append([key, arr.typecode, strings])
+        tables[name] = {"rows": len(rows), "columns": layout}
+    meta = {k: v for k, v in data.items() if k not in _TABLES}
+
+    # Offsets depend on the header length, which depends on the offsets:
+    # lay the columns out relative to the data start, then fix the header.
+    rel = 0
+    offsets = []
+    for b in blobs:
+        offsets.append(rel)
+        rel = _align8(rel + len(b))
+    i = 0
+    for t in tables.values():
+        for col in t["columns"]:
+            col.append(offsets[i])
+            i += 1
+    header = json.dumps({"meta": meta, "tables": tables},
+                        separators=(",", ":")).encode()
+    data_start = _align8(_PREAMBLE.size + len(header))
+    out = bytearray(_PREAMBLE.pack(_MAGIC, _FORMAT, len(header)))
+    out += header
+    out += b"\0" * (data_start - len(out))
+    for off, b in zip(offsets, blobs):
+        out += b"\0" * (data_start + off - len(out))
+        out += b
+    return bytes(out)
+
+
+class ColumnTable:
+    """One row table of the binary cache, column by column.
+
+    `column(key)` is zero-copy: a memoryview over the mmap for numeric
+    columns (hand it to numpy.frombuffer or index it directly), a list
+    for string columns. `rows()` rebuilds the JSON-era list of dicts.
+    """
+
+    __slots__ = ("name", "n", "_cols", "_strings")
+
+    def __init__(self, name, n, cols, strings):
+        self.name = name
+        self.n = n
+        self._cols = cols          # key -> memoryview
+        self._strings = strings    # key -> string table (string columns)
+
+    def __len__(self):
+        return self.n
+
+    def keys(self):
+        return [k for k, _ in _TABLES[self.name]]
+
+    def column(self, key):
+        col = self._cols[key]
+        table = self._strings.get(key)
+        if table is None:
+            return col
+        return [table[i] for i in col]
+
+    def rows(self):
+        keys = self.keys()
+        cols = [self.column(k) for k in keys]
+        if not self.n:
+            return []
+        return [dict(zip(keys, vals)) for vals in zip(*cols)]
+
+
+class PcbCache(dict):
+    """The cache dict, with the row tables decoded on first access.
+
+    Behaves exactly like the dict load_cache() has always returned: the
+    row tables are real lists of real dicts, so consumers that mutate a
+    (deep-copied) cache keep working. The difference is WHEN they are
+    built — a gate that only looks at vias never pays for pads — and that
+    the underlying columns are shared pages, not private heap.
+    """
+
+    def __init__(self, meta, tables, mm=None):
+        super().__init__(meta)
+        self._tables = tables
+        self._mm = mm
+
+    def columns(self, name):
+        """The ColumnTable for "pads", "vias" or "segments"."""
+        return self._tables[name]
+
+    def _load(self, key):
+        t = self._tables.get(key)
+        if t is not None and not dict.__contains__(self, key):
+            dict.__setitem__(self, key, t.rows())
+
+    def _load_all(self):
+        for key in self._tables:
+            self._load(key)
+
+    def __missing__(self, key):
+        if key in self._tables:
+            self._load(key)
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        self._load(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return key in self._tables or dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._load_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._load_all()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._load_all()
+        return dict.values(self)
+
+    def items(self):
+        self._load_all()
+        return dict.items(self)
+
+    def copy(self):
+        return dict(self.items())
+
+    def __reduce_ex__(self, protocol):
+        # copy.deepcopy / pickle get a plain dict: the mmap stays here.
+        return (dict, (dict(self.items()),))
+
+
+def _write_binary(data, cache_path):
+    payload = _encode_binary(data)
+    # Atomic replace — see build_cache. A reader that has the old file
+    # mmapped keeps its (unlinked) inode; it never sees a torn one.
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def read_binary(cache_path):
+    """mmap a binary cache file into a PcbCache (no freshness check).
+
+    Returns None when the file is missing, foreign, truncated or written
+    by a different format/byte order — the caller rebuilds.
+    """
+    try:
+        f = open(cache_path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:          # empty file
+            return None
+    if len(mm) < _PREAMBLE.size:
+        return None
+    magic, fmt, hlen = _PREAMBLE.unpack_from(mm, 0)
+    if magic != _MAGIC or fmt != _FORMAT or sys.byteorder != "little":
+        return None
+    try:
+        header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + hlen])
+    except ValueError:
+        return None
+    data_start = _align8(_PREAMBLE.size + hlen)
+    view = memoryview(mm)
+    tables = {}
+    for name, spec in header["tables"].items():
+        n = spec["rows"]
+        cols, strings = {}, {}
+        for key, typecode, table, off in spec["columns"]:
+            size = array.array(typecode).itemsize * n
+            lo = data_start + off
+            if lo + size > len(mm):
+                return None
+            cols[key] = view[lo:lo + size].cast(typecode)
+            if table is not None:
+                strings[key] = table
+        tables[name] = ColumnTable(name, n, cols, strings)
+    return PcbCache(header["meta"], tables, mm)
 
 
 # ── Build / Load ─────────────────────────────────────────────────────
 
+def _default_cache_path(pcb_path):
+    return pcb_path.parent / ".pcb_cache.bin"
+
+
 def build_cache(pcb_path=None, cache_path=None):
-    """Parse PCB and write .pcb_cache.json. Returns the cache dict."""
+    """Parse PCB and write .pcb_cache.bin. Returns the cache dict."""
     if pcb_path is None:
         pcb_path = _DEFAULT_PCB
     pcb_path = Path(pcb_path)
     if cache_path is None:
-        cache_path = pcb_path.parent / ".pcb_cache.json"
+        cache_path = _default_cache_path(pcb_path)
+    cache_path = Path(cache_path)
 
     t0 = time.time()
+    # Stat BEFORE reading: if the board changes mid-parse, the stored
+    # fingerprint is the older one and the next load falls through to
+    # the hash instead of trusting a cache built from a half-old file.
+    stat = _stat_fingerprint(pcb_path)
     data = parse_pcb_full(pcb_path)
     data["pcb_hash"] = _sha256(pcb_path)
+    data["pcb_stat"] = _settled(stat)
 
     # Write atomically. `open(path, "w")` truncates first, so any concurrent
     # reader sees a torn or empty file during the write. `make verify-all`
@@ -333,16 +641,7 @@ def build_cache(pcb_path=None, cache_path=None):
     # os.replace() is atomic on POSIX and on Windows, so a reader gets either
     # the whole old file or the whole new one. The temp file must live in the
     # same directory to guarantee it is on the same filesystem.
-    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
-    try:
-        with open(tmp_path, "w") as f:
-            json.dump(data, f, separators=(",", ":"))
-            f.flush()
-            os.fsync(f.fileno())
-        os.replace(tmp_path, cache_path)
-    except BaseException:
-        tmp_path.unlink(missing_ok=True)
-        raise
+    _write_binary(data, cache_path)
 
     ms = (time.time() - t0) * 1000
     s = data["stats"]
@@ -351,19 +650,108 @@ def build_cache(pcb_path=None, cache_path=None):
     return data
 
 
-def load_cache(pcb_path=None, cache_path=None):
-    """Load cache JSON, auto-rebuild if hash mismatches or missing."""
+class PcbWriter:
+    """Stream a .kicad_pcb to disk and build its cache on the way.
+
+    The generator used to join the whole board, write it, and have
+    build_cache() read it back, hash it and re-parse it. Fragments written
+    here go to a temp file beside the board, a running SHA-256 and a
+    CacheBuilder at once; the temp file replaces the board atomically when
+    the block exits cleanly (and is removed if it does not), so nobody
+    ever sees a half-written board.
+
+        with PcbWriter(pcb_path) as out:
+            for fragment in board_fragments():
+                out.write(fragment)
+        out.store_cache()
+
+    Each fragment must hold whole top-level items (see CacheBuilder).
+    """
+
+    def __init__(self, pcb_path, cache_path=None):
+        self.pcb_path = Path(pcb_path)
+        self.cache_path = Path(cache_path) if cache_path is not None \
+            else _default_cache_path(self.pcb_path)
+        self._tmp_path = self.pcb_path.with_name(
+            f".{self.pcb_path.name}.{os.getpid()}.tmp")
+        self._builder = CacheBuilder()
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._stat = None
+        self._t0 = 0.0
+
+    def __enter__(self):
+        self._t0 = time.time()
+        self._file = open(self._tmp_path, "wb")
+        return self
+
+    def write(self, fragment):
+        raw = fragment.encode("utf-8")
+        self._file.write(raw)
+        self._hash.update(raw)
+        self._builder.feed(fragment)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._file.close()
+            if exc_type is None:
+                os.replace(self._tmp_path, self.pcb_path)
+                self._stat = _stat_fingerprint(self.pcb_path)
+        finally:
+            self._tmp_path.unlink(missing_ok=True)
+        return False
+
+    def store_cache(self):
+        """Write .pcb_cache.bin for the board just written; returns the dict.
+
+        Same file, same message as build_cache() — only the re-read and the
+        re-hash are gone. The tables still come from parsing the text:
+        feed() ran the same parser over each fragment as it was written.
+        """
+        data = self._builder.finish()
+        data["pcb_hash"] = f"sha256:{self._hash.hexdigest()}"
+        data["pcb_stat"] = _settled(self._stat)
+        _write_binary(data, self.cache_path)
+
+        ms = (time.time() - self._t0) * 1000
+        s = data["stats"]
+        print(f"  Cache built: {self.cache_path.name} "
+              f"({s['pads']}p/{s['vias']}v/{s['segments']}s in {ms:.0f}ms)")
+        return data
+
+
+def load_cache(pcb_path=None, cache_path=None, strict=None):
+    """Load the binary cache, auto-rebuild if stale or missing.
+
+    Freshness is two-tier. If the board's (size, mtime_ns, inode) matches
+    the fingerprint in the cache header, the cache is current and the only
+    I/O was one stat(). Otherwise the SHA-256 decides; a content match
+    (a touch, a checkout of the same bytes) re-stamps the header so the
+    next load is back on the stat path.
+
+    strict=True — or PCB_CACHE_STRICT=1 in the environment, for CI — skips
+    the stat tier and always compares the hash.
+
+    Raises the "pcb.board" audit event first, so a traced gate records the
+    board's content as an input however little of it was read (gate_store).
+    """
     if pcb_path is None:
         pcb_path = _DEFAULT_PCB
     pcb_path = Path(pcb_path)
+    sys.audit("pcb.board", str(pcb_path))
     if cache_path is None:
-        cache_path = pcb_path.parent / ".pcb_cache.json"
-
-    if cache_path.exists():
-        with open(cache_path) as f:
-            data = json.load(f)
-        if (data.get("pcb_hash") == _sha256(pcb_path)
-                and data.get("version") == _CACHE_VERSION):
+        cache_path = _default_cache_path(pcb_path)
+    if strict is None:
+        strict = os.environ.get("PCB_CACHE_STRICT", "") == "1"
+
+    data = read_binary(cache_path)
+    if data is not None and data.get("version") == _CACHE_VERSION:
+        stat = _stat_fingerprint(pcb_path)
+        if not strict and stat is not None and data.get("pcb_stat") == stat:
+            return data
+        if data.get("pcb_hash") == _sha256(pcb_path):
+            if data.get("pcb_stat") != _settled(stat):
+                _restamp(data, cache_path, stat)
             return data
 
     # Cache miss or stale — rebuild
@@ -373,7 +761,6 @@ def load_cache(pcb_path=None, cache_path=None):
 # ── CLI ──────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import sys
     pcb = sys.argv[1] if len(sys.argv) > 1 else str(_DEFAULT_PCB)
     data = build_cache(Path(pcb))
     print(f"  Stats: {data['stats']}")
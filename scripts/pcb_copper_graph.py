@@ -7,6 +7,9 @@ Provides:
   groups_for(net, geom)       — union-find over every piece of copper on a
                                 net; returns the ELECTRICAL groups, largest
                                 first
+  board_graph(pcb_path)       — every net's groups, island areas and
+                                adjacency, built once per board fingerprint
+                                and cached in .copper_graph.pkl
   group_pads / group_islands / group_area / group_distance — reporting
                                 helpers for describing an orphan group
 
@@ -48,13 +51,23 @@ Validated by control: on the unfixed PCB v1 this returns GND → 1 group,
 """
 
 import math
+import os
+import pickle
 import re
+import sys
 from collections import defaultdict, namedtuple
 from pathlib import Path
 
 from shapely.geometry import LineString, Point, Polygon
 from shapely.strtree import STRtree
 
+# Sibling import also works when this module is loaded as
+# scripts.pcb_copper_graph
+_SCRIPTS_DIR = str(Path(__file__).resolve().parent)
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+import kicad_sexpr  # noqa: E402
+
 DEFAULT_PCB = (Path(__file__).resolve().parent.parent
                / "hardware" / "kicad" / "esp32-emu-turbo.kicad_pcb")
 
@@ -77,23 +90,7 @@ CopperGeometry = namedtuple("CopperGeometry", "zones vias segments footprints")
 
 def blocks(src, tok):
     """Return every balanced-paren block starting with `tok`."""
-    out, i = [], 0
-    while True:
-        i = src.find(tok, i)
-        if i < 0:
-            return out
-        depth, j = 0, i
-        while j < len(src):
-            c = src[j]
-            if c == "(":
-                depth += 1
-            elif c == ")":
-                depth -= 1
-                if depth == 0:
-                    break
-            j += 1
-        out.append(src[i:j + 1])
-        i = j + 1
+    return kicad_sexpr.blocks(src, tok)
 
 
 # ── Parsing ─────────────────────────────────────────────────────────
@@ -107,27 +104,24 @@ def parse_copper(pcb_path=None):
     board the higher-priority zones left behind.
     """
     path = Path(pcb_path) if pcb_path else DEFAULT_PCB
-    for enc in ("utf-8", "latin-1", "cp1252"):
-        try:
-            s = path.read_text(encoding=enc)
-            break
-        except UnicodeDecodeError:
-            continue
-    else:
-        raise UnicodeDecodeError("utf-8", b"", 0, 1, f"cannot decode {path}")
+    s = kicad_sexpr.read_text(path)
+    # One structural scan; nested lookups (filled_polygon in a zone, pad in
+    # a footprint) reuse it through the (lo, hi) bounds.
+    sx = kicad_sexpr.index(s)
 
     netmap = {int(a): b for a, b in
               re.findall(r'^\s*\(net (\d+) "([^"]*)"\)', s, re.M)}
 
     zones = []
-    for z in blocks(s, "(zone"):
+    for zs, ze in sx.find_blocks("(zone"):
+        z = s[zs:ze + 1]
         net_m = re.search(r'\(net_name "([^"]*)"\)', z)
         layer_m = re.search(r"\(layers? ([^)]*)\)", z)
         if not (net_m and layer_m):
             continue
         prio = re.search(r"\(priority (\d+)\)", z)
         polys = []
-        for f in blocks(z, "(filled_polygon"):
+        for f in sx.blocks("(filled_polygon", zs, ze):
             pts = [(float(a), float(b)) for a, b in
                    re.findall(r"\(xy ([\-0-9.]+) ([\-0-9.]+)\)", f)]
             if len(pts) >= 3:
@@ -138,7 +132,7 @@ def parse_copper(pcb_path=None):
                       "polys": polys})
 
     vias = []
-    for v in blocks(s, "(via"):
+    for v in sx.blocks("(via"):
         nm = re.search(r"\(net (\d+)\)", v)
         at = re.search(r"\(at ([\-0-9.]+) ([\-0-9.]+)\)", v)
         sz = re.search(r"\(size ([\-0-9.]+)\)", v)
@@ -149,7 +143,7 @@ def parse_copper(pcb_path=None):
                      "size": float(sz.group(1)) if sz else 0.6})
 
     segs = []
-    for t in blocks(s, "(segment"):
+    for t in sx.blocks("(segment"):
         nm = re.search(r"\(net (\d+)\)", t)
         st = re.search(r"\(start ([\-0-9.]+) ([\-0-9.]+)\)", t)
         en = re.search(r"\(end ([\-0-9.]+) ([\-0-9.]+)\)", t)
@@ -164,7 +158,8 @@ def parse_copper(pcb_path=None):
                      "layer": ly.group(1) if ly else "F.Cu"})
 
     fps = []
-    for f in blocks(s, "(footprint "):
+    for fs, fe in sx.find_blocks("(footprint "):
+        f = s[fs:fe + 1]
         rm = re.search(r'"Reference" "([^"]+)"', f)
         if not rm:
             continue
@@ -176,7 +171,7 @@ def parse_copper(pcb_path=None):
         fx, fy = float(at.group(1)), float(at.group(2))
         ang = float(at.group(3) or 0)
         pads = []
-        for p in blocks(f, '(pad "'):
+        for p in sx.blocks('(pad "', fs, fe):
             # mounting holes / shield pads can carry an empty pad number
             num = re.match(r'\(pad "([^"]*)"', p).group(1)
             pa = re.search(r"\(at ([\-0-9.]+) ([\-0-9.]+)", p)
@@ -206,49 +201,62 @@ def parse_copper(pcb_path=None):
 
 # ── Node construction ───────────────────────────────────────────────
 
-def nodes_for(net, geom):
-    """Every piece of copper carrying `net`, as CopperNode objects."""
+def _nodes_by_net(geom, nets=None):
+    """{net: [CopperNode, ...]} in one pass over the geometry.
+
+    Restricted to `nets` when given. Per net the order is the one
+    nodes_for() has always produced: islands, vias, segments, pads.
+    """
     zones, vias, segs, fps = geom
-    nodes = []
+    out = defaultdict(list)
+
+    def wanted(net):
+        return nets is None or net in nets
+
     for z in zones:
-        if z["net"] != net:
+        if not wanted(z["net"]):
             continue
         for k, g in enumerate(z["polys"]):
-            nodes.append(CopperNode(f"ISLAND{k}", {z["layer"]}, g, None))
+            out[z["net"]].append(CopperNode(f"ISLAND{k}", {z["layer"]}, g, None))
     for v in vias:
-        if v["net"] != net:
+        if not wanted(v["net"]):
             continue
-        nodes.append(CopperNode(f"VIA({v['x']:.2f},{v['y']:.2f})", set(LAYERS),
-                                Point(v["x"], v["y"]).buffer(v["size"] / 2), v))
+        out[v["net"]].append(CopperNode(
+            f"VIA({v['x']:.2f},{v['y']:.2f})", set(LAYERS),
+            Point(v["x"], v["y"]).buffer(v["size"] / 2), v))
     for i, t in enumerate(segs):
-        if t["net"] != net:
+        if not wanted(t["net"]):
             continue
         g = (LineString([(t["x1"], t["y1"]), (t["x2"], t["y2"])])
              .buffer(t["w"] / 2, cap_style=2))
-        nodes.append(CopperNode(
+        out[t["net"]].append(CopperNode(
             f"SEG{i} {t['layer']}({t['x1']:.2f},{t['y1']:.2f})-"
             f"({t['x2']:.2f},{t['y2']:.2f})", {t["layer"]}, g, t))
     for f in fps:
         for p in f["pads"]:
-            if p["net"] != net:
+            if not wanted(p["net"]):
                 continue
             layers = set(LAYERS) if p["thru"] else {f["layer"]}
             g = Point(p["x"], p["y"]).buffer(max(p["w"], p["h"]) / 2)
-            nodes.append(CopperNode(f"PAD {f['ref']}.{p['num']}", layers, g,
-                                    {"ref": f["ref"], **p}))
-    return nodes
+            out[p["net"]].append(CopperNode(f"PAD {f['ref']}.{p['num']}",
+                                            layers, g, {"ref": f["ref"], **p}))
+    return out
+
+
+def nodes_for(net, geom):
+    """Every piece of copper carrying `net`, as CopperNode objects."""
+    return _nodes_by_net(geom, {net}).get(net, [])
 
 
 # ── Union-find grouping ─────────────────────────────────────────────
 
-def group_nodes(nodes):
-    """Union-find over overlapping copper that shares a layer.
+def _label(nodes):
+    """(components, edges) of the copper graph over `nodes`.
 
-    Returns the connected components, largest (most members) first.
+    components — lists of node indices, largest (most members) first
+    edges      — (i, j) index pairs, i < j, of nodes that touch on a
+                 shared layer
     """
-    if not nodes:
-        return []
-
     parent = list(range(len(nodes)))
 
     def find(a):
@@ -266,32 +274,172 @@ def group_nodes(nodes):
     # The exact intersects() test still decides every edge, so the result is
     # identical to the naive double loop — just orders of magnitude faster on
     # a full-board GND pour.
-    geoms = [n.geom for n in nodes]
-    tree = STRtree(geoms)
-    for i, node in enumerate(nodes):
-        for j in tree.query(node.geom):
-            j = int(j)
-            if j <= i:
-                continue
-            if not (node.layers & nodes[j].layers):
-                continue
-            if node.geom.intersects(nodes[j].geom):
-                union(i, j)
+    edges = []
+    if nodes:
+        geoms = [n.geom for n in nodes]
+        tree = STRtree(geoms)
+        for i, node in enumerate(nodes):
+            for j in tree.query(node.geom):
+                j = int(j)
+                if j <= i:
+                    continue
+                if not (node.layers & nodes[j].layers):
+                    continue
+                if node.geom.intersects(nodes[j].geom):
+                    edges.append((i, j))
+                    union(i, j)
 
     comp = defaultdict(list)
-    for i, n in enumerate(nodes):
-        comp[find(i)].append(n)
-    return sorted(comp.values(), key=len, reverse=True)
+    for i in range(len(nodes)):
+        comp[find(i)].append(i)
+    return sorted(comp.values(), key=len, reverse=True), edges
 
 
-def groups_for(net, geom):
+def group_nodes(nodes):
+    """Union-find over overlapping copper that shares a layer.
+
+    Returns the connected components, largest (most members) first.
+    """
+    return [[nodes[i] for i in c] for c in _label(nodes)[0]]
+
+
+def groups_for(net, geom=None):
     """Electrical groups of `net` on the board, largest first.
 
     len(groups) > 1  ⇒  the net is an OPEN CIRCUIT on the fabricated board.
+
+    `geom` is a CopperGeometry to compute from, a CopperGraph to look the
+    answer up in, or None for the default board's cached graph.
     """
+    if geom is None:
+        geom = board_graph()
+    if isinstance(geom, CopperGraph):
+        return geom.groups_for(net)
     return group_nodes(nodes_for(net, geom))
 
 
+# ── Whole-board graph ───────────────────────────────────────────────
+
+class CopperGraph:
+    """Every net's electrical groups on one board, labelled in one build.
+
+    Attributes:
+      geom   — the CopperGeometry it was built from
+      nodes  — {net: [CopperNode, ...]}
+      groups — {net: [[node index, ...], ...]}, largest first
+      areas  — {net: [poured island area of each group, mm²]}
+      edges  — {net: [(i, j), ...]} node pairs that touch
+
+    groups_for(net) is then a lookup; the connectivity gates share one
+    build through board_graph() instead of each union-finding its nets.
+    """
+
+    def __init__(self, geom):
+        self.geom = CopperGeometry(*geom)
+        self.nodes = dict(_nodes_by_net(self.geom))
+        self.groups, self.areas, self.edges = {}, {}, {}
+        for net, nodes in self.nodes.items():
+            self.groups[net], self.edges[net] = _label(nodes)
+            self.areas[net] = [
+                sum(nodes[i].geom.area for i in c
+                    if nodes[i].label.startswith("ISLAND"))
+                for c in self.groups[net]]
+
+    def groups_for(self, net):
+        """Same answer as groups_for(net, geom) on the source geometry."""
+        nodes = self.nodes.get(net, [])
+        return [[nodes[i] for i in c] for c in self.groups.get(net, [])]
+
+    # Pickled as plain tuples: the class and the namedtuples may live in
+    # __main__ when this file runs as a script.
+    def __getstate__(self):
+        return {"geom": tuple(self.geom),
+                "nodes": {net: [tuple(n) for n in nodes]
+                          for net, nodes in self.nodes.items()},
+                "groups": self.groups, "areas": self.areas,
+                "edges": self.edges}
+
+    def __setstate__(self, state):
+        self.geom = CopperGeometry(*state["geom"])
+        self.nodes = {net: [CopperNode(*n) for n in nodes]
+                      for net, nodes in state["nodes"].items()}
+        self.groups = state["groups"]
+        self.areas = state["areas"]
+        self.edges = state["edges"]
+
+
+_GRAPH_VERSION = 1
+
+# {board path: (stat fingerprint, CopperGraph)} — a long-lived process
+# (gate_daemon) re-checks the fingerprint on every call.
+_GRAPHS = {}
+
+
+def _graph_path(pcb_path):
+    return pcb_path.parent / ".copper_graph.pkl"
+
+
+def board_graph(pcb_path=None):
+    """The CopperGraph of a board, built once per board fingerprint.
+
+    Persisted next to the board (.copper_graph.pkl) with the same two-tier
+    freshness as pcb_cache: a matching (size, mtime_ns, inode) is trusted,
+    otherwise the SHA-256 decides. A stale or unreadable file is rebuilt;
+    a read-only checkout just rebuilds in memory.
+
+    Raises the "pcb.board" audit event first, as pcb_cache.load_cache does:
+    an in-process hit opens nothing, and a traced gate must still record
+    the board's content as an input (gate_store).
+    """
+    from pcb_cache import _settled, _sha256, _stat_fingerprint
+
+    path = Path(pcb_path) if pcb_path else DEFAULT_PCB
+    sys.audit("pcb.board", str(path))
+    stat = _stat_fingerprint(path)
+    memo = _GRAPHS.get(path)
+    if memo and stat is not None and memo[0] == stat:
+        return memo[1]
+
+    cache_path = _graph_path(path)
+    graph = None
+    digest = None
+    try:
+        with open(cache_path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != _GRAPH_VERSION:
+            data = None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+            TypeError, ValueError):
+        data = None
+    if data is not None:
+        if stat is not None and data.get("pcb_stat") == stat:
+            graph = data["graph"]
+        else:
+            digest = _sha256(path)
+            if data.get("pcb_hash") == digest:
+                graph = data["graph"]
+
+    if graph is None or data.get("pcb_stat") != _settled(stat):
+        if graph is None:
+            graph = CopperGraph(parse_copper(path))
+        data = {"version": _GRAPH_VERSION,
+                "pcb_hash": digest or _sha256(path),
+                "pcb_stat": _settled(stat), "graph": graph}
+        # Atomic, for the same reason as pcb_cache: verify-all runs the
+        # connectivity gates side by side.
+        tmp_path = cache_path.with_name(
+            f".{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    _GRAPHS[path] = (stat, graph)
+    return graph
+
+
 # ── Reporting helpers ───────────────────────────────────────────────
 
 def group_pads(group):
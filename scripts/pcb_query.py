@@ -18,7 +18,7 @@ Usage:
     python3 scripts/pcb_query.py where U2              # placement + extent
     python3 scripts/pcb_query.py stats                 # board totals
 
-The cache (hardware/kicad/.pcb_cache.json) is SHA-256-keyed to the board,
+The cache (hardware/kicad/.pcb_cache.bin) is SHA-256-keyed to the board,
 so answers can never be stale; regeneration is automatic on first query
 after the board changes.
 """
@@ -15,6 +15,8 @@ from collections import defaultdict
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import kicad_sexpr  # noqa: E402
+
 # -- Constants ---------------------------------------------------------
 BOARD_W, BOARD_H = 160.0, 75.0
 PCB_DEFAULT = "hardware/kicad/esp32-emu-turbo.kicad_pcb"
@@ -101,28 +103,9 @@ def parse_pcb(filepath):
                 })
 
         # Walk footprint blocks and inspect each for SilkS elements.
-        # Depth-tracked parenthesis scan (regex can't handle nested parens).
-        idx = 0
-        n = len(raw)
-        while True:
-            start = raw.find("(footprint ", idx)
-            if start == -1:
-                break
-            # Find matching close paren
-            depth = 0
-            j = start
-            while j < n:
-                ch = raw[j]
-                if ch == "(":
-                    depth += 1
-                elif ch == ")":
-                    depth -= 1
-                    if depth == 0:
-                        break
-                j += 1
-            block = raw[start:j + 1]
-            idx = j + 1
-
+        # Balanced blocks come from the shared tokenizer (regex can't
+        # handle nested parens).
+        for block in kicad_sexpr.blocks(raw, "(footprint "):
             ref_match = re.search(
                 r'\(property\s+"Reference"\s+"([^"]+)"', block
             )
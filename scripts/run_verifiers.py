@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Run a set of pass/fail verifiers and aggregate their verdicts into one.
+
+Why
+---
+The first `make verify-all` recipe was of the form
+
+    sh -c 'python3 a.py & python3 b.py & ... & wait'
+
+and `wait` with no arguments always returns 0, so that suite could never
+fail no matter how many checks reported errors. Its replacement,
+run-verifiers.sh, fixed the exit code but still started every gate at
+once: a hundred gates on a handful of cores, verify_dfm_v2 and
+verify_copper_clearance fighting thirty trivial checks for the CPU, and
+the slowest gate finishing last because it started with everyone else.
+
+This is a scheduler with the same contract (exit 0 only if every gate
+passed, 1 otherwise, 2 on usage):
+
+  * gates whose inputs are unchanged replay their stored verdict
+    (gate_store.py; --force runs everything);
+  * the rest run longest-first by their last recorded duration, gates
+    never timed before going first — so the long ones start at t=0 and
+    the short ones fill the gaps, and wall time approaches the longest
+    gate instead of the sum of the contention;
+  * at most --jobs gates run at once (default: one per core), each in a
+    fork of this process, which has the board context and the heavy
+    imports loaded once;
+  * every gate has a timeout (--timeout, default 600 s) and optionally an
+    address-space ceiling (--memory MB); --limit overrides both per gate;
+  * after the summary, a schedule report: wall time against its lower
+    bound, the chain of gates that set the wall time, and the peaks.
+
+Usage:
+    python3 scripts/run_verifiers.py [--force] [-j N] <script-basename> ...
+    python3 scripts/run_verifiers.py --limit verify_isolation=120 ...
+    python3 scripts/run_verifiers.py --memory 2048 --limit verify_dfm_v2=:4096 ...
+    scripts/run-verifiers.sh ...                  # same thing
+
+(basenames are relative to scripts/ and without the .py suffix)
+"""
+
+import argparse
+import atexit
+import collections
+import contextlib
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+import gate_registry  # noqa: E402
+import gate_store  # noqa: E402
+
+DEFAULT_TIMEOUT_S = 600
+POLL_S = 0.01
+TAIL_LINES = 25
+
+Limits = collections.namedtuple("Limits", "timeout memory_mb")
+
+# One gate's place in the schedule, for the report.
+Slot = collections.namedtuple("Slot",
+                              "name worker start end peak_mb verdict")
+
+
+# ── Scheduling ───────────────────────────────────────────────────────
+
+def longest_first(names, durations):
+    """`names` ordered for list scheduling: unknown durations, then LPT."""
+    return sorted(names, key=lambda n: (n in durations,
+                                        -durations.get(n, 0.0)))
+
+
+class _Task:
+    __slots__ = ("name", "worker", "limits", "sink", "res", "pid", "t0",
+                 "expired")
+
+    def __init__(self, name, worker):
+        self.name, self.worker = name, worker
+        self.limits = None
+        self.sink = tempfile.TemporaryFile()
+        fd, path = tempfile.mkstemp(prefix="run-verifiers-res-")
+        os.unlink(path)
+        self.res = fd
+        self.pid = self.t0 = None
+        self.expired = False
+
+
+class Scheduler:
+    """Runs gates in forked workers, longest first, `jobs` at a time.
+
+    run() yields a GateResult per gate as each finishes; afterwards
+    `timeline` holds a Slot per gate and report() describes it.
+    """
+
+    def __init__(self, jobs=None, timeout=DEFAULT_TIMEOUT_S, memory_mb=None,
+                 limits=None, durations=None, trace=True):
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.default = Limits(timeout, memory_mb)
+        self.limits = limits or {}
+        self.durations = durations or {}
+        self.trace = trace
+        self.timeline = []
+        self.t0 = None
+
+    def limits_for(self, name):
+        own = self.limits.get(name) or self.limits.get(name.split()[0])
+        if own is None:
+            return self.default
+        return Limits(own.timeout if own.timeout is not None
+                      else self.default.timeout,
+                      own.memory_mb if own.memory_mb is not None
+                      else self.default.memory_mb)
+
+    def run(self, names):
+        queue = collections.deque(longest_first(names, self.durations))
+        running = {}
+        idle = list(range(self.jobs - 1, -1, -1))
+        self.t0 = time.monotonic()
+        with gate_registry.BoardContext().active():
+            while queue or running:
+                while queue and idle:
+                    self._start(_Task(queue.popleft(), idle.pop()), running)
+                # Wait on our own pids, not -1: the caller may have
+                # children of its own.
+                finished = []
+                for pid in list(running):
+                    wpid, status, usage = os.wait4(pid, os.WNOHANG)
+                    if wpid:
+                        finished.append((running.pop(pid), status, usage))
+                if not finished:
+                    self._expire(running)
+                    time.sleep(POLL_S)
+                    continue
+                for task, status, usage in finished:
+                    idle.append(task.worker)
+                    yield self._finish(task, status, usage)
+
+    def _start(self, task, running):
+        task.limits = self.limits_for(task.name)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        task.t0 = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            self._child(task, running)
+        with contextlib.suppress(OSError):
+            os.setpgid(pid, pid)    # also in the child; whichever runs first
+        task.pid = pid
+        running[pid] = task
+
+    def _child(self, task, running):
+        """Body of a forked worker: run one gate, report, never return.
+
+        Ends as gate_registry's workers do: the gate's own atexit handlers
+        run into its output, stdio is flushed, and the exit status is 1 if
+        the worker itself failed.
+        """
+        code = 1
+        try:
+            os.setpgid(0, 0)
+            atexit._clear()
+            for other in running.values():
+                os.close(other.res)
+                other.sink.close()
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if task.limits.memory_mb:
+                import resource
+                ceiling = task.limits.memory_mb << 20
+                with contextlib.suppress(ValueError, OSError):
+                    resource.setrlimit(resource.RLIMIT_AS,
+                                       (ceiling, ceiling))
+            r = gate_registry.run_here(task.name, self.trace, task.sink)
+            doc = r.to_dict()
+            doc.pop("output")
+            os.write(task.res, json.dumps(doc).encode())
+            with gate_registry._captured(task.sink):
+                atexit._run_exitfuncs()
+            code = 0
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+        finally:
+            with contextlib.suppress(OSError, ValueError):
+                sys.stdout.flush()
+                sys.stderr.flush()
+            os._exit(code)
+
+    def _expire(self, running):
+        now = time.monotonic()
+        for task in running.values():
+            timeout = task.limits.timeout
+            if timeout and not task.expired and now - task.t0 > timeout:
+                task.expired = True
+                with contextlib.suppress(OSError):
+                    os.killpg(task.pid, signal.SIGKILL)
+
+    def _finish(self, task, status, usage):
+        end = time.monotonic()
+        seconds = end - task.t0
+        task.sink.seek(0)
+        output = task.sink.read().decode("utf-8", "replace")
+        task.sink.close()
+        os.lseek(task.res, 0, os.SEEK_SET)
+        raw = b"".join(iter(lambda: os.read(task.res, 65536), b""))
+        os.close(task.res)
+        if task.expired:
+            result = gate_registry.GateResult(
+                task.name, "TIMEOUT", None, seconds,
+                [f"exceeded {task.limits.timeout:g}s"], output=output)
+        elif raw:
+            result = gate_registry.GateResult(**json.loads(raw))
+            result.output = output
+        else:
+            sig = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+            why = f"killed by signal {sig}" if sig else "worker died"
+            if sig and task.limits.memory_mb:
+                why += f" (memory ceiling {task.limits.memory_mb} MB)"
+            result = gate_registry.GateResult(
+                task.name, "ERROR", None, seconds,
+                [why] + gate_registry.findings(None, output, 1)[0],
+                output=output)
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        scale = 1 << 20 if sys.platform == "darwin" else 1 << 10
+        self.timeline.append(Slot(task.name, task.worker, task.t0 - self.t0,
+                                  end - self.t0, usage.ru_maxrss / scale,
+                                  result.verdict))
+        return result
+
+    def report(self, top=5):
+        """Lines describing the schedule run() just executed."""
+        if not self.timeline:
+            return []
+        wall = max(s.end for s in self.timeline)
+        busy = sum(s.end - s.start for s in self.timeline)
+        longest = max(self.timeline, key=lambda s: s.end - s.start)
+        bound = max(longest.end - longest.start, busy / self.jobs)
+        lines = [
+            f"Schedule: {len(self.timeline)} gates on {self.jobs} "
+            f"worker(s), wall {wall:.1f}s, busy {busy:.1f}s "
+            f"({100 * busy / (wall * self.jobs or 1):.0f}% of capacity)",
+            f"  lower bound {bound:.1f}s = max(longest gate "
+            f"{longest.end - longest.start:.1f}s, work/workers "
+            f"{busy / self.jobs:.1f}s)",
+        ]
+        # The chain that set the wall time: the worker that finished last,
+        # walked back through the gates it ran.
+        last = max(self.timeline, key=lambda s: s.end)
+        chain = sorted((s for s in self.timeline if s.worker == last.worker),
+                       key=lambda s: s.start)
+        lines.append(f"  critical path (worker {last.worker}, "
+                     f"{len(chain)} gate(s)):")
+        heavy = sorted(chain, key=lambda s: s.start - s.end)[:top]
+        for s in sorted(heavy, key=lambda s: s.start):
+            lines.append(f"    {s.start:6.1f}s -> {s.end:6.1f}s  "
+                         f"{s.name:<40} {s.end - s.start:6.1f}s")
+        rest = [s for s in chain if s not in heavy]
+        if rest:
+            lines.append(f"    ... and {len(rest)} shorter gate(s), "
+                         f"{sum(s.end - s.start for s in rest):.1f}s")
+        slowest = sorted(self.timeline, key=lambda s: s.start - s.end)[:top]
+        lines.append("  slowest: " + ", ".join(
+            f"{s.name} {s.end - s.start:.1f}s" for s in slowest))
+        heaviest = sorted(self.timeline, key=lambda s: -s.peak_mb)[:top]
+        lines.append("  peak memory: " + ", ".join(
+            f"{s.name} {s.peak_mb:.0f} MB" for s in heaviest))
+        return lines
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+def _limit(text):
+    """NAME=SECONDS[:MB], either part may be empty."""
+    name, _, spec = text.partition("=")
+    timeout, _, memory = spec.partition(":")
+    try:
+        return name, Limits(float(timeout) if timeout else None,
+                            int(memory) if memory else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=SECONDS[:MB], got {text!r}")
+
+
+def _exit_code(result):
+    if result.verdict == "TIMEOUT":
+        return 124
+    if result.verdict == "MISSING":
+        return 2                # what python3 says for a missing script
+    return 1 if result.rc is None else result.rc
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        usage="%(prog)s [options] <verifier> [<verifier> ...]")
+    ap.add_argument("gates", nargs="*", help=argparse.SUPPRESS)
+    ap.add_argument("--force", action="store_true",
+                    help="run every gate, even if its inputs are unchanged")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="gates at once (default: one per core)")
+    ap.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S,
+                    help="per-gate timeout in seconds (default %(default)g)")
+    ap.add_argument("--memory", type=int, default=None, metavar="MB",
+                    help="per-gate address-space ceiling")
+    ap.add_argument("--limit", type=_limit, action="append", default=[],
+                    metavar="NAME=SECONDS[:MB]",
+                    help="override timeout / memory for one gate")
+    ap.add_argument("--no-report", action="store_true",
+                    help="skip the schedule report")
+    opts = ap.parse_args(argv)
+    if not opts.gates:
+        print(f"usage: {ap.prog} <verifier> [<verifier> ...]",
+              file=sys.stderr)
+        return 2
+
+    os.chdir(PROJECT_DIR)
+    start = time.monotonic()
+    store = gate_store.ResultStore()
+    scheduler = Scheduler(opts.jobs, opts.timeout, opts.memory,
+                          dict(opts.limit), store.durations)
+    results = {}
+    for r in gate_store.run_gates(opts.gates, force=opts.force, store=store,
+                                  runner=scheduler.run):
+        results[r.name] = r
+    elapsed = time.monotonic() - start
+
+    failed = [results[n] for n in dict.fromkeys(opts.gates)
+              if results[n].verdict != "PASS"]
+    total = len(opts.gates)
+    cached = sum(r.cached for r in results.values())
+    print()
+    print("=" * 60)
+    print(f"Verification suite: {total - len(failed)}/{total} passed in "
+          f"{elapsed:.0f}s ({cached} unchanged, replayed)")
+    print("=" * 60)
+    if not opts.no_report:
+        for line in scheduler.report():
+            print(line)
+
+    if failed:
+        for r in failed:
+            print()
+            print("-" * 60)
+            print(f"FAIL  scripts/{r.name.split()[0]}.py "
+                  f"(exit {_exit_code(r)})")
+            print("-" * 60)
+            for line in (r.output.splitlines()
+                         or r.findings)[-TAIL_LINES:]:
+                print(line)
+        print()
+        print(f"FAILED ({len(failed)}): "
+              + " ".join(r.name for r in failed) + " ")
+        return 1
+
+    print("All checks passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
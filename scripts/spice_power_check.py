@@ -21,6 +21,9 @@ import re
 import tempfile
 
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "scripts"))
+
+from vbench import spice  # noqa: E402
 
 # Per-process paths, NOT fixed /tmp names — same fix as verify_netlist_diff and
 # erc_check. Several worktrees of this repo are usually open at once and
@@ -137,14 +140,18 @@ quit
 
 
 def run_simulation():
-    """Run ngspice simulation and capture results."""
+    """Run ngspice simulation and capture results.
+
+    Through vbench/spice.py, which caches the output by the deck's text:
+    an unchanged deck is not simulated again.
+    """
     print("Running ngspice power supply simulation...")
-    result = subprocess.run(
-        ["ngspice", "-b", NETLIST],
-        capture_output=True, text=True, timeout=30,
-    )
-    output = result.stdout + result.stderr
-    return output
+    with open(NETLIST) as f:
+        deck = f.read()
+    try:
+        return spice.output(deck)
+    except spice.SimulatorMissing as exc:
+        return str(exc)
 
 
 def parse_results(output):
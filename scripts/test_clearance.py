@@ -0,0 +1,141 @@
+"""Regression tests for the batched clearance kernel (clearance.py).
+
+Five spacing gates now take their pairs from this kernel, so a pair it
+drops is a violation nobody sees. The tests pin it against the scalar
+functions it replaced, on seeded random boards dense enough that many
+shapes share grid cells:
+
+  Complete — pairs() returns exactly the pairs a brute-force double loop
+             finds under the threshold, each once, in (i, j) order.
+  Exact    — the gaps equal the scalar reference for capsule/capsule,
+             rect/rect, circle/rect and capsule/rect (the last against
+             dense sampling along the trace).
+  Layers   — shapes on different layers are never paired, and a circle
+             built without a layer pairs with no named layer.
+
+Usage:
+    python3 scripts/test_clearance.py
+    python3 -m unittest scripts.test_clearance
+"""
+
+import itertools
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import clearance as C  # noqa: E402
+from analyze_pad_distances import (  # noqa: E402
+    Pad, Segment, Via, pad_edge_distance, segment_to_segment_distance,
+    via_to_pad_distance,
+)
+
+N = 250
+THRESHOLD = 0.4
+
+
+def _segment(rng, layer="F.Cu"):
+    x, y = rng.uniform(0, 15), rng.uniform(0, 15)
+    angle = math.radians(rng.choice([0, 45, 90, rng.uniform(0, 180)]))
+    length = rng.choice([0.0, rng.uniform(0, 6)])
+    return Segment(x, y, x + length * math.cos(angle),
+                   y + length * math.sin(angle),
+                   rng.uniform(0.1, 0.5), layer, rng.randint(0, 5))
+
+
+def _pad(rng, layer="F.Cu"):
+    return Pad("R", "1", layer, rng.uniform(0, 15), rng.uniform(0, 15),
+               rng.uniform(0.2, 2.0), rng.uniform(0.2, 2.0), "rect",
+               net=rng.randint(0, 5))
+
+
+def _sampled_gap(s, p, steps=2000):
+    best = math.inf
+    for k in range(steps + 1):
+        t = k / steps
+        x, y = s.x1 + t * (s.x2 - s.x1), s.y1 + t * (s.y2 - s.y1)
+        best = min(best, math.hypot(max(0.0, abs(x - p.x) - p.w / 2),
+                                    max(0.0, abs(y - p.y) - p.h / 2)))
+    return best - s.width / 2
+
+
+class Kernel(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(8)
+        self.segs = [_segment(rng) for _ in range(N)]
+        self.pads = [_pad(rng) for _ in range(N)]
+        self.vias = [Via(rng.uniform(0, 15), rng.uniform(0, 15), 0.6, 0.3,
+                         0.15) for _ in range(N)]
+
+    def assertPairs(self, found, expected):
+        i, j, gap = found
+        got = dict(zip(zip(i.tolist(), j.tolist()), gap.tolist()))
+        self.assertEqual(len(got), len(i), "a pair was reported twice")
+        self.assertEqual(set(got), set(expected))
+        self.assertEqual(list(got), sorted(got))
+        for key, want in expected.items():
+            self.assertAlmostEqual(got[key], want, places=9, msg=key)
+
+    def test_capsule_capsule(self):
+        found = C.pairs(C.capsules(self.segs), threshold=THRESHOLD)
+        expected = {}
+        for a, b in itertools.combinations(range(N), 2):
+            gap = segment_to_segment_distance(self.segs[a], self.segs[b])
+            if gap < THRESHOLD:
+                expected[(a, b)] = gap
+        # The scalar reference floors overlaps at zero.
+        i, j, gap = found
+        self.assertPairs((i, j, gap.clip(min=0.0)), expected)
+
+    def test_rect_rect(self):
+        expected = {}
+        for a, b in itertools.combinations(range(N), 2):
+            gap = pad_edge_distance(self.pads[a], self.pads[b])
+            if gap < THRESHOLD:
+                expected[(a, b)] = gap
+        self.assertPairs(C.pairs(C.rects(self.pads), threshold=THRESHOLD),
+                         expected)
+
+    def test_circle_rect(self):
+        expected = {}
+        for a, b in itertools.product(range(N), range(N)):
+            gap = via_to_pad_distance(self.vias[a], self.pads[b])
+            if gap < THRESHOLD:
+                expected[(a, b)] = gap
+        found = C.pairs(C.circles(self.vias, layer="F.Cu"),
+                        C.rects(self.pads), threshold=THRESHOLD)
+        self.assertPairs(found, expected)
+
+    def test_capsule_rect(self):
+        i, j, gap = C.pairs(C.capsules(self.segs), C.rects(self.pads),
+                            threshold=THRESHOLD)
+        self.assertGreater(len(i), 100)
+        for a, b, g in list(zip(i, j, gap))[:150]:
+            with self.subTest(pair=(a, b)):
+                want = _sampled_gap(self.segs[a], self.pads[b])
+                self.assertAlmostEqual(g, want, delta=2e-3)
+
+    def test_layers_are_never_paired(self):
+        rng = random.Random(9)
+        front = [_pad(rng, "F.Cu") for _ in range(50)]
+        back = [Pad(p.ref, p.num, "B.Cu", p.x, p.y, p.w, p.h, p.shape)
+                for p in front]
+        i, j, _ = C.pairs(C.rects(front + back), threshold=THRESHOLD)
+        self.assertTrue(len(i))
+        self.assertTrue(all((a < 50) == (b < 50) for a, b in zip(i, j)))
+
+    def test_a_layerless_circle_is_on_no_named_layer(self):
+        C.layer_id("F.Cu")              # whichever name was interned first
+        layered = C.rects(self.pads)
+        self.assertFalse(len(C.pairs(C.circles(self.vias), layered,
+                                     threshold=THRESHOLD)[0]))
+        self.assertTrue(len(C.pairs(C.circles(self.vias),
+                                    threshold=THRESHOLD)[0]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
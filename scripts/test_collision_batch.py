@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Regression tests for the batched, four-layer side of generate_pcb/collision.py.
+
+The router now places each domain's copper inside CollisionGrid.batch(),
+which checks the whole run in one vectorised sweep when the block exits.
+A sweep that drops a pair, or reports it in another order, silently
+changes the collision report, so the tests pin it against placing the
+same pieces one by one:
+
+  Batch   — seeded random runs dense enough that many pieces share cells,
+            and the real board's routing, give the sequential violations
+            in the sequential order.
+  Arrays  — check_segments / check_vias equal check_segment / check_via
+            on each row.
+  Layers  — inner-layer copper is checked, and a via is an obstacle on
+            all four layers.
+  Zones   — the R22-CRIT-1 swallowed via is reported whichever pour is
+            placed first, and two equal-priority pours of different nets
+            that overlap are reported.
+
+Run: python3 scripts/test_collision_batch.py
+"""
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.generate_pcb import collision as C               # noqa: E402
+from scripts.generate_pcb.collision import CollisionGrid      # noqa: E402
+
+LAYERS = ["F.Cu", "B.Cu", "In1.Cu", "In2.Cu"]
+
+
+def _grid(rng, cell_size=5.0):
+    g = CollisionGrid(cell_size=cell_size)
+    g.register_board_edges(board_w=30.0, board_h=30.0)
+    g.register_mounting_holes([(15.0, 15.0)])
+    g.register_pads({"U1": {str(k): (rng.uniform(2, 28), rng.uniform(2, 28),
+                                     rng.uniform(0.3, 1.5),
+                                     rng.uniform(0.3, 1.5))
+                            for k in range(40)}},
+                    {("U1", str(k)): rng.randint(0, 6) for k in range(40)},
+                    {"U1": "F.Cu"})
+    return g
+
+
+def _pieces(rng, n):
+    out = []
+    for _ in range(n):
+        x, y = rng.uniform(1, 29), rng.uniform(1, 29)
+        net = rng.randint(0, 6)
+        if rng.random() < 0.3:
+            out.append(("via", (x, y, net, rng.choice([0.45, 0.6, 0.9]),
+                                rng.choice([0.2, 0.3, 0.35]))))
+        else:
+            a = math.radians(rng.choice([0, 45, 90, 135]))
+            length = rng.uniform(0, 5)
+            out.append(("segment", (x, y, x + length * math.cos(a),
+                                    y + length * math.sin(a),
+                                    rng.choice(LAYERS),
+                                    rng.choice([0.2, 0.25, 0.5]), net)))
+    return out
+
+
+def _place(g, pieces):
+    for kind, args in pieces:
+        if kind == "via":
+            g.place_via(*args)
+        else:
+            g.place_segment(*args)
+
+
+def _square(x, y, half):
+    return [(x - half, y - half), (x + half, y - half),
+            (x + half, y + half), (x - half, y + half)]
+
+
+@unittest.skipIf(C.np is None, "the batch path needs NumPy")
+class BatchMatchesSequential(unittest.TestCase):
+
+    def test_random_runs(self):
+        for seed in range(4):
+            for cell_size in (1.0, 5.0):
+                with self.subTest(seed=seed, cell_size=cell_size):
+                    pieces = _pieces(random.Random(seed), 400)
+                    seq = _grid(random.Random(100 + seed), cell_size)
+                    _place(seq, pieces)
+                    bat = _grid(random.Random(100 + seed), cell_size)
+                    with bat.batch():
+                        _place(bat, pieces)
+                        self.assertEqual(bat.violations, [],
+                                         "checked before the batch closed")
+                    self.assertGreater(len(seq.violations), 50)
+                    self.assertEqual(bat.violations, seq.violations)
+                    self.assertEqual(bat.index.occupancy(),
+                                     seq.index.occupancy())
+
+    def test_the_real_routing(self):
+        from scripts.generate_pcb import primitives as P
+        from scripts.generate_pcb import routing
+        from scripts.generate_pcb.routing import _shared
+
+        def route():
+            mark = P.uid_mark()
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                out = routing.generate_all_traces()
+            P.uid_restore(mark)
+            return out, list(_shared._GRID.violations)
+
+        batched, got = route()
+        with mock.patch.object(CollisionGrid, "batch",
+                               lambda self: contextlib.nullcontext()):
+            sequential, want = route()
+        self.assertEqual(batched, sequential)
+        self.assertTrue(got)
+        self.assertEqual(got, want)
+
+
+class ArrayQueries(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.g = _grid(rng)
+        _place(self.g, _pieces(rng, 300))
+        self.probe = _pieces(random.Random(8), 200)
+
+    def test_check_segments(self):
+        rows = [(x1, y1, x2, y2, C.LAYER_IDX[layer], w, net)
+                for x1, y1, x2, y2, layer, w, net in
+                (args for kind, args in self.probe if kind == "segment")]
+        want = [v for x1, y1, x2, y2, li, w, net in rows
+                for v in self.g.check_segment(x1, y1, x2, y2,
+                                              C.LAYER_NAMES[li], w, net)]
+        self.assertGreater(len(want), 20)
+        self.assertEqual(self.g.check_segments(rows), want)
+
+    def test_check_vias(self):
+        rows = [args for kind, args in self.probe if kind == "via"]
+        want = [v for args in rows for v in self.g.check_via(*args)]
+        self.assertGreater(len(want), 10)
+        self.assertEqual(self.g.check_vias(rows), want)
+
+
+class FourLayers(unittest.TestCase):
+
+    def test_an_inner_layer_short_is_reported(self):
+        g = CollisionGrid()
+        g.add_segment(0.0, 5.0, 10.0, 5.0, "In1.Cu", 0.25, net=1)
+        self.assertTrue(g.check_segment(5.0, 0.0, 5.0, 10.0, "In1.Cu",
+                                        0.25, net=2))
+        self.assertEqual(g.check_segment(5.0, 0.0, 5.0, 10.0, "In2.Cu",
+                                         0.25, net=2), [])
+
+    def test_a_via_is_an_obstacle_on_every_layer(self):
+        g = CollisionGrid()
+        g.add_via(5.0, 5.0, net=1, size=0.6, drill=0.3)
+        for layer in LAYERS:
+            with self.subTest(layer=layer):
+                self.assertTrue(g.check_segment(4.0, 5.0, 6.0, 5.0, layer,
+                                                0.2, net=2))
+        occupancy = g.index.occupancy()
+        self.assertEqual({k: v["obstacles"] for k, v in occupancy.items()},
+                         dict.fromkeys(LAYERS, 1))
+
+
+class Zones(unittest.TestCase):
+    """R22-CRIT-1: +5V (net 2, priority 1) poured over the +3V3 vias."""
+
+    V3, V5 = 1, 2
+
+    def _grid(self):
+        g = CollisionGrid()
+        g.add_via(20.0, 20.0, net=self.V3, size=0.6, drill=0.3)
+        return g
+
+    def test_the_swallowed_via_is_reported_in_either_order(self):
+        own = ("In2.Cu", _square(20.0, 20.0, 10.0), self.V3, 0)
+        over = ("In2.Cu", _square(22.0, 22.0, 4.0), self.V5, 1)
+        for first, second in ((own, over), (over, own)):
+            with self.subTest(first=first[2]):
+                g = self._grid()
+                self.assertEqual(g.check_zone(*first), [])
+                g.add_zone(*first)
+                (v,) = g.check_zone(*second)
+                self.assertEqual(v.obstacle_a.kind, "via")
+                self.assertEqual(v.obstacle_b.net, self.V5)
+                self.assertEqual(v.layer, "In2.Cu")
+
+    def test_a_via_outside_its_own_plane_is_not_swallowed(self):
+        g = self._grid()
+        g.add_zone("In2.Cu", _square(50.0, 50.0, 5.0), self.V3, 0)
+        self.assertEqual(
+            g.check_zone("In2.Cu", _square(20.0, 20.0, 4.0), self.V5, 1), [])
+
+    def test_equal_priority_overlap_is_reported(self):
+        g = CollisionGrid()
+        g.add_zone("In1.Cu", _square(10.0, 10.0, 5.0), self.V3, 0)
+        self.assertTrue(
+            g.check_zone("In1.Cu", _square(14.0, 10.0, 5.0), self.V5, 0))
+        self.assertEqual(
+            g.check_zone("In1.Cu", _square(14.0, 10.0, 5.0), self.V5, 1), [])
+        self.assertEqual(
+            g.check_zone("In1.Cu", _square(30.0, 10.0, 5.0), self.V5, 0), [])
+
+    def test_a_via_placed_under_the_higher_pour_is_reported(self):
+        g = CollisionGrid()
+        g.add_zone("In2.Cu", _square(20.0, 20.0, 10.0), self.V3, 0)
+        g.add_zone("In2.Cu", _square(22.0, 22.0, 4.0), self.V5, 1)
+        self.assertTrue(g.check_via(22.0, 22.0, self.V3, 0.6, 0.3))
+        self.assertEqual(g.check_via(12.0, 12.0, self.V3, 0.6, 0.3), [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -12,12 +12,13 @@ short_circuit_analysis, analyze_pad_distances) stood behind it.
 
 The fix has three moving parts, and each one is planted against here:
 
-1.  `routing.generate_all_traces` routes TWICE — a discovery pass whose
-    output is discarded, then the emitted pass, seeded from the pad->net
-    map the first pass produced. That is only legitimate because routing is
-    idempotent and collision results never steer the router, so the two
-    passes must be provably byte-identical and the UUID counter must come
-    back to where it started.
+1.  `routing.generate_all_traces` seeds the run from the pad->net map the
+    last run produced (cached per routing-source fingerprint), and when
+    that seed is stale it routes TWICE — the first run becomes a discovery
+    pass whose output is discarded. That is only legitimate because routing
+    is idempotent and collision results never steer the router, so the
+    runs must be provably byte-identical, a stale seed must not change a
+    byte, and the UUID counter must come back to where it started.
 2.  net 0 no longer means "not known yet", it means "unconnected copper",
     and unconnected copper is a thing nothing may overlap.
 3.  which side a pad is on is DERIVED from the placements, not remembered
@@ -33,7 +34,10 @@ Run: python3 scripts/test_collision_pad_nets.py
 import os
 import re
 import sys
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -163,6 +167,36 @@ class TwoPassRoutingIsSideEffectFree(unittest.TestCase):
             f"only {len(self.pad_nets)} pad nets discovered — the seed is "
             "not being collected")
 
+    def test_a_fresh_seed_routes_the_board_once(self):
+        from scripts.generate_pcb.routing import _assemble as asm
+        P.uid_restore(self.mark)
+        with mock.patch.object(asm, "_route_once",
+                               wraps=asm._route_once) as route:
+            out = self.routing.generate_all_traces()
+        self.assertEqual(route.call_count, 1,
+                         "the cached pad->net seed was not used")
+        self.assertEqual(out, self.first)
+
+    def test_a_stale_seed_is_rerouted_to_the_same_board(self):
+        # A lost cache and a seed from an older router must both end in the
+        # emitted board of a fresh run: the seed is a hint, never an input.
+        from scripts.generate_pcb.routing import _assemble as asm
+        stale = dict(self.pad_nets)
+        stale.pop(("U1", "3"))
+        stale[("U6", "9")] = 1
+        with tempfile.TemporaryDirectory() as tmp:
+            for seed in ({}, stale):
+                with self.subTest(seed=len(seed)), \
+                        mock.patch.object(asm, "_SEED_MEMO", {}), \
+                        mock.patch.object(asm, "_SEED_CACHE",
+                                          Path(tmp) / "pad_nets.json"), \
+                        mock.patch.object(asm, "_load_seed",
+                                          return_value=seed):
+                    P.uid_restore(self.mark)
+                    self.assertEqual(self.routing.generate_all_traces(),
+                                     self.first)
+                    self.assertEqual(P.uid_mark(), self.after_first)
+
     def test_the_explicit_seeds_survive_the_second_pass(self):
         # These are the ones the discovery pass cannot supply, so they
         # must still be declared by hand and must still win. ("U6", "9") is
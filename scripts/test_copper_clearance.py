@@ -0,0 +1,83 @@
+"""Regression tests for verify_copper_clearance's pair search.
+
+find_gaps() used to compare every merged net with every other; it now
+asks an STRtree for the pieces within the threshold. The verdict must not
+move, so the tests pin it against the exhaustive sweep on the real board:
+
+  Identical — every layer's violations (gap, nets, location) equal those
+              of the O(n²) distance() loop, in the same order.
+  Parallel  — checking the layers in forked workers gives the serial
+              result.
+
+Usage:
+    python3 scripts/test_copper_clearance.py
+    python3 -m unittest scripts.test_copper_clearance
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import verify_copper_clearance as CC  # noqa: E402
+from pcb_cache import load_cache  # noqa: E402
+
+LAYERS = ["F.Cu", "B.Cu", "In1.Cu", "In2.Cu"]
+
+# The board is nearly clean at GAP_WARN; a wider net makes the comparison
+# cover a few hundred pairs instead of a handful.
+THRESHOLD = 0.5
+
+
+def exhaustive_pairs(merged, nets, threshold):
+    """Everything find_gaps() reports but slits, via the old double loop."""
+    def name(k):
+        return nets.get(k, str(k)) if isinstance(k, int) else k
+
+    found = []
+    items = list(merged.items())
+    for i, (ka, (pa, _)) in enumerate(items):
+        for kb, (pb, _) in items[i + 1:]:
+            d = pa.distance(pb)
+            if d < threshold and not name(ka) == name(kb) == "<no net>":
+                found.append((d, name(ka), name(kb)) + CC._locate(pa, pb))
+    for key, (geom, _) in items:
+        if name(key) == "<no net>" or geom.geom_type != "MultiPolygon":
+            continue
+        subs = list(geom.geoms)
+        for i in range(len(subs)):
+            for j in range(i + 1, len(subs)):
+                d = subs[i].distance(subs[j])
+                if 0.001 < d < threshold:
+                    found.append((d, f"{name(key)} (same-net)", name(key))
+                                 + CC._locate(subs[i], subs[j]))
+    return found
+
+
+class Clearance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache = load_cache(CC.PCB_FILE)
+        cls.nets = {n["id"]: n["name"] for n in cls.cache["nets"]}
+
+    def test_matches_the_exhaustive_sweep(self):
+        for layer in LAYERS:
+            with self.subTest(layer=layer):
+                merged = CC.merge_by_net(
+                    CC.build_layer_features(self.cache, layer))
+                got = [v for v in CC.find_gaps(merged, self.nets, THRESHOLD)
+                       if "slit" not in v[1]]
+                want = exhaustive_pairs(merged, self.nets, THRESHOLD)
+                self.assertGreater(len(want), 20)
+                self.assertEqual(got, want)
+
+    def test_parallel_layers_match_serial(self):
+        serial = CC.check_layers(self.cache, self.nets, LAYERS, jobs=1)
+        forked = CC.check_layers(self.cache, self.nets, LAYERS, jobs=4)
+        self.assertEqual(forked, serial)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
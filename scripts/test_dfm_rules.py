@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Regression tests for the pairwise DFM rule engine (dfm_rules.py).
+
+Thirteen verify_dfm_v2 spacing checks now read their violations from the
+engine, so a pair it drops is a violation nobody sees. The kernel's gaps
+are pinned by test_clearance; these tests pin what the engine adds on top,
+against a brute-force double loop over a seeded random board built from
+the scalar helpers the checks used before where they are exact:
+
+  Rows     — every combination of kinds, layers, net relation, metric,
+             where / exclude / structural a row can have finds exactly the
+             pairs the double loop finds, with the same gaps, in the same
+             (a, layer, b) order.
+  Shared   — rows on the same pair of kinds share one clearance sweep.
+  Holes    — a through-hole pad repeated per layer is one hole.
+  Table    — malformed rows are refused.
+
+Usage:
+    python3 scripts/test_dfm_rules.py
+    python3 -m unittest scripts.test_dfm_rules
+"""
+
+import math
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import clearance as C  # noqa: E402
+import dfm_rules as R  # noqa: E402
+from verify_dfm_v2 import _point_to_segment_dist  # noqa: E402
+
+LAYERS = ("F.Cu", "B.Cu", "In1.Cu")
+N = 120
+
+
+def _board(seed=19):
+    rng = random.Random(seed)
+    segs, vias, pads = [], [], []
+    for _ in range(N):
+        x, y = rng.uniform(0, 12), rng.uniform(0, 12)
+        angle = math.radians(rng.choice([0, 45, 90, rng.uniform(0, 180)]))
+        length = rng.uniform(0, 4)
+        segs.append({"x1": x, "y1": y,
+                     "x2": x + length * math.cos(angle),
+                     "y2": y + length * math.sin(angle),
+                     "width": rng.choice([0.15, 0.2, 0.3]),
+                     "layer": rng.choice(LAYERS), "net": rng.randint(0, 4)})
+        size = rng.choice([0.6, 0.9])
+        vias.append({"x": rng.uniform(0, 12), "y": rng.uniform(0, 12),
+                     "size": size, "drill": size - rng.choice([0.3, 0.4]),
+                     "net": rng.randint(0, 4)})
+    for k in range(N):
+        kind = rng.choice(["smd", "smd", "thru_hole", "np_thru_hole"])
+        pad = {"ref": rng.choice(["U1", "R3", "J9"]), "num": str(k),
+               "x": rng.uniform(0, 12), "y": rng.uniform(0, 12),
+               "w": rng.uniform(0.3, 1.5), "h": rng.uniform(0.3, 1.5),
+               "layer": rng.choice(LAYERS[:2]), "net": rng.randint(0, 4),
+               "type": kind, "drill": 0.0 if kind == "smd" else 0.3}
+        pads.append(pad)
+        if kind != "smd":
+            # the cache lists a through-hole pad once per copper layer
+            other = "B.Cu" if pad["layer"] == "F.Cu" else "F.Cu"
+            pads.append(dict(pad, layer=other))
+    return {"segments": segs, "vias": vias, "pads": pads}
+
+
+ROWS = (
+    R.Rule("trace_any", "trace", threshold=0.3),
+    R.Rule("trace_netted_outer", "trace", layers=("B.Cu", "F.Cu"),
+           nets="differ-netted", threshold=0.2),
+    R.Rule("via_drill", "via", nets="any", threshold=0.5,
+           metric=("drill", "drill"),
+           exclude=lambda a, b: a["net"] == b["net"] and a["x"] < 6),
+    R.Rule("via_copper", "via", threshold=0.2),
+    R.Rule("hole_plated", "hole", nets="not-joined", threshold=0.4,
+           where=(lambda h: h["type"] != "np_thru_hole",
+                  lambda h: h["type"] != "np_thru_hole")),
+    R.Rule("hole_trace", "hole", "trace", ("F.Cu", "B.Cu"), "not-joined",
+           0.3, structural=lambda h, s: h["ref"] == "J9"),
+    R.Rule("via_trace_every", "via", "trace", None, "differ", 0.1,
+           where=(lambda v: v["net"] in (1, 2), lambda s: s["net"] != 0)),
+    R.Rule("via_trace_outer", "via", "trace", ("B.Cu", "F.Cu"),
+           "differ-netted", 0.25),
+    R.Rule("via_drill_smd", "via", "pad", ("F.Cu", "B.Cu"), "differ-netted",
+           0.3, metric=("drill", "copper"),
+           where=(None, lambda p: p["type"] == "smd")),
+    R.Rule("via_pad", "via", "pad", ("F.Cu", "B.Cu"), "differ-netted", 0.2,
+           structural=lambda v, p: p["ref"] == "U1" or p["num"] == "7"),
+    R.Rule("trace_pad", "trace", "pad", None, "differ-netted", 0.2),
+    R.Rule("pad_pad", "pad", nets="differ-netted", threshold=0.3),
+)
+
+
+def _radius(kind, item, metric):
+    if kind == "hole" or metric == "drill":
+        return item["drill"] / 2.0
+    return item["size"] / 2.0
+
+
+def _gap(rule, a, b):
+    """The scalar gap the verify_dfm_v2 loops measured for a vs b."""
+    ka, kb = rule.a, rule.b or rule.a
+    if ka in ("via", "hole") and kb in ("via", "hole"):
+        return (math.hypot(a["x"] - b["x"], a["y"] - b["y"])
+                - _radius(ka, a, rule.metric[0])
+                - _radius(kb, b, rule.metric[1]))
+    if ka in ("via", "hole") and kb == "trace":
+        return (_point_to_segment_dist(a["x"], a["y"], b)
+                - _radius(ka, a, rule.metric[0]) - b["w"] / 2.0)
+    if ka == "via" and kb == "pad":
+        return (math.hypot(max(0.0, abs(a["x"] - b["x"]) - b["w"] / 2),
+                           max(0.0, abs(a["y"] - b["y"]) - b["h"] / 2))
+                - _radius(ka, a, rule.metric[0]))
+    # Traces and pads: the kernel's gap for the one pair (test_clearance
+    # pins it). _capsule_rect_gap misses a trace crossing a pad between its
+    # corners, and _pad_pair_gap measures nested pads differently.
+    shape = {"trace": lambda it: C.capsules([it], width="w"),
+             "pad": lambda it: C.rects([it])}
+    return float(C.gaps(shape[ka](a), shape[kb](b))[0])
+
+
+def _nets_ok(rule, a, b):
+    na, nb = a["net"], b["net"]
+    return {"differ": na != nb,
+            "differ-netted": na != nb and na != 0 and nb != 0,
+            "not-joined": na != nb or na == 0 or nb == 0,
+            "any": True}[rule.nets]
+
+
+def _brute(engine, rule):
+    """[(a index, layer, b index, gap)], structural — by double loop."""
+    A = engine.items(rule.a)
+    B = engine.items(rule.b or rule.a)
+    through = {"via", "hole"}
+    rank = {name: k for k, name in enumerate(rule.layers or ())}
+    found, structural = [], 0
+    for ia, a in enumerate(A):
+        for ib, b in enumerate(B):
+            if rule.b is None and ib <= ia:
+                continue
+            if rule.a in through and (rule.b or rule.a) in through:
+                layer = None
+            else:
+                layer = a["layer"] if rule.a not in through else b["layer"]
+                if rule.a not in through and rule.b and rule.b not in through \
+                        and b["layer"] != layer:
+                    continue
+                if rule.b is None and b["layer"] != layer:
+                    continue
+                if rule.layers is not None and layer not in rule.layers:
+                    continue
+            if not _nets_ok(rule, a, b):
+                continue
+            pa, pb = rule.where
+            if (pa and not pa(a)) or (pb and not pb(b)):
+                continue
+            gap = _gap(rule, a, b)
+            if gap >= rule.threshold:
+                continue
+            if rule.exclude and rule.exclude(a, b):
+                continue
+            if rule.structural and rule.structural(a, b):
+                structural += 1
+                continue
+            found.append((ia, rank.get(layer, 0), ib, layer, gap))
+    found.sort(key=lambda row: row[:3])
+    return [(ia, layer, ib, gap) for ia, _r, ib, layer, gap in found], structural
+
+
+class Rows(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = R.RuleEngine(_board(), ROWS)
+
+    def test_every_row_matches_the_double_loop(self):
+        for rule in ROWS:
+            with self.subTest(rule=rule.name):
+                res = self.engine.result(rule.name)
+                want, structural = _brute(self.engine, rule)
+                self.assertGreater(len(want), 3, "row too sparse to test")
+                A = {id(it): k for k, it in
+                     enumerate(self.engine.items(rule.a))}
+                B = {id(it): k for k, it in
+                     enumerate(self.engine.items(rule.b or rule.a))}
+                got = [(A[id(h.a)], h.layer, B[id(h.b)]) for h in res.hits]
+                self.assertEqual(got, [row[:3] for row in want])
+                for h, row in zip(res.hits, want):
+                    self.assertAlmostEqual(h.gap, row[3], places=9)
+                self.assertEqual(res.structural, structural)
+
+    def test_rows_on_the_same_kinds_share_one_sweep(self):
+        calls = []
+        real = R.pairs
+
+        def counting(*args, **kwargs):
+            calls.append(kwargs.get("threshold"))
+            return real(*args, **kwargs)
+
+        with mock.patch.object(R, "pairs", counting):
+            for rule in ROWS:
+                self.engine.result(rule.name)
+        self.assertEqual(len(calls), len(self.engine.passes()))
+        self.assertLess(len(calls), len(ROWS))
+        # each sweep runs at the loosest threshold of its rows
+        self.assertIn(0.3, calls)
+
+    def test_timing_covers_every_row(self):
+        rows = self.engine.timing()
+        self.assertEqual(sorted(name for name, _p, _s in rows),
+                         sorted(rule.name for rule in ROWS))
+        self.assertEqual([s for _n, _p, s in rows],
+                         sorted((s for _n, _p, s in rows), reverse=True))
+
+
+class Holes(unittest.TestCase):
+
+    def test_a_pad_on_two_layers_is_one_hole(self):
+        board = _board()
+        holes = R.hole_items(board)
+        pads = [p for p in board["pads"] if p["type"] != "smd"]
+        self.assertEqual(len(holes), len(board["vias"]) + len(pads) // 2)
+        self.assertEqual([h["type"] for h in holes[:len(board["vias"])]],
+                         ["via"] * len(board["vias"]))
+
+
+class Table(unittest.TestCase):
+
+    def test_malformed_rows_are_refused(self):
+        for rows in (
+            (R.Rule("x", "trace"), R.Rule("x", "pad")),
+            (R.Rule("x", "trace", ("F.Cu",)),),
+            (R.Rule("x", "trace", nets="others"),),
+            (R.Rule("x", "trace", metric=("drill", "copper")),),
+            (R.Rule("x", "via", layers=("F.Cu",)),),
+        ):
+            with self.subTest(rows=rows):
+                with self.assertRaises(ValueError):
+                    R.RuleEngine(_board(), rows)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+"""Regression tests for the gate daemon (gate_daemon.py).
+
+A gate run on the daemon must be indistinguishable from the same gate run
+as `python3 scripts/<gate>.py` — otherwise a warm rerun and a cold one can
+disagree about the board, and the fast path is worse than no path. So:
+
+  Identity  — exit code, stdout and stderr match a fresh interpreter's,
+              argv included.
+  Isolation — a module global set by one gate is not visible to the next;
+              each runs in its own fork of the warm parent.
+  Exit      — the gate's atexit handlers and weakref finalizers run and
+              their output is kept, as at a fresh interpreter's exit.
+  Crashes   — an uncaught exception is a traceback from the gate itself,
+              exit 1, and the daemon keeps serving.
+  Timeouts  — a gate past its deadline is killed and reported as rc None.
+  Fallback  — with no daemon (or GATE_DAEMON=0) run_gate() still runs the
+              gate, as a subprocess.
+
+The gates used here are throwaway scripts written into scripts/ for the
+duration of a test and removed after it.
+
+Usage:
+    python3 scripts/test_gate_daemon.py
+    python3 -m unittest scripts.test_gate_daemon
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gate_daemon as G  # noqa: E402
+
+
+class Daemon(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp(prefix="gate_daemon_test_")
+        cls.sock = os.path.join(cls.tmp, "d.sock")
+        cls.patch = mock.patch.object(G, "SOCKET_PATH", cls.sock)
+        cls.patch.start()
+        env = dict(os.environ, GATE_DAEMON_SOCKET=cls.sock)
+        cls.proc = subprocess.Popen(
+            [sys.executable, G.__file__, "serve", "--jobs", "2"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 60
+        while G.ping() is None:
+            if time.monotonic() > deadline or cls.proc.poll() is not None:
+                raise RuntimeError("gate daemon did not start")
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        list(G._request({"op": "stop"}))
+        try:
+            cls.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            cls.proc.kill()
+        cls.patch.stop()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def gate(self, body):
+        name = f"_test_gate_{uuid.uuid4().hex[:8]}"
+        path = os.path.join(G.SCRIPTS_DIR, f"{name}.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(body))
+        self.addCleanup(os.unlink, path)
+        return name
+
+    def on_daemon(self, gate, timeout=None):
+        (r,) = list(G.run_gates([gate], timeout))
+        return r
+
+    def test_same_result_as_a_fresh_interpreter(self):
+        name = self.gate("""
+            import os, sys
+            print("argv", sys.argv[1:], os.path.basename(os.getcwd()))
+            print("FAIL  something", file=sys.stderr)
+            sys.exit(3)
+        """)
+        warm = self.on_daemon(f"{name} --flag x")
+        cold = G._run_subprocess(f"{name} --flag x", None)
+        self.assertEqual(warm.rc, 3)
+        self.assertEqual((warm.rc, warm.stdout, warm.stderr),
+                         (cold.rc, cold.stdout, cold.stderr))
+
+    def test_module_globals_do_not_leak_between_gates(self):
+        name = self.gate("""
+            import sys
+            import pcb_cache
+            seen = getattr(pcb_cache, "_leak", None)
+            pcb_cache._leak = "set by an earlier gate"
+            sys.exit(1 if seen else 0)
+        """)
+        for r in G.run_gates([name, name, name]):
+            self.assertEqual(r.rc, 0)
+
+    def test_exit_handlers_run_as_at_interpreter_exit(self):
+        name = self.gate("""
+            import atexit, sys, weakref
+
+            class Scratch:
+                pass
+
+            scratch = Scratch()
+            weakref.finalize(scratch, print, "finalized")
+            atexit.register(print, "cleaned up", file=sys.stderr)
+            print("body")
+            sys.exit(4)
+        """)
+        warm = self.on_daemon(name)
+        cold = G._run_subprocess(name, None)
+        self.assertEqual((warm.rc, warm.stdout, warm.stderr),
+                         (4, "body\nfinalized\n", "cleaned up\n"))
+        self.assertEqual((warm.rc, warm.stdout, warm.stderr),
+                         (cold.rc, cold.stdout, cold.stderr))
+
+    def test_a_crash_is_the_gate_s_traceback(self):
+        name = self.gate("""
+            def main():
+                raise ValueError("boom")
+            main()
+        """)
+        r = self.on_daemon(name)
+        self.assertEqual(r.rc, 1)
+        self.assertTrue(r.stderr.startswith("Traceback"))
+        self.assertIn("ValueError: boom", r.stderr)
+        self.assertNotIn("gate_daemon.py", r.stderr)
+        self.assertEqual(self.on_daemon(self.gate("pass\n")).rc, 0)
+
+    def test_a_missing_gate_fails_like_python(self):
+        r = self.on_daemon("_no_such_gate")
+        self.assertEqual(r.rc, 2)
+        self.assertIn("can't open file", r.stderr)
+
+    def test_timeout_kills_the_gate(self):
+        name = self.gate("import time\ntime.sleep(30)\n")
+        t0 = time.monotonic()
+        r = self.on_daemon(name, timeout=0.3)
+        self.assertIsNone(r.rc)
+        self.assertLess(time.monotonic() - t0, 10)
+
+    def test_run_gate_falls_back_without_a_daemon(self):
+        name = self.gate("print('cold')\n")
+        with mock.patch.dict(os.environ, {"GATE_DAEMON": "0"}):
+            self.assertIsNone(G.ping())
+            r = G.run_gate(name)
+        self.assertEqual((r.rc, r.stdout), (0, "cold\n"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,174 @@
+"""Regression tests for the in-process gate registry (gate_registry.py).
+
+Running a gate inside an existing process is only worth having if it says
+what `python3 scripts/<gate>.py` says. So the tests pin:
+
+  Verdicts  — exit code and verdict match a fresh interpreter's, for a
+              pass, a fail, a crash and a missing script.
+  Isolation — module-level PASS/FAIL counters start from zero on every
+              run, in-process and in forked workers alike.
+  Findings  — a gate's check(name, ok, detail) calls come back as data;
+              a gate without that helper is described by its FAIL lines.
+  Timeouts  — in forked mode a gate past its deadline, counted from its
+              own start, is killed and reported TIMEOUT with what it
+              printed, and the gates queued behind it still run.
+  Exit      — a forked worker runs the gate's atexit handlers into its
+              output, and not the ones it inherited from the parent.
+  Board     — inside a BoardContext, pcb_cache.load_cache() is answered
+              from the context without touching the board file again.
+
+The gates used here are throwaway scripts written into scripts/ for the
+duration of a test and removed after it.
+
+Usage:
+    python3 scripts/test_gate_registry.py
+    python3 -m unittest scripts.test_gate_registry
+"""
+
+import atexit
+import functools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gate_registry as R  # noqa: E402
+import pcb_cache  # noqa: E402
+
+COUNTER_GATE = """
+    import sys
+    PASS = 0
+    FAIL = 0
+
+    def check(name, condition, detail=""):
+        global PASS, FAIL
+        if condition:
+            PASS += 1
+        else:
+            FAIL += 1
+            print(f"  FAIL  {name}: {detail}")
+
+    if __name__ == "__main__":
+        check("one", True)
+        check("two", "--bad" not in sys.argv, "asked to fail")
+        check("three", True, "fine")
+        print(f"{PASS} passed, {FAIL} failed")
+        sys.exit(1 if FAIL else 0)
+"""
+
+
+class Registry(unittest.TestCase):
+
+    def gate(self, body):
+        name = f"_test_gate_{uuid.uuid4().hex[:8]}"
+        path = os.path.join(R.SCRIPTS_DIR, f"{name}.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(body))
+        self.addCleanup(os.unlink, path)
+        return name
+
+    def cold(self, gate):
+        script, *args = gate.split()
+        return subprocess.run(
+            [sys.executable, os.path.join(R.SCRIPTS_DIR, f"{script}.py"),
+             *args], cwd=R.PROJECT_DIR, capture_output=True, text=True)
+
+    def test_verdicts_match_a_fresh_interpreter(self):
+        gates = {
+            self.gate("print('ok')\n"): "PASS",
+            self.gate("import sys\nprint('FAIL  x')\nsys.exit(2)\n"): "FAIL",
+            self.gate("raise KeyError('boom')\n"): "ERROR",
+        }
+        for r in R.run_gates(gates, jobs=1):
+            with self.subTest(gate=r.name):
+                self.assertEqual(r.verdict, gates[r.name])
+                self.assertEqual(r.rc, self.cold(r.name).returncode)
+        (r,) = R.run_gates(["_no_such_gate"], jobs=1)
+        self.assertEqual((r.verdict, r.rc), ("MISSING", None))
+
+    def test_counters_start_from_zero_every_run(self):
+        name = self.gate(COUNTER_GATE)
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                results = list(R.run_gates([name, name], jobs=jobs))
+                for r in results:
+                    self.assertEqual((r.verdict, r.passed, r.failed),
+                                     ("PASS", 3, 0))
+                    self.assertIn("3 passed, 0 failed", r.output)
+
+    def test_checks_are_recorded_as_data(self):
+        name = self.gate(COUNTER_GATE)
+        (r,) = R.run_gates([f"{name} --bad"], jobs=1)
+        self.assertEqual((r.verdict, r.rc), ("FAIL", 1))
+        self.assertEqual((r.passed, r.failed), (2, 1))
+        self.assertEqual(r.findings, ["two  asked to fail"])
+
+    def test_gates_without_check_report_their_fail_lines(self):
+        name = self.gate("""
+            import sys
+            print("header")
+            print("  U2   FAIL  rotation 90")
+            print("FAIL  J4 rotation 180")
+            print("1 failure(s)")
+            sys.exit(1)
+        """)
+        (r,) = R.run_gates([name], jobs=1)
+        self.assertIsNone(r.passed)
+        self.assertEqual(r.findings,
+                         ["U2   FAIL  rotation 90", "FAIL  J4 rotation 180"])
+
+    def test_a_hung_gate_is_killed_and_the_queue_moves_on(self):
+        hang = """
+            import time
+            print("hanging", flush=True)
+            time.sleep(60)
+        """
+        names = [self.gate(hang), self.gate(hang), self.gate("print('ok')\n")]
+        t0 = time.monotonic()
+        results = list(R.run_gates(names, jobs=2, timeout=1, context=False))
+        self.assertLess(time.monotonic() - t0, 10)
+        self.assertEqual([r.name for r in results], names)
+        self.assertEqual([r.verdict for r in results],
+                         ["TIMEOUT", "TIMEOUT", "PASS"])
+        for r in results[:2]:
+            self.assertIsNone(r.rc)
+            self.assertLess(r.seconds, 5)
+            self.assertIn("hanging", r.output)
+
+    def test_a_worker_runs_the_gate_s_exit_handlers_only(self):
+        tmp = tempfile.mkdtemp(prefix="gate_registry_test_")
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        marker = os.path.join(tmp, "parent handler ran")
+        inherited = functools.partial(open, marker, "w")
+        atexit.register(inherited)
+        self.addCleanup(atexit.unregister, inherited)
+        name = self.gate("""
+            import atexit
+            atexit.register(print, "cleaned up")
+            print("body")
+        """)
+        (r,) = R.run_gates([name], jobs=2)
+        self.assertEqual((r.verdict, r.output), ("PASS", "body\ncleaned up\n"))
+        self.assertFalse(os.path.exists(marker), "ran the parent's handler")
+
+    def test_board_context_answers_load_cache(self):
+        real = pcb_cache.load_cache
+        ctx = R.BoardContext()
+        with ctx.active():
+            with mock.patch.object(pcb_cache, "_sha256",
+                                   side_effect=AssertionError("hashed")):
+                first = pcb_cache.load_cache()
+                self.assertEqual(len(first["vias"]), len(ctx.cache["vias"]))
+        self.assertIs(pcb_cache.load_cache, real)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
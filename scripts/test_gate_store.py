@@ -0,0 +1,191 @@
+"""Regression tests for incremental verification (gate_store.py).
+
+A replayed verdict is only safe if every input the gate depends on is in
+its record. So the tests pin:
+
+  Tracing — files a gate reads are inputs, files it writes are not, the
+            parse cache stands for the board, and the repo modules it
+            uses are inputs too; a path the gate only probes for is an
+            input by whether it exists, but a board is always a content
+            input, even when its consumer answers from memory.
+  Replay  — an unchanged gate replays its verdict and output; a changed
+            input, a touched-but-identical one aside, reruns it; --force
+            reruns everything.
+  Opaque  — a gate that starts another Python script, and one that
+            crashes, are never stored.
+
+The gates used here are throwaway scripts (and data files) written into
+scripts/ for the duration of a test and removed after it.
+
+Usage:
+    python3 scripts/test_gate_store.py
+    python3 -m unittest scripts.test_gate_store
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gate_store as S  # noqa: E402
+
+BOARD = os.path.join("hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
+
+
+class Store(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="gate_store_test_")
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.store_path = os.path.join(self.tmp, "results.json")
+
+    def file(self, suffix, text):
+        name = f"_test_gate_{uuid.uuid4().hex[:8]}"
+        path = os.path.join(S.SCRIPTS_DIR, f"{name}{suffix}")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(text))
+        self.addCleanup(os.unlink, path)
+        return name, path
+
+    def run_gate(self, name, force=False):
+        (r,) = S.run_gates([name], jobs=1, force=force,
+                           store=S.ResultStore(self.store_path))
+        return r
+
+    def reader(self):
+        """A gate that prints the first line of a data file it reads."""
+        data, data_path = self.file(".txt", "v1\n")
+        name, _ = self.file(".py", f"""
+            import os, sys
+            here = os.path.dirname(os.path.abspath(__file__))
+            with open(os.path.join(here, "{data}.txt")) as f:
+                line = f.readline().strip()
+            with open(os.path.join(here, "{data}.out"), "w") as f:
+                f.write(line)
+            print("read", line)
+            sys.exit(0 if line == "v1" else 1)
+        """)
+        out = os.path.join(S.SCRIPTS_DIR, f"{data}.out")
+        self.addCleanup(lambda: os.path.exists(out) and os.unlink(out))
+        return name, data_path
+
+    def test_inputs_are_what_the_gate_read(self):
+        name, data_path = self.reader()
+        r = self.run_gate(name)
+        keys = set(r.inputs)
+        self.assertIn(os.path.relpath(data_path, S.PROJECT_DIR), keys)
+        self.assertIn(f"scripts/{name}.py", keys)
+        self.assertFalse(any(k.endswith(".out") for k in keys))
+        self.assertNotIn("scripts/test_gate_store.py", keys)   # the harness
+
+    def test_the_parse_cache_stands_for_the_board(self):
+        name, _ = self.file(".py", """
+            import pcb_cache
+            print(len(pcb_cache.load_cache()["vias"]))
+        """)
+        keys = set(self.run_gate(name).inputs)
+        self.assertBoardIsContent(keys)
+        self.assertIn("scripts/pcb_cache.py", keys)
+        self.assertFalse(any(".pcb_cache" in k for k in keys))
+
+    def assertBoardIsContent(self, keys):
+        """The board is a content input, never only an existence probe."""
+        self.assertIn(BOARD, keys)
+        self.assertFalse([k for k in keys if k.startswith("exists:")
+                          and k.endswith(".kicad_pcb")], keys)
+
+    def test_a_reported_board_is_content_unopened(self):
+        name, _ = self.file(".py", f"""
+            import os, sys
+            board = os.path.join({S.PROJECT_DIR!r}, {BOARD!r})
+            sys.audit("pcb.board", board)       # a memo hit: nothing read
+            print(os.path.exists(board))
+        """)
+        self.assertBoardIsContent(set(self.run_gate(name).inputs))
+
+    def test_a_probed_board_is_content(self):
+        name, _ = self.file(".py", f"""
+            import os
+            print(os.path.exists(os.path.join({S.PROJECT_DIR!r}, {BOARD!r})))
+        """)
+        self.assertBoardIsContent(set(self.run_gate(name).inputs))
+
+    @unittest.skipUnless(importlib.util.find_spec("shapely"),
+                         "pcb_copper_graph needs shapely")
+    def test_a_graph_memo_hit_still_records_the_board(self):
+        gates = [self.file(".py", """
+            import pcb_copper_graph
+            print(len(pcb_copper_graph.board_graph().groups))
+        """)[0] for _ in range(2)]
+        results = list(S.run_gates(gates, jobs=1,
+                                   store=S.ResultStore(self.store_path)))
+        for r in results:                   # the second one is a memo hit
+            with self.subTest(gate=r.name):
+                self.assertEqual(r.verdict, "PASS")
+                self.assertBoardIsContent(set(r.inputs))
+
+    def test_unchanged_inputs_replay(self):
+        name, data_path = self.reader()
+        first = self.run_gate(name)
+        self.assertFalse(first.cached)
+        again = self.run_gate(name)
+        self.assertTrue(again.cached)
+        self.assertEqual((again.verdict, again.output),
+                         (first.verdict, first.output))
+        with open(data_path, "w") as f:       # same bytes, new mtime
+            f.write("v1\n")
+        self.assertTrue(self.run_gate(name).cached)
+        self.assertFalse(self.run_gate(name, force=True).cached)
+
+    def test_a_changed_input_reruns(self):
+        name, data_path = self.reader()
+        self.assertEqual(self.run_gate(name).verdict, "PASS")
+        with open(data_path, "w") as f:
+            f.write("v2\n")
+        r = self.run_gate(name)
+        self.assertEqual((r.verdict, r.cached), ("FAIL", False))
+        self.assertIn("read v2", r.output)
+
+    def test_a_probed_file_appearing_or_going_reruns(self):
+        data, data_path = self.file(".flag", "")
+        name, _ = self.file(".py", f"""
+            import os, pathlib, sys
+            here = pathlib.Path(__file__).resolve().parent
+            found = (here / "{data}.flag").exists()
+            print("found" if found else "missing")
+            sys.exit(0 if found else 1)
+        """)
+        self.assertIn(f"exists:scripts/{data}.flag",
+                      self.run_gate(name).inputs)
+        self.assertTrue(self.run_gate(name).cached)
+        os.unlink(data_path)
+        r = self.run_gate(name)
+        self.assertEqual((r.verdict, r.cached), ("FAIL", False))
+        self.assertTrue(self.run_gate(name).cached)
+        with open(data_path, "w"):
+            pass
+        r = self.run_gate(name)
+        self.assertEqual((r.verdict, r.cached), ("PASS", False))
+
+    def test_opaque_and_crashed_gates_are_not_stored(self):
+        sub, _ = self.file(".py", """
+            import subprocess, sys
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+        """)
+        crash, _ = self.file(".py", "raise RuntimeError('boom')\n")
+        self.assertIsNone(self.run_gate(sub).inputs)
+        self.assertEqual(self.run_gate(crash).verdict, "ERROR")
+        for name in (sub, crash):
+            with self.subTest(gate=name):
+                self.assertFalse(self.run_gate(name).cached)
+                self.assertNotIn(name, S.ResultStore(self.store_path).entries)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
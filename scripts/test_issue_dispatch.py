@@ -11,7 +11,9 @@ thinks. These tests break it on purpose and require it to notice:
     (an empty suite and a healthy board print the same thing);
   * a declared exception must beat the law, or exceptions are decoration;
   * severity must separate "the board is dead" from "the board is warm",
-    or every finding is equally urgent and none is.
+    or every finding is equally urgent and none is;
+  * run_gate() must actually run the gate — PASS, FAIL and MISSING from
+    its exit code — not just exist for main() to be mocked around.
 
 Run: python3 scripts/test_issue_dispatch.py
 """
@@ -147,6 +149,35 @@ class ProposalsSurvive(unittest.TestCase):
             shutil.rmtree(tmp)
 
 
+class RunGate(unittest.TestCase):
+    """The gates themselves, cold (GATE_DAEMON=0): no daemon to depend on."""
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"GATE_DAEMON": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_a_real_gate_passes(self):
+        r = D.run_gate("verify_polarity")
+        self.assertEqual((r["gate"], r["status"], r["rc"]),
+                         ("verify_polarity", "PASS", 0))
+        self.assertTrue(r["log"])
+
+    def test_a_failing_gate_is_fail_with_its_log(self):
+        name = "_test_dispatch_fail"
+        path = os.path.join(PROJECT_DIR, "scripts", f"{name}.py")
+        with open(path, "w") as f:
+            f.write("import sys\nprint('FAIL  the board')\nsys.exit(1)\n")
+        self.addCleanup(os.unlink, path)
+        r = D.run_gate(name)
+        self.assertEqual((r["status"], r["rc"]), ("FAIL", 1))
+        self.assertEqual(D.evidence(r["log"]), ["FAIL  the board"])
+
+    def test_a_missing_gate_is_missing(self):
+        r = D.run_gate("verify_no_such_gate")
+        self.assertEqual((r["status"], r["rc"]), ("MISSING", None))
+
+
 class Briefing(unittest.TestCase):
 
     def _finding(self, **over):
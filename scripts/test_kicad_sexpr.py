@@ -0,0 +1,137 @@
+"""Regression tests for the shared S-expression tokenizer (kicad_sexpr.py).
+
+Ten parsers moved onto one structural scan. The scan is only allowed to be
+faster, never different, so the tests pin three things:
+
+  Equivalence — on the real board, ``blocks()`` returns exactly what the old
+                per-module char-walker returned, for every block kind the
+                parsers ask for.
+  Backends    — the NumPy scan and the pure-Python scan agree paren for
+                paren, so a machine without NumPy gets the same verdicts.
+  Strings     — a paren inside a quoted string is text. The old walkers
+                counted it; a property value like ``"(DNP"`` would have
+                swallowed the rest of the board into one footprint.
+
+Usage:
+    python3 scripts/test_kicad_sexpr.py
+    python3 -m unittest scripts.test_kicad_sexpr
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import kicad_sexpr as K  # noqa: E402
+
+PCB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                   "hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
+
+
+def _old_blocks(src, tok):
+    """The char-walker every parser used to carry (verbatim semantics)."""
+    out, i = [], 0
+    while True:
+        i = src.find(tok, i)
+        if i < 0:
+            return out
+        depth, j = 0, i
+        while j < len(src):
+            c = src[j]
+            if c == "(":
+                depth += 1
+            elif c == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        out.append(src[i:j + 1])
+        i = j + 1
+
+
+class RealBoardEquivalence(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text = K.read_text(PCB)
+        cls.idx = K.SexprIndex(cls.text)
+
+    def test_blocks_match_the_old_walker(self):
+        for tok in ("(footprint ", "(zone", "(via", "(segment",
+                    "(gr_text", "(net "):
+            with self.subTest(tok=tok):
+                self.assertEqual(self.idx.blocks(tok),
+                                 _old_blocks(self.text, tok))
+
+    def test_bounded_lookup_matches_a_rescan_of_the_block(self):
+        for fs, fe in self.idx.find_blocks("(footprint ")[:20]:
+            block = self.text[fs:fe + 1]
+            self.assertEqual(self.idx.blocks('(pad "', fs, fe),
+                             _old_blocks(block, '(pad "'))
+
+    def test_top_level_stream_covers_every_item_once(self):
+        heads = [h for h, _, _ in self.idx.top_level()]
+        self.assertEqual(heads.count("footprint"),
+                         len(self.idx.find_blocks("(footprint ")))
+        # Every item is closed before the next one opens.
+        spans = self.idx.top
+        self.assertTrue(all(a[1] < b[0] for a, b in zip(spans, spans[1:])))
+
+    def test_python_and_numpy_scans_agree(self):
+        if K.np is None:
+            self.skipTest("numpy not installed")
+        self.assertEqual(dict(K._scan_numpy(self.text)),
+                         dict(K._scan_python(self.text)))
+
+
+class StringsAreText(unittest.TestCase):
+
+    SRC = ('(kicad_pcb (footprint "A" (property "Value" "(DNP")'
+           ' (pad "1" smd rect))'
+           ' (footprint "B" (pad "2" smd rect)))')
+
+    def test_paren_in_a_string_does_not_unbalance_the_block(self):
+        fps = K.blocks(self.SRC, "(footprint ")
+        self.assertEqual(len(fps), 2)
+        self.assertTrue(fps[0].endswith('(pad "1" smd rect))'))
+
+    def test_both_scanners_honour_strings(self):
+        py = dict(K._scan_python(self.SRC))
+        if K.np is not None:
+            self.assertEqual(dict(K._scan_numpy(self.SRC)), py)
+        self.assertEqual(len(py), self.SRC.count("(") - 1)
+
+    def test_unbalanced_text_is_an_error_not_a_guess(self):
+        with self.assertRaises(K.SexprError):
+            K.SexprIndex("(kicad_pcb (via (at 1 2)")
+        with self.assertRaises(K.SexprError):
+            K.SexprIndex("(a))")
+
+
+class TypedTree(unittest.TestCase):
+
+    def test_parse_types_and_offsets(self):
+        src = '(via (at 1.5 -2) (net 3 "GND") (uuid "x\\"y"))'
+        root = K.parse(src)
+        self.assertEqual(root.head, "via")
+        self.assertEqual((root.start, root.end), (0, len(src) - 1))
+        at = root.find("at")
+        self.assertEqual((at.number(0), at.number(1)), (1.5, -2.0))
+        self.assertEqual(src[at.start:at.end + 1], "(at 1.5 -2)")
+        net = root.find("net")
+        self.assertIsInstance(net.atoms()[0], K.Symbol)
+        self.assertNotIsInstance(net.atoms()[1], K.Symbol)
+        self.assertEqual(net.atoms()[1], "GND")
+        self.assertEqual(root.find("uuid").atoms()[0], 'x"y')
+
+    def test_tree_agrees_with_the_index(self):
+        text = K.read_text(PCB)
+        root = K.parse(text)
+        idx = K.index(text)
+        self.assertEqual([(c.start, c.end) for c in root.children()],
+                         idx.top)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Regression tests for the opt-in maze router (generate_pcb/routing/autoroute.py).
+
+_maze_route() is only useful if what it finds would pass the same checks
+as hand-placed copper, so the tests pin, against the fully routed board:
+
+  Clean    — routes between real pads come back Manhattan, pad to pad,
+             with no collision-grid violations, and placing them reports
+             none either.
+  Barriers — a route across the FPC slot goes round it; one into the slot
+             is refused.
+  Queued   — copper the current domain has queued under record() but not
+             placed is avoided like placed copper, but emit() refuses to
+             place a route there.
+  Stable   — the same request gives the same route, and source() is the
+             calls emit() makes.
+  Tail     — sliding the last line onto the off-grid end pad leaves no
+             leg shorter than the pitch, vias on the line included.
+  CLI      — the docstring's example routes; an unknown net, pad, layer or
+             malformed point is a usage error (exit 2), and no route is one
+             ERROR line (exit 1), never a traceback.
+
+Run: python3 scripts/test_maze_route.py
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.generate_pcb import primitives as P                 # noqa: E402
+from scripts.generate_pcb import routing                         # noqa: E402
+from scripts.generate_pcb.routing import _shared                 # noqa: E402
+from scripts.generate_pcb.routing import autoroute as A          # noqa: E402
+
+PAIRS = [
+    ("LED3_RA", ("R28", "1"), ("LED3", "2"), A.W_DATA),
+    ("USB_CC1", ("J1", "4"), ("R1", "1"), A.W_DATA),
+    ("SPK+", ("U5", "16"), ("SPK1", "1"), A.W_AUDIO),
+]
+
+
+def _routed_board():
+    """generate_all_traces(), quietly, with the UUID counter rewound."""
+    mark = P.uid_mark()
+    with contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        routing.generate_all_traces()
+    P.uid_restore(mark)
+
+
+def _ends(route):
+    segs = [args for kind, args in route.steps if kind == "segment"]
+    return segs[0][:2], segs[-1][2:4]
+
+
+@unittest.skipIf(A.np is None, "the maze router needs NumPy")
+class MazeRoute(unittest.TestCase):
+
+    def setUp(self):
+        _routed_board()
+
+    def test_routes_are_clean_manhattan_pad_to_pad(self):
+        for net, start, end, width in PAIRS:
+            with self.subTest(net=net):
+                route = A._maze_route(net, start, end, width=width)
+                self.assertEqual(route.violations, [])
+                for kind, args in route.steps:
+                    if kind == "segment":
+                        x1, y1, x2, y2, _layer = args
+                        self.assertTrue(x1 == x2 or y1 == y2, args)
+                first, last = _ends(route)
+                self.assertEqual(first, tuple(round(v, 4)
+                                              for v in _shared._pad(*start)))
+                self.assertEqual(last, tuple(round(v, 4)
+                                             for v in _shared._pad(*end)))
+
+    def test_placing_a_route_reports_nothing(self):
+        net, start, end, width = PAIRS[2]
+        route = A._maze_route(net, start, end, width=width)
+        before = len(_shared._GRID.violations)
+        parts = route.emit()
+        self.assertEqual(len(parts), len(route.steps))
+        self.assertEqual(_shared._GRID.violations[before:], [])
+
+    def test_the_slot_is_routed_round(self):
+        route = A._maze_route("SD_CS", (120.0, 35.0, "F.Cu"),
+                              (134.0, 35.0, "F.Cu"), layers=("F.Cu",))
+        self.assertEqual(route.violations, [])
+        length = sum(abs(x2 - x1) + abs(y2 - y1)
+                     for kind, (x1, y1, x2, y2, _l) in route.steps
+                     if kind == "segment")
+        self.assertGreater(length, 14.0 + 2 * 11.0)
+
+    def test_a_route_into_the_slot_is_refused(self):
+        with self.assertRaisesRegex(RuntimeError, "no route"):
+            A._maze_route("SD_CS", (120.0, 35.0, "F.Cu"),
+                          (127.0, 35.0, "F.Cu"), layers=("F.Cu",))
+
+    def test_queued_copper_is_avoided(self):
+        start, end = (30.0, 10.0, "F.Cu"), (40.0, 10.0, "F.Cu")
+        free = A._maze_route("SD_CS", start, end, layers=("F.Cu",))
+        self.assertEqual(len(free.steps), 1)
+        with _shared._GRID.record():
+            _shared._seg(35.0, 5.0, 35.0, 15.0, "F.Cu", A.W_DATA,
+                         _shared.NET_ID["SD_MOSI"])
+            route = A._maze_route("SD_CS", start, end, layers=("F.Cu",))
+        xs = [args[0] for kind, args in route.steps if kind == "via"]
+        self.assertTrue(xs or len(route.steps) > 1)
+        for kind, args in route.steps:
+            if kind == "segment" and args[1] == args[3]:
+                self.assertFalse(min(args[0], args[2]) < 35.0
+                                 < max(args[0], args[2])
+                                 and 5.0 - 0.3 < args[1] < 15.0 + 0.3,
+                                 f"crosses the queued track: {args}")
+
+    def test_emit_is_refused_inside_a_domain(self):
+        net, start, end, width = PAIRS[1]
+        route = A._maze_route(net, start, end, width=width)
+        with _shared._GRID.record() as pieces:
+            with self.assertRaisesRegex(RuntimeError, "source()"):
+                route.emit()
+        self.assertEqual(pieces, [])
+
+    def test_the_same_request_gives_the_same_route(self):
+        net, start, end, width = PAIRS[1]
+        one = A._maze_route(net, start, end, width=width)
+        two = A._maze_route(net, start, end, width=width)
+        self.assertEqual(one.steps, two.steps)
+
+    def test_source_is_the_calls_emit_makes(self):
+        net, start, end, width = PAIRS[1]
+        route = A._maze_route(net, start, end, width=width)
+        calls = []
+        scope = {
+            "NET_ID": _shared.NET_ID, "parts": [],
+            "_seg": lambda *a: calls.append(("segment", a)),
+            "_via_net": lambda *a: calls.append(("via", a)),
+            **{name: w for name, w in A.WIDTH_CLASSES.values()},
+            "VIA_STD": A.VIA_STD, "VIA_STD_DRILL": A.VIA_STD_DRILL,
+            "VIA_PWR": A.VIA_PWR, "VIA_PWR_DRILL": A.VIA_PWR_DRILL,
+        }
+        exec(route.source(), scope)
+        want = [("via", (*args, route.net, route.via_size, route.via_drill))
+                if kind == "via" else
+                ("segment", (*args, route.width, route.net))
+                for kind, args in route.steps]
+        self.assertEqual(calls, want)
+
+    def test_no_leg_is_shorter_than_the_pitch(self):
+        # LCD_D1's last line starts at a via, which has to slide with it
+        for net, start, end, width in PAIRS + [
+                ("LCD_D1", ("J4", "23"), ("U1", "5"), A.W_DATA)]:
+            with self.subTest(net=net):
+                route = A._maze_route(net, start, end, width=width)
+                self.assertEqual(route.violations, [])
+                self.assertEqual(A._slivers(route, A.PITCH), [])
+                self.assertEqual(_ends(route)[1], tuple(
+                    round(v, 4) for v in _shared._pad(*end)))
+
+
+@unittest.skipIf(A.np is None, "the maze router needs NumPy")
+class Cli(unittest.TestCase):
+
+    def run_main(self, *argv):
+        mark = P.uid_mark()
+        self.addCleanup(P.uid_restore, mark)
+        with contextlib.redirect_stdout(io.StringIO()) as out, \
+                contextlib.redirect_stderr(io.StringIO()) as err:
+            try:
+                rc = A.main(list(argv))
+            except SystemExit as e:
+                rc = e.code
+        return rc, out.getvalue(), err.getvalue()
+
+    def test_the_example_routes(self):
+        rc, out, _ = self.run_main("LCD_D1", "J4.23", "U1.5")
+        self.assertEqual(rc, 0)
+        self.assertIn("_seg(", out)
+
+    def test_bad_arguments_are_usage_errors(self):
+        for argv, said in ((("NOPE", "U1.21", "U6.2"), "unknown net NOPE"),
+                           (("SD_CS", "U1.999", "U6.2"), "no pad U1.999"),
+                           (("SD_CS", "1,2", "U6.2"), "bad endpoint"),
+                           (("SD_CS", "U1.21", "U6.2", "--layers", "Q.Cu"),
+                            "unknown layer Q.Cu")):
+            with self.subTest(argv=argv):
+                rc, _, err = self.run_main(*argv)
+                self.assertEqual(rc, 2)
+                self.assertIn(said, err)
+                self.assertNotIn("Traceback", err)
+
+    def test_no_route_is_one_error_line(self):
+        rc, out, err = self.run_main("SD_CS", "U1.21", "U6.2")
+        self.assertEqual(rc, 1)
+        self.assertEqual(out, "")
+        self.assertTrue(err.startswith("ERROR: no route for SD_CS"))
+        self.assertEqual(err.count("\n"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Regression tests for the footprint pad tables (generate_pcb/footprints.py).
+
+_compute_pads() and get_pads_and_layers() no longer call gen() and regex
+each pad per placement: they transform a table parsed once per footprint
+type. Every routed coordinate and every pad box flows from those numbers,
+so the tests pin them against the per-pad arithmetic they replaced:
+
+  Numbers  — place_pads() gives, float for float, what gen() + regex +
+             per-pad trig gave, for every footprint, side and rotation,
+             with NumPy and without.
+  UUIDs    — a placement still advances the UUID counter by what gen()
+             draws, whether or not the table was already parsed.
+  Lookup   — _PAD_POS_LOOKUP, keyed by _pad_key(), groups the board's pads
+             exactly as the round(v, 2) keys did.
+
+Run: python3 scripts/test_pad_tables.py
+"""
+import contextlib
+import io
+import math
+import os
+import re
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.generate_pcb import footprints as FP                # noqa: E402
+from scripts.generate_pcb import primitives as P                 # noqa: E402
+
+ROTATIONS = (0, 90, 180, 270, 30, -90)
+
+
+def _per_pad(fp_name, cx, cy, rot, layer_char):
+    """The loop place_pads() replaced: [(num, x, y, (w, h) | None), ...]."""
+    rows = []
+    for pad_str in FP.FOOTPRINTS[fp_name][0](layer_char):
+        at_m = re.search(r'\(at\s+([-\d.]+)\s+([-\d.]+)\)', pad_str)
+        sz_m = re.search(r'\(size\s+([\d.]+)\s+([\d.]+)\)', pad_str)
+        num_m = re.search(r'\(pad\s+"([^"]*)"', pad_str)
+        if not at_m:
+            continue
+        rx, ry = float(at_m.group(1)), float(at_m.group(2))
+        if rot % 360 != 0:
+            rot_rad = math.radians(rot)
+            cos_r, sin_r = math.cos(rot_rad), math.sin(rot_rad)
+            rx, ry = rx * cos_r - ry * sin_r, rx * sin_r + ry * cos_r
+        if layer_char == "B":
+            rx = -rx
+        size = None
+        if sz_m:
+            size = (float(sz_m.group(1)), float(sz_m.group(2)))
+            if abs(rot % 360) in (90, 270):
+                size = size[::-1]
+        rows.append((num_m.group(1) if num_m else None,
+                     cx + rx, cy + ry, size))
+    return rows
+
+
+def _placements():
+    for fp_name in FP.FOOTPRINTS:
+        for layer_char in "FB":
+            for rot in ROTATIONS:
+                yield fp_name, 71.35, 33.045, rot, layer_char
+
+
+class PlacedPadsMatchPerPad(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(FP._PAD_TABLES.clear)
+        self.mark = P.uid_mark()
+        self.addCleanup(P.uid_restore, self.mark)
+
+    def _check(self):
+        FP._PAD_TABLES.clear()
+        for args in _placements():
+            with self.subTest(placement=args):
+                want = _per_pad(*args)
+                self.assertTrue(want)
+                # repr: equal floats AND the same signs of zero
+                self.assertEqual(repr(FP.place_pads(*args)), repr(want))
+
+    @unittest.skipIf(FP.np is None, "the batched path needs NumPy")
+    def test_with_numpy(self):
+        self._check()
+
+    def test_without_numpy(self):
+        with mock.patch.object(FP, "np", None):
+            self._check()
+
+    def test_a_placement_draws_what_gen_draws(self):
+        for fp_name, layer_char in (("ESP32-S3-WROOM-1-N16R8", "B"),
+                                    ("R_0805", "F"), ("USB-C-16P", "B")):
+            with self.subTest(footprint=fp_name):
+                FP._PAD_TABLES.clear()
+                start = P.uid_mark()
+                FP.FOOTPRINTS[fp_name][0](layer_char)
+                drawn = P.uid_mark() - start
+                self.assertGreater(drawn, 0)
+                for _cold_then_warm in range(2):
+                    start = P.uid_mark()
+                    FP.place_pads(fp_name, 10.0, 20.0, 90, layer_char)
+                    self.assertEqual(P.uid_mark() - start, drawn)
+
+
+class PadLookup(unittest.TestCase):
+
+    def test_keys_group_the_board_pads_as_before(self):
+        from scripts.generate_pcb import routing
+        from scripts.generate_pcb.routing import _shared
+
+        mark = P.uid_mark()
+        with contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            routing.generate_all_traces()
+        P.uid_restore(mark)
+        by_round = {}
+        for ref, pads in _shared._PADS.items():
+            for num, (px, py) in pads.items():
+                by_round.setdefault((round(px, 2), round(py, 2)),
+                                    []).append((ref, num))
+        self.assertGreater(len(by_round), 300)
+        self.assertEqual(sorted(_shared._PAD_POS_LOOKUP.values()),
+                         sorted(by_round.values()))
+        for (kx, ky), refs in _shared._PAD_POS_LOOKUP.items():
+            ref, num = refs[0]
+            self.assertEqual(_shared._pad_key(*_shared._PADS[ref][num]),
+                             (kx, ky))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,224 @@
+"""Regression tests for the binary columnar PCB cache (pcb_cache.py).
+
+The cache changed format from one JSON document to mmap-able columns. About
+sixty gates read it through load_cache(), and none of them may be able to
+tell — so the tests pin:
+
+  Round-trip — every table and every small key comes back equal to what
+               parse_pcb_full() produced, value for value and type for type.
+  Compat     — the result behaves as the old dict: .get(), `in`, mutation of
+               a deep copy (the mutation suites do exactly that), json.dumps.
+  Freshness  — a changed board, a truncated file and a foreign file are all
+               rebuilt, never trusted.
+  Stat tier  — an unchanged board is validated by stat() alone, a touched
+               one costs one hash and is re-stamped, a just-written one is
+               never trusted on its timestamp, and PCB_CACHE_STRICT=1
+               always hashes.
+  Streamed   — a board written through PcbWriter in pieces is the same
+               file, with the same cache, as build_cache() of the joined
+               text; a failed write leaves the old board in place.
+
+Usage:
+    python3 scripts/test_pcb_cache.py
+    python3 -m unittest scripts.test_pcb_cache
+"""
+
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pcb_cache  # noqa: E402
+from kicad_sexpr import top_level  # noqa: E402
+
+
+class BinaryCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp(prefix="pcb_cache_test_"))
+        cls.pcb = cls.tmp / "board.kicad_pcb"
+        shutil.copy(pcb_cache._DEFAULT_PCB, cls.pcb)
+        cls.bin = cls.tmp / ".pcb_cache.bin"
+        cls.parsed = pcb_cache.parse_pcb_full(cls.pcb)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def load(self):
+        return pcb_cache.load_cache(self.pcb, self.bin)
+
+    def test_round_trip_is_exact(self):
+        pcb_cache.build_cache(self.pcb, self.bin)
+        cache = pcb_cache.read_binary(self.bin)
+        for key, want in self.parsed.items():
+            if key in ("pcb_hash", "pcb_stat"):
+                continue
+            with self.subTest(key=key):
+                self.assertEqual(cache[key], want)
+        for table in ("pads", "vias", "segments"):
+            got, want = cache[table][0], self.parsed[table][0]
+            self.assertEqual(list(got), list(want))
+            self.assertEqual([type(v) for v in got.values()],
+                             [type(v) for v in want.values()])
+
+    def test_behaves_as_the_old_dict(self):
+        cache = self.load()
+        self.assertIn("vias", cache)
+        self.assertEqual(cache.get("segments"), self.parsed["segments"])
+        self.assertEqual(cache.get("missing", "d"), "d")
+        self.assertEqual(sorted(cache), sorted(self.parsed))
+        mutated = copy.deepcopy(cache)
+        self.assertIs(type(mutated), dict)
+        mutated["vias"][0]["drill"] = 0.0
+        mutated["pads"][:] = []
+        self.assertNotEqual(self.load()["vias"][0]["drill"], 0.0)
+        self.assertTrue(self.load()["pads"])
+        doc = json.loads(json.dumps(cache))
+        self.assertEqual(doc["segments"], self.parsed["segments"])
+
+    def test_columns_are_zero_copy_views(self):
+        cache = self.load()
+        xs = cache.columns("vias").column("x")
+        self.assertIsInstance(xs, memoryview)
+        self.assertEqual(list(xs), [v["x"] for v in self.parsed["vias"]])
+        self.assertEqual(cache.columns("segments").column("layer"),
+                         [s["layer"] for s in self.parsed["segments"]])
+
+    def test_a_changed_board_is_rebuilt(self):
+        self.load()
+        original = self.pcb.read_text()
+        try:
+            self.pcb.write_text(original.replace(
+                "(via (at ", "(via (at 1", 1))
+            self.assertNotEqual(self.load()["vias"], self.parsed["vias"])
+        finally:
+            self.pcb.write_text(original)
+        self.assertEqual(self.load()["vias"], self.parsed["vias"])
+
+    def test_damaged_or_foreign_files_are_rebuilt(self):
+        pcb_cache.build_cache(self.pcb, self.bin)
+        good = self.bin.read_bytes()
+        for bad in (b"", good[:64], good[:len(good) // 2],
+                    b'{"version": 1}', b"PCBCACHE" + b"\xff" * 32):
+            with self.subTest(size=len(bad)):
+                self.bin.write_bytes(bad)
+                self.assertEqual(self.load()["pads"], self.parsed["pads"])
+
+
+class StatFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="pcb_cache_stat_"))
+        self.pcb = self.tmp / "board.kicad_pcb"
+        shutil.copy(pcb_cache._DEFAULT_PCB, self.pcb)
+        self.bin = self.tmp / ".pcb_cache.bin"
+        self.age(3600)
+        pcb_cache.build_cache(self.pcb, self.bin)
+        self.hashes = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def age(self, seconds):
+        """Backdate the board's mtime, out of the racy window."""
+        st = self.pcb.stat()
+        t = st.st_mtime_ns - seconds * 1_000_000_000
+        os.utime(self.pcb, ns=(t, t))
+
+    def load(self, **kw):
+        real = pcb_cache._sha256
+
+        def counted(path):
+            self.hashes += 1
+            return real(path)
+        with mock.patch.object(pcb_cache, "_sha256", counted):
+            return pcb_cache.load_cache(self.pcb, self.bin, **kw)
+
+    def test_unchanged_board_costs_no_hash(self):
+        self.assertTrue(self.load()["vias"])
+        self.load()
+        self.assertEqual(self.hashes, 0)
+
+    def test_strict_always_hashes(self):
+        self.load(strict=True)
+        with mock.patch.dict(os.environ, {"PCB_CACHE_STRICT": "1"}):
+            self.load()
+        self.assertEqual(self.hashes, 2)
+
+    def test_touched_board_is_hashed_once_then_restamped(self):
+        self.age(-60)    # moved, but settled: still outside the window
+        self.load()
+        self.assertEqual(self.hashes, 1)
+        self.load()
+        self.assertEqual(self.hashes, 1)
+
+    def test_just_written_board_is_never_trusted_on_its_stat(self):
+        self.pcb.write_bytes(self.pcb.read_bytes())     # mtime = now
+        self.load()
+        self.load()
+        self.assertEqual(self.hashes, 2)
+
+    def test_strict_catches_an_edit_that_kept_size_and_mtime(self):
+        st = self.pcb.stat()
+        text = self.pcb.read_text()
+        edited = text.replace("(via (at 85.0 ", "(via (at 86.0 ", 1)
+        self.assertEqual(len(edited), len(text))
+        self.pcb.write_text(edited)
+        os.utime(self.pcb, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self.load()["vias"][0]["x"], 85.0)   # documented
+        self.assertEqual(self.load(strict=True)["vias"][0]["x"], 86.0)
+
+
+class StreamedCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp(prefix="pcb_stream_test_"))
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.pcb = tmp / "board.kicad_pcb"
+        self.bin = tmp / ".pcb_cache.bin"
+        self.text = pcb_cache._DEFAULT_PCB.read_text(encoding="utf-8")
+
+    def fragments(self, every):
+        """The board cut after every `every`-th top-level item."""
+        ends = [end + 1 for _head, _start, end in top_level(self.text)]
+        cuts = [0] + ends[every - 1::every] + [len(self.text)]
+        return [self.text[i:j] for i, j in zip(cuts, cuts[1:]) if j > i]
+
+    def test_streamed_cache_equals_the_reparse(self):
+        for every in (1, 7, 10_000):
+            with self.subTest(every=every):
+                with pcb_cache.PcbWriter(self.pcb, self.bin) as out:
+                    for fragment in self.fragments(every):
+                        out.write(fragment)
+                streamed = out.store_cache()
+                self.assertEqual(self.pcb.read_text(encoding="utf-8"),
+                                 self.text)
+                built = pcb_cache.build_cache(self.pcb, self.bin)
+                for key, want in built.items():
+                    with self.subTest(key=key):
+                        self.assertEqual(streamed[key], want)
+                self.assertEqual(dict(pcb_cache.read_binary(self.bin)),
+                                 dict(built))
+
+    def test_a_failed_write_keeps_the_old_board(self):
+        self.pcb.write_text("old board")
+        with self.assertRaises(RuntimeError):
+            with pcb_cache.PcbWriter(self.pcb, self.bin) as out:
+                out.write(self.fragments(1)[0])
+                raise RuntimeError("generator failed")
+        self.assertEqual(self.pcb.read_text(), "old board")
+        self.assertEqual(sorted(p.name for p in self.pcb.parent.iterdir()),
+                         [self.pcb.name])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
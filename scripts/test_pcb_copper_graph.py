@@ -0,0 +1,94 @@
+"""Regression tests for the cached whole-board copper graph.
+
+The connectivity gates now read every net's groups from one CopperGraph
+(pcb_copper_graph.board_graph) instead of union-finding each net afresh.
+A lookup that drifts from the computation would move their verdicts, so
+the tests pin, on a private copy of the real board:
+
+  Lookup  — for every net, the graph's groups (labels, order) and island
+            areas equal groups_for() computed from the raw geometry.
+  Persist — a fresh process (empty memo) loads the same graph from
+            .copper_graph.pkl without re-parsing the board.
+  Stale   — a cache written for other board contents is rebuilt.
+
+Usage:
+    python3 scripts/test_pcb_copper_graph.py
+    python3 -m unittest scripts.test_pcb_copper_graph
+"""
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pcb_copper_graph as G  # noqa: E402
+
+
+def labels(groups):
+    return [[n.label for n in g] for g in groups]
+
+
+class BoardGraph(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        if not G.DEFAULT_PCB.exists():
+            raise unittest.SkipTest(f"{G.DEFAULT_PCB} not found")
+        cls.tmp = tempfile.mkdtemp(prefix="copper_graph_test_")
+        cls.pcb = Path(cls.tmp) / G.DEFAULT_PCB.name
+        shutil.copy2(G.DEFAULT_PCB, cls.pcb)
+        cls.geom = G.parse_copper(cls.pcb)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        G._GRAPHS.clear()
+
+    def test_lookup_matches_the_computation(self):
+        graph = G.board_graph(self.pcb)
+        nets = {z["net"] for z in self.geom.zones} \
+            | {t["net"] for t in self.geom.segments}
+        self.assertGreater(len(nets), 30)
+        for net in sorted(nets):
+            with self.subTest(net=net):
+                want = G.groups_for(net, self.geom)
+                self.assertEqual(labels(G.groups_for(net, graph)),
+                                 labels(want))
+                for area, group in zip(graph.areas[net], want):
+                    self.assertAlmostEqual(area, G.group_area(group))
+
+    def test_a_fresh_process_loads_the_persisted_graph(self):
+        first = G.board_graph(self.pcb)
+        G._GRAPHS.clear()
+        with mock.patch.object(G, "parse_copper",
+                               side_effect=AssertionError("re-parsed")):
+            again = G.board_graph(self.pcb)
+        self.assertEqual(again.groups, first.groups)
+        self.assertEqual(again.edges, first.edges)
+        self.assertEqual(labels(again.groups_for("GND")),
+                         labels(first.groups_for("GND")))
+
+    def test_a_stale_cache_is_rebuilt(self):
+        G.board_graph(self.pcb)
+        cache_path = G._graph_path(self.pcb)
+        with open(cache_path, "rb") as f:
+            data = pickle.load(f)
+        data["pcb_hash"], data["pcb_stat"] = "sha256:other", None
+        data["graph"].groups = {}
+        with open(cache_path, "wb") as f:
+            pickle.dump(data, f)
+        G._GRAPHS.clear()
+        graph = G.board_graph(self.pcb)
+        self.assertEqual(len(graph.groups_for("GND")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
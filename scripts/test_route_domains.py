@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Regression tests for isolated domain routing (generate_pcb/routing/_assemble.py).
+
+Each domain router now runs from a clean slate, under
+CollisionGrid.record(), and _merge_domains() folds the results back in
+domain order. That is only legitimate if the fold reproduces the serial
+run exactly, so the tests pin, on the real board:
+
+  Pool     — routing the domains in forked workers (ids counted from the
+             fork, not from the previous domain) emits the serial board,
+             byte for byte, with the same pad-net map in the same order,
+             the same collision report and the same final UUID counter.
+  Isolated — every domain's result is the same whichever worker, and
+             whichever domain before it, ran it.
+  Guard    — two domains detouring around the same mounting hole are
+             refused rather than merged on top of each other.
+  Memo     — a run spliced from the domain memo (and from its file, in a
+             fresh process) emits the same board and report without
+             routing a domain; an edit to one domain module re-routes only
+             that module's domains.
+
+Run: python3 scripts/test_route_domains.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.generate_pcb import primitives as P             # noqa: E402
+from scripts.generate_pcb import routing                     # noqa: E402
+from scripts.generate_pcb.routing import _assemble as asm    # noqa: E402
+from scripts.generate_pcb.routing import _shared             # noqa: E402
+
+
+def _route(jobs):
+    """One generate_all_traces() with `jobs` workers, rewound afterwards."""
+    mark = P.uid_mark()
+    with mock.patch.dict(os.environ, {"ROUTE_JOBS": str(jobs)}), \
+            contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        out = routing.generate_all_traces()
+    after = P.uid_mark()
+    P.uid_restore(mark)
+    return (out, list(_shared._PAD_NETS.items()),
+            list(_shared._GRID.violations), after)
+
+
+class ParallelMatchesSerial(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.serial = _route(1)
+        cls.pooled = _route(3)
+
+    def test_the_board_is_byte_identical(self):
+        self.assertEqual(self.pooled[0], self.serial[0])
+
+    def test_the_pad_net_map_is_identical_in_order(self):
+        self.assertGreater(len(self.serial[1]), 250)
+        self.assertEqual(self.pooled[1], self.serial[1])
+
+    def test_the_collision_report_is_identical(self):
+        self.assertTrue(self.serial[2])
+        self.assertEqual(self.pooled[2], self.serial[2])
+
+    def test_the_uuid_counter_lands_in_the_same_place(self):
+        self.assertEqual(self.pooled[3], self.serial[3])
+
+
+class DomainsAreIsolated(unittest.TestCase):
+
+    def setUp(self):
+        self.mark = P.uid_mark()
+        self.addCleanup(P.uid_restore, self.mark)
+        _route(1)   # leaves the pad tables and grid initialised
+
+    def _alone(self, index):
+        P.uid_restore(self.mark)
+        return asm._route_domain(index)
+
+    def test_a_domain_does_not_see_the_one_before_it(self):
+        for index in range(1, len(asm._DOMAINS)):
+            with self.subTest(domain=asm._DOMAINS[index].__name__):
+                alone = self._alone(index)
+                P.uid_restore(self.mark)
+                asm._route_domain(index - 1)
+                after = asm._route_domain(index)
+                shift = alone.uid_start - after.uid_start
+                self.assertEqual(
+                    [P.uid_shift(p, shift) for p in after.parts], alone.parts)
+                self.assertEqual(after.pad_nets, alone.pad_nets)
+                self.assertEqual(after.pieces, alone.pieces)
+                self.assertEqual(after.detours, alone.detours)
+
+    def test_shared_detour_slots_are_refused(self):
+        routes = [self._alone(i) for i in range(len(asm._DOMAINS))]
+        (with_detours,) = [r for r in routes if r.detours]
+        clash = asm._DomainRoute(**{**vars(with_detours), "name": "clash"})
+        with self.assertRaisesRegex(RuntimeError, "mounting hole"):
+            asm._merge_domains(routes + [clash], self.mark)
+
+
+class DomainMemo(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp(prefix="domain_memo_test_")
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        for patch in (mock.patch.object(asm, "_DOMAIN_MEMO", {}),
+                      mock.patch.object(asm, "_DOMAIN_CACHE",
+                                        Path(tmp) / "domain_routes.pkl")):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.fresh = _route(1)
+
+    def _routed(self, digests=None):
+        """_route(1), and the names of the domains it routed."""
+        patches = [mock.patch.object(asm, "_route_domain",
+                                     wraps=asm._route_domain)]
+        if digests:
+            patches.append(mock.patch.object(asm, "_source_digests",
+                                              return_value=digests))
+        with contextlib.ExitStack() as stack:
+            route = stack.enter_context(patches[0])
+            for patch in patches[1:]:
+                stack.enter_context(patch)
+            result = _route(1)
+        return result, [asm._DOMAINS[c.args[0]].__name__
+                        for c in route.call_args_list]
+
+    def test_a_memoized_run_routes_nothing(self):
+        again, routed = self._routed()
+        self.assertEqual(routed, [])
+        self.assertEqual(again, self.fresh)
+
+    def test_the_memo_survives_the_process(self):
+        asm._DOMAIN_MEMO.clear()
+        again, routed = self._routed()
+        self.assertEqual(routed, [])
+        self.assertEqual(again, self.fresh)
+
+    def test_an_edited_module_reroutes_only_its_domains(self):
+        digests = asm._source_digests()
+        digests["routing/buttons.py"] = "edited"
+        again, routed = self._routed(digests)
+        self.assertEqual(routed, ["_button_traces", "_reset_boot_traces",
+                                  "_menu_diode_traces",
+                                  "_button_pullup_bridges"])
+        self.assertEqual(again, self.fresh)
+
+    def test_a_shared_edit_reroutes_everything(self):
+        digests = asm._source_digests()
+        digests["primitives.py"] = "edited"
+        again, routed = self._routed(digests)
+        self.assertEqual(len(routed), len(asm._DOMAINS))
+        self.assertEqual(again, self.fresh)
+
+
+class UidShift(unittest.TestCase):
+
+    def test_shift_renumbers_every_id(self):
+        mark = P.uid_mark()
+        self.addCleanup(P.uid_restore, mark)
+        P.uid_restore(0x0f)
+        text = f"(a (uuid \"{P.uid()}\")) (b (uuid \"{P.uid()}\"))"
+        P.uid_restore(0x0f + 0x1f0)
+        want = f"(a (uuid \"{P.uid()}\")) (b (uuid \"{P.uid()}\"))"
+        self.assertEqual(P.uid_shift(text, 0x1f0), want)
+        self.assertEqual(P.uid_shift(text, 0), text)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+"""Regression tests for the verify-all scheduler (run_verifiers.py).
+
+The runner replaced a shell loop whose one job was to fail when a gate
+fails. So the tests pin that contract first, then the scheduling:
+
+  Contract — exit 0 only when every gate passed, 1 when any failed, 2 on
+             no arguments; a failing gate's output tail is printed.
+  Order    — gates with no recorded duration start first, then longest
+             first.
+  Limits   — a gate past its timeout is killed and fails the suite; a
+             gate over its memory ceiling fails, and the others still run.
+  Report   — the schedule report names the gate on the critical path.
+  Reaping  — the scheduler waits on its own workers only; a child the
+             caller started keeps its exit status.
+  Exit     — a worker runs the gate's atexit handlers into its output.
+
+The gates used here are throwaway scripts written into scripts/ for the
+duration of a test and removed after it; results go to a temporary store.
+
+Usage:
+    python3 scripts/test_run_verifiers.py
+    python3 -m unittest scripts.test_run_verifiers
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gate_store  # noqa: E402
+import run_verifiers as RV  # noqa: E402
+
+
+class Runner(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp(prefix="run_verifiers_test_")
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        patch = mock.patch.object(gate_store, "STORE_PATH",
+                                  os.path.join(tmp, "results.json"))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(os.chdir, os.getcwd())
+
+    def gate(self, body):
+        name = f"_test_gate_{uuid.uuid4().hex[:8]}"
+        path = os.path.join(RV.SCRIPTS_DIR, f"{name}.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(body))
+        self.addCleanup(os.unlink, path)
+        return name
+
+    def main(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), \
+                contextlib.redirect_stderr(io.StringIO()):
+            rc = RV.main(["-j", "2", *argv])
+        return rc, out.getvalue()
+
+    def test_exit_code_contract(self):
+        ok = self.gate("print('fine')\n")
+        bad = self.gate("import sys\nprint('FAIL  the widget')\nsys.exit(1)\n")
+        self.assertEqual(self.main(ok)[0], 0)
+        rc, out = self.main(ok, bad)
+        self.assertEqual(rc, 1)
+        self.assertIn("1/2 passed", out)
+        self.assertIn(f"FAIL  scripts/{bad}.py (exit 1)", out)
+        self.assertIn("FAIL  the widget", out)
+        self.assertEqual(self.main()[0], 2)
+
+    def test_unknown_then_longest_first(self):
+        durations = {"a": 1.0, "b": 9.0, "c": 3.0}
+        self.assertEqual(RV.longest_first(["a", "b", "new", "c"], durations),
+                         ["new", "b", "c", "a"])
+
+    def test_timeout_fails_the_suite(self):
+        slow = self.gate("import time\nprint('started')\ntime.sleep(30)\n")
+        ok = self.gate("pass\n")
+        t0 = time.monotonic()
+        rc, out = self.main("--limit", f"{slow}=0.5", slow, ok)
+        self.assertLess(time.monotonic() - t0, 15)
+        self.assertEqual(rc, 1)
+        self.assertIn(f"FAIL  scripts/{slow}.py (exit 124)", out)
+        self.assertIn("started", out)
+        self.assertIn("1/2 passed", out)
+
+    def test_memory_ceiling(self):
+        hog = self.gate("b = bytearray(1 << 30)\n")
+        ok = self.gate("pass\n")
+        rc, out = self.main("--limit", f"{hog}=:512", hog, ok)
+        self.assertEqual(rc, 1)
+        self.assertIn("MemoryError", out)
+        self.assertIn("1/2 passed", out)
+
+    def test_report_names_the_critical_path(self):
+        long = self.gate("import time\ntime.sleep(0.5)\n")
+        short = [self.gate("pass\n") for _ in range(3)]
+        rc, out = self.main(long, *short)
+        self.assertEqual(rc, 0)
+        self.assertIn("Schedule: 4 gates on 2 worker(s)", out)
+        path = out.split("critical path", 1)[1].split("slowest", 1)[0]
+        self.assertIn(long, path)
+
+    def test_the_callers_own_child_is_left_alone(self):
+        child = subprocess.Popen([sys.executable, "-c",
+                                  "import sys; sys.exit(7)"])
+        self.addCleanup(child.wait)
+        gate = self.gate("import time\ntime.sleep(0.3)\n")
+        self.assertEqual(self.main(gate)[0], 0)
+        self.assertEqual(child.wait(timeout=10), 7)
+
+
+    def test_a_worker_runs_the_gate_s_exit_handlers(self):
+        gate = self.gate("import atexit\n"
+                         "atexit.register(print, 'cleaned up')\n"
+                         "print('body')\n")
+        (r,) = RV.Scheduler(jobs=1, trace=False).run([gate])
+        self.assertEqual((r.verdict, r.output), ("PASS", "body\ncleaned up\n"))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
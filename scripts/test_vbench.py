@@ -47,6 +47,7 @@ Usage:
     python3 scripts/test_vbench.py
 """
 
+import copy
 import json
 import os
 import shutil
@@ -371,24 +372,28 @@ def test_netlist():
         check("D4 fires when a schematic pin is moved to the wrong net",
               False, "U1.3 absent from the schematic netlist — test is stale")
 
+    # The board is the memoized one every other module is handed, so the
+    # injections below go into a copy of it, never into the board itself.
+    mutant = copy.deepcopy(board)
+
     # D1 must fire on a declared net that no pad carries.
-    board.declared_nets.add("PHANTOM_RAIL")
-    after = nl.crosscheck(board, sch)
+    mutant.declared_nets.add("PHANTOM_RAIL")
+    after = nl.crosscheck(mutant, sch)
     check("D1 fires on a declared net with no pad",
           any(d.code == "D1" and d.subject == "PHANTOM_RAIL" for d in after))
-    board.declared_nets.discard("PHANTOM_RAIL")
+    mutant.declared_nets.discard("PHANTOM_RAIL")
 
     # D2 must fire on a net reduced to one pin, and the reduction must be
     # the only reason it fires.
-    two_pin = next((n for n, p in board.nets.items() if len(p) == 2), None)
+    two_pin = next((n for n, p in mutant.nets.items() if len(p) == 2), None)
     if two_pin:
-        saved = board.nets[two_pin]
-        board.nets[two_pin] = (saved[0],)
-        after = nl.crosscheck(board, sch)
+        saved = mutant.nets[two_pin]
+        mutant.nets[two_pin] = (saved[0],)
+        after = nl.crosscheck(mutant, sch)
         check("D2 fires when a net is reduced to a single pin",
               any(d.code == "D2" and d.subject == two_pin and d.side == "pcb"
                   for d in after))
-        board.nets[two_pin] = saved
+        mutant.nets[two_pin] = saved
     else:
         check("D2 fires when a net is reduced to a single pin", False,
               "no two-pin net to reduce")
@@ -396,10 +401,15 @@ def test_netlist():
     # And the baseline must be reproduced exactly after undoing the
     # mutations: a detector with state leaks would pass every test above
     # and still be useless.
-    restored = nl.crosscheck(board, sch)
+    restored = nl.crosscheck(mutant, sch)
     check("undoing every mutation restores the baseline verdict",
           [d[:5] for d in restored] == [d[:5] for d in base],
           f"{len(restored)} disputes vs {len(base)} before")
+    shared = nl.load_board_netlist()
+    check("the shared board was never written into",
+          shared is board and "PHANTOM_RAIL" not in shared.declared_nets
+          and [d[:5] for d in nl.crosscheck(shared, sch)]
+          == [d[:5] for d in base])
 
     # D3 must fire only for a pad that NEITHER source accounts for, so the
     # injection removes the datasheet_specs entry that currently explains
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Regression tests for i80 bus trace replay (vbench/i80_trace.py).
+
+A trace is only evidence if replaying it is exactly driving the controller
+with the same writes, and a diff is only evidence if it names the pixel
+that moved. So the tests pin:
+
+  Format     — what the writer writes the reader reads back, timestamps
+               included, and a malformed trace (bad magic, a record or a
+               payload cut short, an unknown kind, time running backwards)
+               is a TraceError, never a shorter replay.
+  Streaming  — no Run carries more than `chunk` bytes, and a replay in
+               odd-sized pieces ends in the state one whole read does —
+               which is the state the same bytes written straight into a
+               controller give.
+  Diff       — identical traces do not diverge; one changed byte is
+               reported at its frame and pixel; a trace that stops early
+               diverges at the frame it is missing.
+  Replay CLI — per-frame PNGs via write_png, every Nth, and a trace with a
+               controller fault exits 1.
+
+Run: python3 scripts/test_vbench_i80_trace.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vbench.models._schema import ModelSchemaError               # noqa: E402
+
+try:
+    from vbench import i80_trace as tr                           # noqa: E402
+    from vbench import ili9488_ctrl as ili                       # noqa: E402
+except ModelSchemaError:        # DS1 not held: the controller will not load
+    tr = ili = None
+
+FRAMES = 4
+
+
+def _trace(frames=FRAMES, clock_hz=20e6):
+    buf = io.BytesIO()
+    tr.synthesize(buf, frames, clock_hz)
+    return buf.getvalue()
+
+
+def _final(data, chunk=None):
+    """The last Frame of a replay — its controller is the final state."""
+    last = None
+    for frame in tr.frames(io.BytesIO(data), chunk=chunk or tr.CHUNK):
+        last = frame
+    return last
+
+
+@unittest.skipIf(tr is None, "DS1 datasheet not held")
+class Format(unittest.TestCase):
+
+    def test_the_writer_and_reader_agree(self):
+        buf = io.BytesIO()
+        out = tr.TraceWriter(buf, 20e6)
+        out.write(0, [ili.CMD_SLPOUT], 0, 50)
+        out.write(1, b"\x01\x02\x03", 100, 50)
+        out.frame(400)
+        buf.seek(0)
+        self.assertEqual(tr.read_header(buf), tr.Header(1, 20_000_000))
+        buf.seek(0)
+        self.assertEqual(list(tr.records(buf)), [
+            tr.Run(tr.KIND_COMMAND, 0, 50, bytes([ili.CMD_SLPOUT])),
+            tr.Run(tr.KIND_DATA, 100, 50, b"\x01\x02\x03"),
+            tr.Run(tr.KIND_FRAME, 400, 0, b"")])
+
+    def test_the_writer_refuses_time_running_backwards(self):
+        out = tr.TraceWriter(io.BytesIO())
+        out.write(1, b"\x00\x00", 100, 10)
+        with self.assertRaises(tr.TraceError):
+            out.frame(105)
+
+    def test_a_malformed_trace_is_an_error(self):
+        good = _trace(1)
+        header = tr.HEADER.size
+        backwards = bytearray(good)
+        # the first record's t0 pushed past the second's
+        tr.RECORD.pack_into(backwards, header, tr.KIND_COMMAND, 1, 10**12, 0)
+        unknown = bytearray(good)
+        unknown[header] = 7
+        for name, data in (("magic", b"XXXX" + good[4:]),
+                           ("header", good[:5]),
+                           ("record", good[:header + 3]),
+                           ("payload", good[:-100]),
+                           ("backwards", bytes(backwards)),
+                           ("kind", bytes(unknown))):
+            with self.subTest(name=name):
+                with self.assertRaises(tr.TraceError):
+                    list(tr.records(io.BytesIO(data)))
+
+
+@unittest.skipIf(tr is None, "DS1 datasheet not held")
+class Streaming(unittest.TestCase):
+
+    def test_no_run_is_longer_than_the_chunk(self):
+        runs = list(tr.records(io.BytesIO(_trace(2)), chunk=1000))
+        self.assertLessEqual(max(len(r.data) for r in runs), 1000)
+        # a split run's pieces carry their own start times
+        data = [r for r in runs if r.kind == tr.KIND_DATA and r.period_ns]
+        self.assertEqual(data[-1].t0_ns - data[-2].t0_ns,
+                         len(data[-2].data) * data[-2].period_ns)
+
+    def test_odd_pieces_replay_as_one_read_and_as_direct_writes(self):
+        data = _trace()
+        whole = _final(data)
+        pieces = _final(data, chunk=4093)
+        self.assertEqual(whole.index, FRAMES - 1)
+        self.assertEqual(whole.bytes, pieces.bytes)
+        self.assertEqual(whole.ctrl.faults, [])
+        self.assertIsNone(tr.first_difference(whole.ctrl, pieces.ctrl))
+        self.assertEqual(
+            (whole.ctrl.pixels_written, whole.ctrl.pixels_ignored),
+            (pieces.ctrl.pixels_written, pieces.ctrl.pixels_ignored))
+
+        direct = ili.ILI9488Controller()
+        for run in tr.records(io.BytesIO(data)):
+            for byte in run.data:
+                direct.write(run.kind, byte)
+        self.assertIsNone(tr.first_difference(whole.ctrl, direct))
+        self.assertEqual(direct.pixels_written, FRAMES * ili.WIDTH * ili.HEIGHT)
+
+    def test_the_last_frame_is_the_animation(self):
+        ctrl = _final(_trace()).ctrl
+        rgb = list(ili.animation(FRAMES))[-1]
+        # what RGB565 keeps of it (p.113), expanded as the controller does
+        want = rgb.copy()
+        want[..., 0] = ili._to8_from5(rgb[..., 0] >> 3)
+        want[..., 1] = ili._to8_from6(rgb[..., 1] >> 2)
+        want[..., 2] = ili._to8_from5(rgb[..., 2] >> 3)
+        self.assertTrue((ctrl.frame() == want).all())
+
+
+@unittest.skipIf(tr is None, "DS1 datasheet not held")
+class Diff(unittest.TestCase):
+
+    def test_identical_traces_do_not_diverge(self):
+        data = _trace()
+        self.assertIsNone(tr.diff(io.BytesIO(data), io.BytesIO(data)))
+
+    def test_one_byte_is_reported_at_its_frame_and_pixel(self):
+        data = _trace()
+        # frame 2's payload starts after its RAMWR; the byte pair for
+        # address (col 5, page 3) is 2 * (3 * WIDTH + 5) bytes into it
+        runs, offset = [], tr.HEADER.size
+        stream = io.BytesIO(data)
+        tr.read_header(stream)
+        while True:
+            head = stream.read(tr.RECORD.size)
+            if not head:
+                break
+            kind, count, _t0, _period = tr.RECORD.unpack(head)
+            runs.append((kind, count, offset + tr.RECORD.size))
+            offset += tr.RECORD.size + count
+            stream.seek(offset)
+        payloads = [start for kind, count, start in runs
+                    if kind == tr.KIND_DATA and count > 4]
+        mutant = bytearray(data)
+        mutant[payloads[2] + 2 * (3 * ili.WIDTH + 5) + 1] ^= 0x1F
+        found = tr.diff(io.BytesIO(data), io.BytesIO(bytes(mutant)))
+        self.assertEqual((found.frame, found.x, found.y), (2, 5, 3))
+        self.assertNotEqual(found.a, found.b)
+        self.assertEqual(found.a[:2], found.b[:2])      # only blue moved
+
+    def test_a_trace_that_stops_early_diverges_where_it_stops(self):
+        found = tr.diff(io.BytesIO(_trace(3)), io.BytesIO(_trace(2)))
+        self.assertEqual((found.frame, found.x), (2, None))
+        self.assertEqual((found.frames_a, found.frames_b), (3, 2))
+
+
+@unittest.skipIf(tr is None, "DS1 datasheet not held")
+class ReplayCli(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="vbench-i80-test-")
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def run_main(self, *argv):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            rc = tr.main(list(argv))
+        return rc, out.getvalue()
+
+    def test_every_nth_frame_is_a_png(self):
+        path = os.path.join(self.dir, "run.i80")
+        with open(path, "wb") as fh:
+            tr.synthesize(fh, 5)
+        pngs = os.path.join(self.dir, "png")
+        rc, _ = self.run_main("replay", path, "--png-dir", pngs, "--every", "2")
+        self.assertEqual(rc, 0)
+        self.assertEqual(sorted(os.listdir(pngs)),
+                         ["frame-00000.png", "frame-00002.png",
+                          "frame-00004.png"])
+        with open(os.path.join(pngs, "frame-00000.png"), "rb") as fh:
+            self.assertEqual(fh.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_a_fault_in_the_trace_exits_1(self):
+        path = os.path.join(self.dir, "sleepy.i80")
+        with open(path, "wb") as fh:
+            out = tr.TraceWriter(fh)
+            out.write(0, [ili.CMD_RAMWR], 0)        # no SLPOUT first
+            out.write(1, bytes(8), 10)
+            out.frame(20)
+        rc, text = self.run_main("replay", path)
+        self.assertEqual(rc, 1)
+        self.assertIn("ram_write_while_sleep_in", text)
+
+    def test_an_unreadable_trace_exits_2(self):
+        path = os.path.join(self.dir, "junk.i80")
+        with open(path, "wb") as fh:
+            fh.write(b"not a trace")
+        self.assertEqual(self.run_main("replay", path)[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Regression tests for the ILI9488 RAM-data bulk path (vbench/ili9488_ctrl.py).
+
+write_bytes() hands a RAM-data payload to the vectorised path instead of
+one write() per byte. The bulk path is a fast path, never a second set of
+semantics, so every test drives the same bytes through both and requires
+the same controller afterwards — pixels, unwritten mask, counters, the
+address counter, a carried partial pixel and the fault list:
+
+  Equivalence — random MADCTL, windows, formats and chunkings, RAMWR and
+                RAMWRC, payloads that overrun the window and ones that stop
+                mid-pixel.
+  Faults      — a refused RAMWR, a bad byte and a parameter with no
+                command fault exactly as byte-wise writes do.
+  Throughput  — frame_rate() renders its last frame and whole frames take
+                milliseconds, not the ~0.3 s one write() per byte takes.
+
+Run: python3 scripts/test_vbench_ili9488_bulk.py
+"""
+import hashlib
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np                                               # noqa: E402
+
+from vbench.models._schema import ModelSchemaError               # noqa: E402
+
+try:
+    from vbench import ili9488_ctrl as ili                       # noqa: E402
+except ModelSchemaError:        # DS1 not held: the controller will not load
+    ili = None
+
+
+def _state(ctrl):
+    """Everything the controller would do differently next; the arrays by
+    digest, so a mismatch reports in milliseconds, not minutes of diff."""
+    frame = hashlib.sha256(ctrl.rgb.tobytes() + ctrl.unwritten.tobytes())
+    return (frame.hexdigest(), ctrl.pixels_written,
+            ctrl.pixels_ignored, ctrl._col, ctrl._page, list(ctrl._bytes),
+            ctrl._ramwr_active, [(f.code, f.detail) for f in ctrl.faults])
+
+
+def _setup(ctrl, madctl, colmod, window):
+    sc, ec, sp, ep = window
+    ctrl.command(ili.CMD_SLPOUT)
+    ctrl.command(ili.CMD_MADCTL, [madctl])
+    ctrl.command(ili.CMD_COLMOD, [colmod])
+    ctrl.command(ili.CMD_CASET, [sc >> 8, sc & 0xFF, ec >> 8, ec & 0xFF])
+    ctrl.command(ili.CMD_PASET, [sp >> 8, sp & 0xFF, ep >> 8, ep & 0xFF])
+
+
+def _drive(ctrl, steps, bulk):
+    """Replay (dcx, bytes) steps — bulk through write_bytes(), else one
+    write() per byte, which never takes the bulk path."""
+    for dcx, data in steps:
+        if bulk:
+            ctrl.write_bytes(dcx, data)
+        else:
+            for b in data:
+                ctrl.write(dcx, b)
+
+
+@unittest.skipIf(ili is None, "DS1 datasheet not held")
+class Equivalence(unittest.TestCase):
+
+    def both(self, setup, steps):
+        a, b = ili.ILI9488Controller(), ili.ILI9488Controller()
+        for ctrl, bulk in ((a, False), (b, True)):
+            setup(ctrl)
+            _drive(ctrl, steps, bulk)
+        self.assertEqual(_state(a), _state(b))
+        return b
+
+    def test_random_windows_orientations_and_chunkings(self):
+        rng = np.random.default_rng(7)
+        for trial in range(60):
+            madctl = int(rng.integers(0, 256)) & 0xE8   # MY MX MV BGR
+            dbi = (ili.DBI_16BPP, ili.DBI_18BPP)[trial % 2]
+            probe = ili.ILI9488Controller()
+            probe.madctl = madctl
+            sc = int(rng.integers(0, probe.col_span))
+            ec = int(rng.integers(sc, min(sc + 40, probe.col_span)))
+            sp = int(rng.integers(0, probe.page_span))
+            ep = int(rng.integers(sp, min(sp + 40, probe.page_span)))
+            transfers = ili.FORMATS[dbi].transfers
+            area = (ec - sc + 1) * (ep - sp + 1)
+            size = int(rng.integers(0, area * transfers * 3 // 2 + 5))
+            payload = rng.integers(0, 256, size).astype(np.uint8).tobytes()
+            cuts = np.sort(rng.integers(0, size + 1, 4))
+            chunks = [payload[i:j] for i, j in
+                      zip(np.r_[0, cuts], np.r_[cuts, size])]
+            steps = [(0, [ili.CMD_RAMWR])] + [(1, c) for c in chunks]
+            # a RAMWRC carries on from the counter the RAMWR left
+            steps += [(0, [ili.CMD_RAMWRC]), (1, payload[:transfers * 7 + 1])]
+            with self.subTest(trial=trial, madctl=hex(madctl), dbi=dbi,
+                              window=(sc, ec, sp, ep), size=size):
+                self.both(lambda c: _setup(c, madctl, (dbi << 4) | dbi,
+                                           (sc, ec, sp, ep)), steps)
+
+    def test_a_full_frame_matches_and_fills_the_panel(self):
+        payload = ili.encode_frame(ili.FORMATS[ili.DBI_16BPP],
+                                   ili._pattern(ili.WIDTH, ili.HEIGHT))
+        ctrl = self.both(
+            lambda c: _setup(c, 0, 0x55, (0, ili.WIDTH - 1, 0, ili.HEIGHT - 1)),
+            [(0, [ili.CMD_RAMWR]), (1, payload)])
+        self.assertEqual(ctrl.pixels_written, ili.WIDTH * ili.HEIGHT)
+        self.assertEqual(ctrl.pixels_ignored, 0)
+        self.assertFalse(ctrl.unwritten.any())
+
+    def test_the_payload_types_agree(self):
+        payload = bytes(range(256)) * 3
+        setup = lambda c: _setup(c, 0x48, 0x66, (10, 29, 5, 40))  # noqa: E731
+        want = _state(self.both(setup, [(0, [ili.CMD_RAMWR]), (1, payload)]))
+        for kind in (bytearray, memoryview, list,
+                     lambda p: np.frombuffer(p, np.uint8)):
+            ctrl = ili.ILI9488Controller()
+            setup(ctrl)
+            ctrl.ram_write(kind(payload))
+            self.assertEqual(_state(ctrl), want, kind)
+
+
+@unittest.skipIf(ili is None, "DS1 datasheet not held")
+class Faults(unittest.TestCase):
+
+    def test_ram_data_before_slpout_is_one_fault_either_way(self):
+        states = []
+        for bulk in (False, True):
+            ctrl = ili.ILI9488Controller()
+            _drive(ctrl, [(0, [ili.CMD_RAMWR]), (1, bytes(64))], bulk)
+            states.append(_state(ctrl))
+        self.assertEqual(states[0], states[1])
+        self.assertEqual([code for code, _ in states[1][-1]],
+                         ["ram_write_while_sleep_in"])
+
+    def test_a_parameter_with_no_command_is_a_fault(self):
+        ctrl = ili.ILI9488Controller()
+        ctrl.write_bytes(1, [1, 2])
+        self.assertEqual([f.code for f in ctrl.faults],
+                         ["parameter_without_command"] * 2)
+
+    def test_a_bad_byte_raises_after_the_good_ones(self):
+        states = []
+        for bulk in (False, True):
+            ctrl = ili.ILI9488Controller()
+            _setup(ctrl, 0, 0x55, (0, 9, 0, 9))
+            ctrl.write(0, ili.CMD_RAMWR)
+            with self.assertRaises(ValueError):
+                _drive(ctrl, [(1, [0xF8, 0x00, 0x07, 256, 0])], bulk)
+            states.append(_state(ctrl))
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(states[1][1], 1)
+
+
+@unittest.skipIf(ili is None, "DS1 datasheet not held")
+class Throughput(unittest.TestCase):
+
+    def test_frames_render_and_take_milliseconds(self):
+        fps, ctrl = ili.frame_rate(10)
+        self.assertEqual(ctrl.pixels_written, 10 * ili.WIDTH * ili.HEIGHT)
+        self.assertEqual(ctrl.faults, [])
+        last = ili._pattern(ili.WIDTH, ili.HEIGHT, (72, 72))
+        self.assertEqual(ctrl.pixel(72, 72), (255, 255, 255))
+        self.assertEqual(ctrl.pixel(0, 0), tuple(int(v) for v in last[0, 0]))
+        self.assertGreater(fps, 20)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Regression tests for the bench-wide memo (vbench/memo.py).
+
+The board netlist, the BOM values and the DC operating point are now built
+once and shared. A memo that serves a stale answer is worse than none, so
+the tests pin when it must NOT hit:
+
+  Memo     — the LRU is bounded, invalidate() drops exactly one
+             fingerprint, and the disk store round-trips, ignores a
+             corrupt entry and forgets what was invalidated.
+  Loaders  — a second caller gets the first caller's object; a BOM whose
+             bytes change is parsed again.
+  Mutants  — mutate.apply gives the copy its own fingerprint, so the real
+             board's operating point is never served for it.
+
+Run: python3 scripts/test_vbench_memo.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vbench import memo                                          # noqa: E402
+from vbench import mutate                                        # noqa: E402
+from vbench import netlist as nl                                 # noqa: E402
+from vbench import rails                                         # noqa: E402
+
+
+class MemoStore(unittest.TestCase):
+
+    def setUp(self):
+        self.memo = memo.Memo("test", maxsize=3, disk=True)
+        self.addCleanup(memo._MEMOS.remove, self.memo)
+        self.dir = tempfile.mkdtemp(prefix="vbench-memo-test-")
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_hits_and_bound(self):
+        built = []
+        for k in (1, 2, 1, 3, 4, 1):
+            self.memo.get(("fp", k), lambda k=k: built.append(k) or k * 10)
+        self.assertEqual(built, [1, 2, 3, 4])
+        self.assertEqual(len(self.memo.entries), 3)
+        self.assertEqual((self.memo.hits, self.memo.misses), (2, 4))
+
+    def test_invalidate_drops_one_fingerprint(self):
+        for fp in ("a", "b"):
+            for k in range(2):
+                self.memo.get((fp, k), lambda: object())
+        self.memo.maxsize = 10
+        self.memo.invalidate("a")
+        self.assertEqual(sorted(self.memo.entries), [("b", 0), ("b", 1)])
+
+    def test_disk_round_trip(self):
+        with mock.patch.dict(os.environ, {"VBENCH_CACHE_DIR": self.dir}):
+            self.memo.get(("fp", 1), lambda: {"v": 3.3})
+            self.memo.clear()
+            got = self.memo.get(("fp", 1), lambda: self.fail("rebuilt"))
+            self.assertEqual(got, {"v": 3.3})
+            self.assertEqual(self.memo.disk_hits, 1)
+
+            self.memo.invalidate("fp")
+            self.assertEqual(os.listdir(self.dir), [])
+            self.assertEqual(self.memo.get(("fp", 1), lambda: "fresh"),
+                             "fresh")
+
+    def test_a_corrupt_disk_entry_is_a_miss(self):
+        with mock.patch.dict(os.environ, {"VBENCH_CACHE_DIR": self.dir}):
+            self.memo.get(("fp", 1), lambda: 1)
+            for name in os.listdir(self.dir):
+                with open(os.path.join(self.dir, name), "wb") as fh:
+                    fh.write(b"not a pickle")
+            self.memo.clear()
+            self.assertEqual(self.memo.get(("fp", 1), lambda: 2), 2)
+
+    def test_without_the_directory_nothing_is_written(self):
+        with mock.patch.dict(os.environ, {"VBENCH_CACHE_DIR": ""}):
+            self.memo.get(("fp", 1), lambda: 1)
+        self.assertEqual(os.listdir(self.dir), [])
+
+
+class Loaders(unittest.TestCase):
+
+    def setUp(self):
+        memo.clear()
+        self.addCleanup(memo.clear)
+
+    def test_a_changed_bom_is_parsed_again(self):
+        d = tempfile.mkdtemp(prefix="vbench-memo-bom-")
+        self.addCleanup(shutil.rmtree, d)
+        path = os.path.join(d, "bom.csv")
+        with open(path, "w") as fh:
+            fh.write("Comment,Designator\n10k 0805,\"R1,R2\"\n")
+        first = rails.load_bom_values(path)
+        self.assertIs(rails.load_bom_values(path), first)
+        with open(path, "w") as fh:
+            fh.write("Comment,Designator\n22k 0805,\"R1,R2\"\n")
+        self.assertEqual(rails.load_bom_values(path)["R1"], 22e3)
+
+    @unittest.skipUnless(os.path.exists(os.path.join(nl.BASE, nl.PCB_REL)),
+                         "board not generated")
+    def test_callers_share_one_board_and_one_solve(self):
+        self.assertIs(nl.load_board_netlist(), nl.load_board_netlist())
+        op = rails.operating_point()
+        self.assertIs(rails.operating_point(), op)
+        self.assertIsNot(rails.operating_point(buttons_pressed=True), op)
+        memo.clear()
+        self.assertEqual(rails.operating_point().voltages, op.voltages)
+
+
+@unittest.skipUnless(os.path.exists(os.path.join(nl.BASE, nl.PCB_REL)),
+                     "board not generated")
+class Mutants(unittest.TestCase):
+
+    def setUp(self):
+        memo.clear()
+        self.addCleanup(memo.clear)
+
+    def test_a_mutant_has_its_own_fingerprint(self):
+        board = nl.load_board_netlist()
+        a, _ = mutate.apply(board, {"kind": "short_nets", "net_a": "GND",
+                                    "net_b": "+3V3"})
+        b, _ = mutate.apply(board, {"kind": "short_nets", "net_a": "GND",
+                                    "net_b": "+5V"})
+        self.assertNotEqual(a.pcb_hash, board.pcb_hash)
+        self.assertNotEqual(a.pcb_hash, b.pcb_hash)
+        self.assertIn("+3V3", board.nets)
+        self.assertIs(nl.load_board_netlist(), board)
+
+    def test_applying_a_mutation_invalidates_its_fingerprint(self):
+        board = nl.load_board_netlist()
+        mutation = {"kind": "short_nets", "net_a": "GND", "net_b": "+3V3"}
+        mutant, _ = mutate.apply(board, mutation)
+        store = rails._OPERATING_POINTS
+        store.get((mutant.pcb_hash, "stale"), lambda: "from an earlier run")
+        mutate.apply(board, mutation)
+        self.assertNotIn((mutant.pcb_hash, "stale"), store.entries)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
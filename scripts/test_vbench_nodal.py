@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Regression tests for the compiled nodal solver (vbench/nodal.py).
+
+rails.solve_dc now factorizes a network once and re-solves it, on SciPy,
+NumPy or the stdlib, picked by size. Every voltage the bench prints comes
+out of it, so the tests pin what the backends must agree on:
+
+  Backends — every backend gives the same voltages as a fresh dense
+             elimination, on random networks with floating islands, and
+             solve_many() is solve() repeated.
+  Floating — a node with no resistive path to a source is absent, never
+             0 V; a singular matrix raises.
+  Rails    — solve_dc on a small board still merges inductors and closed
+             switches, still reports UNDEFINED, and reuses its compiled
+             network until the topology or a resistor value changes.
+
+Run: python3 scripts/test_vbench_nodal.py
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vbench import nodal                                         # noqa: E402
+from vbench import rails                                         # noqa: E402
+from vbench.netlist import PinRef                                # noqa: E402
+
+
+def _random_network(seed, nodes=40, islands=2):
+    """(edges, fixed volts): a connected core plus unreachable islands."""
+    rng = random.Random(seed)
+    edges = []
+    for k in range(1, nodes):
+        edges.append((rng.randrange(k), k, 1.0 / rng.uniform(10, 1e6)))
+    for _ in range(nodes):
+        a, b = rng.sample(range(nodes), 2)
+        edges.append((a, b, 1.0 / rng.uniform(10, 1e6)))
+    for k in range(islands):
+        edges.append((f"float{k}", f"float{k}b", 1e-3))
+    fixed = {0: 0.0, 1: 3.3, nodes - 1: 5.0}
+    return edges, fixed
+
+
+def _reference(edges, fixed):
+    """A fresh dense elimination, as solve_dc did before it compiled."""
+    net = nodal.Network(edges, fixed, backend="stdlib")
+    index = {n: i for i, n in enumerate(net.unknowns)}
+    mat = [[0.0] * len(index) for _ in index]
+    rhs = [0.0] * len(index)
+    for a, b, g in edges:
+        for x, y in ((a, b), (b, a)):
+            if x in index:
+                mat[index[x]][index[x]] += g
+                if y in index:
+                    mat[index[x]][index[y]] -= g
+                elif y in fixed:
+                    rhs[index[x]] += g * fixed[y]
+    out = dict(fixed)
+    out.update(zip(net.unknowns, nodal.lu_solve(*nodal.lu_factor(mat), rhs)))
+    return out
+
+
+class Backends(unittest.TestCase):
+
+    def test_every_backend_matches_a_fresh_elimination(self):
+        for seed in range(5):
+            edges, fixed = _random_network(seed)
+            want = _reference(edges, fixed)
+            for backend in nodal.available():
+                with self.subTest(seed=seed, backend=backend):
+                    got = nodal.Network(edges, fixed, backend).solve(fixed)
+                    self.assertEqual(got.keys(), want.keys())
+                    for node, volts in want.items():
+                        self.assertAlmostEqual(got[node], volts, places=9)
+
+    def test_solve_many_is_solve_repeated(self):
+        edges, fixed = _random_network(7)
+        rows = [{n: v * scale for n, v in fixed.items()}
+                for scale in (0.5, 1.0, 1.1)]
+        for backend in nodal.available():
+            with self.subTest(backend=backend):
+                net = nodal.Network(edges, fixed, backend)
+                for got, row in zip(net.solve_many(rows), rows):
+                    want = net.solve(row)
+                    for node, volts in want.items():
+                        self.assertAlmostEqual(got[node], volts, places=12)
+
+    def test_small_networks_stay_on_the_stdlib(self):
+        if nodal.FORCED:
+            self.skipTest("VBENCH_SOLVER forces a backend")
+        self.assertEqual(nodal.backend_for(nodal.SMALL), "stdlib")
+        edges, fixed = nodal.grid_network(12)
+        self.assertEqual(nodal.Network(edges, fixed).backend,
+                         nodal.available()[0])
+
+
+class Floating(unittest.TestCase):
+
+    def test_an_island_is_absent_not_zero(self):
+        edges, fixed = _random_network(3)
+        for backend in nodal.available():
+            with self.subTest(backend=backend):
+                got = nodal.Network(edges, fixed, backend).solve(fixed)
+                self.assertNotIn("float0", got)
+                self.assertNotIn("float1b", got)
+
+    def test_a_missing_source_voltage_is_refused(self):
+        edges, fixed = _random_network(3)
+        net = nodal.Network(edges, fixed)
+        with self.assertRaises(KeyError):
+            net.solve({0: 0.0})
+
+    def test_a_singular_matrix_raises(self):
+        with self.assertRaises(nodal.NodalError):
+            nodal.lu_factor([[1.0, 1.0], [1.0, 1.0]])
+
+
+def _pin(ref, pad):
+    return PinRef(ref, pad, pad, "F.Cu")
+
+
+class _Board:
+    """A divider into an inductor, a button with a pull-down, a cap."""
+
+    def __init__(self):
+        self.nets = {
+            "A": (_pin("R1", "1"), _pin("SW99", "1")),
+            "B": (_pin("R1", "2"), _pin("R2", "1"), _pin("L1", "1")),
+            "C": (_pin("L1", "2"), _pin("C1", "1")),
+            "D": (_pin("C1", "2"),),
+            "E": (_pin("SW99", "2"), _pin("R3", "1")),
+            "GND": (_pin("R2", "2"), _pin("R3", "2")),
+        }
+
+
+VALUES = {"R1": 10e3, "R2": 10e3, "R3": 100e3}
+FIXED = {"A": 3.3, "GND": 0.0}
+
+
+class Rails(unittest.TestCase):
+
+    def setUp(self):
+        rails._COMPILED.clear()
+        self.addCleanup(rails._COMPILED.clear)
+
+    def test_the_board_solves_as_before(self):
+        for backend in nodal.available():
+            with self.subTest(backend=backend):
+                v = rails.compile_dc(_Board(), VALUES, FIXED,
+                                     backend=backend).solve(FIXED)
+                self.assertAlmostEqual(v["B"], 1.65, places=12)
+                self.assertAlmostEqual(v["C"], 1.65, places=12)
+                self.assertIs(v["D"], rails.UNDEFINED)
+                self.assertEqual(v["E"], 0.0)
+                pressed = rails.compile_dc(_Board(), VALUES, FIXED, True,
+                                           backend=backend).solve(FIXED)
+                self.assertEqual(pressed["E"], 3.3)
+
+    def test_a_new_source_voltage_reuses_the_network(self):
+        first = rails.compile_dc(_Board(), VALUES, FIXED)
+        v = rails.solve_dc(_Board(), dict(VALUES), {"A": 5.0, "GND": 0.0})
+        self.assertIs(rails.compile_dc(_Board(), VALUES, FIXED), first)
+        self.assertEqual(len(rails._COMPILED), 1)
+        self.assertAlmostEqual(v["C"], 2.5, places=12)
+
+    def test_a_changed_board_is_compiled_again(self):
+        first = rails.compile_dc(_Board(), VALUES, FIXED)
+        self.assertIsNot(rails.compile_dc(
+            _Board(), dict(VALUES, R2=30e3), FIXED), first)
+        self.assertIsNot(rails.compile_dc(_Board(), VALUES, FIXED, True),
+                         first)
+        board = _Board()
+        board.nets["D"] += (_pin("R4", "1"),)
+        board.nets["GND"] += (_pin("R4", "2"),)
+        with self.assertRaises(rails.RailError):
+            rails.solve_dc(board, VALUES, FIXED)
+        board = _Board()
+        board.nets["C"] += (_pin("R4", "1"),)
+        board.nets["GND"] += (_pin("R4", "2"),)
+        v = rails.solve_dc(board, dict(VALUES, R4=10e3), FIXED)
+        self.assertAlmostEqual(v["B"], 3.3 / 3, places=12)
+        self.assertEqual(len(rails._COMPILED), 4)
+
+    def test_the_cache_is_bounded(self):
+        for k in range(rails._COMPILED_MAX + 3):
+            rails.compile_dc(_Board(), dict(VALUES, R3=1e3 + k), FIXED)
+        self.assertEqual(len(rails._COMPILED), rails._COMPILED_MAX)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Regression tests for the batched ngspice layer (vbench/spice.py).
+
+Every transient and dynamic verdict now comes through run_many(), so the
+tests pin what batching, pooling and caching must not change — against a
+stand-in `ngspice` on PATH that measures each deck deterministically from
+its text and logs every time it is started:
+
+  Results  — a batch gives each deck exactly what running it alone gives,
+             in the order asked, duplicates included.
+  Batch    — N uncached decks on one job are one ngspice process, and a
+             batch that measures nothing falls back to one per deck.
+  Cache    — an unchanged deck is never simulated again, in this process
+             or (through the disk store) the next.
+  Missing  — no ngspice is SimulatorMissing even with every deck cached,
+             and a deck that measures nothing is SimulatorMissing too.
+
+Run: python3 scripts/test_vbench_spice.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vbench import spice                                         # noqa: E402
+
+FAKE = f"""#!{sys.executable}
+import hashlib, os, re, sys
+with open(os.environ["FAKE_NGSPICE_LOG"], "a") as fh:
+    fh.write(" ".join(sys.argv[1:]) + "\\n")
+if sys.argv[1] == "--version":
+    print("** ngspice-42 : stand-in for the tests")
+    sys.exit(0)
+text = open(sys.argv[2]).read()
+
+def measure(deck):
+    for name in re.findall(r"^\\.meas \\w+ (\\w+)", deck, re.M):
+        h = hashlib.sha256((deck + name).encode()).hexdigest()
+        print(f"{{name:<20}} =  {{int(h[:8], 16) / 1e9:.6e}}")
+
+if ".control" in text:
+    if os.environ.get("FAKE_NGSPICE_NO_BATCH"):
+        sys.exit(1)
+    deck = ""
+    for line in text.splitlines():
+        if line.startswith("source "):
+            deck = open(line[len("source "):]).read()
+        elif line == "run":
+            measure(deck)
+        elif line.startswith("echo "):
+            print(line[len("echo "):])
+else:
+    measure(text)
+"""
+
+
+def _deck(k):
+    return (f"* deck {k}\nV1 a 0 DC {k}\nR1 a 0 1k\n.tran 1u 10u\n"
+            f".meas tran v_max MAX v(a)\n.meas tran v_min MIN v(a)\n.end\n")
+
+
+class _FakeSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="vbench-spice-test-")
+        self.addCleanup(shutil.rmtree, self.dir)
+        bindir = os.path.join(self.dir, "bin")
+        os.makedirs(bindir)
+        fake = os.path.join(bindir, "ngspice")
+        with open(fake, "w") as fh:
+            fh.write(FAKE)
+        os.chmod(fake, 0o755)
+        self.log = os.path.join(self.dir, "calls.log")
+        env = {"PATH": bindir + os.pathsep + os.environ.get("PATH", ""),
+               "FAKE_NGSPICE_LOG": self.log}
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = os.path.join(self.dir, "cache")
+        patcher = mock.patch.object(spice._RESULTS, "root", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        spice._RESULTS.clear()
+        self.addCleanup(spice._RESULTS.clear)
+        spice._VERSION.clear()
+        self.addCleanup(spice._VERSION.clear)
+        self.work = os.path.join(self.dir, "work")
+        os.makedirs(self.work)
+
+    def simulations(self):
+        """ngspice starts so far, not counting --version."""
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as fh:
+            return sum(1 for line in fh if not line.startswith("--version"))
+
+
+class Results(_FakeSimulator):
+
+    def test_a_batch_gives_what_each_deck_gives_alone(self):
+        decks = [_deck(k) for k in range(5)] + [_deck(2)]
+        batched = spice.run_many(decks, self.work, jobs=2)
+        spice._RESULTS.clear()
+        for deck, (values, _out) in zip(decks, batched):
+            with self.subTest(deck=deck.splitlines()[0]):
+                alone, _, _, _ = spice._single(deck, self.work)
+                self.assertEqual(set(values), {"v_max", "v_min"})
+                self.assertEqual(values, alone)
+        self.assertEqual(batched[2], batched[5])
+
+
+class Batch(_FakeSimulator):
+
+    def test_one_job_is_one_process(self):
+        spice.run_many([_deck(k) for k in range(4)], self.work, jobs=1)
+        self.assertEqual(self.simulations(), 1)
+
+    def test_jobs_split_the_decks(self):
+        spice.run_many([_deck(k) for k in range(4)], self.work, jobs=2)
+        self.assertEqual(self.simulations(), 2)
+
+    def test_a_failed_batch_falls_back_to_single_decks(self):
+        with mock.patch.dict(os.environ, {"FAKE_NGSPICE_NO_BATCH": "1"}):
+            got = spice.run_many([_deck(k) for k in range(3)], self.work,
+                                 jobs=1)
+        self.assertTrue(all(values for values, _out in got))
+        self.assertEqual(self.simulations(), 1 + 3)
+
+
+class Cache(_FakeSimulator):
+
+    def test_an_unchanged_deck_is_not_simulated_again(self):
+        decks = [_deck(k) for k in range(3)]
+        first = spice.run_many(decks, self.work)
+        ran = self.simulations()
+        self.assertEqual(spice.run_many(decks, self.work), first)
+        self.assertEqual(self.simulations(), ran)
+        # a new process: nothing in memory, everything on disk
+        spice._RESULTS.clear()
+        self.assertEqual(spice.run_many(decks, self.work), first)
+        self.assertEqual(self.simulations(), ran)
+        self.assertEqual(spice._RESULTS.disk_hits, 3)
+
+    def test_a_changed_deck_is_simulated(self):
+        spice.run(_deck(1), self.work)
+        ran = self.simulations()
+        spice.run(_deck(1).replace("1k", "2k"), self.work)
+        self.assertEqual(self.simulations(), ran + 1)
+
+    def test_no_directory_means_no_disk(self):
+        with mock.patch.object(spice._RESULTS, "root", ""):
+            spice.run(_deck(1), self.work)
+        self.assertFalse(os.path.exists(self.cache))
+
+
+class Missing(_FakeSimulator):
+
+    def test_no_simulator_raises_even_when_cached(self):
+        spice.run(_deck(1), self.work)
+        with mock.patch.object(spice.shutil, "which", lambda _name: None):
+            with self.assertRaises(spice.SimulatorMissing):
+                spice.run(_deck(1), self.work)
+
+    def test_a_deck_that_measures_nothing_raises(self):
+        with self.assertRaises(spice.SimulatorMissing):
+            spice.run("* nothing to measure\n.end\n", self.work)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
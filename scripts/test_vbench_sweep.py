@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Regression tests for the Monte Carlo sweep (vbench/sweep.py).
+
+The sweep re-evaluates the bench's analytic formulas over arrays of
+draws. A sweep whose formulas drift from the owning modules' reports a
+yield for a board nobody else computes, so the tests pin:
+
+  FixedPoint — the nominal draw reproduces thermal.evaluate, the divider's
+               typical corner, audio.input_network, dynamics.brownout_soc
+               and buttons.survey exactly.
+  Draws      — a seed gives the same draws, every draw is inside its
+               cited [min, max], the divider corners bound every draw,
+               and 10k draws of the analytic layer take well under the
+               seconds the bench budget allows.
+  Summary    — limits are inclusive, NaN (a deck that measured nothing)
+               is a failing draw, and the worst draw is the one nearest
+               its limit.
+  Simulated  — only the first --spice draws become decks, two each, in
+               one run_many() call.
+
+Run: python3 scripts/test_vbench_sweep.py
+"""
+import math
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np                                               # noqa: E402
+
+from vbench import audio, buttons, dynamics                      # noqa: E402
+from vbench import netlist as nl                                 # noqa: E402
+from vbench import sweep, thermal                                # noqa: E402
+
+BOARD = os.path.exists(os.path.join(nl.BASE, nl.PCB_REL))
+
+
+def _by_name(quantities):
+    return {q.name: q for q in quantities}
+
+
+@unittest.skipUnless(BOARD, "board not generated")
+class FixedPoint(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ctx = sweep.context()
+        cls.swept, _ = sweep.tolerances(cls.ctx.values)
+        cls.q = _by_name(sweep.analytic(sweep.nominal(cls.swept), cls.ctx))
+
+    def value(self, name):
+        return float(self.q[name].samples[0])
+
+    def test_the_divider_is_its_typical_corner(self):
+        corners = dict(dynamics.divider_corners())
+        self.assertEqual(self.value("+3V3 from the divider"), corners["typ"])
+
+    def test_junction_temperatures_are_thermal_evaluate(self):
+        for sc in thermal.SCENARIOS:
+            for r in thermal.evaluate(sc, thermal.GOVERNING_AMBIENT):
+                name = f"Tj {r.ref} {sc.name}"
+                if name not in self.q:
+                    continue
+                with self.subTest(name=name):
+                    self.assertAlmostEqual(self.value(name), r.tj, places=12)
+                    self.assertEqual(self.q[name].hi,
+                                     r.tj_max - thermal.SAFE_MARGIN)
+
+    def test_audio_brownout_and_buttons_are_their_modules(self):
+        _, _, f_corner, _, _ = audio.input_network()
+        self.assertAlmostEqual(self.value("audio input corner"), f_corner,
+                               places=9)
+        _, first_fail, _ = dynamics.brownout_soc()
+        self.assertEqual(self.value("brownout SoC, SNES stress"),
+                         first_fail or 0.0)
+        slowest = max(b.t_rise_s for b in buttons.survey() if b.t_rise_s)
+        self.assertAlmostEqual(self.value("slowest button release"),
+                               slowest, places=15)
+
+
+@unittest.skipUnless(BOARD, "board not generated")
+class Draws(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ctx = sweep.context()
+        cls.swept, cls.fixed = sweep.tolerances(cls.ctx.values)
+
+    def test_a_seed_is_reproducible_and_inside_its_range(self):
+        a = sweep.draw(self.swept, 1000, seed=3)
+        b = sweep.draw(self.swept, 1000, seed=3)
+        for name, t in self.swept.items():
+            with self.subTest(name=name):
+                np.testing.assert_array_equal(a[name], b[name])
+                self.assertTrue(np.all((a[name] >= t.lo) & (a[name] <= t.hi)))
+        c = sweep.draw(self.swept, 1000, seed=4)
+        self.assertFalse(np.array_equal(a["U3.v_fb_ref"], c["U3.v_fb_ref"]))
+
+    def test_only_documented_parts_are_swept(self):
+        self.assertIn(self.ctx.divider.r_top, self.swept)
+        self.assertIn(self.ctx.divider.r_bottom, self.swept)
+        self.assertFalse(any(name.startswith("C") for name in self.swept))
+        self.assertTrue(any(what == "capacitors" for what, _ in self.fixed))
+
+    def test_the_corners_bound_every_draw(self):
+        v33 = sweep.v_rail(sweep.draw(self.swept, 10000), self.ctx)
+        corners = [v for _label, v in dynamics.divider_corners()]
+        self.assertGreaterEqual(v33.min(), min(corners))
+        self.assertLessEqual(v33.max(), max(corners))
+
+    def test_ten_thousand_draws_in_seconds(self):
+        start = time.perf_counter()
+        quantities = sweep.analytic(sweep.draw(self.swept, 10000), self.ctx)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        for q in quantities:
+            self.assertEqual(np.shape(q.samples), (10000,), q.name)
+
+
+class Summary(unittest.TestCase):
+
+    def test_limits_are_inclusive_and_nan_fails(self):
+        q = sweep.Quantity("x", "V", np.array([1.0, 2.0, 3.0, math.nan]),
+                           1.0, 3.0, "test")
+        s = sweep.summarize(q)
+        self.assertEqual(s.failing, 1)
+        self.assertAlmostEqual(s.yield_, 0.75)
+
+    def test_the_worst_draw_is_nearest_its_limit(self):
+        s = np.array([3.1, 3.5, 3.3, 3.0])
+        self.assertEqual(sweep.summarize(
+            sweep.Quantity("x", "V", s, 3.0, 3.6, "")).worst, 3.0)
+        self.assertEqual(sweep.summarize(
+            sweep.Quantity("x", "V", s, None, 3.6, "")).worst, 3.5)
+        self.assertEqual(sweep.summarize(
+            sweep.Quantity("x", "V", s, None, None, "")).worst, 3.5)
+
+
+@unittest.skipUnless(BOARD, "board not generated")
+class Simulated(unittest.TestCase):
+
+    def test_only_the_first_draws_are_simulated_in_one_batch(self):
+        ctx = sweep.context()
+        swept, _ = sweep.tolerances(ctx.values)
+        draws = sweep.draw(swept, 100)
+        calls = []
+
+        def run_many(decks, workdir, jobs=None):
+            calls.append(decks)
+            return [({"v_max": 3.4, "v_min": 3.2, "t_rail_valid": 1e-3,
+                      "t_en_release": 2e-3}, "") for _ in decks]
+
+        with mock.patch.object(sweep.spice, "run_many", run_many):
+            got = _by_name(sweep.simulated(draws, ctx, 5, "/nonexistent"))
+        self.assertEqual([len(decks) for decks in calls], [10])
+        self.assertEqual(len(set(calls[0][0::2])), 5)
+        self.assertEqual(got["+3V3 ripple crest"].samples.shape, (5,))
+        self.assertEqual(sweep.summarize(
+            got["EN release after rail valid"]).failing, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
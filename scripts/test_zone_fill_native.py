@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Regression tests for the native zone filler (scripts/zone_fill_native.py).
+
+The native fill stands in for pcbnew's in the check loop, so the tests pin
+the parts of KiCad's pour a downstream gate would notice, first on a small
+board whose answers are known and then against the real board's KiCad fill:
+
+  Knockout  — other-net copper is cleared by exactly its size plus the zone
+              clearance; the board edge by the edge clearance.
+  Priority  — a lower zone pours round a higher other-net zone's fill.
+  Islands   — copper no same-net item reaches is removed.
+  Output    — the fractured filled_polygon text reads back as the same
+              geometry, and injecting it twice changes nothing.
+  KiCad     — on the real board, every zone matches KiCad's fill within
+              COMPARE_TOLERANCE with the same island count.
+
+Run: python3 scripts/test_zone_fill_native.py
+"""
+import os
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import zone_fill_native as N                                     # noqa: E402
+from shapely.geometry import Point                               # noqa: E402
+from shapely.ops import unary_union                              # noqa: E402
+from zone_fill_inject import inject_fills                        # noqa: E402
+
+CLEARANCE = 0.3
+VIA = 0.6
+
+
+def _zone(net, uid, priority, pts, clearance=CLEARANCE):
+    xy = " ".join(f"(xy {x} {y})" for x, y in pts)
+    return f"""  (zone
+    (net {net})
+    (net_name "N{net}")
+    (layer "F.Cu")
+    (uuid "{uid}")
+    (hatch edge 0.5)
+    (priority {priority})
+    (connect_pads
+      (clearance {clearance})
+    )
+    (min_thickness 0.25)
+    (fill yes
+      (thermal_gap 0.5)
+      (thermal_bridge_width 0.5)
+      (island_removal_mode 0)
+    )
+    (polygon
+      (pts
+        {xy}
+      )
+    )
+  )
+"""
+
+
+def _via(x, y, net):
+    return (f'  (via (at {x} {y}) (size {VIA}) (drill 0.3) '
+            f'(layers "F.Cu" "B.Cu") (net {net}) (uuid "v-{x}-{y}"))\n')
+
+
+def _track(x1, y1, x2, y2, net, width=0.25):
+    return (f'  (segment (start {x1} {y1}) (end {x2} {y2}) (width {width}) '
+            f'(layer "F.Cu") (net {net}) (uuid "t-{x1}-{y1}"))\n')
+
+
+SQUARE = [(0, 0), (20, 0), (20, 20), (0, 20)]
+
+BOARD = ("(kicad_pcb\n"
+         '  (gr_rect (start 0 0) (end 20 20) (layer "Edge.Cuts") '
+         '(uuid "edge"))\n'
+         # the low zone's anchor: without same-net copper it is all island
+         + _via(15, 15, 1)
+         # other-net copper the low zone pours round
+         + _via(10, 10, 2)
+         # a net-2 wall cutting off the top-left corner: an orphan island
+         + _track(-1, 6, 6, -1, 2)
+         + _zone(1, "low", 0, SQUARE)
+         + _zone(3, "high", 1, [(14, 2), (18, 2), (18, 6), (14, 6)])
+         + _via(16, 4, 3)
+         + ")\n")
+
+
+# no .kicad_pro/.kicad_dru beside it: the filler's default rules apply
+NO_RULES = Path(tempfile.gettempdir()) / "zone-fill-native-test.kicad_pcb"
+
+
+def _fill(text):
+    items = N.board_items(text, NO_RULES)
+    return items, N.fill_zones(items, jobs=1)
+
+
+class SyntheticBoard(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.items, cls.fills = _fill(BOARD)
+        by_uuid = {z.uuid: i for i, z in enumerate(cls.items.zones)}
+        cls.low = [p for _l, p in cls.fills[by_uuid["low"]]]
+        cls.high = [p for _l, p in cls.fills[by_uuid["high"]]]
+
+    def _in(self, polys, x, y):
+        return any(p.contains(Point(x, y)) for p in polys)
+
+    def test_other_net_via_is_cleared_by_its_clearance(self):
+        reach = VIA / 2 + CLEARANCE
+        self.assertFalse(self._in(self.low, 10 + reach - 0.01, 10))
+        self.assertTrue(self._in(self.low, 10 + reach + 0.02, 10))
+
+    def test_edge_is_cleared_by_the_edge_clearance(self):
+        self.assertFalse(self._in(self.low, 10, self.items.edge_clearance - 0.01))
+        self.assertTrue(self._in(self.low, 10, self.items.edge_clearance + 0.02))
+
+    def test_same_net_via_is_poured_over(self):
+        self.assertTrue(self._in(self.low, 15, 15))
+
+    def test_lower_zone_pours_round_the_higher_fill(self):
+        high = unary_union(self.high)
+        self.assertGreater(high.area, 10.0)
+        low = unary_union(self.low)
+        self.assertTrue(low.intersection(
+            high.buffer(CLEARANCE - 0.01)).is_empty)
+        # but not round the higher zone's outline: a gap, not a moat
+        self.assertTrue(self._in(self.low, 18 + 0.5, 10))
+
+    def test_orphan_corner_is_removed(self):
+        self.assertEqual(len(self.low), 1)
+        self.assertFalse(self._in(self.low, 1.5, 1.5))
+
+    def test_fill_text_reads_back_as_the_same_geometry(self):
+        fills = N.native_fills(BOARD, NO_RULES, jobs=1)
+        filled, missing = inject_fills(BOARD, fills)
+        self.assertEqual(missing, [])
+        back = {z.uuid: z for z in N.board_items(filled, NO_RULES).zones}
+        low = unary_union(back["low"].fills["F.Cu"])
+        # the via knockout is a hole, so this goes through the fracture
+        self.assertTrue(any(p.interiors for p in self.low))
+        # 6 decimals in the text, ~80 mm of outline
+        self.assertLess(low.symmetric_difference(unary_union(self.low)).area,
+                        1e-4)
+
+    def test_injecting_twice_changes_nothing(self):
+        fills = N.native_fills(BOARD, NO_RULES, jobs=1)
+        once, _ = inject_fills(BOARD, fills)
+        twice, _ = inject_fills(once, fills)
+        self.assertEqual(once, twice)
+        self.assertEqual(once.count("(filled_polygon"),
+                         sum(len(f) for f in self.fills))
+
+
+class RealBoard(unittest.TestCase):
+
+    def test_matches_the_kicad_fill(self):
+        if not N.DEFAULT_PCB.exists():
+            self.skipTest("board not generated")
+        text = N.DEFAULT_PCB.read_text()
+        if not re.search(r"\(filled_polygon", text):
+            self.skipTest("board has no KiCad fill to compare against")
+        filled, missing = inject_fills(text, N.native_fills(text))
+        self.assertEqual(missing, [])
+        for row in N.compare_fills(text, filled):
+            with self.subTest(zone=row.uuid, layer=row.layer):
+                self.assertTrue(N.diff_ok(row), row)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
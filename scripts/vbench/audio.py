@@ -62,6 +62,9 @@ SPEAKER_OHM = 8.0
 SPEAKER_SRC = ("website/docs/design/components.md — 28 mm 8 ohm speaker. The "
                "PAM8403's 3 W rating is into 4 ohm.")
 
+# Above this input high-pass corner the chain audibly loses bass.
+F_CORNER_MAX = 100.0
+
 
 class AudioError(RuntimeError):
     """The chain cannot be evaluated. Never downgraded to a warning."""
@@ -261,10 +264,10 @@ def main(argv=None):
     problems = []
     if v5 is None:
         problems.append("+5V has no DC solution, so no output power follows")
-    if f_corner > 100.0:
+    if f_corner > F_CORNER_MAX:
         problems.append(
             f"the input high-pass corner is {f_corner:.0f} Hz — above about "
-            f"100 Hz the chain audibly loses bass")
+            f"{F_CORNER_MAX:.0f} Hz the chain audibly loses bass")
 
     print()
     print("=" * 72)
@@ -62,14 +62,14 @@ sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
 from vbench import netlist as nl                             # noqa: E402
-from vbench import rails, sources                            # noqa: E402
+from vbench import rails, sources, spice                     # noqa: E402
 from vbench.models import require_valid                      # noqa: E402
 from vbench.models.q1_ao3401a import Q1, r_ds_on              # noqa: E402
 from vbench.models.u1_esp32s3 import U1                      # noqa: E402
 from vbench.models.u2_ip5306 import U2                       # noqa: E402
 from vbench.models.u3_sy8089 import U3, v_out                # noqa: E402
 from vbench.transients import (                              # noqa: E402
-    SimulatorMissing, board_values, r_conduction, run_ngspice)
+    SimulatorMissing, board_values, r_conduction)
 
 # Scenario input, not a claim: the containment roadmap's SNES stress
 # current on +3V3. transients.py's 0.430 A is the measured-class gaming
@@ -84,6 +84,9 @@ I_SNES_STRESS_SRC = ("docs/archived/containment-roadmap.md layer 3 — scenario
 # more than that is not.
 SOC_BROWNOUT_ACCEPTABLE = 0.10
 
+# The OCV curve points the brownout walk visits, full to empty.
+BROWNOUT_SOC = (1.0, 0.5, 0.3, 0.2, 0.1, 0.05, 0.0)
+
 
 # ── Divider corners ─────────────────────────────────────────────────
 
@@ -189,17 +192,20 @@ Cen en 0 {c_en:.12g}
 
 # ── Battery brownout ────────────────────────────────────────────────
 
-def stress_currents(v_bat):
+def stress_currents(v_bat, v33=None):
     """Currents for the SNES stress load, each with its epistemic status.
 
     +5V-side current is derived (buck conduction loss from cited R_ds_on);
     battery-side current uses the cited "up to" boost efficiency, so it
-    is a LOWER bound (U2 efficiency curve is UNESTABLISHED).
+    is a LOWER bound (U2 efficiency curve is UNESTABLISHED). `v33` is the
+    rail the buck holds, the typical target unless given.
     """
-    v33 = v_out(100e3, 22e3)  # typ target; identity from netlist elsewhere
-    p_33 = v33 * I_SNES_STRESS
-    p_5 = p_33 + I_SNES_STRESS ** 2 * r_conduction()
+    from vbench.thermal import p_buck_conduction
+    if v33 is None:
+        v33 = v_out(100e3, 22e3)  # typ target; identity from netlist elsewhere
     v5 = U2.params["v_out_typ"].value
+    p_33 = v33 * I_SNES_STRESS
+    p_5 = p_33 + p_buck_conduction(I_SNES_STRESS, v33 / v5)
     i_5 = p_5 / v5
     eta = U2.params["eta_boost_max"].value
     i_bat = p_5 / (v_bat * eta)
@@ -237,7 +243,7 @@ def brownout_soc():
     v_bat_min = U2.params["v_bat_operating_min"].value
     rows = []
     first_fail = None
-    for soc in (1.0, 0.5, 0.3, 0.2, 0.1, 0.05, 0.0):
+    for soc in BROWNOUT_SOC:
         cell = sources.lipo(soc)
         _, i_bat = stress_currents(cell.v_open)
         drop = i_bat * (cell.r_internal + r_ds_on(-cell.v_open))
@@ -278,16 +284,25 @@ def main(argv=None):
         print("  specifies DF at 120 Hz only) — simulated ripple is a "
               "FLOOR, stated per corner.")
 
+        # Every deck below is independent of the others' results:
+        # simulate them as one batch, then read them in report order.
+        corners = divider_corners()
+        r_ref, r_en, c_ref, c_en = find_en_rc()
+        i_5, _ = stress_currents(sources.lipo(0.5).v_open)
+        decks = [deck_corner_ripple(c_3v3, l_buck, v_in, v_corner,
+                                    I_SNES_STRESS)
+                 for _label, v_corner in corners]
+        decks += [deck_en_ramp(c_3v3, I_SNES_STRESS, r_en, c_en, v_rail),
+                  deck_bulk_ride_through(c_5v, i_5)]
+        sims = iter(spice.run_many(decks, workdir))
+
         # ── 1. divider corners ───────────────────────────────────────
         print()
         print("-" * 72)
         print(f"  1. buck output at divider corners vs the ESP32-S3 window "
               f"[{v_lo_ok}, {v_hi_ok}] V")
-        corners = divider_corners()
         for label, v_corner in corners:
-            vals, _ = run_ngspice(
-                deck_corner_ripple(c_3v3, l_buck, v_in, v_corner,
-                                   I_SNES_STRESS), workdir)
+            vals, _ = next(sims)
             ripple = vals["v_max"] - vals["v_min"]
             print(f"     {label:>3}: target {v_corner:.3f} V, simulated "
                   f"mean {vals['v_avg']:.3f} V, ripple {ripple*1e3:.1f} mV "
@@ -304,9 +319,7 @@ def main(argv=None):
                     f"{v_lo_ok} V minimum")
 
         # ── 2. EN ramp ───────────────────────────────────────────────
-        r_ref, r_en, c_ref, c_en = find_en_rc()
-        vals, _ = run_ngspice(
-            deck_en_ramp(c_3v3, I_SNES_STRESS, r_en, c_en, v_rail), workdir)
+        vals, _ = next(sims)
         t_rail = vals.get("t_rail_valid")
         t_en = vals.get("t_en_release")
         print()
@@ -346,8 +359,7 @@ def main(argv=None):
                 f"pack leaves the IP5306 operating window at SoC "
                 f"{first_fail:.2f} under the stress load — more than the "
                 f"declared {SOC_BROWNOUT_ACCEPTABLE:.0%} acceptable loss")
-        i_5, _ = stress_currents(sources.lipo(0.5).v_open)
-        vals, _ = run_ngspice(deck_bulk_ride_through(c_5v, i_5), workdir)
+        vals, _ = next(sims)
         uvp = U2.params["v_out_uvp"].value
         print(f"     +5V under the {i_5:.2f} A stress step: min "
               f"{vals['v5_min']:.3f} V vs cited UVP {uvp} V")
@@ -358,6 +370,7 @@ def main(argv=None):
                 "declares brownout")
 
         print()
+        print(f"  {spice.summary()}")
         print("=" * 72)
         if failures:
             print(f"  FAIL — {len(failures)} dynamic violation(s):")
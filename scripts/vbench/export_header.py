@@ -31,6 +31,7 @@ sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
 from vbench import audio, buttons, display, rails, sources, thermal  # noqa: E402
+from vbench import ili9488_ctrl as ili                                # noqa: E402
 from vbench import netlist as nl                                      # noqa: E402
 from vbench import pins as pinmod                                     # noqa: E402
 from vbench.models.q1_ao3401a import Q1, r_ds_on                       # noqa: E402
@@ -95,6 +96,13 @@ def derive():
         "r_int": sources.lipo(0.5).r_internal,
         "bus": [bus[n] for n in range(8)],
         "mode_8080_8bit": mode_ok,
+        "ili_cmd": [("SLPOUT", ili.CMD_SLPOUT), ("DISPON", ili.CMD_DISPON),
+                    ("CASET", ili.CMD_CASET), ("PASET", ili.CMD_PASET),
+                    ("RAMWR", ili.CMD_RAMWR), ("MADCTL", ili.CMD_MADCTL),
+                    ("COLMOD", ili.CMD_COLMOD)],
+        "ili_madctl_mv": 1 << ili.BIT_MV,
+        "ili_madctl_mx": 1 << ili.BIT_MX,
+        "ili_colmod_16bpp": (ili.DBI_16BPP << 4) | ili.DBI_16BPP,
         "t_rise_us": t_rise * 1e6,
         "rc_mask": rc_mask,
         "boot_mode": mode_now,
@@ -166,6 +174,16 @@ def render(d):
     w(f"#define VB_LCD_MODE_8080_8BIT {1 if d['mode_8080_8bit'] else 0} "
       f"/* IM straps, derived from copper */\n\n")
 
+    w("/* ILI9488 protocol — models/ds1_ili9488.py, each value cited there.\n")
+    w(" * With VB_I80_TRACE=<file> set, vbench_hal.c records the bytes the\n")
+    w(" * panel would receive, framed by these, for i80_trace.py to replay\n")
+    w(" * through the controller model. */\n")
+    for name, opcode in d["ili_cmd"]:
+        w(f"#define VB_ILI_CMD_{name} 0x{opcode:02X}\n")
+    w(f"#define VB_ILI_MADCTL_MV 0x{d['ili_madctl_mv']:02X}\n")
+    w(f"#define VB_ILI_MADCTL_MX 0x{d['ili_madctl_mx']:02X}\n")
+    w(f"#define VB_ILI_COLMOD_RGB565 0x{d['ili_colmod_16bpp']:02X}\n\n")
+
     w("/* Buttons — buttons.py: release edge to 70% of rail through the\n")
     w(" * 10k x 100nF network. Bit order matches sim_hal.h SIM_BTN_*. A\n")
     w(" * clear bit in VB_BTN_RC_MASK = no external RC (BTN_L: R14 is DNP\n")
@@ -0,0 +1,404 @@
+"""Virtual Bench T3.1b — i80 bus traces, replayed into the ILI9488 model.
+
+`vbench_hal.c` pushes every LCD byte through VB_LCD_BUS_MAP, and with
+VB_I80_TRACE=<file> set it also records them: the command and RAM-data runs
+the firmware's i80 bus carries, opcodes and parameters permuted by the
+same map as pixels, so as the panel's DB[7:0] sees them, with a
+frame boundary at each flush. This module reads such a trace back through
+`ILI9488Controller`, so a multi-minute emulator run can be checked against
+the controller model offline — faults, pixels written and ignored, one PNG
+per frame — and two runs can be compared down to the first pixel that
+differs.
+
+## The format
+
+Little-endian throughout. One header, then records until end of file:
+
+    header   "<4sHHI"  magic b"I80T", version (1), header size (12),
+                       WRX clock in Hz (0 = not modelled)
+    record   "<BIQI"   kind, count, t0 (ns), period (ns), then `count`
+                       payload bytes for kinds 0 and 1
+
+    kind 0   `count` bytes written with D/CX low  (commands)
+    kind 1   `count` bytes written with D/CX high (parameters, RAM data)
+    kind 2   frame boundary at t0; count 0, no payload
+
+Kinds 0 and 1 are the D/CX level itself. Byte k of a run was written at
+t0 + k * period; period 0 means only the run's start is known. A (D/CX,
+byte, timestamp) per write would take ten bytes per byte; here a whole
+320 x 480 RGB565 frame costs one 17-byte record header over its payload.
+Timestamps never go backwards, and a reader that sees them do — or a
+record cut short, or a kind it does not know — raises TraceError.
+
+## Streaming
+
+records() never holds more than `chunk` payload bytes: a long run comes out
+as consecutive pieces, each with its own t0. frames() feeds them to the
+controller as they arrive; write_bytes() carries a pixel split between two
+pieces, so a trace replays the same in 4 KiB pieces as in one read. The
+controller a Frame carries is the live one — use it before asking for the
+next frame.
+
+Provides:
+  TraceError                  — a malformed trace. Fatal.
+  TraceWriter(fh, clock_hz)   — .write(dcx, data, t0_ns, period_ns)
+                                .frame(t_ns)
+  read_header(fh)             — Header(version, clock_hz)
+  records(fh, chunk)          — Run(kind, t0_ns, period_ns, data), streamed
+  frames(fh, ctrl, chunk)     — Frame(index, t_ns, bytes, ctrl) per boundary
+  first_difference(a, b)      — (x, y) of the first pixel two controllers
+                                disagree on, raster order; None if none
+  diff(fh_a, fh_b, chunk)     — Divergence at the first frame that differs
+  synthesize(fh, frames, clock_hz)
+                              — a firmware-shaped trace of the animated test
+                                pattern, for the bench and the tests
+
+Exit codes: 0 clean (replay) or identical (diff), 1 a controller fault or a
+divergence, 2 a trace that cannot be read.
+
+Usage:
+    python3 scripts/vbench/i80_trace.py replay run.i80 --png-dir out/ --every 60
+    python3 scripts/vbench/i80_trace.py replay            # synthesized trace
+    python3 scripts/vbench/i80_trace.py diff golden.i80 run.i80
+    python3 scripts/vbench/i80_trace.py synth out.i80 --frames 120
+"""
+
+import argparse
+import collections
+import itertools
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+
+from vbench import ili9488_ctrl as ili                          # noqa: E402
+
+MAGIC = b"I80T"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<BIQI")
+
+KIND_COMMAND = 0
+KIND_DATA = 1
+KIND_FRAME = 2
+
+CHUNK = 1 << 16         # payload bytes per Run, at most
+
+DEMO_TRACE = os.path.join(BASE, "software", "build", "vbench",
+                          "i80-demo.trace")
+
+Header = collections.namedtuple("Header", "version clock_hz")
+Run = collections.namedtuple("Run", "kind t0_ns period_ns data")
+Frame = collections.namedtuple("Frame", "index t_ns bytes ctrl")
+Divergence = collections.namedtuple(
+    "Divergence", "frame t_ns x y a b frames_a frames_b")
+
+
+class TraceError(ValueError):
+    """The trace is not one this reader can replay faithfully."""
+
+
+class TraceWriter:
+    """Writes the format above to a binary file object."""
+
+    def __init__(self, fh, clock_hz=0):
+        self.fh = fh
+        self.t_ns = 0
+        fh.write(HEADER.pack(MAGIC, VERSION, HEADER.size, int(clock_hz)))
+
+    def _time(self, t_ns):
+        if t_ns < self.t_ns:
+            raise TraceError(f"timestamp {t_ns} ns is before {self.t_ns} ns")
+        self.t_ns = t_ns
+
+    def write(self, dcx, data, t0_ns, period_ns=0):
+        """One run of bytes at one D/CX level."""
+        data = bytes(data)
+        if not data:
+            return
+        self._time(t0_ns)
+        self.fh.write(RECORD.pack(KIND_DATA if dcx else KIND_COMMAND,
+                                  len(data), t0_ns, period_ns))
+        self.fh.write(data)
+        self.t_ns = t0_ns + (len(data) - 1) * period_ns
+
+    def frame(self, t_ns):
+        self._time(t_ns)
+        self.fh.write(RECORD.pack(KIND_FRAME, 0, t_ns, 0))
+
+
+def read_header(fh):
+    raw = fh.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise TraceError("shorter than its header")
+    magic, version, size, clock_hz = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise TraceError(f"magic {magic!r}, not {MAGIC!r}: not an i80 trace")
+    if version != VERSION:
+        raise TraceError(f"version {version}; this reader knows {VERSION}")
+    if size < HEADER.size:
+        raise TraceError(f"header size {size} < {HEADER.size}")
+    fh.read(size - HEADER.size)         # a later version's extra fields
+    return Header(version, clock_hz)
+
+
+def records(fh, chunk=CHUNK):
+    """Every Run after the header, no payload longer than `chunk`."""
+    read_header(fh)
+    last = 0
+    while True:
+        raw = fh.read(RECORD.size)
+        if not raw:
+            return
+        if len(raw) < RECORD.size:
+            raise TraceError(f"record cut short at byte {fh.tell()}")
+        kind, count, t0, period = RECORD.unpack(raw)
+        if kind not in (KIND_COMMAND, KIND_DATA, KIND_FRAME):
+            raise TraceError(f"unknown record kind {kind} at byte "
+                             f"{fh.tell() - RECORD.size}")
+        if t0 < last:
+            raise TraceError(f"timestamp {t0} ns is before {last} ns at "
+                             f"byte {fh.tell() - RECORD.size}")
+        if kind == KIND_FRAME:
+            last = t0
+            yield Run(kind, t0, 0, b"")
+            continue
+        done = 0
+        while done < count:
+            data = fh.read(min(chunk, count - done))
+            if not data:
+                raise TraceError(f"run of {count} bytes ends after {done}, "
+                                 f"at byte {fh.tell()}")
+            yield Run(kind, t0 + done * period, period, data)
+            done += len(data)
+        last = t0 + max(count - 1, 0) * period
+
+
+def frames(fh, ctrl=None, chunk=CHUNK):
+    """Replay into `ctrl` (a fresh controller by default), one Frame per
+    boundary, and one more if bytes arrived after the last boundary."""
+    ctrl = ctrl if ctrl is not None else ili.ILI9488Controller()
+    index = total = 0
+    pending = False
+    t_ns = 0
+    for run in records(fh, chunk):
+        if run.kind == KIND_FRAME:
+            yield Frame(index, run.t0_ns, total, ctrl)
+            index += 1
+            pending = False
+            continue
+        ctrl.write_bytes(run.kind, run.data)
+        total += len(run.data)
+        t_ns = run.t0_ns + (len(run.data) - 1) * run.period_ns
+        pending = True
+    if pending:
+        yield Frame(index, t_ns, total, ctrl)
+
+
+def first_difference(a, b):
+    """(x, y) of the first pixel, in raster order, that two controllers
+    hold differently — written in one and not the other, or written with
+    different colours. None if the framebuffers agree."""
+    differ = (a.unwritten != b.unwritten) | (a.rgb != b.rgb).any(axis=2)
+    hits = np.flatnonzero(differ)
+    if not len(hits):
+        return None
+    y, x = divmod(int(hits[0]), ili.WIDTH)
+    return x, y
+
+
+def diff(fh_a, fh_b, chunk=CHUNK):
+    """The first frame two traces render differently, or None.
+
+    Both are replayed in lockstep, one frame of each in memory. A trace
+    that ends first diverges at the frame it is missing (x and y None).
+    """
+    count_a = count_b = 0
+    for fa, fb in itertools.zip_longest(frames(fh_a, chunk=chunk),
+                                        frames(fh_b, chunk=chunk)):
+        count_a += fa is not None
+        count_b += fb is not None
+        if fa is None or fb is None:
+            here = fa or fb
+            return Divergence(here.index, here.t_ns, None, None, None, None,
+                              count_a, count_b)
+        pos = first_difference(fa.ctrl, fb.ctrl)
+        if pos is not None:
+            x, y = pos
+            return Divergence(fa.index, fa.t_ns, x, y, fa.ctrl.pixel(x, y),
+                              fb.ctrl.pixel(x, y), count_a, count_b)
+    return None
+
+
+def synthesize(fh, frames, clock_hz=None):
+    """Write the animated test pattern as the firmware would send it.
+
+    SLPOUT, COLMOD 0x55, CASET/PASET to the panel, DISPON, then per frame a
+    RAMWR and the whole window of RGB565 data, back to back at the WRX
+    clock (default: the firmware's LCD_CLK_HZ), and a boundary. Returns the
+    byte count on the bus.
+    """
+    clock_hz = clock_hz or ili._firmware_clock_hz()
+    period = int(round(1e9 / clock_hz))
+    out = TraceWriter(fh, clock_hz)
+    t = 0
+
+    def send(dcx, data):
+        nonlocal t
+        out.write(dcx, data, t, period)
+        t += len(data) * period
+
+    fmt = ili.FORMATS[ili.DBI_16BPP]
+    w, h = ili.WIDTH, ili.HEIGHT
+    for opcode, params in (
+            (ili.CMD_SLPOUT, []),
+            (ili.CMD_COLMOD, [(fmt.dbi << 4) | fmt.dbi]),
+            (ili.CMD_CASET, [0, 0, (w - 1) >> 8, (w - 1) & 0xFF]),
+            (ili.CMD_PASET, [0, 0, (h - 1) >> 8, (h - 1) & 0xFF]),
+            (ili.CMD_DISPON, [])):
+        send(0, [opcode])
+        send(1, params)
+    total = 0
+    for rgb in ili.animation(frames, w, h):
+        payload = ili.encode_frame(fmt, rgb)
+        send(0, [ili.CMD_RAMWR])
+        send(1, payload)
+        out.frame(t)
+        total += 1 + len(payload)
+    return total
+
+
+# ── CLI ───────────────────────────────────────────────────────────────
+def _pixel(px):
+    return "unwritten" if px is None else "({:3d},{:3d},{:3d})".format(*px)
+
+
+def _replay(args):
+    path = args.trace
+    if path is None:
+        path = DEMO_TRACE
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            synthesize(fh, args.frames)
+    if args.png_dir:
+        os.makedirs(args.png_dir, exist_ok=True)
+
+    print("=" * 72)
+    print("  Virtual Bench T3.1b — an i80 bus trace through the ILI9488 model")
+    print("=" * 72)
+    print(f"  Trace  : {os.path.relpath(path, BASE)}")
+    if args.trace is None:
+        print(f"           synthesized: {args.frames} animated test frames")
+    start = time.perf_counter()
+    last = None
+    written = 0
+    with open(path, "rb") as fh:
+        clock = read_header(fh).clock_hz
+        fh.seek(0)
+        for frame in frames(fh, chunk=args.chunk):
+            last = frame
+            if args.png_dir and frame.index % args.every == 0:
+                ili.write_png(os.path.join(
+                    args.png_dir, f"frame-{frame.index:05d}.png"),
+                    frame.ctrl.frame())
+                written += 1
+    elapsed = time.perf_counter() - start
+    if last is None:
+        print("  Empty  : no bytes and no frame boundaries")
+        print("=" * 72)
+        return 0
+    ctrl = last.ctrl
+    print(f"  Clock  : {clock / 1e6:.3g} MHz" if clock
+          else "  Clock  : not recorded")
+    print(f"  Bus    : {last.bytes} bytes, {last.index + 1} frame(s), "
+          f"{last.t_ns / 1e9:.3f} s of bus time")
+    print(f"  Pixels : {ctrl.pixels_written} written, "
+          f"{ctrl.pixels_ignored} ignored")
+    print(f"  Replay : {elapsed:.2f} s, {(last.index + 1) / elapsed:.0f} "
+          f"frames/s, {last.bytes / elapsed / 1e6:.0f} MB/s")
+    if args.png_dir:
+        print(f"  PNGs   : {written} in {args.png_dir} (every "
+              f"{args.every} frame(s)); unwritten pixels drawn grey")
+    print("=" * 72)
+    if ctrl.faults:
+        print(f"  FAIL — {len(ctrl.faults)} controller fault(s)")
+        for flt in ctrl.faults[:20]:
+            print(f"    [{flt.code}] {flt.detail}  ({flt.locator})")
+        if len(ctrl.faults) > 20:
+            print(f"    ... and {len(ctrl.faults) - 20} more")
+        print("=" * 72)
+        return 1
+    print("  Every byte went through the state machine without a fault.")
+    print("=" * 72)
+    return 0
+
+
+def _diff(args):
+    print("=" * 72)
+    print("  Virtual Bench T3.1b — two i80 bus traces, frame by frame")
+    print("=" * 72)
+    print(f"  A      : {args.a}")
+    print(f"  B      : {args.b}")
+    with open(args.a, "rb") as fa, open(args.b, "rb") as fb:
+        found = diff(fa, fb, chunk=args.chunk)
+    print("=" * 72)
+    if found is None:
+        print("  IDENTICAL — every frame renders the same in both")
+        print("=" * 72)
+        return 0
+    if found.x is None:
+        print(f"  DIVERGED at frame {found.frame} ({found.t_ns / 1e9:.6f} s): "
+              f"A has {found.frames_a} frame(s), B has {found.frames_b}")
+    else:
+        print(f"  DIVERGED at frame {found.frame} ({found.t_ns / 1e9:.6f} s), "
+              f"first at pixel ({found.x}, {found.y})")
+        print(f"    A {_pixel(found.a)}")
+        print(f"    B {_pixel(found.b)}")
+    print("=" * 72)
+    return 1
+
+
+def _synth(args):
+    with open(args.out, "wb") as fh:
+        total = synthesize(fh, args.frames, args.clock)
+    print(f"  {args.out}: {args.frames} frame(s), {total} bytes on the bus")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--chunk", type=int, default=CHUNK,
+                    help="payload bytes read at a time (default: %(default)s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("replay", help="replay a trace into the controller")
+    rp.add_argument("trace", nargs="?",
+                    help="trace file (default: synthesize the test pattern)")
+    rp.add_argument("--png-dir", help="write frame-NNNNN.png here")
+    rp.add_argument("--every", type=int, default=1,
+                    help="only every Nth frame as a PNG")
+    rp.add_argument("--frames", type=int, default=60,
+                    help="frames to synthesize when no trace is given")
+    dp = sub.add_parser("diff", help="first pixel two traces disagree on")
+    dp.add_argument("a")
+    dp.add_argument("b")
+    sp = sub.add_parser("synth", help="write the animated test pattern")
+    sp.add_argument("out")
+    sp.add_argument("--frames", type=int, default=60)
+    sp.add_argument("--clock", type=float, default=None,
+                    help="WRX clock in Hz for the timestamps "
+                         "(default: the firmware's)")
+    args = ap.parse_args(argv)
+    try:
+        return {"replay": _replay, "diff": _diff, "synth": _synth}[args.cmd](args)
+    except (TraceError, OSError) as exc:
+        print(f"  ERROR: {exc}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
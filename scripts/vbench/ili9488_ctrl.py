@@ -33,8 +33,19 @@ Three properties are deliberate:
    basis of its "available" figure so nobody reads a bus-geometry pass as a
    closed setup/hold loop.
 
+RAM data has a bulk path. `write_bytes()` with D/CX high during an active
+RAMWR/RAMWRC decodes the whole payload with NumPy and places it through the
+same address counter, as index arrays, instead of one `write()` per byte.
+Nothing in a RAM-data run can fault — every fault is raised by a command, a
+parameter, or the RAMWR that opened the run — so the bulk path ends in the
+state the byte-wise one would: the same pixels, the same counter, the same
+written/ignored counts, a partial pixel carried into the next call. Bytes
+outside 0..255 fall back to the byte-wise path, which raises where it always
+did. `frame_rate()` measures whole frames per second through it.
+
 Usage:
     python3 scripts/vbench/ili9488_ctrl.py --demo
+    python3 scripts/vbench/ili9488_ctrl.py --demo --frames 120
 """
 
 import argparse
@@ -42,8 +53,11 @@ import collections
 import os
 import struct
 import sys
+import time
 import zlib
 
+import numpy as np
+
 BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
@@ -135,7 +149,10 @@ NAMES = {
 
 
 def _to8_from6(v):
-    """6-bit component to 8-bit, replicating the high bits (0..63 -> 0..255)."""
+    """6-bit component to 8-bit, replicating the high bits (0..63 -> 0..255).
+
+    Takes an int or a uint8 array alike.
+    """
     return (v << 2) | (v >> 4)
 
 
@@ -143,13 +160,26 @@ def _to8_from5(v):
     return (v << 3) | (v >> 2)
 
 
+def _as_bytes(data):
+    """`data` as a uint8 array, or None if any entry is not a byte."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(memoryview(data).cast("B"), dtype=np.uint8)
+    arr = np.asarray(data)
+    if arr.ndim != 1 or (arr.size and arr.dtype.kind not in "iu"):
+        return None
+    if arr.size and (arr.min() < 0 or arr.max() > 0xFF):
+        return None
+    return arr.astype(np.uint8)
+
+
 class ILI9488Controller:
     """The controller's write-side behaviour, driven one bus byte at a time.
 
     The framebuffer is the PHYSICAL panel: index (x, y) with x in [0, 320)
     and y in [0, 480), regardless of what MADCTL is doing to the addressing.
     That is the whole point — a rotation bug shows up as a pixel in the wrong
-    physical place, which is what the user sees.
+    physical place, which is what the user sees. `rgb` holds it as
+    (HEIGHT, WIDTH, 3) uint8 and `unwritten` marks what no write has reached.
     """
 
     def __init__(self):
@@ -166,9 +196,10 @@ class ILI9488Controller:
         self.ec = _v("reset_caset_end")
         self.sp = _v("reset_paset_start")
         self.ep = _v("reset_paset_end")
-        # "Frame Memory: Random" (p.306 table 37). None means "the spec does
-        # not say what is here", which is not the same as black.
-        self.fb = [None] * (WIDTH * HEIGHT)
+        # "Frame Memory: Random" (p.306 table 37). `unwritten` means "the
+        # spec does not say what is here", which is not the same as black.
+        self.rgb = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        self.unwritten = np.ones((HEIGHT, WIDTH), dtype=bool)
         self.faults = []
         self.pixels_written = 0
         self.pixels_ignored = 0
@@ -269,6 +300,16 @@ class ILI9488Controller:
             self._parameter(byte)
 
     def write_bytes(self, dcx, data):
+        """One write() per byte — except RAM data, which takes the bulk path
+        (module docstring) and ends in the same state."""
+        if dcx != _v("dcx_command_level") and self._ramwr_active:
+            if not isinstance(data, (bytes, bytearray, memoryview,
+                                     np.ndarray)):
+                data = list(data)
+            raw = _as_bytes(data)
+            if raw is not None:
+                self._ram_bulk(raw)
+                return
         for b in data:
             self.write(dcx, b)
 
@@ -277,6 +318,12 @@ class ILI9488Controller:
         self.write(0, opcode)
         self.write_bytes(1, params)
 
+    def ram_write(self, payload, opcode=None):
+        """RAMWR (or `opcode`, e.g. RAMWRC) and then a whole payload of RAM
+        data — bytes, bytearray, memoryview or a uint8 array."""
+        self.write(0, CMD_RAMWR if opcode is None else opcode)
+        self.write_bytes(1, payload)
+
     # ── internals ─────────────────────────────────────────────────────
     def _fault(self, code, detail, locator):
         self.faults.append(Fault(code, detail, locator))
@@ -467,12 +514,74 @@ class ILI9488Controller:
             return
         x, y = self.map_address(self._col, self._page)
         if 0 <= x < WIDTH and 0 <= y < HEIGHT:
-            self.fb[y * WIDTH + x] = (r, g, b)
+            self.rgb[y, x] = (r, g, b)
+            self.unwritten[y, x] = False
             self.pixels_written += 1
         else:
             self.pixels_ignored += 1
         self._advance()
 
+    def _ram_bulk(self, data):
+        """_ram_byte() over a whole uint8 payload at once."""
+        fmt = self.fmt
+        if self._bytes:
+            data = np.concatenate((np.array(self._bytes, np.uint8), data))
+        whole = len(data) - len(data) % fmt.transfers
+        self._bytes = data[whole:].tolist()
+        raw = data[:whole].reshape(-1, fmt.transfers)
+        if not len(raw):
+            return
+        if fmt.dbi == DBI_16BPP:
+            r = _to8_from5(raw[:, 0] >> 3)
+            g = _to8_from6(((raw[:, 0] & 0b111) << 3) | (raw[:, 1] >> 5))
+            b = _to8_from5(raw[:, 1] & 0b11111)
+        else:
+            r, g, b = (_to8_from6(raw[:, k] >> 2) for k in range(3))
+        if self.bgr:
+            r, b = b, r
+
+        cols, pages = self._addresses(len(raw))
+        x, y = self.map_address(cols, pages)
+        ok = (x >= 0) & (x < WIDTH) & (y >= 0) & (y < HEIGHT)
+        x, y = x[ok], y[ok]
+        self.rgb[y, x] = np.stack((r, g, b), axis=1)[:len(cols)][ok]
+        self.unwritten[y, x] = False
+        self.pixels_written += len(x)
+        self.pixels_ignored += len(raw) - len(x)
+
+    def _addresses(self, n):
+        """(columns, pages) the next `n` pixels are stored at, as arrays,
+        with the counter advanced past them — _store()'s walk, vectorised.
+        Shorter than `n` when the window runs out: those pixels are ignored
+        and, as in _store(), do not move the counter."""
+        if self.mv:
+            inner, lo, hi, outer, last = (self._page, self.sp, self.ep,
+                                          self._col, self.ec)
+        else:
+            inner, lo, hi, outer, last = (self._col, self.sc, self.ec,
+                                          self._page, self.ep)
+        if inner > hi or outer > last:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        first = hi - inner + 1          # what is left of the current line
+        span = hi - lo + 1              # every line after it
+        count = min(n, first + (last - outer) * span if span > 0 else first)
+        step = max(span, 1)
+        k = np.arange(count)
+        later = k - first
+        ins = np.where(later < 0, inner + k, lo + later % step)
+        outs = outer + np.where(later < 0, 0, later // step + 1)
+        if count < first:
+            inner += count
+        else:
+            outer += 1 + (count - first) // step
+            inner = lo + (count - first) % step
+        if self.mv:
+            self._page, self._col = inner, outer
+            return outs, ins
+        self._col, self._page = inner, outer
+        return ins, outs
+
     def _advance(self):
         """Counter order per p.179, which states both MADCTL D5 cases."""
         if self.mv:
@@ -488,7 +597,24 @@ class ILI9488Controller:
 
     # ── readout ───────────────────────────────────────────────────────
     def pixel(self, x, y):
-        return self.fb[y * WIDTH + x]
+        """(r, g, b) at physical (x, y), or None if nothing was written."""
+        if self.unwritten[y, x]:
+            return None
+        return tuple(int(v) for v in self.rgb[y, x])
+
+    @property
+    def fb(self):
+        """Every pixel in raster order, (r, g, b) or None — the flat view."""
+        return [None if blank else tuple(px) for blank, px in
+                zip(self.unwritten.ravel().tolist(),
+                    self.rgb.reshape(-1, 3).tolist())]
+
+    def frame(self, unwritten=(60, 60, 60)):
+        """The framebuffer as a (HEIGHT, WIDTH, 3) uint8 array, with
+        `unwritten` where rgb_rows() puts it."""
+        out = self.rgb.copy()
+        out[self.unwritten] = unwritten
+        return out
 
     def rgb_rows(self, unwritten=(60, 60, 60)):
         """The framebuffer as rows of (r, g, b).
@@ -497,23 +623,27 @@ class ILI9488Controller:
         table 37). It is a placeholder, not a colour the controller produces,
         and `--demo` says so next to the export.
         """
-        out = []
-        for y in range(HEIGHT):
-            row = self.fb[y * WIDTH:(y + 1) * WIDTH]
-            out.append([px if px is not None else unwritten for px in row])
-        return out
+        return [[tuple(px) for px in row]
+                for row in self.frame(unwritten).tolist()]
 
 
-# ── PNG export, stdlib only ───────────────────────────────────────────────
+# ── PNG export ────────────────────────────────────────────────────────────
 def write_png(path, rows):
-    """Write 8-bit RGB rows as a PNG. zlib and struct are enough for this."""
-    height = len(rows)
-    width = len(rows[0]) if height else 0
-    raw = bytearray()
-    for row in rows:
-        raw.append(0)                       # filter type 0 (None)
-        for r, g, b in row:
-            raw += bytes((r & 0xFF, g & 0xFF, b & 0xFF))
+    """Write 8-bit RGB rows — or a (height, width, 3) uint8 array, e.g.
+    ILI9488Controller.frame() — as a PNG. zlib and struct do the rest."""
+    if isinstance(rows, np.ndarray):
+        height, width = rows.shape[:2]
+        scan = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+        scan[:, 1:] = rows.reshape(height, width * 3)   # filter type 0
+        raw = scan.tobytes()
+    else:
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        raw = bytearray()
+        for row in rows:
+            raw.append(0)                       # filter type 0 (None)
+            for r, g, b in row:
+                raw += bytes((r & 0xFF, g & 0xFF, b & 0xFF))
 
     def chunk(tag, data):
         return (struct.pack(">I", len(data)) + tag + data
@@ -606,23 +736,33 @@ def test_pattern(ctrl, fmt_dbi=DBI_16BPP):
     ctrl.command(CMD_CASET, [0, 0, (w - 1) >> 8, (w - 1) & 0xFF])
     ctrl.command(CMD_PASET, [0, 0, (h - 1) >> 8, (h - 1) & 0xFF])
 
-    bars = [(255, 0, 0), (0, 255, 0), (0, 0, 255),
-            (255, 255, 0), (0, 255, 255), (255, 0, 255), (128, 128, 128)]
-    fmt = FORMATS[fmt_dbi]
-    payload = bytearray()
-    for page in range(h):
-        for col in range(w):
-            if col < w // 8 and page < h // 8:
-                r, g, b = (255, 255, 255)
-            else:
-                r, g, b = bars[(page * len(bars)) // h]
-            payload += encode_pixel(fmt, r, g, b)
-    ctrl.command(CMD_RAMWR)
-    ctrl.write_bytes(1, payload)
+    payload = encode_frame(FORMATS[fmt_dbi], _pattern(w, h))
+    ctrl.ram_write(payload)
     ctrl.command(CMD_DISPON)
     return len(payload)
 
 
+_BARS = np.array([(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0),
+                  (0, 255, 255), (255, 0, 255), (128, 128, 128)], np.uint8)
+
+
+def _pattern(w, h, marker=(0, 0)):
+    """(h, w, 3) colour bars with the w/8 x h/8 white marker at `marker`
+    — one row per page, in the order RAMWR sends them."""
+    rgb = np.repeat(_BARS[(np.arange(h) * len(_BARS)) // h][:, None], w,
+                    axis=1)
+    col, page = marker
+    rgb[page:page + h // 8, col:col + w // 8] = 255
+    return rgb
+
+
+def animation(frames, w=WIDTH, h=HEIGHT):
+    """`frames` (h, w, 3) frames of the test pattern, its marker stepping
+    8 addresses diagonally per frame and wrapping inside the window."""
+    for k in range(frames):
+        yield _pattern(w, h, ((k * 8) % (w - w // 8), (k * 8) % (h - h // 8)))
+
+
 def encode_pixel(fmt, r, g, b):
     if fmt.dbi == DBI_16BPP:
         v = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
@@ -630,6 +770,40 @@ def encode_pixel(fmt, r, g, b):
     return bytes((r & 0xFC, g & 0xFC, b & 0xFC))
 
 
+def encode_frame(fmt, rgb):
+    """encode_pixel() over a (..., 3) uint8 array, as one RAMWR payload."""
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if fmt.dbi == DBI_16BPP:
+        r, g, b = (rgb[..., k].astype(np.uint16) for k in range(3))
+        v = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+        return v.astype(">u2").tobytes()
+    return (rgb & 0xFC).tobytes()
+
+
+def frame_rate(frames=60, fmt_dbi=DBI_16BPP):
+    """Whole frames per second through the RAM-data path.
+
+    Drives an animation — the test pattern with its marker stepping across
+    the panel — as a full-window RAMWR per frame. The payloads are encoded
+    before the clock starts, so this is the controller's rate, not NumPy's.
+    Returns (frames/s, the controller after the last frame).
+    """
+    ctrl = ILI9488Controller()
+    ctrl.command(CMD_SLPOUT)
+    ctrl.command(CMD_COLMOD, [(fmt_dbi << 4) | fmt_dbi])
+    w, h = ctrl.col_span, ctrl.page_span
+    ctrl.command(CMD_CASET, [0, 0, (w - 1) >> 8, (w - 1) & 0xFF])
+    ctrl.command(CMD_PASET, [0, 0, (h - 1) >> 8, (h - 1) & 0xFF])
+    ctrl.command(CMD_DISPON)
+    fmt = FORMATS[fmt_dbi]
+    payloads = [encode_frame(fmt, rgb) for rgb in animation(frames, w, h)]
+    start = time.perf_counter()
+    for payload in payloads:
+        ctrl.ram_write(payload)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else float("inf"), ctrl
+
+
 def _firmware_clock_hz():
     """LCD_CLK_HZ out of board_config.h — read, never retyped."""
     path = os.path.join(BASE, "software", "main", "board_config.h")
@@ -654,6 +828,8 @@ def main(argv=None):
         help="where to write the demo frame (default: an ignored build dir)")
     ap.add_argument("--clock", type=float, default=None,
                     help="WRX clock in Hz (default: the firmware's)")
+    ap.add_argument("--frames", type=int, default=30,
+                    help="animated frames to time the RAM-data path over")
     args = ap.parse_args(argv)
     if not args.demo:
         ap.print_help()
@@ -694,6 +870,11 @@ def main(argv=None):
     print(f"           {fmt.order_locator}")
     print(f"  Frame  : {written} bytes -> {ctrl.pixels_written} pixels "
           f"written, {ctrl.pixels_ignored} ignored")
+    if args.frames > 0:
+        fps, _ = frame_rate(args.frames)
+        print(f"  Ingest : {fps:.0f} frames/s over {args.frames} animated "
+              f"full-window RAMWRs")
+        print("           (the model's throughput, not the bus's)")
 
     # Rotation: the same probe pixel under four MADCTL settings.
     print()
@@ -716,7 +897,7 @@ def main(argv=None):
 
     out = args.out
     os.makedirs(os.path.dirname(out), exist_ok=True)
-    write_png(out, ctrl.rgb_rows())
+    write_png(out, ctrl.frame())
     print()
     print(f"  Export : {os.path.relpath(out, BASE)}")
     print(f"           unwritten pixels are drawn grey; the spec calls the "
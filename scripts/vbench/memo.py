@@ -0,0 +1,206 @@
+"""Virtual Bench — one load, one solve, however many modules ask.
+
+A `bench-all` run asks for the board netlist, the BOM values and the DC
+operating point from transients, dynamics, pins, buttons, display, sdcard,
+thermal, the scenario runner and every corpus detector. Each used to
+reload the board cache, rebuild BoardNetlist, reparse the BOM and resolve
+DC. The loaders now go through here, keyed by what their answer depends
+on, so the second caller gets the first caller's object.
+
+Provides:
+  Memo(name, maxsize, disk, root)
+                             — one in-process LRU, optionally backed by disk
+    .get(key, build)         — the cached value for `key`, else build()
+    .lookup(key) / .put(key, value)
+                             — the same in two halves, for batch callers
+    .invalidate(fingerprint) — drop every entry whose key starts with it
+    .clear()
+  file_key(path)             — (path, size, mtime_ns, inode): cheap identity
+  file_digest(path)          — sha256 of the file, recomputed only on change
+  code_version(*paths)       — one digest over source files, per process
+  invalidate(fingerprint)    — Memo.invalidate on every memo
+  clear()                    — Memo.clear on every memo
+  stats()                    — {name: (hits, disk hits, misses)}
+
+Keys are the caller's business and must name everything the answer reads:
+netlist.load_board_netlist keys on the board file, rails.load_bom_values on
+the BOM's content, rails.operating_point on (pcb_hash, BOM digest, model
+version, setup). A mutated board is never looked up by the tree's key:
+mutate.apply gives it its own fingerprint and invalidates that fingerprint,
+so a mutant always computes afresh.
+
+Values are shared, not copied: every caller gets the same object, and a
+write into it is seen by every later caller in the process. So callers
+treat a board, a value table or an operating point as read-only, and one
+that needs to change it (a test injecting a fault) works on a
+copy.deepcopy() of it. The one write the bench makes is crosscheck(),
+which rebuilds the board's pads_only_in_datasheet scratch list on every
+call, so the last caller's is always its own.
+
+The disk store is opt-in: set VBENCH_CACHE_DIR and memos created with
+disk=True pickle their entries there (a memo given its own `root` uses
+that instead, "" for none), one file per key, named by the
+key's fingerprint and then the whole key, so a second process (`make
+bench-all` after `make bench-ci`) starts warm. A disk entry that fails to
+load is a miss, never an error.
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+
+_MEMOS = []
+_DIGESTS = {}
+_CODE = {}
+
+
+def _digest(key):
+    return hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+
+
+def file_key(path):
+    """(path, size, mtime_ns, inode), or (path, None) if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None)
+    return (path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def file_digest(path):
+    """sha256 of `path`'s bytes; re-read only when file_key() changes."""
+    key = file_key(path)
+    if _DIGESTS.get(path, (None,))[0] != key:
+        with open(path, "rb") as fh:
+            _DIGESTS[path] = (key, hashlib.sha256(fh.read()).hexdigest())
+    return _DIGESTS[path][1]
+
+
+def code_version(*paths):
+    """One digest over the source files an answer was computed by.
+
+    Computed once per process: the code does not change under a running
+    bench, and this is what keeps a disk entry written by older code from
+    being read by newer code.
+    """
+    key = tuple(sorted(paths))
+    if key not in _CODE:
+        digest = hashlib.sha256()
+        for path in key:
+            digest.update(path.encode())
+            digest.update(file_digest(path).encode()
+                          if os.path.exists(path) else b"missing")
+        _CODE[key] = digest.hexdigest()[:16]
+    return _CODE[key]
+
+
+class Memo:
+    """An LRU of computed values, optionally pickled to VBENCH_CACHE_DIR."""
+
+    def __init__(self, name, maxsize=32, disk=False, root=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.disk = disk
+        self.root = root
+        self.entries = collections.OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+        _MEMOS.append(self)
+
+    def _root(self):
+        if not self.disk:
+            return None
+        root = (self.root if self.root is not None
+                else os.environ.get("VBENCH_CACHE_DIR"))
+        return root or None
+
+    def _path(self, key):
+        root = self._root()
+        if root is None:
+            return None
+        return os.path.join(root, f"{self.name}-{_digest(key[:1])}-"
+                                  f"{_digest(key)}.pkl")
+
+    def _load(self, key):
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as fh:
+                stored_key, value = pickle.load(fh)
+        except Exception:                     # noqa: BLE001 — a miss
+            return None
+        return (value,) if stored_key == key else None
+
+    def _store(self, key, value):
+        path = self._path(key)
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump((key, value), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def lookup(self, key):
+        """(True, value) if `key` is stored, in memory or on disk; else
+        (False, None). Never builds anything."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key]
+        found = self._load(key)
+        if found is None:
+            return False, None
+        self.disk_hits += 1
+        self._remember(key, found[0])
+        return True, found[0]
+
+    def put(self, key, value):
+        """Store `value` for `key`, in memory and (if enabled) on disk."""
+        self._store(key, value)
+        self._remember(key, value)
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def get(self, key, build):
+        """The value stored for `key`; build(), store and return it if none."""
+        found, value = self.lookup(key)
+        if not found:
+            self.misses += 1
+            value = build()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, fingerprint):
+        """Forget every entry whose key's first element is `fingerprint`."""
+        for key in [k for k in self.entries if k and k[0] == fingerprint]:
+            del self.entries[key]
+        root = self._root()
+        if root and os.path.isdir(root):
+            prefix = f"{self.name}-{_digest((fingerprint,))}-"
+            for name in os.listdir(root):
+                if name.startswith(prefix):
+                    os.remove(os.path.join(root, name))
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+
+def invalidate(fingerprint):
+    for memo in _MEMOS:
+        memo.invalidate(fingerprint)
+
+
+def clear():
+    for memo in _MEMOS:
+        memo.clear()
+
+
+def stats():
+    return {m.name: (m.hits, m.disk_hits, m.misses) for m in _MEMOS}
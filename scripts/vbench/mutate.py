@@ -16,6 +16,8 @@ did nothing would make its entry look uncatchable when it was never applied.
 """
 
 import copy
+import hashlib
+import json
 import os
 import sys
 
@@ -23,6 +25,7 @@ BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)
 sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
+from vbench import memo                                       # noqa: E402
 from vbench import netlist as nl                              # noqa: E402
 
 
@@ -30,9 +33,19 @@ class MutationError(RuntimeError):
     """The mutation could not be applied. Never silently skipped."""
 
 
-def _clone(board):
-    """A copy whose nets can be rewritten without touching the original."""
+def _clone(board, mutation):
+    """A copy whose nets can be rewritten without touching the original.
+
+    The copy gets its own pcb_hash — the original's plus the mutation — so
+    nothing memoized for the real board (vbench/memo.py) is ever served for
+    the mutant, and anything left under the mutant's fingerprint by an
+    earlier run is dropped before the bench looks at it.
+    """
     dup = copy.copy(board)
+    spec = json.dumps(mutation, sort_keys=True, default=str)
+    dup.pcb_hash = "mutated:" + hashlib.sha256(
+        f"{board.pcb_hash}|{spec}".encode()).hexdigest()
+    memo.invalidate(dup.pcb_hash)
     dup.nets = {net: tuple(pins) for net, pins in board.nets.items()}
     dup.declared_nets = set(board.declared_nets)
     dup.pads_only_in_datasheet = list(board.pads_only_in_datasheet)
@@ -56,7 +69,7 @@ def apply(board, mutation):
             "kind 'none' describes a defect present in the design as it "
             "stands; there is nothing to inject and the entry needs a live "
             "detector instead")
-    dup = _clone(board)
+    dup = _clone(board, mutation)
 
     if kind == "detach_pin" and mutation.get("side") == "schematic":
         # The schematic is a different netlist with the same shape. R24-HIGH-3
@@ -67,6 +67,7 @@ from verify_bom_cpl_pcb import DNP_REFS, HAND_ASSEMBLED  # noqa: E402
 # pad the schematic symbol does not represent is not automatically a pad
 # nobody checks — see the D3 note in crosscheck().
 from hardware.datasheet_specs import COMPONENT_SPECS      # noqa: E402
+from vbench import memo                                   # noqa: E402
 
 PCB_REL = os.path.join("hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
 
@@ -194,13 +195,22 @@ class BoardNetlist:
                 for net, pins in self.nets.items() for p in pins}
 
 
+# One BoardNetlist per board file state, shared by every module that asks.
+_BOARDS = memo.Memo("board", maxsize=4)
+
+
 def load_board_netlist(rev=None):
-    """Build the board netlist from the working tree or from a git rev."""
+    """Build the board netlist from the working tree or from a git rev.
+
+    The working tree's is built once per board file state (vbench/memo.py)
+    and shared; a rev's is built fresh each call.
+    """
     pcb = os.path.join(BASE, PCB_REL)
     if rev is None:
         if not os.path.exists(pcb):
             raise NetlistError(f"board file missing: {PCB_REL}")
-        return BoardNetlist(load_cache(pcb), "working tree")
+        return _BOARDS.get((memo.file_key(pcb),), lambda: BoardNetlist(
+            load_cache(pcb), "working tree"))
 
     _require_rev(rev)
     tmp = tempfile.mkdtemp(prefix="vbench-")
@@ -215,7 +225,7 @@ def load_board_netlist(rev=None):
     # to the checked-out file anyway, but being explicit keeps the
     # revision's cache from ever being mistaken for the tree's.
     cache = build_cache(pathlib.Path(checked_out),
-                        pathlib.Path(tmp) / ".pcb_cache.json")
+                        pathlib.Path(tmp) / ".pcb_cache.bin")
     return BoardNetlist(cache, rev)
 
 
@@ -0,0 +1,361 @@
+"""Virtual Bench T1.1 — nodal analysis of a resistive network, compiled once.
+
+rails.solve_dc used to rebuild a dense conductance matrix on Python lists
+and eliminate it from scratch on every operating_point() call, although
+the scenarios, the pin fabric, the switch scenario and the detectors only
+ever change which voltage the sources hold. Here the network is compiled
+once — which nodes are solvable, the unknown-unknown conductances G_uu and
+the unknown-source coupling G_uf — and G_uu is factorized once. A new set
+of source voltages is then one right-hand side, G_uf · v, and one
+triangular solve.
+
+Provides:
+  backend_for(unknowns)    — "stdlib" (dense LU on lists) up to SMALL
+                             unknowns, else the best of "scipy" (sparse LU)
+                             and "numpy" (dense inverse) importable;
+                             VBENCH_SOLVER forces one
+  available()              — the backends importable here, best first
+  NodalError               — the network cannot be solved
+  Network(edges, fixed)    — one compiled network
+    .solve(volts)          — {node: volts} for every fixed and solvable node
+    .solve_many(rows)      — the same for several source settings at once
+  grid_network(side, seed) — a side x side resistor mesh, for benchmarks
+  lu_factor / lu_solve     — the stdlib fallback's elimination
+
+A node with no resistive path to a fixed node is not solvable and is left
+out of the answer entirely: the caller decides what floating means (rails
+reports it as UNDEFINED, never 0 V). Every solvable node therefore reaches
+a source, so G_uu is symmetric positive definite and never singular; a
+singular factorization is still raised rather than trusted.
+
+Usage:
+    python3 scripts/vbench/nodal.py                  # board + 10k-node mesh
+    python3 scripts/vbench/nodal.py --side 200 --solves 20
+"""
+
+import argparse
+import collections
+import os
+import random
+import sys
+import time
+
+BACKENDS = ("scipy", "numpy", "stdlib")
+
+# Below this many unknowns the stdlib LU wins outright: importing
+# scipy.sparse alone costs ~100 ms, and the board has a few dozen nodes.
+# VBENCH_SOLVER names a backend to use for every size instead.
+SMALL = 64
+FORCED = os.environ.get("VBENCH_SOLVER") or None
+
+# The dense backends are for when SciPy is missing, not for meshes: numpy
+# inverts G_uu (n^2 memory, ~30 s at 10k nodes) and stdlib eliminates it
+# with n^3 / 3 Python-level multiply-adds. The benchmark stops them here.
+DENSE_BENCH_LIMIT = {"numpy": 2500, "stdlib": 256}
+
+np = csc_matrix = splu = None
+_AVAILABLE = None
+
+
+def available():
+    """The backends importable here, best first. Imports on first call."""
+    global _AVAILABLE, np, csc_matrix, splu
+    if _AVAILABLE is None:
+        _AVAILABLE = ["stdlib"]
+        try:
+            import numpy
+        except ImportError:     # the stdlib LU solves the same network
+            return _AVAILABLE
+        np = numpy
+        _AVAILABLE.insert(0, "numpy")
+        try:
+            from scipy.sparse import csc_matrix
+            from scipy.sparse.linalg import splu
+        except ImportError:
+            return _AVAILABLE
+        _AVAILABLE.insert(0, "scipy")
+    return _AVAILABLE
+
+
+def backend_for(unknowns):
+    """The backend a network of `unknowns` nodes is factorized with."""
+    if FORCED:
+        if FORCED not in available():
+            raise ValueError(f"VBENCH_SOLVER={FORCED!r} is not available "
+                             f"here; choose one of {available()}")
+        return FORCED
+    if unknowns <= SMALL:
+        return "stdlib"
+    return available()[0]
+
+
+class NodalError(RuntimeError):
+    """The conductance matrix cannot be factorized."""
+
+
+_SINGULAR = ("the conductance matrix is singular — a node group has no "
+             "path to any source and was not classified as floating")
+
+
+# ── stdlib fallback ─────────────────────────────────────────────────
+
+def lu_factor(matrix):
+    """LU with partial pivoting, in place on a list of rows. stdlib only.
+
+    Returns (lu, perm): U on and above the diagonal, the multipliers of L
+    below it, and the row order the pivoting chose.
+    """
+    n = len(matrix)
+    perm = list(range(n))
+    for col in range(n):
+        piv = max(range(col, n), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[piv][col]) < 1e-15:
+            raise NodalError(_SINGULAR)
+        matrix[col], matrix[piv] = matrix[piv], matrix[col]
+        perm[col], perm[piv] = perm[piv], perm[col]
+        pivot = matrix[col]
+        for row in range(col + 1, n):
+            cur = matrix[row]
+            f = cur[col] / pivot[col]
+            cur[col] = f
+            if f == 0.0:
+                continue
+            for k in range(col + 1, n):
+                cur[k] -= f * pivot[k]
+    return matrix, perm
+
+
+def lu_solve(lu, perm, rhs):
+    """Solve with a lu_factor() result: forward, then back substitution."""
+    n = len(rhs)
+    y = [rhs[p] for p in perm]
+    for row in range(n):
+        y[row] -= sum(lu[row][k] * y[k] for k in range(row))
+    out = [0.0] * n
+    for row in reversed(range(n)):
+        acc = y[row] - sum(lu[row][k] * out[k] for k in range(row + 1, n))
+        out[row] = acc / lu[row][row]
+    return out
+
+
+# ── The compiled network ────────────────────────────────────────────
+
+class Network:
+    """A resistive network compiled for one set of fixed nodes.
+
+    `edges` is [(a, b, siemens)] between hashable nodes; `fixed` names the
+    nodes the sources hold. Only the names matter here — the voltages
+    arrive with each solve().
+    """
+
+    def __init__(self, edges, fixed, backend=None):
+        if backend is not None and backend not in available():
+            raise ValueError(f"backend {backend!r} is not available; "
+                             f"choose one of {available()}")
+        self.fixed = list(dict.fromkeys(fixed))
+        fixed_col = {n: j for j, n in enumerate(self.fixed)}
+
+        # Only nodes with a resistive path to a fixed node are solvable.
+        adj = collections.defaultdict(set)
+        for a, b, _ in edges:
+            adj[a].add(b)
+            adj[b].add(a)
+        reachable = set(self.fixed)
+        stack = list(self.fixed)
+        while stack:
+            node = stack.pop()
+            for nb in adj[node]:
+                if nb not in reachable:
+                    reachable.add(nb)
+                    stack.append(nb)
+        self.unknowns = sorted(n for n in reachable if n not in fixed_col)
+        index = {n: i for i, n in enumerate(self.unknowns)}
+        self.backend = backend or backend_for(len(self.unknowns))
+
+        # G_uu as (row, col, g) triplets, duplicates summed by whoever
+        # assembles them; G_uf likewise, against the fixed columns.
+        uu, uf = [], []
+        for a, b, g in edges:
+            for x, y in ((a, b), (b, a)):
+                if x not in index:
+                    continue
+                i = index[x]
+                uu.append((i, i, g))
+                if y in index:
+                    uu.append((i, index[y], -g))
+                elif y in fixed_col:
+                    uf.append((i, fixed_col[y], g))
+        self._factorize(uu, uf)
+
+    def _factorize(self, uu, uf):
+        n, f = len(self.unknowns), len(self.fixed)
+        if n == 0:
+            return
+        if self.backend == "stdlib":
+            mat = [[0.0] * n for _ in range(n)]
+            for i, j, g in uu:
+                mat[i][j] += g
+            self._lu = lu_factor(mat)
+            self._uf = uf
+            return
+        rows, cols, vals = (np.asarray(v) for v in zip(*uu))
+        ur, uc, uv = ((np.asarray(v) for v in zip(*uf)) if uf
+                      else (np.zeros(0, int), np.zeros(0, int), np.zeros(0)))
+        if self.backend == "scipy":
+            g_uu = csc_matrix((vals, (rows, cols)), shape=(n, n))
+            try:
+                self._lu = splu(g_uu)
+            except RuntimeError as exc:         # "exactly singular"
+                raise NodalError(_SINGULAR) from exc
+            self._uf = csc_matrix((uv, (ur, uc)), shape=(n, f))
+        else:
+            g_uu = np.zeros((n, n))
+            np.add.at(g_uu, (rows, cols), vals)
+            try:
+                self._inv = np.linalg.inv(g_uu)
+            except np.linalg.LinAlgError as exc:
+                raise NodalError(_SINGULAR) from exc
+            self._uf = np.zeros((n, f))
+            np.add.at(self._uf, (ur, uc), uv)
+
+    def _vector(self, volts):
+        missing = [n for n in self.fixed if n not in volts]
+        if missing:
+            raise KeyError(f"no voltage for fixed node(s) {missing}")
+        return [float(volts[n]) for n in self.fixed]
+
+    def _solve_columns(self, vs):
+        """[[volts per unknown] per source setting] for fixed vectors `vs`."""
+        if not self.unknowns:
+            return [[] for _ in vs]
+        if self.backend == "stdlib":
+            out = []
+            for v in vs:
+                rhs = [0.0] * len(self.unknowns)
+                for i, j, g in self._uf:
+                    rhs[i] += g * v[j]
+                out.append(lu_solve(*self._lu, rhs))
+            return out
+        rhs = self._uf @ np.asarray(vs, dtype=float).T
+        x = self._lu.solve(rhs) if self.backend == "scipy" else self._inv @ rhs
+        if not np.all(np.isfinite(x)):
+            raise NodalError(_SINGULAR)
+        return x.T.tolist()
+
+    def solve(self, volts):
+        """{node: volts} for the fixed nodes and every solvable node.
+
+        `volts` must hold every fixed node's voltage; extra keys are
+        ignored. Floating nodes are absent from the answer.
+        """
+        return self.solve_many([volts])[0]
+
+    def solve_many(self, rows):
+        """solve() for each {node: volts} in `rows`, as one batch."""
+        vs = [self._vector(volts) for volts in rows]
+        out = []
+        for v, x in zip(vs, self._solve_columns(vs)):
+            solved = dict(zip(self.fixed, v))
+            solved.update(zip(self.unknowns, x))
+            out.append(solved)
+        return out
+
+
+# ── Benchmark ───────────────────────────────────────────────────────
+
+def grid_network(side, seed=20):
+    """A side x side mesh of 100 ohm .. 100 kohm resistors.
+
+    Returns (edges, fixed volts): the four corners held at 0, 1.2, 3.3 and
+    5 V. side=100 is the 10k-node network the benchmark reports.
+    """
+    rng = random.Random(seed)
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                edges.append(((r, c), (r, c + 1), 1.0 / rng.uniform(1e2, 1e5)))
+            if r + 1 < side:
+                edges.append(((r, c), (r + 1, c), 1.0 / rng.uniform(1e2, 1e5)))
+    last = side - 1
+    fixed = {(0, 0): 0.0, (0, last): 1.2, (last, 0): 3.3, (last, last): 5.0}
+    return edges, fixed
+
+
+def _timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def _bench_board(solves):
+    from vbench import rails
+
+    try:
+        rails.operating_point()
+    except Exception as exc:                      # noqa: BLE001 — reported
+        print(f"  board        skipped: {exc}")
+        return
+    board = rails.nl.load_board_netlist()
+    values = rails.load_bom_values()
+    op = rails.operating_point()
+    fixed = {n: op.voltages[n] for n in ("GND", "+5V_VOUT", "+5V", "BAT+",
+                                          "BAT_IN", "VBUS", "+3V3")
+             if n in board.nets}
+    for backend in available():
+        rails._COMPILED.clear()
+        dc, t_compile = _timed(lambda: rails.compile_dc(
+            board, values, fixed, backend=backend))
+        _, t_solve = _timed(lambda: dc.solve(fixed), solves)
+        print(f"  board        {backend:<7} {len(dc.network.unknowns):>6} "
+              f"unknowns  compile {t_compile * 1e3:8.2f} ms  "
+              f"solve {t_solve * 1e6:9.1f} us")
+    rails._COMPILED.clear()
+    _, t_call = _timed(lambda: rails.solve_dc(board, values, fixed), solves)
+    print(f"  board        rails.solve_dc, compiled network reused: "
+          f"{t_call * 1e6:.1f} us per call")
+    rails._COMPILED.clear()
+
+
+def _bench_mesh(side, solves):
+    edges, fixed = grid_network(side)
+    for backend in available():
+        if side * side > DENSE_BENCH_LIMIT.get(backend, side * side):
+            print(f"  mesh {side}x{side:<4} {backend:<7} skipped: dense "
+                  f"beyond {DENSE_BENCH_LIMIT[backend]} nodes")
+            continue
+        net, t_compile = _timed(lambda: Network(edges, fixed, backend))
+        _, t_solve = _timed(lambda: net.solve(fixed), solves)
+        print(f"  mesh {side}x{side:<4} {backend:<7} "
+              f"{len(net.unknowns):>6} unknowns  "
+              f"compile {t_compile * 1e3:8.2f} ms  "
+              f"solve {t_solve * 1e6:9.1f} us")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--side", type=int, default=100,
+                    help="mesh side; side^2 nodes (default 100: 10k nodes)")
+    ap.add_argument("--solves", type=int, default=50,
+                    help="re-solves timed per network (default 50)")
+    args = ap.parse_args(argv)
+
+    print("=" * 72)
+    print("  Virtual Bench T1.1 — nodal solver backends")
+    print("=" * 72)
+    print(f"  backends: {', '.join(available())}; stdlib up to {SMALL} "
+          f"unknowns, then {backend_for(SMALL + 1)}")
+    print()
+    _bench_board(args.solves)
+    for side in sorted({16, 48, args.side}):
+        _bench_mesh(side, args.solves)
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    BASE = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    sys.path.insert(0, os.path.join(BASE, "scripts"))
+    sys.exit(main())
@@ -34,6 +34,7 @@ Usage:
 import argparse
 import collections
 import csv
+import hashlib
 import os
 import re
 import sys
@@ -42,7 +43,9 @@ BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)
 sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
+from vbench import memo                                      # noqa: E402
 from vbench import netlist as nl                             # noqa: E402
+from vbench import nodal                                     # noqa: E402
 from vbench import sources                                   # noqa: E402
 from vbench.models import require_valid                      # noqa: E402
 from vbench.models.u2_ip5306 import U2, UNESTABLISHED        # noqa: E402
@@ -87,11 +90,22 @@ def _parse_value(comment):
     return num * _MULT.get(m.group(2).upper(), 1.0)
 
 
+_BOM_VALUES = memo.Memo("bom", maxsize=4)
+
+
 def load_bom_values(path=BOM):
-    """{designator: numeric value} from the BOM's Comment column."""
+    """{designator: numeric value} from the BOM's Comment column.
+
+    Parsed once per BOM content (vbench/memo.py); every caller shares it.
+    """
     if not os.path.exists(path):
         raise RailError(f"BOM not found at {path} — the operating point "
                         f"cannot be computed without passive values")
+    return _BOM_VALUES.get((memo.file_digest(path), path),
+                           lambda: _parse_bom(path))
+
+
+def _parse_bom(path):
     values = {}
     with open(path) as fh:
         for row in csv.DictReader(fh):
@@ -208,38 +222,58 @@ def find_feedback_divider(board, values, reg_ref="U3", fb_pin="5",
 
 # ── DC solve of the resistive network ───────────────────────────────
 
-def _solve(matrix, rhs):
-    """Gaussian elimination with partial pivoting. stdlib only."""
-    n = len(rhs)
-    for col in range(n):
-        piv = max(range(col, n), key=lambda r: abs(matrix[r][col]))
-        if abs(matrix[piv][col]) < 1e-15:
-            raise RailError(
-                "the conductance matrix is singular — a node group has no "
-                "path to any source and was not classified as floating")
-        matrix[col], matrix[piv] = matrix[piv], matrix[col]
-        rhs[col], rhs[piv] = rhs[piv], rhs[col]
-        for row in range(col + 1, n):
-            f = matrix[row][col] / matrix[col][col]
-            if f == 0.0:
-                continue
-            for k in range(col, n):
-                matrix[row][k] -= f * matrix[col][k]
-            rhs[row] -= f * rhs[col]
-    out = [0.0] * n
-    for row in reversed(range(n)):
-        acc = rhs[row] - sum(matrix[row][k] * out[k] for k in range(row + 1, n))
-        out[row] = acc / matrix[row][row]
-    return out
+# Compiled networks, newest last. A scenario sweep flips between a handful
+# of topologies (switches open / closed, a mutated board and the real one),
+# so a few entries cover it; each one is a factorization, not a report.
+_COMPILED = collections.OrderedDict()
+_COMPILED_MAX = 16
 
 
-def solve_dc(board, values, fixed, buttons_pressed=False):
-    """Return {net: volts or UNDEFINED} for every net carrying a pin.
+class DcNetwork:
+    """One board's resistive network, compiled for one set of fixed nets.
 
-    `fixed` maps net -> volts for nodes the sources and regulators hold.
-    Everything else is solved through the resistors; inductors merge their
-    two nets; capacitors, open switches and device pins contribute nothing.
+    `root` maps every net to the node it was merged into (inductors and
+    closed switches); `network` is the nodal.Network over those nodes.
     """
+
+    def __init__(self, root, network):
+        self.root = root
+        self.network = network
+
+    def solve(self, fixed):
+        """{net: volts or UNDEFINED} with `fixed` holding its nets."""
+        roots_fixed = {self.root[n]: v for n, v in fixed.items()
+                       if n in self.root}
+        try:
+            solved = self.network.solve(roots_fixed)
+        except nodal.NodalError as exc:
+            raise RailError(str(exc)) from exc
+        return {net: solved.get(r, UNDEFINED) for net, r in self.root.items()}
+
+
+def _topology_key(board, values, fixed, buttons_pressed):
+    """Everything compile_dc() reads, except the fixed nets' voltages."""
+    pins = tuple(board.nets.items())
+    ohms = tuple(sorted((ref, values.get(ref)) for ref in
+                        {p.ref for _net, ps in pins for p in ps}
+                        if ref[0] == "R" and _kind(ref) == "resistor"))
+    return (pins, ohms, frozenset(n for n in fixed if n in board.nets),
+            bool(buttons_pressed))
+
+
+def compile_dc(board, values, fixed, buttons_pressed=False, backend=None):
+    """The DcNetwork solve_dc() would solve — built once per topology.
+
+    Only the names in `fixed` are read. The result is cached by the
+    board's pins, its resistor values, those names and the switch state,
+    so a scenario that only moves a source voltage re-solves a factorized
+    network instead of rebuilding it, and a mutated board is a new key.
+    """
+    key = _topology_key(board, values, fixed, buttons_pressed) + (backend,)
+    if key in _COMPILED:
+        _COMPILED.move_to_end(key)
+        return _COMPILED[key]
+
     # Inductors are 0 ohm at DC: merge their nets so the matrix stays
     # non-singular instead of carrying a 1e9-siemens edge.
     parent = {net: net for net in board.nets}
@@ -297,44 +331,31 @@ def solve_dc(board, values, fixed, buttons_pressed=False):
                 f"resistor changes the answer, so this is fatal, not skipped")
         edges.append((distinct[0], distinct[1], 1.0 / values[ref]))
 
-    roots_fixed = {find(n): v for n, v in fixed.items() if n in parent}
-
-    # Only nodes with a resistive path to a fixed node are solvable. The
-    # rest are floating, and are reported as such.
-    adj = collections.defaultdict(set)
-    for a, b, _ in edges:
-        adj[a].add(b)
-        adj[b].add(a)
-    reachable = set(roots_fixed)
-    stack = list(roots_fixed)
-    while stack:
-        node = stack.pop()
-        for nb in adj[node]:
-            if nb not in reachable:
-                reachable.add(nb)
-                stack.append(nb)
-
-    unknowns = sorted(n for n in reachable if n not in roots_fixed)
-    solved = dict(roots_fixed)
-    if unknowns:
-        index = {n: i for i, n in enumerate(unknowns)}
-        size = len(unknowns)
-        mat = [[0.0] * size for _ in range(size)]
-        rhs = [0.0] * size
-        for a, b, g in edges:
-            for x, y in ((a, b), (b, a)):
-                if x not in index:
-                    continue
-                i = index[x]
-                mat[i][i] += g
-                if y in index:
-                    mat[i][index[y]] -= g
-                elif y in roots_fixed:
-                    rhs[i] += g * roots_fixed[y]
-        for n, v in zip(unknowns, _solve(mat, rhs)):
-            solved[n] = v
-
-    return {net: solved.get(find(net), UNDEFINED) for net in board.nets}
+    # Only nodes with a resistive path to a fixed node are solvable; the
+    # network leaves the rest out, and solve() reports them as floating.
+    roots = [find(n) for n in fixed if n in parent]
+    try:
+        network = nodal.Network(edges, roots, backend)
+    except nodal.NodalError as exc:
+        raise RailError(str(exc)) from exc
+    dc = DcNetwork({net: find(net) for net in board.nets}, network)
+
+    _COMPILED[key] = dc
+    while len(_COMPILED) > _COMPILED_MAX:
+        _COMPILED.popitem(last=False)
+    return dc
+
+
+def solve_dc(board, values, fixed, buttons_pressed=False):
+    """Return {net: volts or UNDEFINED} for every net carrying a pin.
+
+    `fixed` maps net -> volts for nodes the sources and regulators hold.
+    Everything else is solved through the resistors; inductors merge their
+    two nets; capacitors, open switches and device pins contribute nothing.
+    The network is compiled once per topology (compile_dc) and re-solved
+    for the voltages in `fixed`.
+    """
+    return compile_dc(board, values, fixed, buttons_pressed).solve(fixed)
 
 
 # ── Operating point ─────────────────────────────────────────────────
@@ -343,9 +364,37 @@ OperatingPoint = collections.namedtuple(
     "OperatingPoint", "voltages divider rail_spread source notes violations")
 
 
+# What an operating point is computed by, beyond the board and the BOM:
+# this file, the solver, the sources, the two regulator models and the
+# switch terminal table. A disk entry from other code is never read.
+_OP_CODE = tuple(os.path.join(BASE, *rel) for rel in (
+    ("scripts", "vbench", "rails.py"), ("scripts", "vbench", "nodal.py"),
+    ("scripts", "vbench", "sources.py"),
+    ("scripts", "vbench", "models", "u2_ip5306.py"),
+    ("scripts", "vbench", "models", "u3_sy8089.py"),
+    ("hardware", "datasheet_specs.py")))
+
+_OPERATING_POINTS = memo.Memo("operating_point", maxsize=64, disk=True)
+
+
 def operating_point(on_battery=False, soc=0.5, buttons_pressed=False):
+    """The DC operating point for one setup, solved once per board state.
+
+    Keyed by (pcb_hash, BOM digest, model version, setup) — see
+    vbench/memo.py — so the scenario runner, the pin fabric, the button
+    survey and every corpus detector share one solve per setup.
+    """
     require_valid(U2, U3)
     board = nl.load_board_netlist()
+    models = memo.code_version(*_OP_CODE) + ":" + hashlib.sha256(
+        repr((U2, U3)).encode()).hexdigest()[:16]
+    key = (board.pcb_hash, memo.file_digest(BOM), models,
+           (bool(on_battery), float(soc), bool(buttons_pressed)))
+    return _OPERATING_POINTS.get(key, lambda: _operating_point(
+        board, on_battery, soc, buttons_pressed))
+
+
+def _operating_point(board, on_battery, soc, buttons_pressed):
     values = load_bom_values()
     divider = find_feedback_divider(board, values)
 
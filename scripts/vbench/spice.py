@@ -0,0 +1,205 @@
+"""Virtual Bench T1.4 — one ngspice layer for every deck the bench simulates.
+
+transients, dynamics and spice_power_check each wrote a deck and spawned
+`ngspice -b` for it, one process per deck, every run — the same decks,
+with the same numbers, every time `make bench-power` ran on an unchanged
+board. Here a deck is simulated at most once:
+
+  * **Cache.** A deck's .meas results are stored under the sha256 of its
+    exact text and the simulator's version. A deck is a pure function of
+    the board and the models, so an unchanged board re-simulates nothing,
+    in this process or the next (the store is on disk, see below).
+  * **Batch.** The decks not in the cache run in one ngspice per batch,
+    driven by a `.control` script that sources, runs and removes each
+    circuit in turn, instead of one process per deck.
+  * **Pool.** Independent batches run in parallel, one ngspice each, up
+    to `jobs` (default: the CPU count).
+
+A deck the batch did not measure — ngspice stopped part-way, or a deck
+the batch driver cannot source — is re-run on its own with `ngspice -b`,
+exactly as before, and fails exactly as before. The batch is a fast path,
+never a second set of semantics.
+
+Provides:
+  SimulatorMissing        — ngspice is absent or measured nothing. Fatal.
+  run(deck, workdir)      — ({meas: value}, output) for one deck
+  run_many(decks, workdir, jobs)
+                          — the same for many, batched, pooled, cached
+  output(deck)            — ngspice's raw output for a deck, cached
+  summary()               — "N simulated, M from cache" for the reports
+  CACHE_DIR               — VBENCH_SPICE_CACHE, else VBENCH_CACHE_DIR,
+                            else .vbench-cache/ at the repo root; "" for
+                            in-process only
+
+A missing simulator is checked before the cache is: a bench whose
+ngspice went away must still say so, not quietly replay old answers.
+"""
+
+import concurrent.futures
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from vbench import memo
+
+BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CACHE_DIR = os.environ.get(
+    "VBENCH_SPICE_CACHE",
+    os.environ.get("VBENCH_CACHE_DIR") or os.path.join(BASE, ".vbench-cache"))
+
+TIMEOUT = 120           # seconds per deck, as run_ngspice always allowed
+
+_MEAS = re.compile(r"^\s*([a-z_0-9]+)\s*=\s*([-\d.eE+]+)", re.MULTILINE)
+_MARK = "@@vbench-deck"
+_SPLIT = re.compile(rf"^{_MARK} (\d+)\s*$", re.MULTILINE)
+
+_RESULTS = memo.Memo("spice", maxsize=256, disk=True, root=CACHE_DIR)
+_VERSION = {}
+
+
+class SimulatorMissing(RuntimeError):
+    """ngspice is not installed. Fatal — never downgraded to a skip."""
+
+
+def _require():
+    if shutil.which("ngspice") is None:
+        raise SimulatorMissing(
+            "ngspice is not on PATH. This module exits rather than skipping: "
+            "'no transient violations' from a run that never simulated "
+            "anything is the worst output this bench could produce. "
+            "Install with `brew install ngspice`.")
+    if "ngspice" not in _VERSION:
+        proc = subprocess.run(["ngspice", "--version"], capture_output=True,
+                              text=True, timeout=30)
+        lines = [ln.strip() for ln in (proc.stdout + proc.stderr).splitlines()
+                 if "ngspice" in ln.lower()]
+        _VERSION["ngspice"] = lines[0] if lines else "unknown"
+    return _VERSION["ngspice"]
+
+
+def _key(version, deck):
+    return (version, hashlib.sha256(deck.encode()).hexdigest())
+
+
+def _measures(out):
+    values = {}
+    for name, raw in _MEAS.findall(out):
+        try:
+            values[name] = float(raw)
+        except ValueError:
+            continue
+    return values
+
+
+def _single(deck, workdir):
+    """One deck, one `ngspice -b`: the path every deck used to take."""
+    here = tempfile.mkdtemp(prefix="deck-", dir=workdir)
+    path = os.path.join(here, "deck.cir")
+    with open(path, "w") as fh:
+        fh.write(deck)
+    proc = subprocess.run(["ngspice", "-b", path], capture_output=True,
+                          text=True, timeout=TIMEOUT, cwd=here)
+    out = proc.stdout + proc.stderr
+    return _measures(out), out, proc.returncode, path
+
+
+def _batch(decks, workdir):
+    """[(values, output)] for `decks` from one ngspice; {} where unmeasured."""
+    if len(decks) == 1:
+        values, out, _rc, _path = _single(decks[0], workdir)
+        return [(values, out)]
+    batch = tempfile.mkdtemp(prefix="batch-", dir=workdir)
+    lines = ["* vbench batch", ".control", "set noaskquit"]
+    for k, deck in enumerate(decks):
+        path = os.path.join(batch, f"deck-{k}.cir")
+        with open(path, "w") as fh:
+            fh.write(deck)
+        lines += [f"source {path}", "run", f"echo {_MARK} {k}",
+                  "remcirc", "destroy all"]
+    lines += ["quit", ".endc", ".end", ""]
+    driver = os.path.join(batch, "batch.cir")
+    with open(driver, "w") as fh:
+        fh.write("\n".join(lines))
+    try:
+        proc = subprocess.run(["ngspice", "-b", driver], capture_output=True,
+                              text=True, timeout=TIMEOUT * len(decks),
+                              cwd=batch)
+        out = proc.stdout
+    except subprocess.TimeoutExpired:
+        out = ""
+    found = [({}, "")] * len(decks)
+    start = 0
+    for m in _SPLIT.finditer(out):
+        k = int(m.group(1))
+        if k < len(decks):
+            chunk = out[start:m.start()]
+            found[k] = (_measures(chunk), chunk)
+        start = m.end()
+    return found
+
+
+def run_many(decks, workdir, jobs=None):
+    """[(values, output)] per deck, in order; each distinct deck run once.
+
+    Raises SimulatorMissing if ngspice is absent or a deck measures
+    nothing even on its own.
+    """
+    version = _require()
+    keys = [_key(version, deck) for deck in decks]
+    results = {}
+    pending = {}
+    for key, deck in zip(keys, decks):
+        if key in results or key in pending:
+            continue
+        found, hit = _RESULTS.lookup(key)
+        if found:
+            results[key] = hit
+        else:
+            pending[key] = deck
+
+    if pending:
+        todo = list(pending.items())
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(todo)))
+        chunks = [todo[k::jobs] for k in range(jobs)]
+        with concurrent.futures.ThreadPoolExecutor(jobs) as pool:
+            outs = pool.map(
+                lambda chunk: _batch([d for _k, d in chunk], workdir), chunks)
+            for chunk, found in zip(chunks, outs):
+                for (key, deck), (values, out) in zip(chunk, found):
+                    if not values:
+                        values, out, rc, path = _single(deck, workdir)
+                        if not values:
+                            raise SimulatorMissing(
+                                f"ngspice produced no .meas results "
+                                f"(rc={rc}). Deck at {path}. Output:\n"
+                                f"{out[-1500:]}")
+                    results[key] = (values, out)
+                    _RESULTS.misses += 1
+                    _RESULTS.put(key, (values, out))
+    return [(dict(results[key][0]), results[key][1]) for key in keys]
+
+
+def run(deck, workdir):
+    """({meas: value}, ngspice output) for one deck. See run_many()."""
+    return run_many([deck], workdir)[0]
+
+
+def output(deck):
+    """ngspice's output for `deck`, for callers that parse it themselves."""
+    workdir = tempfile.mkdtemp(prefix="vbench-spice-")
+    try:
+        return run(deck, workdir)[1]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summary():
+    """How many decks this process simulated and how many it replayed."""
+    s = _RESULTS
+    cached = s.hits + s.disk_hits
+    return (f"ngspice: {s.misses} deck(s) simulated, {cached} from the "
+            f"result cache ({CACHE_DIR or 'in-process only'})")
@@ -0,0 +1,518 @@
+"""Virtual Bench T1.4c — Monte Carlo over every tolerance the bench can cite.
+
+dynamics.divider_corners argues that two deterministic corners bound the
+divider; thermal, audio, the LiPo and the buttons each evaluate one fixed
+point. This module draws every input that has a cited spread, evaluates
+the owning modules' formulas over thousands of draws at once (NumPy, one
+array per input), sends only what needs a simulator to the batched
+ngspice pool (vbench/spice.py), and reports per quantity: the fixed point
+the bench already prints, the spread, the worst draw, and the yield
+against the limit the owning module judges it by.
+
+## What is swept, and from where
+
+* **Resistors** — the Uniroyal part-number key's "F = +/-1%" (the
+  citation U3's r_divider_tolerance carries), for every resistor whose
+  BOM part has its datasheet held in hardware/datasheets/. A resistor
+  whose document is not held stays at its BOM value and is listed.
+* **Model ranges** — a cited (min, max): V_FB's 0.588-0.612 V (SY8089
+  p.4 table 1), and Q1's R_ds(on) between its typical and its maximum
+  (AO3401A p.2 table 1; the bench's fixed point is the maximum).
+* **Distribution** — uniform over [min, max]. A datasheet's limits are a
+  guarantee, not a distribution; uniform is the least-informed draw over
+  them and weights the tails more than a production process does, so a
+  yield here is pessimistic, not a forecast.
+
+Not swept, and printed as such: the capacitors (no held document gives
+their tolerance), the cell's internal resistance (a family bound, not a
+range), +5V (u2_ip5306.UNESTABLISHED v_out_tolerance) and the boost
+efficiency (one "up to" point).
+
+## What is evaluated
+
+Analytically, over every draw: the +3V3 the divider programs against the
+ESP32-S3 window, the junction temperatures thermal.evaluate computes at
+the governing ambient, the audio input corner, the brownout SoC under the
+SNES stress load, and the slowest button release edge. Each calls or
+repeats the owning module's formula with arrays for scalars, so the
+nominal draw reproduces that module's fixed point exactly
+(test_vbench_sweep.py holds them to it).
+
+By ngspice, on the first --spice draws only: dynamics' ripple and EN-ramp
+decks at each draw's +3V3 and R3. Their yields are over those draws, and
+say so.
+
+The draws also check dynamics' own argument: a draw outside the divider
+corners means the corners do not bound the divider, and that fails here.
+
+Exit codes: 0 every draw inside its limits, 1 a reachable violation, 2
+NumPy or the simulator missing — never a skip.
+
+Usage:
+    python3 scripts/vbench/sweep.py
+    python3 scripts/vbench/sweep.py --samples 100000 --seed 7 --spice 0
+"""
+
+import argparse
+import collections
+import csv
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE)
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+
+try:
+    import numpy as np
+except ImportError:                 # main() says so and exits 2
+    np = None
+
+from vbench import audio, buttons, dynamics                  # noqa: E402
+from vbench import netlist as nl                             # noqa: E402
+from vbench import rails, sources, spice, thermal            # noqa: E402
+from vbench.models import require_valid                      # noqa: E402
+from vbench.models._schema import DATASHEET_DIR              # noqa: E402
+from vbench.models.q1_ao3401a import Q1, r_ds_on              # noqa: E402
+from vbench.models.u1_esp32s3 import U1                      # noqa: E402
+from vbench.models.u2_ip5306 import U2                       # noqa: E402
+from vbench.models.u3_sy8089 import U3                       # noqa: E402
+from vbench.models.u5_pam8403 import U5                      # noqa: E402
+from vbench.transients import SimulatorMissing, board_values  # noqa: E402
+
+SAMPLES = 10000
+SPICE_DRAWS = 32        # draws simulated; each is two decks
+
+Tolerance = collections.namedtuple("Tolerance", "name nominal lo hi basis")
+Quantity = collections.namedtuple("Quantity",
+                                  "name unit samples lo hi basis")
+
+
+class SweepError(RuntimeError):
+    """The sweep cannot be set up from the board and the models."""
+
+
+# ── What is swept ───────────────────────────────────────────────────
+
+def _held_parts():
+    """LCSC part numbers with a datasheet in hardware/datasheets/."""
+    held = set()
+    for name in os.listdir(DATASHEET_DIR):
+        held.update(re.findall(r"_(C\d{3,})\b", name))
+    return held
+
+
+def _bom_parts(path=rails.BOM):
+    """{designator: LCSC part} from the BOM the values come from."""
+    parts = {}
+    with open(path) as fh:
+        for row in csv.DictReader(fh):
+            for des in row.get("Designator", "").split(","):
+                if des.strip():
+                    parts[des.strip()] = row.get("LCSC Part #", "").strip()
+    return parts
+
+
+def tolerances(values, bom=rails.BOM):
+    """({name: Tolerance}, [(what, why not swept)]).
+
+    Resistors are keyed by designator, model ranges by "REF.param".
+    """
+    parts = _bom_parts(bom)
+    held = _held_parts()
+    key = U3.params["r_divider_tolerance"]
+    tol = key.value
+    swept, fixed = {}, []
+    unheld = []
+    for ref in sorted(values):
+        if not re.match(r"^R\d+$", ref):
+            continue
+        part = parts.get(ref, "")
+        if part not in held:
+            unheld.append(ref)
+            continue
+        r = values[ref]
+        swept[ref] = Tolerance(
+            ref, r, r * (1 - tol), r * (1 + tol),
+            f"+/-{tol:.0%}, Uniroyal part-number key ({key.doc} "
+            f"{key.locator}); {part} held")
+    if unheld:
+        fixed.append((", ".join(unheld),
+                      "resistor whose datasheet is not held — BOM value"))
+
+    v_lo, v_typ, v_hi = U3.params["v_fb_ref"].value
+    swept["U3.v_fb_ref"] = Tolerance(
+        "U3.v_fb_ref", v_typ, v_lo, v_hi,
+        f"SY8089 V_FB min/max ({U3.params['v_fb_ref'].locator})")
+
+    # Every cell voltage the sweep evaluates Q1 at is below 4.5 V, so one
+    # row of the table serves them all; _rds() refuses any that is not.
+    v_gs = -thermal.V_BAT
+    swept["Q1.r_ds_on"] = Tolerance(
+        "Q1.r_ds_on", r_ds_on(v_gs, True), r_ds_on(v_gs, False),
+        r_ds_on(v_gs, True),
+        f"AO3401A R_ds(on) typ..max at V_GS={v_gs:.2f} V "
+        f"({Q1.params['r_ds_on_at_2v5'].locator}); the bench's fixed "
+        f"point is the max")
+
+    fixed += [
+        ("capacitors", "no held document gives their tolerance — BOM "
+                       "value"),
+        ("BT1 R_internal", "a family bound (< 60 mOhm), not a range — held "
+                           "at the bound"),
+        ("+5V", "u2_ip5306.UNESTABLISHED v_out_tolerance — 5.0 V typ"),
+        ("IP5306 efficiency", "one cited 'up to' point — held at it"),
+    ]
+    return swept, fixed
+
+
+def draw(swept, n, seed=0):
+    """{name: n uniform draws over [lo, hi]}, reproducible per seed."""
+    rng = np.random.default_rng(seed)
+    return {name: rng.uniform(swept[name].lo, swept[name].hi, n)
+            for name in sorted(swept)}
+
+
+def nominal(swept):
+    """One draw: every input at the value the bench's fixed point uses."""
+    return {name: np.array([t.nominal]) for name, t in swept.items()}
+
+
+# ── Analytic quantities ─────────────────────────────────────────────
+
+Context = collections.namedtuple(
+    "Context", "values divider bias block buttons en_r en_c")
+
+
+def context(board=None, values=None):
+    """Which parts each quantity reads, found in the netlist as the owning
+    modules find them."""
+    board = board or nl.load_board_netlist()
+    values = values if values is not None else rails.load_bom_values()
+    divider = rails.find_feedback_divider(board, values)
+    _, _, _, bias, block = audio.input_network(board, values)
+    with_rc = [b for b in buttons.survey(board, values) if b.tau_s]
+    en_r, _, en_c, _ = dynamics.find_en_rc()
+    return Context(values, divider, tuple(bias), block, tuple(with_rc),
+                   en_r, en_c)
+
+
+def _part(draws, values, ref):
+    """A part's draws if it is swept, else its BOM value."""
+    return draws[ref] if ref in draws else values[ref]
+
+
+def _rds(draws, v_bat):
+    rds = draws["Q1.r_ds_on"]
+    if r_ds_on(-v_bat, True) != r_ds_on(-thermal.V_BAT, True):
+        raise SweepError(
+            f"Q1 at V_GS=-{v_bat:.2f} V reads a different R_ds(on) row "
+            f"from the one swept (V_GS=-{thermal.V_BAT:.2f} V)")
+    return rds
+
+
+def v_rail(draws, ctx):
+    """+3V3 per draw: V_FB * (1 + R_top/R_bottom), u3_sy8089.v_out."""
+    div = ctx.divider
+    r_top = _part(draws, ctx.values, div.r_top)
+    r_bot = _part(draws, ctx.values, div.r_bottom)
+    return draws["U3.v_fb_ref"] * (1.0 + r_top / r_bot)
+
+
+def analytic(draws, ctx):
+    """[Quantity] over every draw, without a simulator."""
+    out = []
+    v33 = v_rail(draws, ctx)
+    v_lo, _, v_hi = U1.params["v_supply_range"].value
+    out.append(Quantity(
+        "+3V3 from the divider", "V", v33, v_lo, v_hi,
+        f"ESP32-S3 supply window ({U1.params['v_supply_range'].locator})"))
+
+    # thermal.evaluate at the governing ambient, for the parts whose loss
+    # reads a swept input. U5's reads none.
+    ambient = thermal.GOVERNING_AMBIENT
+    v_in = U2.params["v_out_typ"].value
+    rds = _rds(draws, thermal.V_BAT)
+    for sc in thermal.SCENARIOS:
+        p3 = thermal.p_buck_conduction(sc.i_3v3, v33 / v_in)
+        tj_max = U3.params["t_junction_max"].value
+        out.append(Quantity(
+            f"Tj U3 {sc.name}", "degC",
+            ambient + p3 * U3.params["theta_ja"].value,
+            None, tj_max - thermal.SAFE_MARGIN,
+            f"thermal.evaluate at {ambient:.0f} degC"))
+        i_bat = thermal.i_battery(sc)
+        if i_bat:
+            pq = thermal.p_q1(i_bat, thermal.V_BAT, rds)
+            tj_max = Q1.params["t_junction_max"].value
+            out.append(Quantity(
+                f"Tj Q1 {sc.name}", "degC",
+                ambient + pq * Q1.params["theta_ja_steady_state"].value,
+                None, tj_max - thermal.SAFE_MARGIN,
+                f"thermal.evaluate at {ambient:.0f} degC"))
+        if sc.name != "charge-and-play":
+            p2 = thermal.p_ip5306_boost(sc.i_3v3, sc.audio_out_w, v33)
+            tj_max = U2.params["t_junction_max"].value
+            out.append(Quantity(
+                f"Tj U2 {sc.name}", "degC",
+                ambient + p2 * U2.params["theta_ja"].value,
+                None, tj_max - thermal.SAFE_MARGIN,
+                f"thermal.evaluate at {ambient:.0f} degC"))
+
+    conductance = sum(1.0 / _part(draws, ctx.values, ref) for ref in ctx.bias)
+    c_block = ctx.values[ctx.block]
+    f_corner = conductance / (2.0 * math.pi * c_block)
+    out.append(Quantity(
+        "audio input corner", "Hz", f_corner * np.ones_like(v33), None,
+        audio.F_CORNER_MAX, "audio.input_network"))
+
+    # dynamics.brownout_soc: the highest OCV point whose terminal voltage
+    # under the stress load is below the IP5306's minimum. The empty cell
+    # is below it under any load, so every draw browns out somewhere.
+    v_bat_min = U2.params["v_bat_operating_min"].value
+    brownout = np.zeros_like(v33)
+    pending = np.ones(v33.shape, dtype=bool)
+    for soc in dynamics.BROWNOUT_SOC:
+        cell = sources.lipo(soc)
+        _, i_bat = dynamics.stress_currents(cell.v_open, v33)
+        v_term = cell.v_open - i_bat * (cell.r_internal
+                                        + _rds(draws, cell.v_open))
+        hit = pending & (v_term < v_bat_min)
+        brownout[hit] = soc
+        pending &= ~hit
+    out.append(Quantity(
+        "brownout SoC, SNES stress", "SoC", brownout, None,
+        dynamics.SOC_BROWNOUT_ACCEPTABLE, "dynamics.brownout_soc"))
+
+    k = -math.log(1.0 - buttons.V_IH_FRACTION)
+    rises = [k * _part(draws, ctx.values, b.pullup) * b.c_farad
+             for b in ctx.buttons]
+    if rises:
+        out.append(Quantity(
+            "slowest button release", "s",
+            np.max(np.broadcast_arrays(*rises, v33)[:-1], axis=0),
+            None, None, "buttons.survey — size the debounce against it"))
+    return out
+
+
+# ── Simulated quantities ────────────────────────────────────────────
+
+def simulated(draws, ctx, count, workdir, jobs=None):
+    """[Quantity] from dynamics' ripple and EN-ramp decks, on the first
+    `count` draws. Raises SimulatorMissing."""
+    caps, l_buck = board_values()
+    c_3v3, _ = caps["+3V3"]
+    v_in = U2.params["v_out_typ"].value
+    i_load = dynamics.I_SNES_STRESS
+    v33 = v_rail(draws, ctx)
+    r_en = np.broadcast_to(_part(draws, ctx.values, ctx.en_r), v33.shape)
+    v33, r_en = v33[:count], r_en[:count]
+    c_en = ctx.values[ctx.en_c]
+    decks = []
+    for v, r in zip(v33.tolist(), r_en.tolist()):
+        decks.append(dynamics.deck_corner_ripple(c_3v3, l_buck, v_in, v,
+                                                 i_load))
+        decks.append(dynamics.deck_en_ramp(c_3v3, i_load, r, c_en, v))
+    sims = [values for values, _out in spice.run_many(decks, workdir, jobs)]
+
+    def column(rows, name):
+        return np.array([row.get(name, np.nan) for row in rows])
+
+    ripple, ramp = sims[0::2], sims[1::2]
+    v_lo, _, v_hi = U1.params["v_supply_range"].value
+    basis = f"ngspice, {len(ripple)} draws"
+    return [
+        Quantity("+3V3 ripple crest", "V", column(ripple, "v_max"),
+                 None, v_hi, basis),
+        Quantity("+3V3 ripple valley", "V", column(ripple, "v_min"),
+                 v_lo, None, basis),
+        Quantity("EN release after rail valid", "s",
+                 column(ramp, "t_en_release") - column(ramp, "t_rail_valid"),
+                 0.0, None, basis),
+    ]
+
+
+# ── Statistics ──────────────────────────────────────────────────────
+
+Summary = collections.namedtuple(
+    "Summary", "n yield_ failing p_lo p50 p_hi worst")
+
+
+def summarize(q):
+    """Yield against the limits (NaN fails), 0.1/50/99.9 percentiles and
+    the draw nearest to — or furthest past — a limit."""
+    s = q.samples
+    ok = ~np.isnan(s)
+    if q.lo is not None:
+        ok &= s >= q.lo
+    if q.hi is not None:
+        ok &= s <= q.hi
+    p_lo, p50, p_hi = np.nanpercentile(s, [0.1, 50.0, 99.9])
+    if q.lo is not None and q.hi is not None:
+        margin = np.minimum(s - q.lo, q.hi - s)
+    elif q.lo is not None:
+        margin = s - q.lo
+    else:
+        margin = -s if q.hi is None else q.hi - s
+    worst = s[np.nanargmin(np.where(np.isnan(s), -np.inf, margin))]
+    failing = int(s.size - np.count_nonzero(ok))
+    return Summary(s.size, 1.0 - failing / s.size, failing, p_lo, p50, p_hi,
+                   worst)
+
+
+def _natural(name):
+    return [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", name)]
+
+
+def _fmt(value, unit):
+    if unit == "s":
+        return f"{value * 1e3:.3f}ms"
+    if unit == "SoC":
+        return f"{value:.2f}"
+    return f"{value:.4g}"
+
+
+def _limit(q):
+    lo = "" if q.lo is None else _fmt(q.lo, q.unit)
+    hi = "" if q.hi is None else _fmt(q.hi, q.unit)
+    if lo and hi:
+        return f"[{lo}, {hi}]"
+    return f">= {lo}" if lo else (f"<= {hi}" if hi else "-")
+
+
+def _report(quantities, fixed_point=None):
+    failures = []
+    print(f"  {'quantity':<28} {'fixed pt':>9} {'p0.1':>9} {'p50':>9} "
+          f"{'p99.9':>9} {'worst':>9}  {'limit':<18} yield")
+    print("  " + "-" * 100)
+    for k, q in enumerate(quantities):
+        s = summarize(q)
+        fp = (_fmt(float(fixed_point[k].samples[0]), q.unit)
+              if fixed_point else "-")
+        good = "-" if q.lo is None and q.hi is None else f"{s.yield_:.2%}"
+        print(f"  {q.name:<28} {fp:>9} {_fmt(s.p_lo, q.unit):>9} "
+              f"{_fmt(s.p50, q.unit):>9} {_fmt(s.p_hi, q.unit):>9} "
+              f"{_fmt(s.worst, q.unit):>9}  {_limit(q):<18} {good}")
+        if s.failing:
+            failures.append(
+                f"{q.name}: {s.failing} of {s.n} draws outside "
+                f"{_limit(q)} (worst {_fmt(s.worst, q.unit)}; {q.basis})")
+    return failures
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--samples", type=int, default=SAMPLES,
+                    help=f"draws for the analytic layer (default {SAMPLES})")
+    ap.add_argument("--seed", type=int, default=0,
+                    help="seed; the same seed gives the same report")
+    ap.add_argument("--spice", type=int, default=SPICE_DRAWS,
+                    help=f"draws to simulate (default {SPICE_DRAWS}; 0 for "
+                         f"the analytic layer only)")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="parallel ngspice processes (default: CPU count)")
+    args = ap.parse_args(argv)
+
+    if np is None:
+        print("  ERROR  the sweep needs NumPy (pip install numpy)",
+              file=sys.stderr)
+        return 2
+    require_valid(Q1, U1, U2, U3, U5)
+    try:
+        ctx = context()
+        swept, fixed = tolerances(ctx.values)
+    except (rails.RailError, audio.AudioError, SweepError) as exc:
+        print(f"  ERROR  {exc}", file=sys.stderr)
+        return 2
+
+    print("=" * 72)
+    print("  Virtual Bench T1.4c — Monte Carlo over the cited tolerances")
+    print("=" * 72)
+    print(f"  {args.samples} draws, seed {args.seed}, uniform over each "
+          f"cited [min, max] —")
+    print("  pessimistic in the tails, so a yield is a floor, not a "
+          "forecast.")
+    print()
+    print("  Swept:")
+    groups = collections.defaultdict(list)
+    for name in sorted(swept, key=_natural):
+        t = swept[name]
+        groups[(t.lo, t.hi, t.basis)].append(name)
+    for (lo, hi, basis), names in groups.items():
+        print(f"    {', '.join(names)}: {lo:.6g} .. {hi:.6g}")
+        print(f"        {basis}")
+    print("  Not swept, and not silently:")
+    for what, why in fixed:
+        print(f"    {what}:")
+        print(f"        {why}")
+
+    start = time.perf_counter()
+    draws = draw(swept, args.samples, args.seed)
+    quantities = analytic(draws, ctx)
+    elapsed = time.perf_counter() - start
+    fixed_point = analytic(nominal(swept), ctx)
+
+    print()
+    print("-" * 72)
+    print(f"  Analytic layer: {len(quantities)} quantities x "
+          f"{args.samples} draws in {elapsed:.2f} s")
+    print("-" * 72)
+    failures = _report(quantities, fixed_point)
+
+    v33 = quantities[0].samples
+    corners = [v for _label, v in dynamics.divider_corners()]
+    escaped = int(np.count_nonzero((v33 < min(corners) - 1e-12)
+                                   | (v33 > max(corners) + 1e-12)))
+    print()
+    print(f"  Divider corners [{min(corners):.4f}, {max(corners):.4f}] V "
+          f"bound {args.samples - escaped} of {args.samples} draws "
+          f"(dynamics.divider_corners' argument)")
+    if escaped:
+        failures.append(
+            f"{escaped} draws of +3V3 fall outside the divider corners — "
+            f"the corners do not bound the divider, so dynamics' corner "
+            f"sweep is not the superset it claims")
+
+    count = min(args.spice, args.samples)
+    print()
+    print("-" * 72)
+    if count <= 0:
+        print("  Simulated layer: not asked for (--spice 0)")
+    else:
+        workdir = tempfile.mkdtemp(prefix="vbench-sweep-")
+        try:
+            print(f"  Simulated layer: {count} draws x 2 decks (ngspice)")
+            print("-" * 72)
+            failures += _report(simulated(draws, ctx, count, workdir,
+                                          args.jobs))
+            print()
+            print(f"  {spice.summary()}")
+        except SimulatorMissing as exc:
+            print(f"  ERROR  {exc}", file=sys.stderr)
+            return 2
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print("=" * 72)
+    if failures:
+        print(f"  FAIL — {len(failures)} quantity(ies) with a reachable "
+              f"violation:")
+        for f in failures:
+            print(f"    {f}")
+        print("=" * 72)
+        return 1
+    print("  Every draw is inside its limits. Within the swept inputs only —")
+    print("  the capacitors, +5V and the cell are held at their fixed "
+          "points.")
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
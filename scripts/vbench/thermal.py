@@ -92,6 +92,9 @@ SCENARIOS = (
     Scenario("charge-and-play", "gaming while charging over USB", 0.430, 0.2),
 )
 
+# Cell voltage the scenarios run at: the OCV curve's 50% point.
+V_BAT = 3.83
+
 Result = collections.namedtuple("Result", "ref part p_watts basis tj margin "
                                           "tj_max ok")
 
@@ -103,9 +106,12 @@ def duty_cycle():
     return v_out / v_in, v_out, v_in
 
 
-def p_buck_conduction(i_out):
-    """Conduction loss in U3's two internal FETs. A LOWER BOUND."""
-    d, _, _ = duty_cycle()
+def p_buck_conduction(i_out, duty=None):
+    """Conduction loss in U3's two internal FETs. A LOWER BOUND.
+
+    `duty` defaults to duty_cycle()'s; sweep.py passes one per draw.
+    """
+    d = duty_cycle()[0] if duty is None else duty
     r_p = U3.params["r_ds_on_pfet"].value
     r_n = U3.params["r_ds_on_nfet"].value
     return i_out ** 2 * (d * r_p + (1.0 - d) * r_n)
@@ -122,28 +128,44 @@ def p_pam8403(audio_out_w):
     return audio_out_w * (1.0 / eta - 1.0) + quiescent
 
 
-def p_ip5306_boost(i_3v3, audio_out_w):
+def p_ip5306_boost(i_3v3, audio_out_w, v_out=None):
     """U2's converter loss when the board runs from the battery.
 
     Everything the boost delivers on +5V: the buck's input power (its own
     output plus its conduction loss) and the amplifier's supply power.
     The cited "up to 92%" (p.2) then gives the loss as a LOWER bound:
-    P_loss = P_out * (1/eta - 1).
+    P_loss = P_out * (1/eta - 1). `v_out` is the +3V3 the buck holds,
+    duty_cycle()'s unless given.
     """
-    _, v_out, _ = duty_cycle()
-    p_3v3 = v_out * i_3v3 + p_buck_conduction(i_3v3)
+    _, v_typ, v_in = duty_cycle()
+    if v_out is None:
+        v_out = v_typ
+    p_3v3 = v_out * i_3v3 + p_buck_conduction(i_3v3, v_out / v_in)
     p_audio = audio_out_w + p_pam8403(audio_out_w)
     p_out = p_3v3 + p_audio
     eta = U2.params["eta_boost_max"].value
     return p_out * (1.0 / eta - 1.0)
 
 
-def p_q1(i_battery, v_bat):
-    """Conduction loss in the reverse-polarity FET. V_GS = -V_BAT."""
-    return i_battery ** 2 * r_ds_on(-v_bat, worst_case=True)
+def p_q1(i_battery, v_bat, r_on=None):
+    """Conduction loss in the reverse-polarity FET. V_GS = -V_BAT.
+
+    `r_on` defaults to the cited worst case at that drive.
+    """
+    if r_on is None:
+        r_on = r_ds_on(-v_bat, worst_case=True)
+    return i_battery ** 2 * r_on
+
+
+def i_battery(scenario, v_bat=V_BAT):
+    """Cell current through Q1. In charge-and-play it comes from USB, not
+    the cell, so Q1 carries only what the boost draws on the battery."""
+    if scenario.name == "charge-and-play":
+        return 0.0
+    return scenario.i_3v3 * 3.327 / v_bat / 0.90
 
 
-def evaluate(scenario, ambient, v_bat=3.83):
+def evaluate(scenario, ambient, v_bat=V_BAT):
     """Per-part results for one scenario at one ambient."""
     out = []
 
@@ -171,10 +193,7 @@ def evaluate(scenario, ambient, v_bat=3.83):
         "(p.8)", tj5, tjmax5 - SAFE_MARGIN - tj5, tjmax5,
         tj5 <= tjmax5 - SAFE_MARGIN))
 
-    # The battery current in charge-and-play comes from USB, not the cell, so
-    # Q1 carries only what the boost draws when running on the battery.
-    i_bat = 0.0 if scenario.name == "charge-and-play" else (
-        scenario.i_3v3 * 3.327 / v_bat / 0.90)
+    i_bat = i_battery(scenario, v_bat)
     pq = p_q1(i_bat, v_bat)
     thetaq = Q1.params["theta_ja_steady_state"].value
     tjq = ambient + pq * thetaq
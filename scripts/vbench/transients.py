@@ -48,9 +48,7 @@ Usage:
 import argparse
 import collections
 import os
-import re
 import shutil
-import subprocess
 import sys
 import tempfile
 
@@ -59,7 +57,7 @@ sys.path.insert(0, BASE)
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
 from vbench import netlist as nl                             # noqa: E402
-from vbench import rails, sources                            # noqa: E402
+from vbench import rails, sources, spice                     # noqa: E402
 from vbench.models import require_valid                      # noqa: E402
 from vbench.models.q1_ao3401a import Q1, r_ds_on              # noqa: E402
 from vbench.models.u2_ip5306 import U2                       # noqa: E402
@@ -72,9 +70,7 @@ V_3V3_VALID = 3.0
 V_3V3_VALID_SRC = "ESP32-S3-WROOM-1 recommended supply minimum"
 
 
-class SimulatorMissing(RuntimeError):
-    """ngspice is not installed. Fatal — never downgraded to a skip."""
-
+SimulatorMissing = spice.SimulatorMissing
 
 Scenario = collections.namedtuple("Scenario", "name desc deck measures")
 Measured = collections.namedtuple("Measured", "name values notes")
@@ -230,33 +226,11 @@ Vctl ctl 0 PULSE(0 1 {t_step:.12g} 1u)
 
 # ── ngspice ─────────────────────────────────────────────────────────
 
-_MEAS = re.compile(r"^\s*([a-z_0-9]+)\s*=\s*([-\d.eE+]+)", re.MULTILINE)
-
-
 def run_ngspice(deck, workdir):
-    if shutil.which("ngspice") is None:
-        raise SimulatorMissing(
-            "ngspice is not on PATH. This module exits rather than skipping: "
-            "'no transient violations' from a run that never simulated "
-            "anything is the worst output this bench could produce. "
-            "Install with `brew install ngspice`.")
-    path = os.path.join(workdir, "deck.cir")
-    with open(path, "w") as fh:
-        fh.write(deck)
-    proc = subprocess.run(["ngspice", "-b", path], capture_output=True,
-                          text=True, timeout=120, cwd=workdir)
-    out = proc.stdout + proc.stderr
-    values = {}
-    for name, raw in _MEAS.findall(out):
-        try:
-            values[name] = float(raw)
-        except ValueError:
-            continue
-    if not values:
-        raise SimulatorMissing(
-            f"ngspice produced no .meas results (rc={proc.returncode}). "
-            f"Deck at {path}. Output:\n{out[-1500:]}")
-    return values, out
+    """({meas: value}, output) for one deck — through vbench/spice.py, so a
+    deck already simulated (this run or an earlier one) is not simulated
+    again."""
+    return spice.run(deck, workdir)
 
 
 # ── Closed-form cross-check ─────────────────────────────────────────
@@ -314,9 +288,19 @@ def main(argv=None):
               "f_sw are cited;")
         print("  the buck is behavioural behind them.")
 
+        # The three decks are independent: simulate them as one batch.
+        decks = {
+            "ripple": deck_ripple(c_3v3, l_buck, duty, v_in, i_gaming),
+            "cold_start": deck_cold_start(c_5v, c_3v3, i_gaming, psu.v_open,
+                                          psu.r_internal),
+            "load_step": deck_load_step(c_3v3, i_gaming, 0.100, v_out,
+                                        r_conduction()),
+        }
+        sims = dict(zip(decks, spice.run_many(list(decks.values()),
+                                              workdir)))
+
         # ── 1. ripple ────────────────────────────────────────────────
-        vals, _ = run_ngspice(
-            deck_ripple(c_3v3, l_buck, duty, v_in, i_gaming), workdir)
+        vals, _ = sims["ripple"]
         sim_ripple = vals["v_max"] - vals["v_min"]
         cf_ripple, d_i = ripple_closed_form(c_3v3, l_buck, duty, v_in, v_out)
         print()
@@ -339,9 +323,7 @@ def main(argv=None):
                                 "output filter only"))
 
         # ── 2. cold start ────────────────────────────────────────────
-        vals, _ = run_ngspice(
-            deck_cold_start(c_5v, c_3v3, i_gaming, psu.v_open,
-                            psu.r_internal), workdir)
+        vals, _ = sims["cold_start"]
         t_valid = vals.get("t_3v3_valid")
         print()
         print("-" * 72)
@@ -380,9 +362,7 @@ def main(argv=None):
         results.append(Measured("cold_start", dict(vals), ""))
 
         # ── 3. load step (the unballasted backlight) ─────────────────
-        vals, _ = run_ngspice(
-            deck_load_step(c_3v3, i_gaming, 0.100, v_out, r_conduction()),
-            workdir)
+        vals, _ = sims["load_step"]
         droop = vals["v_settled"] - vals["v_min"]
         print()
         print("-" * 72)
@@ -422,6 +402,7 @@ def main(argv=None):
         print(f"     pages this repo holds — see u2_ip5306.UNESTABLISHED.")
 
         print()
+        print(f"  {spice.summary()}")
         print("=" * 72)
         if failures:
             print(f"  FAIL — {len(failures)} transient violation(s):")
@@ -10,7 +10,6 @@ with segment proximity as a fallback check.
 """
 
 import csv
-import json
 import math
 import os
 import sys
@@ -18,7 +17,10 @@ from collections import defaultdict
 from typing import Dict, List, Set, Tuple
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CACHE_FILE = os.path.join(BASE, "hardware", "kicad", ".pcb_cache.json")
+PCB_FILE = os.path.join(BASE, "hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
+
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+import pcb_cache  # noqa: E402
 BOM_FILE = os.path.join(BASE, "hardware", "kicad", "jlcpcb", "bom.csv")
 
 # Components known to connect only via zone fill (no direct traces)
@@ -95,9 +97,8 @@ def read_bom_refs() -> Dict[str, str]:
 
 
 def load_cache() -> dict:
-    """Load PCB cache JSON."""
-    with open(CACHE_FILE) as f:
-        return json.load(f)
+    """Load the PCB cache (rebuilt from the board if stale)."""
+    return pcb_cache.load_cache(PCB_FILE)
 
 
 def build_ref_net_map(pads: list) -> Dict[str, List[int]]:
@@ -251,9 +252,9 @@ def main():
     print("Component Connectivity Verification")
     print("=" * 60)
 
-    if not os.path.exists(CACHE_FILE):
-        print(f"  ERROR: PCB cache not found: {CACHE_FILE}")
-        print("  Run: python3 scripts/generate_pcb/generate.py")
+    if not os.path.exists(PCB_FILE):
+        print(f"  ERROR: PCB not found: {PCB_FILE}")
+        print("  Run: make generate-pcb")
         return 1
 
     if not os.path.exists(BOM_FILE):
@@ -22,7 +22,8 @@ Strategy:
   2. Group features by net and merge per-net polygons into a single
      MultiPolygon via unary_union.
   3. Compute pairwise polygon distance between every different-net
-     pair (broad-phase pruned by bounding box).
+     pair (broad phase: an STRtree dwithin query over the nets'
+     connected pieces). Layers are independent and run in parallel.
   4. Report any gap < GAP_WARN (0.15mm) as WARN and < GAP_DANGER
      (0.10mm) as FAIL. Exit code 1 if any FAIL.
 
@@ -43,6 +44,7 @@ Usage:
 
 import argparse
 import math
+import multiprocessing
 import os
 import sys
 
@@ -52,6 +54,7 @@ sys.path.insert(0, os.path.join(BASE, "scripts"))
 from pcb_cache import load_cache  # noqa: E402
 
 try:
+    from shapely import STRtree, get_parts  # noqa: E402
     from shapely.geometry import Point, LineString, box  # noqa: E402
     from shapely.ops import unary_union, nearest_points  # noqa: E402
 except ImportError as e:
@@ -65,9 +68,6 @@ PCB_FILE = os.path.join(BASE, "hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
 GAP_DANGER = 0.10   # Below this = FAIL (JLCDFM Danger band)
 GAP_WARN = 0.15     # Below this = WARN (JLCPCB preferred minimum, JLCDFM Warning)
 
-# Broad-phase pruning distance (skip pairs whose bboxes are >= this apart)
-BROAD_PHASE = 0.5
-
 
 def seg_to_capsule(seg):
     """Convert a trace segment to a Shapely capsule polygon."""
@@ -210,30 +210,45 @@ def find_gaps(merged, nets, threshold=GAP_WARN):
     - Same-net pairs that touch (d == 0, routed together)
     """
     violations = []
-    items = list(merged.items())
+    keys = list(merged)
+    names = [nets.get(k, str(k)) if isinstance(k, int) else k for k in keys]
+
+    # Index every connected piece of every net's copper once. A merged net
+    # (GND, +3V3) spans the board, so its own bbox prunes nothing; its
+    # pieces do. STRtree's dwithin is GEOS's exact distance test with an
+    # early exit, so the candidates ARE the pairs under threshold.
+    parts, owner = [], []
+    for n, key in enumerate(keys):
+        for g in get_parts(merged[key][0]):
+            parts.append(g)
+            owner.append(n)
+    tree = STRtree(parts)
+    pi, pj = tree.query(parts, predicate="dwithin", distance=threshold)
+    cross, same = set(), []
+    for i, j in zip(pi.tolist(), pj.tolist()):
+        if i >= j:
+            continue
+        oi, oj = owner[i], owner[j]
+        if oi != oj:
+            cross.add((min(oi, oj), max(oi, oj)))
+        else:
+            same.append((i, j))
 
     # Category 1+3: cross-net distances
-    for i in range(len(items)):
-        ka, (pa, _) = items[i]
-        pa_bounds = pa.bounds
-        for j in range(i + 1, len(items)):
-            kb, (pb, _) = items[j]
-            pb_bounds = pb.bounds
-            if (pa_bounds[2] + BROAD_PHASE < pb_bounds[0]
-                    or pb_bounds[2] + BROAD_PHASE < pa_bounds[0]
-                    or pa_bounds[3] + BROAD_PHASE < pb_bounds[1]
-                    or pb_bounds[3] + BROAD_PHASE < pa_bounds[1]):
+    # Pairs in the order of the old nested loop over merged.items(), and
+    # the distance is still taken between the whole merged geometries, so
+    # values and report order are what the O(n²) sweep produced.
+    for i, j in sorted(cross):
+        pa, pb = merged[keys[i]][0], merged[keys[j]][0]
+        # Unguarded: a failed distance() is a broken polygon, and
+        # swallowing it silently skips exactly the pair that might be
+        # shorting. Let it raise.
+        d = pa.distance(pb)
+        if d < threshold:
+            na, nb = names[i], names[j]
+            if na == "<no net>" and nb == "<no net>":
                 continue
-            # Unguarded: a failed distance() is a broken polygon, and
-            # swallowing it silently skips exactly the pair that might be
-            # shorting. Let it raise.
-            d = pa.distance(pb)
-            if d < threshold:
-                na = nets.get(ka, str(ka)) if isinstance(ka, int) else ka
-                nb = nets.get(kb, str(kb)) if isinstance(kb, int) else kb
-                if na == "<no net>" and nb == "<no net>":
-                    continue
-                violations.append((d, na, nb) + _locate(pa, pb))
+            violations.append((d, na, nb) + _locate(pa, pb))
 
     # Category 2: same-net non-touching sub-polygons (fab dry-film risk)
     # Walk each net's merged geometry. If it's a MultiPolygon, the net
@@ -249,31 +264,21 @@ def find_gaps(merged, nets, threshold=GAP_WARN):
     #     polygon, we want to detect the thin-neck via morphological
     #     erosion (eroded by 0.5*GAP_WARN, check if the result
     #     disconnects into > original component count)
-    for key, (geom, _) in merged.items():
-        net_name = nets.get(key, str(key)) if isinstance(key, int) else key
-        if net_name == "<no net>":
+    #
+    # (a) comes from the same tree query: pieces of one net that are
+    # within threshold of each other, in the old per-net (i, j) order.
+    for i, j in sorted(same):
+        if names[owner[i]] == "<no net>":
             continue
-
-        # Collect sub-geometries
-        subs = []
-        if geom.geom_type == "MultiPolygon":
-            subs = list(geom.geoms)
-        elif geom.geom_type == "GeometryCollection":
-            subs = [g for g in geom.geoms if g.geom_type == "Polygon"]
-
-        if len(subs) < 2:
+        if parts[i].geom_type != "Polygon" or parts[j].geom_type != "Polygon":
             continue
-
-        # Pairwise distance between sub-polygons of the same net
-        for i in range(len(subs)):
-            for j in range(i + 1, len(subs)):
-                # Unguarded — see the note in find_gaps().
-                d = subs[i].distance(subs[j])
-                if d < threshold and d > 0.001:
-                    violations.append(
-                        (d, f"{net_name} (same-net)", net_name)
-                        + _locate(subs[i], subs[j])
-                    )
+        # Unguarded — see the note above.
+        d = parts[i].distance(parts[j])
+        if d < threshold and d > 0.001:
+            violations.append(
+                (d, f"{names[owner[i]]} (same-net)", names[owner[i]])
+                + _locate(parts[i], parts[j])
+            )
 
     # Category 2b: narrow SLITS inside one connected polygon — the case
     # 2a structurally cannot see. Implemented 2026-08-08 after JLCDFM
@@ -312,6 +317,45 @@ def find_gaps(merged, nets, threshold=GAP_WARN):
     return violations
 
 
+def check_layer(cache, nets, layer):
+    """(feature count, net count, violations sorted by gap) for one layer,
+    or None when the layer has no copper."""
+    features = build_layer_features(cache, layer)
+    if not features:
+        return None
+    merged = merge_by_net(features)
+    violations = find_gaps(merged, nets, threshold=GAP_WARN)
+    violations.sort(key=lambda v: v[0])
+    return len(features), len(merged), violations
+
+
+# (cache, nets) for forked layer workers; inherited, never pickled.
+_WORK = None
+
+
+def _check_layer_worker(layer):
+    return check_layer(*_WORK, layer)
+
+
+def check_layers(cache, nets, layers, jobs=None):
+    """check_layer() for every layer, results in `layers` order.
+
+    The layers share nothing, so with more than one CPU each gets a forked
+    worker. On one CPU it is a plain loop.
+    """
+    global _WORK
+    if jobs is None:
+        jobs = min(len(layers), os.cpu_count() or 1)
+    if jobs <= 1 or len(layers) <= 1:
+        return [check_layer(cache, nets, layer) for layer in layers]
+    _WORK = (cache, nets)
+    try:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            return pool.map(_check_layer_worker, layers)
+    finally:
+        _WORK = None
+
+
 def main():
     ap = argparse.ArgumentParser(description=__doc__)
     ap.add_argument(
@@ -326,6 +370,10 @@ def main():
         "--quiet", "-q", action="store_true",
         help="Only show totals, not per-violation details",
     )
+    ap.add_argument(
+        "--jobs", "-j", type=int, default=None,
+        help="Layers checked in parallel (default: one per CPU, max 4)",
+    )
     args = ap.parse_args()
 
     cache = load_cache(PCB_FILE)
@@ -343,15 +391,13 @@ def main():
     total_danger = 0
     total_warn = 0
 
-    for layer in layers:
-        features = build_layer_features(cache, layer)
-        if not features:
+    results = check_layers(cache, nets, layers, jobs=args.jobs)
+    for layer, result in zip(layers, results):
+        if result is None:
             print(f"\n{layer}: no features, skipped")
             continue
 
-        merged = merge_by_net(features)
-        violations = find_gaps(merged, nets, threshold=GAP_WARN)
-        violations.sort(key=lambda v: v[0])
+        n_features, n_nets, violations = result
 
         danger = [v for v in violations if v[0] < GAP_DANGER]
         warn = [v for v in violations if GAP_DANGER <= v[0] < GAP_WARN]
@@ -360,7 +406,7 @@ def main():
         total_warn += len(warn)
 
         status = "PASS" if not danger else "FAIL"
-        print(f"\n{layer}: {len(features)} features, {len(merged)} nets")
+        print(f"\n{layer}: {n_features} features, {n_nets} nets")
         print(f"  DANGER (< {GAP_DANGER}mm): {len(danger)}  "
               f"WARN (< {GAP_WARN}mm): {len(warn)}  [{status}]")
 
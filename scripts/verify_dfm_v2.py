@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Verify DFM v2 fixes: CPL alignment, silkscreen, spacing, gerbers."""
+"""Verify DFM v2 fixes: CPL alignment, silkscreen, spacing, gerbers.
+
+The pairwise spacing checks are rows of PAIR_RULES, swept together by
+dfm_rules.RuleEngine. --timing prints each row's share of the sweep.
+"""
 
 import csv
 import json
@@ -11,6 +15,8 @@ import subprocess
 import sys
 import zipfile
 
+from dfm_rules import Rule, RuleEngine
+
 _ROTATION_LAW = None
 
 
@@ -499,99 +505,106 @@ def _point_to_segment_dist(px, py, s):
     return ((px - cx) ** 2 + (py - cy) ** 2) ** 0.5
 
 
-def _segment_to_rect_gap(s, px, py, pw, ph):
-    """Minimum copper gap between a trace segment and an axis-aligned rectangular pad.
-
-    The trace has half-width s["w"]/2 and the pad is pw x ph centered at (px, py).
-    Returns the edge-to-edge gap (negative means overlap).
-
-    Uses segment-to-rectangle minimum distance: finds the closest point on the
-    segment to the rectangle, then subtracts half-trace-width.
-    """
-    import math
-    hw, hh = pw / 2.0, ph / 2.0
-    # Rectangle bounds
-    rx_min, rx_max = px - hw, px + hw
-    ry_min, ry_max = py - hh, py + hh
-
-    # Sample points along the segment and find minimum distance to rectangle
-    # For exact computation: clamp each segment point to the rectangle
-    ax, ay = s["x1"], s["y1"]
-    bx, by = s["x2"], s["y2"]
-
-    def _point_to_rect_dist(qx, qy):
-        """Distance from point to axis-aligned rectangle."""
-        # Clamp point to rectangle
-        cx = max(rx_min, min(rx_max, qx))
-        cy = max(ry_min, min(ry_max, qy))
-        return math.sqrt((qx - cx) ** 2 + (qy - cy) ** 2)
-
-    # Exact: check segment vs each of the 4 rectangle edges
-    # But for axis-aligned pads, a simpler approach:
-    # Find closest point on segment to the rectangle (analytical)
-
-    # Check all rectangle corners against segment
-    min_dist = float("inf")
-    for cx, cy in [(rx_min, ry_min), (rx_min, ry_max),
-                   (rx_max, ry_min), (rx_max, ry_max)]:
-        d = _point_to_segment_dist(cx, cy, s)
-        if d < min_dist:
-            min_dist = d
-
-    # Check segment endpoints against rectangle
-    for qx, qy in [(ax, ay), (bx, by)]:
-        d = _point_to_rect_dist(qx, qy)
-        if d < min_dist:
-            min_dist = d
-
-    # Check segment vs each rectangle edge (4 edges)
-    edges = [
-        (rx_min, ry_min, rx_max, ry_min),  # bottom
-        (rx_max, ry_min, rx_max, ry_max),  # right
-        (rx_max, ry_max, rx_min, ry_max),  # top
-        (rx_min, ry_max, rx_min, ry_min),  # left
-    ]
-    for ex1, ey1, ex2, ey2 in edges:
-        d = _seg_seg_dist(ax, ay, bx, by, ex1, ey1, ex2, ey2)
-        if d < min_dist:
-            min_dist = d
-
-    return min_dist - s["w"] / 2.0
-
-
-def _seg_seg_dist(ax, ay, bx, by, cx, cy, dx, dy):
-    """Minimum distance between two line segments AB and CD."""
-    import math
-
-    def _pt_seg(px, py, sx, sy, ex, ey):
-        vx, vy = ex - sx, ey - sy
-        ln2 = vx * vx + vy * vy
-        if ln2 < 1e-12:
-            return math.sqrt((px - sx) ** 2 + (py - sy) ** 2)
-        t = max(0.0, min(1.0, ((px - sx) * vx + (py - sy) * vy) / ln2))
-        qx, qy = sx + t * vx, sy + t * vy
-        return math.sqrt((px - qx) ** 2 + (py - qy) ** 2)
-
-    # Check if segments intersect
-    def _cross(ux, uy, vx, vy):
-        return ux * vy - uy * vx
-
-    rx, ry = bx - ax, by - ay
-    sx, sy = dx - cx, dy - cy
-    denom = _cross(rx, ry, sx, sy)
-    qpx, qpy = cx - ax, cy - ay
-    if abs(denom) > 1e-12:
-        t = _cross(qpx, qpy, sx, sy) / denom
-        u = _cross(qpx, qpy, rx, ry) / denom
-        if 0 <= t <= 1 and 0 <= u <= 1:
-            return 0.0  # segments intersect
-
-    # No intersection — minimum is endpoint-to-segment
-    d1 = _pt_seg(ax, ay, cx, cy, dx, dy)
-    d2 = _pt_seg(bx, by, cx, cy, dx, dy)
-    d3 = _pt_seg(cx, cy, ax, ay, bx, by)
-    d4 = _pt_seg(dx, dy, ax, ay, bx, by)
-    return min(d1, d2, d3, d4)
+# ── Pairwise rule table ───────────────────────────────────────────
+#
+# Every spacing check below that compares two kinds of board object is a
+# row here rather than its own loop: dfm_rules compiles the table into one
+# clearance sweep per pair of kinds and answers each row from it. A new
+# spacing rule is a new row plus the check() that reports it.
+#
+# The ESP32 module (centre 80, 31.12; 18 x 25.5 mm) carries same-net
+# via-in-pad on its castellations and the J4 FPC (x = 133.15, 0.5 mm
+# pitch) via-in-pad, so the via-to-via rows skip pairs inside them.
+
+def _on_esp(a, b):
+    esp_cx, esp_cy = 80.0, 31.12
+    return (abs(a["x"] - esp_cx) < 10 and abs(a["y"] - esp_cy) < 14
+            and abs(b["x"] - esp_cx) < 10 and abs(b["y"] - esp_cy) < 14)
+
+
+def _on_fpc(a, b):
+    fpc_x = 133.15
+    return (abs(a["x"] - fpc_x) < 1.0 and 27.0 < a["y"] < 34.0
+            and abs(b["x"] - fpc_x) < 1.0 and 27.0 < b["y"] < 34.0)
+
+
+_NET_NAMES = None
+
+
+def _net_names():
+    """{net id: name} from the PCB file (cached)."""
+    global _NET_NAMES
+    if _NET_NAMES is None:
+        with open(PCB_FILE) as f:
+            _NET_NAMES = {int(m.group(1)): m.group(2) for m in re.finditer(
+                r'\(net\s+(\d+)\s+"([^"]*)"\)', f.read())}
+    return _NET_NAMES
+
+
+POWER_NETS = {"GND", "VBUS", "+5V", "+3V3", "BAT+"}
+
+
+def _is_power(item):
+    return _net_names().get(item["net"]) in POWER_NETS
+
+
+OUTER = ("F.Cu", "B.Cu")
+
+PAIR_RULES = (
+    # trace x trace
+    Rule("trace_spacing", "trace", threshold=0.10),
+    Rule("jlcdfm_trace_spacing", "trace", nets="differ-netted",
+         threshold=0.15),
+    # via x via
+    Rule("via_to_via_spacing", "via", nets="any", threshold=0.25,
+         metric=("drill", "drill"),
+         exclude=lambda a, b: a["net"] == b["net"] and _on_esp(a, b)),
+    Rule("via_pad_spacing", "via", threshold=0.15,
+         exclude=lambda a, b: _on_esp(a, b) or _on_fpc(a, b)),
+    # hole x hole
+    Rule("jlcdfm_pth_spacing", "hole", nets="not-joined", threshold=0.15,
+         where=(lambda h: h["type"] != "np_thru_hole",
+                lambda h: h["type"] != "np_thru_hole")),
+    # hole x trace
+    Rule("drill_trace_clearance", "hole", "trace", OUTER, "not-joined", 0.15),
+    Rule("jlcdfm_pth_to_trace_clearance", "hole", "trace", OUTER,
+         "not-joined", 0.15, where=(lambda h: h["type"] == "thru_hole", None),
+         structural=lambda h, s: h["ref"] in _FINE_PITCH_REFS),
+    # via x trace
+    Rule("via_annular_ring_trace_clearance", "via", "trace", OUTER,
+         "differ-netted", 0.10),
+    Rule("signal_power_via_overlap", "via", "trace", None, "differ", 0.0,
+         where=(_is_power, lambda s: s["net"] != 0 and not _is_power(s))),
+    # via x pad
+    Rule("jlcdfm_via_to_smd_clearance", "via", "pad", OUTER, "differ-netted",
+         0.15, metric=("drill", "copper"),
+         where=(None, lambda p: p.get("type") == "smd"),
+         structural=lambda v, p: p["ref"] in _FINE_PITCH_REFS),
+    Rule("jlcdfm_via_to_pad_clearance", "via", "pad", OUTER, "differ-netted",
+         0.10,
+         structural=lambda v, p: p["ref"] in _FINE_PITCH_REFS
+         or p["num"] == "EP"),
+    # trace x pad
+    Rule("trace_pad_different_net_clearance", "trace", "pad", None,
+         "differ-netted", 0.10),
+    # pad x pad
+    Rule("jlcdfm_pad_spacing", "pad", nets="differ-netted", threshold=0.15),
+)
+
+_RULE_ENGINE = None
+
+
+def _rule_engine():
+    """PAIR_RULES compiled against the PCB cache (shared, like the cache)."""
+    global _RULE_ENGINE
+    if _RULE_ENGINE is None:
+        _RULE_ENGINE = RuleEngine(_get_cache(), PAIR_RULES)
+    return _RULE_ENGINE
+
+
+def _rule(name):
+    """RuleResult for one PAIR_RULES row (every row is swept once)."""
+    return _rule_engine().result(name)
 
 
 def test_trace_spacing():
@@ -600,34 +613,20 @@ def test_trace_spacing():
     Baseline: some trace proximity violations are inherent to the dense design
     (USB-C area, button pull-up arrays, ESP32 pin fan-out).
     This test guards against REGRESSIONS — the count should not increase.
+
+    The gap is the exact capsule-to-capsule copper distance from the
+    clearance kernel, so diagonal and end-on approaches count as well as
+    the parallel runs _seg_min_dist() measures. PAIR_RULES row:
+    trace_spacing.
     """
     print("\n── Trace Spacing Tests ──")
-    segs = _cached_segments()
-
-    # Group by layer for efficient comparison
-    by_layer = {}
-    for s in segs:
-        by_layer.setdefault(s["layer"], []).append(s)
 
-    violations = []
-    min_gap_threshold = 0.10  # JLCPCB DFM Danger threshold
-
-    for layer, layer_segs in by_layer.items():
-        if "Cu" not in layer:
-            continue
-        n = len(layer_segs)
-        for i in range(n):
-            for j in range(i + 1, n):
-                s1, s2 = layer_segs[i], layer_segs[j]
-                if s1["net"] == s2["net"]:
-                    continue  # same net, no spacing required
-                gap = _seg_min_dist(s1, s2)
-                if gap is not None and gap < min_gap_threshold:
-                    violations.append(
-                        f"{layer}: gap={gap:.3f}mm at "
-                        f"({s1['x1']},{s1['y1']})-({s1['x2']},{s1['y2']}) vs "
-                        f"({s2['x1']},{s2['y1']})-({s2['x2']},{s2['y2']})"
-                    )
+    violations = [
+        f"{h.layer}: gap={h.gap:.3f}mm at "
+        f"({h.a['x1']},{h.a['y1']})-({h.a['x2']},{h.a['y2']}) vs "
+        f"({h.b['x1']},{h.b['y1']})-({h.b['x2']},{h.b['y2']})"
+        for h in _rule("trace_spacing").hits
+    ]
 
     # Baseline reduced to 0: all trace-trace spacing violations resolved.
     # History: 27 → 12 (layer-swap) → 0 (routing cleanup)
@@ -638,30 +637,19 @@ def test_trace_spacing():
 
 
 def test_via_to_via_spacing():
-    """Test 17: No via holes closer than 0.25mm (hole-to-hole edge gap)."""
+    """Test 17: No via holes closer than 0.25mm (hole-to-hole edge gap).
+
+    Same-net via-in-pad on the ESP32 castellations is excluded. PAIR_RULES
+    row: via_to_via_spacing.
+    """
     print("\n── Via-to-Via Spacing Tests ──")
     vias = _cached_vias()
 
-    min_hole_gap = 0.25  # JLCPCB minimum hole-to-hole clearance
-    violations = []
-
-    for i in range(len(vias)):
-        for j in range(i + 1, len(vias)):
-            v1, v2 = vias[i], vias[j]
-            dist = ((v1["x"] - v2["x"])**2 + (v1["y"] - v2["y"])**2)**0.5
-            edge_gap = dist - (v1["drill"] + v2["drill"]) / 2
-            if edge_gap < min_hole_gap:
-                # Exclude same-net via-in-pad on ESP32 castellated pads
-                # (ESP32 center at 80, 31.12; module 18x25.5mm)
-                esp_cx, esp_cy = 80.0, 31.12
-                on_esp = (abs(v1["x"] - esp_cx) < 10 and abs(v1["y"] - esp_cy) < 14
-                          and abs(v2["x"] - esp_cx) < 10 and abs(v2["y"] - esp_cy) < 14)
-                if on_esp and v1["net"] == v2["net"]:
-                    continue
-                violations.append(
-                    f"gap={edge_gap:.3f}mm: ({v1['x']},{v1['y']}) vs "
-                    f"({v2['x']},{v2['y']})"
-                )
+    violations = [
+        f"gap={h.gap:.3f}mm: ({h.a['x']},{h.a['y']}) vs "
+        f"({h.b['x']},{h.b['y']})"
+        for h in _rule("via_to_via_spacing").hits
+    ]
 
     check(f"Via hole-to-hole gap >= 0.25mm ({len(vias)} vias)",
           len(violations) == 0,
@@ -1318,43 +1306,24 @@ def test_via_pad_spacing():
     """Test 32: All different-net via pairs have pad edge gap >= 0.15mm.
 
     Guards against via placement that creates overlapping pads on different
-    nets. Excludes same-net pairs and vias within ESP32 module area.
+    nets. Excludes same-net pairs, vias within the ESP32 module area
+    (handled by via_to_via_spacing) and the J4 FPC via-in-pad column (0.5mm
+    pitch makes via-via pad overlap inherent; hole-to-hole spacing is the
+    real guard). PAIR_RULES row: via_pad_spacing.
     """
     print("\n── Via Pad Spacing Test ──")
     vias = _cached_vias()
+    res = _rule("via_pad_spacing")
 
-    min_pad_gap = 0.15
-    violations = []
-
-    for i in range(len(vias)):
-        for j in range(i + 1, len(vias)):
-            v1, v2 = vias[i], vias[j]
-            if v1["net"] == v2["net"]:
-                continue
-            dist = ((v1["x"] - v2["x"])**2 + (v1["y"] - v2["y"])**2)**0.5
-            pad_gap = dist - (v1["size"] + v2["size"]) / 2
-            if pad_gap < min_pad_gap:
-                # Exclude ESP32 area (already handled by via_to_via_spacing)
-                esp_cx, esp_cy = 80.0, 31.12
-                on_esp = (abs(v1["x"] - esp_cx) < 10 and abs(v1["y"] - esp_cy) < 14
-                          and abs(v2["x"] - esp_cx) < 10 and abs(v2["y"] - esp_cy) < 14)
-                if on_esp:
-                    continue
-                # Exclude FPC J4 via-in-pad area (0.5mm pitch makes via-via
-                # pad overlap inherent; hole-to-hole spacing is the real guard)
-                fpc_x = 133.15
-                on_fpc = (abs(v1["x"] - fpc_x) < 1.0 and 27.0 < v1["y"] < 34.0
-                          and abs(v2["x"] - fpc_x) < 1.0 and 27.0 < v2["y"] < 34.0)
-                if on_fpc:
-                    continue
-                violations.append(
-                    f"net{v1['net']}@({v1['x']:.3f},{v1['y']:.3f}) vs "
-                    f"net{v2['net']}@({v2['x']:.3f},{v2['y']:.3f}): "
-                    f"pad gap={pad_gap:.3f}mm"
-                )
+    violations = [
+        f"net{h.a['net']}@({h.a['x']:.3f},{h.a['y']:.3f}) vs "
+        f"net{h.b['net']}@({h.b['x']:.3f},{h.b['y']:.3f}): "
+        f"pad gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     check(
-        f"Via pad edge gap >= {min_pad_gap}mm ({len(vias)} vias)",
+        f"Via pad edge gap >= {res.rule.threshold}mm ({len(vias)} vias)",
         len(violations) == 0,
         f"{len(violations)} violations: {violations[:5]}",
     )
@@ -1612,73 +1581,20 @@ def test_drill_trace_clearance():
     JLCPCB error: "The indicated hole will cut off the trace."
     For every via and THT pad, checks that the drill edge maintains >= 0.15mm
     clearance from every different-net trace on the same copper layer.
+    PAIR_RULES row: drill_trace_clearance.
     """
     print("\n── Drill-Trace Clearance Test ──")
-    MIN_CLR = 0.15  # mm — JLCPCB minimum
-
     segs = _cached_segments()
-    vias = _cached_vias()
-    pads = _get_cache()["pads"]
-
-    # Collect all drill items: (x, y, drill_r, net, layers)
-    drill_items = []
-    for v in vias:
-        drill_items.append({
-            "x": v["x"], "y": v["y"],
-            "drill_r": v["drill"] / 2.0,
-            "net": v["net"],
-            "layers": {"F.Cu", "B.Cu"},
-            "label": f"via@({v['x']},{v['y']})",
-        })
-
-    # THT pads (thru_hole, np_thru_hole) span *.Cu
-    for p in pads:
-        if p.get("type") not in ("thru_hole", "np_thru_hole"):
-            continue
-        if p.get("drill", 0) <= 0:
-            continue
-        drill_items.append({
-            "x": p["x"], "y": p["y"],
-            "drill_r": p["drill"] / 2.0,
-            "net": p["net"],
-            "layers": {"F.Cu", "B.Cu"},
-            "label": f"{p['ref']}[{p['num']}]@({p['x']},{p['y']})",
-        })
-
-    # Deduplicate by position+drill (cache duplicates THT pads per layer)
-    seen = set()
-    unique_drills = []
-    for item in drill_items:
-        key = (round(item["x"], 3), round(item["y"], 3),
-               round(item["drill_r"], 3))
-        if key not in seen:
-            seen.add(key)
-            unique_drills.append(item)
-
-    # Index segments by layer
-    segs_by_layer = {}
-    for s in segs:
-        segs_by_layer.setdefault(s["layer"], []).append(s)
-
-    violations = []
-    for item in unique_drills:
-        hx, hy = item["x"], item["y"]
-        dr = item["drill_r"]
-        h_net = item["net"]
-        for layer in item["layers"]:
-            for s in segs_by_layer.get(layer, []):
-                # Skip same-net (intentional connection)
-                if h_net != 0 and s["net"] != 0 and h_net == s["net"]:
-                    continue
-                dist = _point_to_segment_dist(hx, hy, s)
-                gap = dist - dr - s["w"] / 2.0
-                if gap < MIN_CLR:
-                    violations.append(
-                        f"{item['label']} drill_r={dr:.2f} net={h_net} vs "
-                        f"{layer} net={s['net']} w={s['w']} "
-                        f"({s['x1']},{s['y1']})-({s['x2']},{s['y2']}) "
-                        f"gap={gap:.3f}mm"
-                    )
+    res = _rule("drill_trace_clearance")
+    holes = _rule_engine().items("hole")
+
+    violations = [
+        f"{h.a['label']} drill_r={h.a['drill'] / 2.0:.2f} net={h.a['net']} vs "
+        f"{h.layer} net={h.b['net']} w={h.b['w']} "
+        f"({h.b['x1']},{h.b['y1']})-({h.b['x2']},{h.b['y2']}) "
+        f"gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     # Baseline reduced to 0: same-net filtering already present, all real
     # drill-to-trace violations resolved in routing.
@@ -1686,7 +1602,7 @@ def test_drill_trace_clearance():
     BASELINE = 0
     check(
         f"Drill-to-trace violations <= baseline {BASELINE} "
-        f"({len(violations)} found, {len(unique_drills)} holes × {len(segs)} segs)",
+        f"({len(violations)} found, {len(holes)} holes × {len(segs)} segs)",
         len(violations) <= BASELINE,
         f"{len(violations)} violations (baseline {BASELINE}): {violations[:5]}",
     )
@@ -1697,10 +1613,10 @@ def test_trace_pad_different_net_clearance():
 
     JLCPCB error: "The pad and trace is connected, is that correct?"
     Skips if pads appear unnetted (>90% net=0) — run after pad net injection.
+    The gap is the exact capsule-to-rectangle distance. PAIR_RULES row:
+    trace_pad_different_net_clearance.
     """
     print("\n── Trace-Pad Different-Net Clearance Test ──")
-    MIN_CLR = 0.10  # mm — JLCPCB recommended minimum trace-to-pad clearance
-
     segs = _cached_segments()
     pads = _get_cache()["pads"]
 
@@ -1711,49 +1627,13 @@ def test_trace_pad_different_net_clearance():
               f"non-zero) — inject pad nets first (Action 2b)")
         return
 
-    # Index pads by layer
-    pads_by_layer = {}
-    for p in pads:
-        pads_by_layer.setdefault(p["layer"], []).append(p)
-
-    violations = []
-    for s in segs:
-        if s["net"] == 0:
-            continue
-        sxmin = s["x1"] if s["x1"] < s["x2"] else s["x2"]
-        sxmax = s["x1"] if s["x1"] > s["x2"] else s["x2"]
-        symin = s["y1"] if s["y1"] < s["y2"] else s["y2"]
-        symax = s["y1"] if s["y1"] > s["y2"] else s["y2"]
-        shw = s["w"] / 2.0
-        for p in pads_by_layer.get(s["layer"], []):
-            if p["net"] == 0:
-                continue
-            if s["net"] == p["net"]:
-                continue
-            # Conservative reject: the exact segment-to-rect gap can never be
-            # smaller than the per-axis gap between the segment's bbox and the
-            # pad rect, minus the trace half-width. Skipping here can only
-            # skip pairs whose true gap is >= MIN_CLR.
-            hw, hh = p["w"] / 2.0, p["h"] / 2.0
-            dxg = (p["x"] - hw) - sxmax
-            t = sxmin - (p["x"] + hw)
-            if t > dxg:
-                dxg = t
-            dyg = (p["y"] - hh) - symax
-            t = symin - (p["y"] + hh)
-            if t > dyg:
-                dyg = t
-            if (dxg if dxg > dyg else dyg) - shw >= MIN_CLR:
-                continue
-            # Use precise rectangular pad geometry instead of half-diagonal
-            gap = _segment_to_rect_gap(s, p["x"], p["y"], p["w"], p["h"])
-            if gap < MIN_CLR:
-                violations.append(
-                    f"seg net={s['net']} {s['layer']} "
-                    f"({s['x1']},{s['y1']})-({s['x2']},{s['y2']}) "
-                    f"vs {p['ref']}[{p['num']}] net={p['net']} "
-                    f"@({p['x']},{p['y']}) gap={gap:.3f}mm"
-                )
+    violations = [
+        f"seg net={h.a['net']} {h.a['layer']} "
+        f"({h.a['x1']},{h.a['y1']})-({h.a['x2']},{h.a['y2']}) "
+        f"vs {h.b['ref']}[{h.b['num']}] net={h.b['net']} "
+        f"@({h.b['x']},{h.b['y']}) gap={h.gap:.3f}mm"
+        for h in _rule("trace_pad_different_net_clearance").hits
+    ]
 
     # Metric upgraded from half-diagonal circle to exact rectangle distance.
     # History: 140 → 127 (half-diag) → reduced with rectangle metric.
@@ -2155,40 +2035,20 @@ def test_via_annular_ring_trace_clearance():
     A trace can pass test 42 yet physically overlap the copper by 0.275mm.
 
     This test uses the actual copper radius (via_size/2) to check clearance.
+    PAIR_RULES row: via_annular_ring_trace_clearance.
     """
     print("\n── Via Annular Ring to Trace Clearance Test ──")
-    MIN_CLR = 0.10  # mm — JLCPCB minimum copper-to-copper
-
-    segs = _cached_segments()
-    vias = _cached_vias()
-
-    # Index segments by layer
-    segs_by_layer = {}
-    for s in segs:
-        segs_by_layer.setdefault(s["layer"], []).append(s)
-
-    violations = []
-    for v in vias:
-        vx, vy = v["x"], v["y"]
-        copper_r = v["size"] / 2.0  # annular ring radius (NOT drill radius)
-        v_net = v["net"]
-        if v_net == 0:
-            continue
-        # Vias have copper on F.Cu and B.Cu
-        for layer in ("F.Cu", "B.Cu"):
-            for s in segs_by_layer.get(layer, []):
-                if s["net"] == 0 or s["net"] == v_net:
-                    continue
-                dist = _point_to_segment_dist(vx, vy, s)
-                gap = dist - copper_r - s["w"] / 2.0
-                if gap < MIN_CLR:
-                    violations.append(
-                        f"via@({vx:.1f},{vy:.1f}) sz={v['size']} net={v_net} "
-                        f"vs {layer} net={s['net']} "
-                        f"({s['x1']:.1f},{s['y1']:.1f})-"
-                        f"({s['x2']:.1f},{s['y2']:.1f}) w={s['w']} "
-                        f"gap={gap:.3f}mm"
-                    )
+    res = _rule("via_annular_ring_trace_clearance")
+    MIN_CLR = res.rule.threshold  # mm — JLCPCB minimum copper-to-copper
+
+    violations = [
+        f"via@({h.a['x']:.1f},{h.a['y']:.1f}) sz={h.a['size']} net={h.a['net']} "
+        f"vs {h.layer} net={h.b['net']} "
+        f"({h.b['x1']:.1f},{h.b['y1']:.1f})-"
+        f"({h.b['x2']:.1f},{h.b['y2']:.1f}) w={h.b['w']} "
+        f"gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     # Baseline: current design has some inherent proximity in dense areas.
     # This catches the 0.275mm blind spot from test 42 (drill vs copper).
@@ -2208,48 +2068,28 @@ def test_signal_power_via_overlap():
     Complement to test_power_bridge_detection which requires 2+ different power
     nets. This test catches the simpler case: a signal trace touching even ONE
     power via creates a signal-to-power short. For example, BTN_Y overlapping
-    a +3V3 via makes the button permanently read HIGH.
+    a +3V3 via makes the button permanently read HIGH. PAIR_RULES row:
+    signal_power_via_overlap.
     """
     print("\n── Signal-to-Power Via Overlap Test ──")
+    net_names = _net_names()
 
-    segs = _cached_segments()
-    vias = _cached_vias()
-
-    # Read net names from PCB file
-    net_names = {}
-    with open(PCB_FILE) as f:
-        for m in re.finditer(r'\(net\s+(\d+)\s+"([^"]*)"\)', f.read()):
-            net_names[int(m.group(1))] = m.group(2)
-
-    POWER_NETS = {"GND", "VBUS", "+5V", "+3V3", "BAT+"}
-    power_net_ids = {nid for nid, name in net_names.items() if name in POWER_NETS}
-    power_vias = [v for v in vias if v["net"] in power_net_ids]
-
+    # Reported per trace, as the trace is what has to move.
+    order = {id(s): k for k, s in enumerate(_rule_engine().items("trace"))}
+    hits = _rule("signal_power_via_overlap").hits
     violations = []
-    for seg in segs:
-        seg_net = seg["net"]
-        if seg_net == 0 or seg_net in power_net_ids:
-            continue  # skip unnetted and power-net traces
-
-        seg_name = net_names.get(seg_net, f"net{seg_net}")
-
-        for via in power_vias:
-            if via["net"] == seg_net:
-                continue
-            vr = via["size"] / 2.0
-            sw = seg["w"] / 2.0
-            dist = _point_to_segment_dist(via["x"], via["y"], seg)
-            gap = dist - vr - sw
-            if gap < 0:
-                via_name = net_names.get(via["net"], f"net{via['net']}")
-                violations.append(
-                    f"{seg['layer']} {seg_name} "
-                    f"({seg['x1']:.1f},{seg['y1']:.1f})->"
-                    f"({seg['x2']:.1f},{seg['y2']:.1f}) "
-                    f"overlaps {via_name} via "
-                    f"({via['x']:.1f},{via['y']:.1f}) "
-                    f"gap={gap:.3f}mm"
-                )
+    for h in sorted(hits, key=lambda h: order[id(h.b)]):
+        via, seg = h.a, h.b
+        seg_name = net_names.get(seg["net"], f"net{seg['net']}")
+        via_name = net_names.get(via["net"], f"net{via['net']}")
+        violations.append(
+            f"{seg['layer']} {seg_name} "
+            f"({seg['x1']:.1f},{seg['y1']:.1f})->"
+            f"({seg['x2']:.1f},{seg['y2']:.1f}) "
+            f"overlaps {via_name} via "
+            f"({via['x']:.1f},{via['y']:.1f}) "
+            f"gap={h.gap:.3f}mm"
+        )
 
     check(
         f"No signal traces overlap power via copper "
@@ -2663,34 +2503,22 @@ def test_jlcdfm_trace_spacing():
     """JLCDFM: Minimum trace-to-trace spacing >= 0.15mm on ALL layers.
 
     Checks every pair of trace segments on the same copper layer with
-    different nets.  Uses both parallel (axis-aligned) and perpendicular
-    crossing detection for comprehensive coverage.
+    different nets, by the exact capsule-to-capsule copper gap, so diagonal
+    and end-on approaches count as well as parallel runs. PAIR_RULES row:
+    jlcdfm_trace_spacing.
     """
     print("\n── JLCDFM: Trace-to-Trace Spacing (0.15mm) ──")
-    MIN_GAP = 0.15
     segs = _cached_segments()
-
-    by_layer = {}
-    for s in segs:
-        if "Cu" in s["layer"]:
-            by_layer.setdefault(s["layer"], []).append(s)
-
-    violations = []
-    for layer, layer_segs in by_layer.items():
-        n = len(layer_segs)
-        for i in range(n):
-            for j in range(i + 1, n):
-                s1, s2 = layer_segs[i], layer_segs[j]
-                if s1["net"] == s2["net"] or s1["net"] == 0 or s2["net"] == 0:
-                    continue
-                gap = _seg_min_dist(s1, s2)
-                if gap is not None and gap < MIN_GAP:
-                    violations.append(
-                        f"{layer}: net{s1['net']} vs net{s2['net']} "
-                        f"gap={gap:.3f}mm at "
-                        f"({s1['x1']:.1f},{s1['y1']:.1f})-({s1['x2']:.1f},{s1['y2']:.1f}) vs "
-                        f"({s2['x1']:.1f},{s2['y1']:.1f})-({s2['x2']:.1f},{s2['y2']:.1f})"
-                    )
+    res = _rule("jlcdfm_trace_spacing")
+    MIN_GAP = res.rule.threshold
+
+    violations = [
+        f"{h.layer}: net{h.a['net']} vs net{h.b['net']} "
+        f"gap={h.gap:.3f}mm at "
+        f"({h.a['x1']:.1f},{h.a['y1']:.1f})-({h.a['x2']:.1f},{h.a['y2']:.1f}) vs "
+        f"({h.b['x1']:.1f},{h.b['y1']:.1f})-({h.b['x2']:.1f},{h.b['y2']:.1f})"
+        for h in res.hits
+    ]
 
     # Report all violations with coordinates
     if violations:
@@ -2798,40 +2626,25 @@ def test_jlcdfm_pad_to_board_edge():
 def test_jlcdfm_pad_spacing():
     """JLCDFM: All pad pairs on same layer, different nets, gap >= 0.15mm.
 
-    Iterates over ALL pads grouped by layer and measures the exact
-    edge-to-edge gap between axis-aligned pad rectangles (_pad_pair_gap).
-    NO refs are excluded: the previous _FINE_PITCH_REFS bypass only existed
-    to absorb the half-diagonal approximation error, and with exact geometry
-    the whole board passes with every ref measured.
+    Measures the exact edge-to-edge gap between axis-aligned pad rectangles
+    (the _pad_pair_gap metric) for every pad pair on a layer. NO refs are
+    excluded: the previous _FINE_PITCH_REFS bypass only existed to absorb
+    the half-diagonal approximation error, and with exact geometry the whole
+    board passes with every ref measured. PAIR_RULES row: jlcdfm_pad_spacing.
     """
     print("\n── JLCDFM: Pad-to-Pad Spacing (0.15mm) ──")
-    MIN_GAP = 0.15
     pads = _get_cache()["pads"]
-
-    # Group by layer
-    by_layer = {}
-    for p in pads:
-        by_layer.setdefault(p["layer"], []).append(p)
-
-    violations = []
-    for layer, lpads in by_layer.items():
-        if "Cu" not in layer:
-            continue
-        n = len(lpads)
-        for i in range(n):
-            for j in range(i + 1, n):
-                p1, p2 = lpads[i], lpads[j]
-                if p1["net"] == p2["net"] or p1["net"] == 0 or p2["net"] == 0:
-                    continue
-                gap = _pad_pair_gap(p1, p2)
-                if gap < MIN_GAP:
-                    violations.append(
-                        f"{layer}: {p1['ref']}[{p1['num']}] net{p1['net']} "
-                        f"@({p1['x']:.2f},{p1['y']:.2f}) vs "
-                        f"{p2['ref']}[{p2['num']}] net{p2['net']} "
-                        f"@({p2['x']:.2f},{p2['y']:.2f}) "
-                        f"gap={gap:.3f}mm"
-                    )
+    res = _rule("jlcdfm_pad_spacing")
+    MIN_GAP = res.rule.threshold
+
+    violations = [
+        f"{h.layer}: {h.a['ref']}[{h.a['num']}] net{h.a['net']} "
+        f"@({h.a['x']:.2f},{h.a['y']:.2f}) vs "
+        f"{h.b['ref']}[{h.b['num']}] net{h.b['net']} "
+        f"@({h.b['x']:.2f},{h.b['y']:.2f}) "
+        f"gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     if violations:
         for v in violations[:20]:
@@ -2839,7 +2652,8 @@ def test_jlcdfm_pad_spacing():
         if len(violations) > 20:
             print(f"    ... and {len(violations) - 20} more")
 
-    check(f"JLCDFM pad spacing >= {MIN_GAP}mm ({sum(len(v) for v in by_layer.values())} pads)",
+    n_pads = sum(1 for p in pads if "Cu" in p["layer"])
+    check(f"JLCDFM pad spacing >= {MIN_GAP}mm ({n_pads} pads)",
           len(violations) == 0,
           f"{len(violations)} violations")
 
@@ -2849,55 +2663,31 @@ def test_jlcdfm_via_to_smd_clearance():
 
     Excludes vias near fine-pitch connector pads (J4 FPC) where power/GND vias
     must be placed within the 0.5mm pitch pad array — structural constraint.
+    Rectangular pad proximity: distance from via center to nearest pad edge,
+    minus drill radius. PAIR_RULES row: jlcdfm_via_to_smd_clearance.
     """
     print("\n── JLCDFM: Via-to-SMD Clearance (0.15mm) ──")
-    import math
-    MIN_CLR = 0.15
     vias = _cached_vias()
     pads = _get_cache()["pads"]
-
-    # SMD pads only
     smd_pads = [p for p in pads if p.get("type") == "smd"]
-
-    violations = []
-    structural = 0
-    for v in vias:
-        vx, vy = v["x"], v["y"]
-        drill_r = v["drill"] / 2.0
-        v_net = v["net"]
-        if v_net == 0:
-            continue
-        for p in smd_pads:
-            if p["net"] == 0 or p["net"] == v_net:
-                continue
-            # Via is on F.Cu+B.Cu; check if pad layer matches
-            if p["layer"] not in ("F.Cu", "B.Cu"):
-                continue
-            # Rectangular pad proximity: distance from via center to nearest
-            # pad edge, minus drill radius.  Old circular method used pad diagonal
-            # as radius, over-reporting violations for non-square pads.
-            dx = max(0.0, abs(vx - p["x"]) - p["w"] / 2)
-            dy = max(0.0, abs(vy - p["y"]) - p["h"] / 2)
-            edge_dist = math.hypot(dx, dy)
-            gap = edge_dist - drill_r
-            if gap < MIN_CLR:
-                # Structural: via near fine-pitch connector pad
-                if p["ref"] in _FINE_PITCH_REFS:
-                    structural += 1
-                    continue
-                violations.append(
-                    f"via@({vx:.2f},{vy:.2f}) net{v_net} drill_r={drill_r:.2f} "
-                    f"vs {p['ref']}[{p['num']}] net{p['net']} "
-                    f"@({p['x']:.2f},{p['y']:.2f}) gap={gap:.3f}mm"
-                )
+    res = _rule("jlcdfm_via_to_smd_clearance")
+    MIN_CLR = res.rule.threshold
+
+    violations = [
+        f"via@({h.a['x']:.2f},{h.a['y']:.2f}) net{h.a['net']} "
+        f"drill_r={h.a['drill'] / 2.0:.2f} "
+        f"vs {h.b['ref']}[{h.b['num']}] net{h.b['net']} "
+        f"@({h.b['x']:.2f},{h.b['y']:.2f}) gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     if violations:
         for v in violations[:20]:
             print(f"    VIOLATION: {v}")
         if len(violations) > 20:
             print(f"    ... and {len(violations) - 20} more")
-    if structural:
-        print(f"    (excluded {structural} structural fine-pitch via-pad pairs)")
+    if res.structural:
+        print(f"    (excluded {res.structural} structural fine-pitch via-pad pairs)")
 
     check(f"JLCDFM via-to-SMD >= {MIN_CLR}mm ({len(vias)} vias x {len(smd_pads)} SMD pads)",
           len(violations) == 0,
@@ -2907,58 +2697,32 @@ def test_jlcdfm_via_to_smd_clearance():
 def test_jlcdfm_via_to_pad_clearance():
     """JLCDFM: Via annular ring edge to nearest pad edge (diff net) >= 0.10mm.
 
-    Uses AABB distance (via circle to pad rectangle) for accurate gap calculation.
-    Excludes vias near fine-pitch connector/IC pads (structural constraint).
-    Also excludes vias near EP (exposed pad) of power ICs where thermal vias
-    are intentionally placed close.
+    Uses the exact via-circle to pad-rectangle gap. Excludes vias near
+    fine-pitch connector/IC pads (structural constraint). Also excludes vias
+    near EP (exposed pad) of power ICs where thermal vias are intentionally
+    placed close. PAIR_RULES row: jlcdfm_via_to_pad_clearance.
     """
     print("\n── JLCDFM: Via Annular Ring to Pad (0.10mm) ──")
-    import math
-    MIN_CLR = 0.10
     vias = _cached_vias()
     pads = _get_cache()["pads"]
-
-    def _via_to_rect_gap(vx, vy, copper_r, px, py, pw, ph):
-        """Distance from via copper circle edge to rectangular pad edge."""
-        # Find closest point on rectangle to via center
-        half_w, half_h = pw / 2.0, ph / 2.0
-        cx = max(px - half_w, min(vx, px + half_w))
-        cy = max(py - half_h, min(vy, py + half_h))
-        dist = math.hypot(vx - cx, vy - cy)
-        return dist - copper_r
-
-    violations = []
-    structural = 0
-    for v in vias:
-        vx, vy = v["x"], v["y"]
-        copper_r = v["size"] / 2.0  # annular ring edge
-        v_net = v["net"]
-        if v_net == 0:
-            continue
-        for p in pads:
-            if p["net"] == 0 or p["net"] == v_net:
-                continue
-            if p["layer"] not in ("F.Cu", "B.Cu"):
-                continue
-            gap = _via_to_rect_gap(vx, vy, copper_r, p["x"], p["y"], p["w"], p["h"])
-            if gap < MIN_CLR:
-                # Structural: via near fine-pitch pad or EP (exposed pad)
-                if p["ref"] in _FINE_PITCH_REFS or p["num"] == "EP":
-                    structural += 1
-                    continue
-                violations.append(
-                    f"via@({vx:.2f},{vy:.2f}) net{v_net} copper_r={copper_r:.2f} "
-                    f"vs {p['ref']}[{p['num']}] net{p['net']} "
-                    f"@({p['x']:.2f},{p['y']:.2f}) gap={gap:.3f}mm"
-                )
+    res = _rule("jlcdfm_via_to_pad_clearance")
+    MIN_CLR = res.rule.threshold
+
+    violations = [
+        f"via@({h.a['x']:.2f},{h.a['y']:.2f}) net{h.a['net']} "
+        f"copper_r={h.a['size'] / 2.0:.2f} "
+        f"vs {h.b['ref']}[{h.b['num']}] net{h.b['net']} "
+        f"@({h.b['x']:.2f},{h.b['y']:.2f}) gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     if violations:
         for v in violations[:20]:
             print(f"    VIOLATION: {v}")
         if len(violations) > 20:
             print(f"    ... and {len(violations) - 20} more")
-    if structural:
-        print(f"    (excluded {structural} structural fine-pitch/EP via-pad pairs)")
+    if res.structural:
+        print(f"    (excluded {res.structural} structural fine-pitch/EP via-pad pairs)")
 
     check(f"JLCDFM via ring-to-pad >= {MIN_CLR}mm ({len(vias)} vias x {len(pads)} pads)",
           len(violations) == 0,
@@ -2970,60 +2734,27 @@ def test_jlcdfm_pth_to_trace_clearance():
 
     Excludes PTH pads on fine-pitch connectors (J1 USB-C shield legs) where
     traces must cross under the connector body — structural constraint.
+    PAIR_RULES row: jlcdfm_pth_to_trace_clearance.
     """
     print("\n── JLCDFM: PTH-to-Trace Clearance (0.15mm) ──")
-    MIN_CLR = 0.15
-    segs = _cached_segments()
-    pads = _get_cache()["pads"]
-
-    # Collect PTH pads (thru_hole only, not np_thru_hole which have no copper)
-    pth_pads = []
-    seen = set()
-    for p in pads:
-        if p.get("type") != "thru_hole":
-            continue
-        if p.get("drill", 0) <= 0:
-            continue
-        key = (round(p["x"], 3), round(p["y"], 3))
-        if key in seen:
-            continue
-        seen.add(key)
-        pth_pads.append(p)
-
-    segs_by_layer = {}
-    for s in segs:
-        segs_by_layer.setdefault(s["layer"], []).append(s)
-
-    violations = []
-    structural = 0
-    for p in pth_pads:
-        px, py = p["x"], p["y"]
-        drill_r = p["drill"] / 2.0
-        p_net = p["net"]
-        for layer in ("F.Cu", "B.Cu"):
-            for s in segs_by_layer.get(layer, []):
-                if p_net != 0 and s["net"] != 0 and p_net == s["net"]:
-                    continue
-                dist = _point_to_segment_dist(px, py, s)
-                gap = dist - drill_r - s.get("width", s.get("w", 0)) / 2.0
-                if gap < MIN_CLR:
-                    # Structural: USB-C shield PTH legs (traces cross under connector)
-                    if p["ref"] in _FINE_PITCH_REFS:
-                        structural += 1
-                        continue
-                    violations.append(
-                        f"{p['ref']}[{p['num']}] @({px:.2f},{py:.2f}) "
-                        f"drill_r={drill_r:.2f} net{p_net} vs "
-                        f"{layer} net{s['net']} gap={gap:.3f}mm"
-                    )
+    res = _rule("jlcdfm_pth_to_trace_clearance")
+    MIN_CLR = res.rule.threshold
+    pth_pads = [h for h in _rule_engine().items("hole") if h["type"] == "thru_hole"]
+
+    violations = [
+        f"{h.a['ref']}[{h.a['num']}] @({h.a['x']:.2f},{h.a['y']:.2f}) "
+        f"drill_r={h.a['drill'] / 2.0:.2f} net{h.a['net']} vs "
+        f"{h.layer} net{h.b['net']} gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     if violations:
         for v in violations[:15]:
             print(f"    VIOLATION: {v}")
         if len(violations) > 15:
             print(f"    ... and {len(violations) - 15} more")
-    if structural:
-        print(f"    (excluded {structural} structural USB-C shield leg crossings)")
+    if res.structural:
+        print(f"    (excluded {res.structural} structural USB-C shield leg crossings)")
 
     check(f"JLCDFM PTH-to-trace >= {MIN_CLR}mm ({len(pth_pads)} PTH pads)",
           len(violations) == 0,
@@ -3733,50 +3464,22 @@ def test_jlcdfm_pth_spacing():
     """JLCDFM: PTH-to-PTH edge spacing >= 0.15mm.
 
     Checks all plated through-holes (vias + THT pads) against each other.
+    PAIR_RULES row: jlcdfm_pth_spacing.
     """
     print("\n── JLCDFM: PTH-to-PTH Spacing (0.15mm) ──")
-    import math
-    MIN_GAP = 0.15
-    vias = _cached_vias()
-    pads = _get_cache()["pads"]
-
-    # Collect all plated through-holes
-    pth_items = []
-    seen = set()
-    for v in vias:
-        key = (round(v["x"], 3), round(v["y"], 3))
-        if key not in seen:
-            seen.add(key)
-            pth_items.append({"x": v["x"], "y": v["y"],
-                              "drill": v["drill"], "net": v["net"],
-                              "label": f"via@({v['x']:.2f},{v['y']:.2f})"})
-    for p in pads:
-        if p.get("type") != "thru_hole":
-            continue
-        if p.get("drill", 0) <= 0:
-            continue
-        key = (round(p["x"], 3), round(p["y"], 3))
-        if key not in seen:
-            seen.add(key)
-            pth_items.append({"x": p["x"], "y": p["y"],
-                              "drill": p["drill"], "net": p["net"],
-                              "label": f"{p['ref']}[{p['num']}]"})
-
-    violations = []
-    n = len(pth_items)
-    for i in range(n):
-        for j in range(i + 1, n):
-            p1, p2 = pth_items[i], pth_items[j]
-            dist = math.hypot(p1["x"] - p2["x"], p1["y"] - p2["y"])
-            edge_gap = dist - (p1["drill"] + p2["drill"]) / 2.0
-            if edge_gap < MIN_GAP:
-                # Skip same-net (intentional connection)
-                if p1["net"] == p2["net"] and p1["net"] != 0:
-                    continue
-                violations.append(
-                    f"{p1['label']} vs {p2['label']}: "
-                    f"edge_gap={edge_gap:.3f}mm"
-                )
+    res = _rule("jlcdfm_pth_spacing")
+    MIN_GAP = res.rule.threshold
+    n = sum(1 for h in _rule_engine().items("hole") if h["type"] != "np_thru_hole")
+
+    def label(h):
+        if h["type"] == "via":
+            return f"via@({h['x']:.2f},{h['y']:.2f})"
+        return f"{h['ref']}[{h['num']}]"
+
+    violations = [
+        f"{label(h.a)} vs {label(h.b)}: edge_gap={h.gap:.3f}mm"
+        for h in res.hits
+    ]
 
     if violations:
         for v in violations[:15]:
@@ -4069,6 +3772,11 @@ if __name__ == "__main__":
     test_degenerate_segments()
     test_silk_to_pad_distance()
 
+    if "--timing" in sys.argv[1:]:
+        print("\n── Pair rule timing (share of sweep + own filter) ──")
+        for name, sweep, seconds in _rule_engine().timing():
+            print(f"    {seconds * 1000:7.1f} ms  {name:<36} {sweep}")
+
     print(f"\n{'=' * 60}")
     print(f"Results: {PASS} passed, {FAIL} failed")
     print(f"{'=' * 60}")
@@ -324,7 +324,7 @@ FAULTS = [
 def run_gates(sandbox: Path, gates):
     """Run every gate in the sandbox, return {gate: exit_code}."""
     # single-process cache warm first — 50 verifiers racing to rebuild
-    # .pcb_cache.json at once is how you get a torn cache file
+    # .pcb_cache.bin at once is how you get a torn cache file
     subprocess.run(
         [sys.executable, "-c",
          "import sys; sys.path.insert(0, 'scripts'); "
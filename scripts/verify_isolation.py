@@ -46,13 +46,14 @@ Usage:
 
 from __future__ import annotations
 
-import subprocess
 import sys
-import time
 from pathlib import Path
 
 BASE = Path(__file__).resolve().parent.parent
 
+sys.path.insert(0, str(BASE / "scripts"))
+from gate_daemon import run_gate  # noqa: E402
+
 # (script, one-line reason it is in this set)
 CHECKS: list[tuple[str, str]] = [
     ("short_circuit_analysis",      "different nets sharing copper"),
@@ -78,12 +79,10 @@ def run(name: str, verbose: bool) -> tuple[str, int, float, str]:
     path = BASE / "scripts" / f"{script}.py"
     if not path.exists():
         return (name, 127, 0.0, f"missing: {path.relative_to(BASE)}")
-    t0 = time.monotonic()
-    proc = subprocess.run(
-        [sys.executable, str(path), *args],
-        capture_output=True, text=True, cwd=str(BASE),
-    )
-    out = (proc.stdout or "") + (proc.stderr or "")
+    # On the gate daemon when one is running (warm fork, no re-import),
+    # else a fresh interpreter — same argv, cwd and verdict either way.
+    proc = run_gate(name)
+    out = proc.stdout + proc.stderr
     if verbose:
         print(out)
     tail = ""
@@ -91,7 +90,7 @@ def run(name: str, verbose: bool) -> tuple[str, int, float, str]:
         if line.strip():
             tail = line.strip()[:70]
             break
-    return (name, proc.returncode, time.monotonic() - t0, tail)
+    return (name, proc.rc, proc.seconds, tail)
 
 
 def main(argv: list[str]) -> int:
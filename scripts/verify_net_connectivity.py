@@ -558,7 +558,7 @@ def main():
     include_zones = not args.skip_zones
 
     cache = load_cache(PCB_FILE)
-    geom = CG.parse_copper(PCB_FILE) if include_zones else None
+    geom = CG.board_graph(PCB_FILE) if include_zones else None
 
     print()
     print("=" * 62)
@@ -58,8 +58,8 @@ from pcb_copper_graph import (  # noqa: E402
     group_island_distance,
     group_islands,
     group_pads,
+    board_graph,
     groups_for,
-    parse_copper,
 )
 
 # Nets that carry supply current. Every one of these must be a single piece of
@@ -163,7 +163,8 @@ def main():
     print("=" * WIDTH)
     print()
 
-    geom = parse_copper(args.pcb)
+    graph = board_graph(args.pcb)
+    geom = graph.geom
     zone_islands = sum(len(z["polys"]) for z in geom.zones)
     print(f"  PCB              : {args.pcb}")
     print(f"  Zones            : {len(geom.zones)} "
@@ -175,7 +176,7 @@ def main():
 
     failures = []
     for net in nets:
-        ok, _groups, lines = check_net(net, geom)
+        ok, _groups, lines = check_net(net, graph)
         for ln in lines:
             print(ln)
         if not ok:
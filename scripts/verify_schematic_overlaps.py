@@ -40,6 +40,9 @@ from pathlib import Path
 REPO = Path(__file__).resolve().parent.parent
 SCH_DIR = REPO / "hardware" / "kicad"
 
+sys.path.insert(0, str(REPO / "scripts"))
+import kicad_sexpr  # noqa: E402
+
 # KiCad stroke-font horizontal advance per character, as a fraction of the
 # font size. Measured conservatively (real advance is ~0.72-0.78).
 CHAR_ADVANCE = 0.72
@@ -52,23 +55,7 @@ EPS = 0.01
 
 def blocks(src, tok):
     """Every balanced-paren block starting with ``tok``."""
-    out, i = [], 0
-    while True:
-        i = src.find(tok, i)
-        if i < 0:
-            return out
-        depth, j = 0, i
-        while j < len(src):
-            c = src[j]
-            if c == "(":
-                depth += 1
-            elif c == ")":
-                depth -= 1
-                if depth == 0:
-                    break
-            j += 1
-        out.append(src[i:j + 1])
-        i = j + 1
+    return kicad_sexpr.blocks(src, tok)
 
 
 def _font_size(block, default=1.27):
@@ -8,14 +8,16 @@ the chain is broken — the copper path is incomplete.
 This goes beyond "net exists" to verify "net connects the right endpoints."
 """
 
-import json
 import os
 import sys
 from collections import defaultdict
 from typing import Dict, List, Set, Tuple
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CACHE_FILE = os.path.join(BASE, "hardware", "kicad", ".pcb_cache.json")
+PCB_FILE = os.path.join(BASE, "hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
+
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+import pcb_cache  # noqa: E402
 
 PASS = 0
 FAIL = 0
@@ -33,9 +35,8 @@ def check(name: str, condition: bool, detail: str = ""):
 
 
 def load_cache() -> dict:
-    """Load PCB cache JSON."""
-    with open(CACHE_FILE) as f:
-        return json.load(f)
+    """Load the PCB cache (rebuilt from the board if stale)."""
+    return pcb_cache.load_cache(PCB_FILE)
 
 
 def build_net_ref_map(pads: list) -> Dict[int, Set[str]]:
@@ -306,9 +307,9 @@ def main():
     print("Signal Chain Completeness Verification")
     print("=" * 60)
 
-    if not os.path.exists(CACHE_FILE):
-        print(f"  ERROR: PCB cache not found: {CACHE_FILE}")
-        print("  Run: python3 scripts/generate_pcb/generate.py")
+    if not os.path.exists(PCB_FILE):
+        print(f"  ERROR: PCB not found: {PCB_FILE}")
+        print("  Run: make generate-pcb")
         return 1
 
     cache = load_cache()
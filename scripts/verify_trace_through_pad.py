@@ -28,134 +28,55 @@ Design note:
     so they are covered automatically.
 """
 
-import math
 import os
 import sys
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(BASE, "scripts"))
 
+from clearance import capsules, pairs, rects  # noqa: E402
 from pcb_cache import load_cache  # noqa: E402
 
 PCB_FILE = os.path.join(BASE, "hardware", "kicad", "esp32-emu-turbo.kicad_pcb")
 
 COPPER_LAYERS = ("F.Cu", "B.Cu")
 
-# Pad sampling resolution (mm) when walking a segment. 0.05mm catches
-# every 0402 pad (smallest in the design is 0.30mm).
-SAMPLE_STEP_MM = 0.05
-
-
-def _seg_pad_gap(sx1, sy1, sx2, sy2, sw, px, py, pw, ph):
-    """Signed gap between a segment (rounded rect) and an axis-aligned
-    pad bounding box. Negative = physical overlap."""
-    half_w = sw / 2.0
-    phw = pw / 2.0
-    phh = ph / 2.0
-
-    ln = math.hypot(sx2 - sx1, sy2 - sy1)
-    if ln < 1e-6:
-        # Zero-length segment — sample once at start
-        dx = max(0.0, abs(sx1 - px) - phw)
-        dy = max(0.0, abs(sy1 - py) - phh)
-        return math.hypot(dx, dy) - half_w
-
-    steps = max(2, int(ln / SAMPLE_STEP_MM))
-    min_gap = float("inf")
-    for i in range(steps + 1):
-        t = i / steps
-        x = sx1 + t * (sx2 - sx1)
-        y = sy1 + t * (sy2 - sy1)
-        dx = max(0.0, abs(x - px) - phw)
-        dy = max(0.0, abs(y - py) - phh)
-        gap = math.hypot(dx, dy) - half_w
-        if gap < min_gap:
-            min_gap = gap
-            if min_gap < -0.01:
-                # Early exit — clearly overlapping
-                break
-    return min_gap
-
-
-def _pad_bbox(pad):
-    """Return (x_min, x_max, y_min, y_max) enlarged by a small margin
-    so segments that just graze the pad are caught by the broad phase."""
-    half_w = pad["w"] / 2.0 + 0.5
-    half_h = pad["h"] / 2.0 + 0.5
-    return (
-        pad["x"] - half_w, pad["x"] + half_w,
-        pad["y"] - half_h, pad["y"] + half_h,
-    )
-
-
-def _seg_bbox(seg):
-    hw = seg["width"] / 2.0 + 0.1
-    return (
-        min(seg["x1"], seg["x2"]) - hw,
-        max(seg["x1"], seg["x2"]) + hw,
-        min(seg["y1"], seg["y2"]) - hw,
-        max(seg["y1"], seg["y2"]) + hw,
-    )
-
-
-def _bbox_overlap(a, b):
-    return not (a[1] < b[0] or b[1] < a[0] or a[3] < b[2] or b[3] < a[2])
-
-
 def find_overlaps(cache):
-    """Return list of (pad, segment, kind) for all different-net or
+    """Return list of (pad, segment, kind, gap) for all different-net or
     trace-through-unnetted-pad overlaps.
 
     kind: "diff_net"  — both netted, different nets (DRC finds this too)
           "unnetted"  — pad unnetted, trace netted (the v3.3 regression)
+
+    gap is the exact signed distance between the trace capsule and the
+    pad rectangle (clearance.pairs); it used to be the minimum over
+    points sampled every 0.05 mm along the trace.
     """
     overlaps = []
 
-    # Group pads by layer for O(pads_on_layer * segs_on_layer) pass
     pads_by_layer = {lay: [] for lay in COPPER_LAYERS}
     for p in cache["pads"]:
         if p["layer"] in pads_by_layer:
             pads_by_layer[p["layer"]].append(p)
 
+    # Unnetted traces can't create a fab short (they're just isolated
+    # copper). DRC already flags these as dangling.
     segs_by_layer = {lay: [] for lay in COPPER_LAYERS}
     for s in cache["segments"]:
-        if s["layer"] in segs_by_layer:
+        if s["layer"] in segs_by_layer and s["net"] != 0:
             segs_by_layer[s["layer"]].append(s)
 
     for layer in COPPER_LAYERS:
         pads = pads_by_layer[layer]
         segs = segs_by_layer[layer]
 
-        # Precompute pad bboxes
-        pad_boxes = [(_pad_bbox(p), p) for p in pads]
-
-        for s in segs:
-            # Unnetted traces can't create a fab short (they're just
-            # isolated copper). DRC already flags these as dangling.
-            if s["net"] == 0:
+        for i, j, gap in zip(*pairs(capsules(segs), rects(pads))):
+            s, p = segs[i], pads[j]
+            # Same-net overlap is intentional (trace into pad)
+            if p["net"] == s["net"]:
                 continue
-
-            sb = _seg_bbox(s)
-
-            for pb, p in pad_boxes:
-                # Same-net overlap is intentional (trace into pad)
-                if p["net"] == s["net"]:
-                    continue
-
-                # Broad-phase bbox reject
-                if not _bbox_overlap(sb, pb):
-                    continue
-
-                # Narrow-phase geometric gap
-                gap = _seg_pad_gap(
-                    s["x1"], s["y1"], s["x2"], s["y2"], s["width"],
-                    p["x"], p["y"], p["w"], p["h"],
-                )
-                if gap >= 0:
-                    continue
-
-                kind = "unnetted" if p["net"] == 0 else "diff_net"
-                overlaps.append((p, s, kind, gap))
+            kind = "unnetted" if p["net"] == 0 else "diff_net"
+            overlaps.append((p, s, kind, float(gap)))
 
     return overlaps
 
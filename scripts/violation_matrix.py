@@ -17,7 +17,11 @@ import math
 import sys
 from pathlib import Path
 
-PCB_FILE = Path("/Users/pierrejonnycau/Documents/WORKS/esp32-emu-turbo/hardware/kicad/esp32-emu-turbo.kicad_pcb")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from clearance import circles, pairs  # noqa: E402
+from kicad_sexpr import index, read_text  # noqa: E402
+
+PCB_FILE = Path(__file__).parent.parent / "hardware" / "kicad" / "esp32-emu-turbo.kicad_pcb"
 
 DANGER_GAP = 0.12   # < this = JLCPCB danger
 WARNING_GAP = 0.15  # < this = JLCPCB warning
@@ -25,13 +29,13 @@ WARNING_GAP = 0.15  # < this = JLCPCB warning
 # ── Parsing helpers ────────────────────────────────────────────────────────
 
 def parse_pcb(path):
-    text = Path(path).read_text(encoding="utf-8")
-    vias = _parse_vias(text)
-    pads = _parse_pads(text)
+    sx = index(read_text(path))
+    vias = _parse_vias(sx)
+    pads = _parse_pads(sx)
     return vias, pads
 
 
-def _parse_vias(text):
+def _parse_vias(sx):
     """Extract all vias."""
     vias = []
     via_pat = re.compile(
@@ -47,7 +51,9 @@ def _parse_vias(text):
         r'(?:.*?\(net\s+(\d+)\))?',
         re.DOTALL
     )
-    for m in via_pat.finditer(text):
+    for m in map(via_pat.match, sx.blocks("(via")):
+        if not m:
+            continue
         x, y = float(m.group(1)), float(m.group(2))
         size = float(m.group(3))
         drill = float(m.group(4))
@@ -64,7 +70,7 @@ def _parse_vias(text):
     return vias
 
 
-def _parse_pads(text):
+def _parse_pads(sx):
     """Extract all SMD and THT pads from footprints.
 
     The KiCad 8+ format has footprints as:
@@ -79,9 +85,6 @@ def _parse_pads(text):
     # and multi-line: (footprint "X"\n  (layer...)\n  (at x y)\n ...)
     fp_header_pat = re.compile(r'\(footprint\s+"([^"]*)"')
 
-    # We'll split the text into footprint blocks
-    fp_starts = [(m.start(), m.group(1)) for m in fp_header_pat.finditer(text)]
-
     # Pad pattern (single-line pad entries in KiCad 8+ format)
     pad_pat = re.compile(
         r'\(pad\s+"?([^"\s)]+)"?\s+(\w+)\s+(\w+)\s*'
@@ -91,9 +94,11 @@ def _parse_pads(text):
         r'(?:.*?\(net\s+(\d+))?'
     )
 
-    for idx, (start, fp_name) in enumerate(fp_starts):
-        end = fp_starts[idx+1][0] if idx+1 < len(fp_starts) else len(text)
-        block = text[start:end]
+    for block in sx.blocks("(footprint "):
+        hdr = fp_header_pat.match(block)
+        if not hdr:
+            continue
+        fp_name = hdr.group(1)
 
         # Get footprint reference from property
         ref_m = re.search(r'\(property\s+"Reference"\s+"([^"]+)"', block)
@@ -175,85 +180,67 @@ def _parse_pads(text):
     return pads
 
 
-# ── Gap computation ────────────────────────────────────────────────────────
-
-def via_to_via_gap(v1, v2):
-    dx = v1["x"] - v2["x"]
-    dy = v1["y"] - v2["y"]
-    return math.hypot(dx, dy) - v1["radius"] - v2["radius"]
-
-
-def via_to_pad_gap(v, p):
-    dx = v["x"] - p["x"]
-    dy = v["y"] - p["y"]
-    return math.hypot(dx, dy) - v["radius"] - p["radius"]
-
-
-def pad_to_pad_gap(p1, p2):
-    dx = p1["x"] - p2["x"]
-    dy = p1["y"] - p2["y"]
-    return math.hypot(dx, dy) - p1["radius"] - p2["radius"]
-
-
 # ── Main matrix builder ────────────────────────────────────────────────────
 
 def build_matrix(vias, pads, threshold=WARNING_GAP):
+    """Every via/pad pair on a copper layer with gap < threshold.
+
+    Vias and pads are both discs of their "radius" (a pad's is half its
+    larger side, conservative), so each pass is a circle-circle query to
+    the clearance kernel; pairs come back in the old nested-loop order.
+    """
     violations = []
 
     for layer in ("F.Cu", "B.Cu"):
         l_vias = [v for v in vias if layer in v["layers"]]
         l_pads = [p for p in pads if layer in p["layers"]]
+        via_discs = circles(l_vias, radius="radius", layer=layer)
+        pad_discs = circles(l_pads, radius="radius", layer=layer)
 
         # Via-to-via
-        for i, v1 in enumerate(l_vias):
-            for v2 in l_vias[i+1:]:
-                gap = via_to_via_gap(v1, v2)
-                if gap < threshold:
-                    violations.append({
-                        "layer": layer,
-                        "type": "via-via",
-                        "gap": gap,
-                        "a_desc": f"via@({v1['x']:.3f},{v1['y']:.3f}) d={v1['size']}mm",
-                        "b_desc": f"via@({v2['x']:.3f},{v2['y']:.3f}) d={v2['size']}mm",
-                        "nets": (v1["net"], v2["net"]),
-                        "same_net": v1["net"] == v2["net"] and v1["net"] != 0,
-                        "v_a": v1,
-                        "v_b": v2,
-                    })
+        for i, j, gap in zip(*pairs(via_discs, threshold=threshold)):
+            v1, v2, gap = l_vias[i], l_vias[j], float(gap)
+            violations.append({
+                "layer": layer,
+                "type": "via-via",
+                "gap": gap,
+                "a_desc": f"via@({v1['x']:.3f},{v1['y']:.3f}) d={v1['size']}mm",
+                "b_desc": f"via@({v2['x']:.3f},{v2['y']:.3f}) d={v2['size']}mm",
+                "nets": (v1["net"], v2["net"]),
+                "same_net": v1["net"] == v2["net"] and v1["net"] != 0,
+                "v_a": v1,
+                "v_b": v2,
+            })
 
         # Via-to-pad
-        for v in l_vias:
-            for p in l_pads:
-                gap = via_to_pad_gap(v, p)
-                if gap < threshold:
-                    violations.append({
-                        "layer": layer,
-                        "type": "via-pad",
-                        "gap": gap,
-                        "a_desc": f"via@({v['x']:.3f},{v['y']:.3f}) d={v['size']}mm net={v['net']}",
-                        "b_desc": f"{p['ref']}[{p['num']}] @({p['x']:.3f},{p['y']:.3f}) {p['sx']}x{p['sy']}mm net={p['net']}",
-                        "nets": (v["net"], p["net"]),
-                        "same_net": v["net"] == p["net"] and v["net"] != 0,
-                        "v_a": v,
-                        "p_b": p,
-                    })
+        for i, j, gap in zip(*pairs(via_discs, pad_discs, threshold=threshold)):
+            v, p, gap = l_vias[i], l_pads[j], float(gap)
+            violations.append({
+                "layer": layer,
+                "type": "via-pad",
+                "gap": gap,
+                "a_desc": f"via@({v['x']:.3f},{v['y']:.3f}) d={v['size']}mm net={v['net']}",
+                "b_desc": f"{p['ref']}[{p['num']}] @({p['x']:.3f},{p['y']:.3f}) {p['sx']}x{p['sy']}mm net={p['net']}",
+                "nets": (v["net"], p["net"]),
+                "same_net": v["net"] == p["net"] and v["net"] != 0,
+                "v_a": v,
+                "p_b": p,
+            })
 
         # Pad-to-pad
-        for i, p1 in enumerate(l_pads):
-            for p2 in l_pads[i+1:]:
-                gap = pad_to_pad_gap(p1, p2)
-                if gap < threshold:
-                    violations.append({
-                        "layer": layer,
-                        "type": "pad-pad",
-                        "gap": gap,
-                        "a_desc": f"{p1['ref']}[{p1['num']}] @({p1['x']:.3f},{p1['y']:.3f}) {p1['sx']}x{p1['sy']}mm net={p1['net']}",
-                        "b_desc": f"{p2['ref']}[{p2['num']}] @({p2['x']:.3f},{p2['y']:.3f}) {p2['sx']}x{p2['sy']}mm net={p2['net']}",
-                        "nets": (p1["net"], p2["net"]),
-                        "same_net": p1["net"] == p2["net"] and p1["net"] != 0,
-                        "p_a": p1,
-                        "p_b": p2,
-                    })
+        for i, j, gap in zip(*pairs(pad_discs, threshold=threshold)):
+            p1, p2, gap = l_pads[i], l_pads[j], float(gap)
+            violations.append({
+                "layer": layer,
+                "type": "pad-pad",
+                "gap": gap,
+                "a_desc": f"{p1['ref']}[{p1['num']}] @({p1['x']:.3f},{p1['y']:.3f}) {p1['sx']}x{p1['sy']}mm net={p1['net']}",
+                "b_desc": f"{p2['ref']}[{p2['num']}] @({p2['x']:.3f},{p2['y']:.3f}) {p2['sx']}x{p2['sy']}mm net={p2['net']}",
+                "nets": (p1["net"], p2["net"]),
+                "same_net": p1["net"] == p2["net"] and p1["net"] != 0,
+                "p_a": p1,
+                "p_b": p2,
+            })
 
     return violations
 
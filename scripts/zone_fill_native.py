@@ -0,0 +1,702 @@
+#!/usr/bin/env python3
+"""Native zone filler — the pour KiCad computes, on the host, with shapely.
+
+``kicad_fill_zones.py`` needs ``pcbnew``, which only exists inside the KiCad
+container. Every fill therefore cost a Docker start-up. Until it had run,
+pcb_copper_graph, verify_power_net_integrity, verify_zone_fill_sanity and
+verify_reference_plane were looking at a board with no islands at all. This
+module computes the same ``filled_polygon`` islands from the board text and
+writes them back through ``zone_fill_inject.inject_fills``, so injection is
+still replace-not-append.
+
+Provides:
+  board_items(text, pcb_path)  — zones, copper, holes, outline and clearance
+                                 rules of a board, as plain geometry
+  fill_zone(items, index)      — one zone's islands, [(layer, Polygon), ...]
+  fill_zones(items, jobs)      — every zone, in priority waves of forked
+                                 workers
+  filled_polygon_text(islands) — KiCad's filled_polygon blocks, fractured
+  native_fills(text, pcb_path) — {zone uuid: filled_polygon text}
+  compare_fills(text, fills)   — per-zone diff against the board's own fill
+
+The pour, per zone and layer, in KiCad's order:
+  1. outline ∩ (board outline shrunk by the copper-to-edge clearance)
+  2. − other-net vias, pads and tracks, grown by the zone clearance
+  3. − holes with no copper on the layer, grown by the NPTH hole clearance
+  4. − same-net thermal pads, grown by thermal_gap
+  5. − higher-priority zones: other-net fills grown by the zone
+       clearance, same-net outlines as they are
+  6. min_thickness: shrink by half, add the thermal spokes, grow back
+  7. island removal: drop islands no same-net via, pad or track reaches
+
+Step 5 reads the FILL of an other-net zone, not its outline: copper the
+higher zone could not use (a corner cut off by its own vias) goes to the
+lower one, as in KiCad. So zones fill in waves, each after the other-net
+zones above it on its layers. Zones within a wave are independent and fill
+in parallel.
+
+The zone clearance, min_thickness and thermal settings come from the zone
+itself. The hole and edge clearances come from the .kicad_dru custom rules,
+falling back to the .kicad_pro board minimums. Custom rules win, as in
+KiCad: the NPTH rule's 0.20 mm is what KiCad actually pours to, not the
+board's 0.25 mm.
+
+Agreement with KiCad is measured, not assumed. ``--compare`` fills the board
+in memory and diffs every zone against the fill already in the file: island
+counts, areas and the area of the symmetric difference. See
+scripts/test_zone_fill_native.py for the tolerance it is held to.
+
+Usage:
+    python3 scripts/zone_fill_native.py                 # fill the board in place
+    python3 scripts/zone_fill_native.py path/to/board.kicad_pcb
+    python3 scripts/zone_fill_native.py --compare       # vs its KiCad fill, no write
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely import affinity
+from shapely.geometry import LineString, Point, Polygon, box
+from shapely.geometry.polygon import orient
+from shapely.ops import polygonize, unary_union
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import kicad_sexpr  # noqa: E402
+from zone_fill_inject import atomic_write, fill_lock, inject_fills  # noqa: E402
+
+DEFAULT_PCB = (Path(__file__).resolve().parent.parent
+               / "hardware" / "kicad" / "esp32-emu-turbo.kicad_pcb")
+
+COPPER_LAYERS = ("F.Cu", "In1.Cu", "In2.Cu", "B.Cu")
+
+#: Arc-to-segment error, mm. KiCad's default ("max_error" in the .kicad_pro).
+MAX_ERROR = 0.005
+
+#: A zone whose fill differs from KiCad's by more than this share of
+#: KiCad's area (or by its island count) fails --compare.
+COMPARE_TOLERANCE = 0.01
+
+#: One zone to fill.
+#:   connect — "thermal" | "solid" | "none" (connect_pads)
+#:   islands — island_removal_mode: 0 always, 1 never, 2 below island_min
+Zone = namedtuple("Zone", "uuid net layers priority clearance min_thickness "
+                          "connect thermal_gap spoke_width islands "
+                          "island_min outline fills")
+
+#: A piece of copper, or a hole, on a set of layers.
+#:   kind   — "via" | "pad" | "track" | "hole"
+#:   core   — the copper (a hole's drill) is `core` grown by `radius`: a
+#:            point, a centre line or a rectangle. Growing the core once by
+#:            radius + clearance is exact where growing the copper is not.
+#:   hole   — a pad's drill as (core, radius), or None
+#:   shape  — the pad shape, which sets the thermal spoke angle
+Item = namedtuple("Item", "kind net layers core radius hole center angle shape")
+
+#: Everything the filler reads from a board.
+BoardItems = namedtuple("BoardItems",
+                        "zones items outline edge_clearance hole_clearance")
+
+
+# ── Geometry helpers ────────────────────────────────────────────────
+
+def _quad_segs(radius):
+    """Segments per quarter circle keeping the chord error under MAX_ERROR."""
+    if radius <= MAX_ERROR:
+        return 1
+    return max(2, math.ceil((math.pi / 2)
+                            / math.acos(1 - MAX_ERROR / radius)))
+
+
+def _grow(geom, distance, radius=None, outside=False):
+    """`geom` grown (or shrunk) by `distance`; `radius` sets the arc step.
+
+    `outside` puts the arcs' chords outside the true arc rather than on it,
+    as KiCad builds every clearance it knocks out of a fill, so a knockout
+    is never smaller than the rule.
+    """
+    quad_segs = _quad_segs(abs(distance if radius is None else radius))
+    if outside and distance > 0:
+        distance /= math.cos(math.pi / (4 * quad_segs))
+    return geom.buffer(distance, quad_segs=quad_segs)
+
+
+def _copper(item, extra=0.0, outside=False):
+    """An item's copper, grown by `extra`."""
+    return _grow(item.core, item.radius + extra, outside=outside)
+
+
+def _arc_points(start, mid, end):
+    """Points along the arc through start, mid and end."""
+    (ax, ay), (bx, by), (cx, cy) = start, mid, end
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if abs(d) < 1e-12:
+        return [start, end]
+    ux = ((ax * ax + ay * ay) * (by - cy) + (bx * bx + by * by) * (cy - ay)
+          + (cx * cx + cy * cy) * (ay - by)) / d
+    uy = ((ax * ax + ay * ay) * (cx - bx) + (bx * bx + by * by) * (ax - cx)
+          + (cx * cx + cy * cy) * (bx - ax)) / d
+    r = math.hypot(ax - ux, ay - uy)
+    a0 = math.atan2(ay - uy, ax - ux)
+    a1 = math.atan2(by - uy, bx - ux)
+    a2 = math.atan2(cy - uy, cx - ux)
+    # sweep from a0 through a1 to a2, whichever way round that is
+    sweep = (a2 - a0) % (2 * math.pi)
+    if (a1 - a0) % (2 * math.pi) > sweep:
+        sweep -= 2 * math.pi
+    n = max(2, math.ceil(abs(sweep) / (math.pi / 2) * _quad_segs(r)))
+    # the ends exactly as given, so the arc still meets its neighbours
+    return [start] + [(ux + r * math.cos(a0 + sweep * k / n),
+                       uy + r * math.sin(a0 + sweep * k / n))
+                      for k in range(1, n)] + [end]
+
+
+def _pad_core(shape, x, y, w, h, angle):
+    """(core, radius) of a pad centred on (x, y), rotated by KiCad `angle`."""
+    if shape in ("circle", "oval") and w == h:
+        return Point(x, y), w / 2
+    if shape == "oval":
+        r = min(w, h) / 2
+        dx, dy = (w / 2 - r, 0.0) if w > h else (0.0, h / 2 - r)
+        core = LineString([(x - dx, y - dy), (x + dx, y + dy)])
+    else:
+        # rect, roundrect, trapezoid, custom: the bounding rectangle. Only
+        # ever an over-estimate, and every use grows it by a clearance.
+        r = 0.0
+        core = box(x - w / 2, y - h / 2, x + w / 2, y + h / 2)
+    # KiCad angles are counter-clockwise on screen, where y points down
+    if angle:
+        core = affinity.rotate(core, -angle, origin=(x, y))
+    return core, r
+
+
+def _layers(spec):
+    """Copper layers named by a (layers ...) list."""
+    names = re.findall(r'"([^"]+)"', spec)
+    if "*.Cu" in names:
+        return frozenset(COPPER_LAYERS)
+    if "F&B.Cu" in names:
+        return frozenset({"F.Cu", "B.Cu"})
+    return frozenset(n for n in names if n in COPPER_LAYERS)
+
+
+# ── Rules ───────────────────────────────────────────────────────────
+
+def _dru_rules(text):
+    """[(name, {constraint: min_mm}, condition)] of a .kicad_dru."""
+    rules = []
+    for block in kicad_sexpr.blocks(text, "(rule "):
+        name = re.match(r'\(rule\s+"([^"]*)"', block)
+        cond = re.search(r'\(condition\s+"((?:[^"\\]|\\.)*)"\)', block)
+        mins = {c: float(v) for c, v in re.findall(
+            r'\(constraint\s+(\w+)\s+\(min\s+([\d.]+)mm\)', block)}
+        rules.append((name.group(1) if name else "", mins,
+                      cond.group(1) if cond else ""))
+    return rules
+
+
+def _zone_rule(rules, constraint, about=""):
+    """`constraint` of the last custom rule that applies to zone copper.
+
+    A rule applies when its condition mentions `about` and does not confine
+    either side to some other kind of item (``B.Type == 'track'``) — a zone
+    is neither a track nor a via. Later rules win, as in KiCad. None when
+    no rule applies.
+    """
+    value = None
+    for _name, mins, cond in rules:
+        if constraint not in mins or about not in cond:
+            continue
+        if re.search(r"\.Type\s*==\s*'(?!zone)", cond, re.I):
+            continue
+        value = mins[constraint]
+    return value
+
+
+def board_rules(pcb_path):
+    """(edge_clearance, npth_hole_clearance) for the board at `pcb_path`."""
+    pcb_path = Path(pcb_path)
+    pro, dru = pcb_path.with_suffix(".kicad_pro"), pcb_path.with_suffix(".kicad_dru")
+    minimums = {}
+    if pro.exists():
+        minimums = (json.loads(pro.read_text()).get("board", {})
+                    .get("design_settings", {}).get("rules", {}))
+    rules = _dru_rules(kicad_sexpr.read_text(dru)) if dru.exists() else []
+    edge = _zone_rule(rules, "edge_clearance")
+    hole = _zone_rule(rules, "hole_clearance", "NPTH")
+    return (edge if edge is not None
+            else minimums.get("min_copper_edge_clearance", 0.5),
+            hole if hole is not None
+            else minimums.get("min_hole_clearance", 0.25))
+
+
+# ── Parsing ─────────────────────────────────────────────────────────
+
+_XY_RE = re.compile(r"\(xy ([\-0-9.e]+) ([\-0-9.e]+)\)")
+
+
+def _num(pattern, text, default=None, cast=float):
+    m = re.search(pattern, text)
+    return cast(m.group(1)) if m else default
+
+
+def _board_outline(text, sx):
+    """The Edge.Cuts region as one polygon, cut-outs subtracted."""
+    lines = []
+    for tok in ("(gr_line", "(gr_arc", "(gr_rect", "(gr_circle", "(gr_poly"):
+        for block in sx.blocks(tok):
+            if '(layer "Edge.Cuts")' not in block:
+                continue
+            pt = {k: (float(a), float(b)) for k, a, b in re.findall(
+                r"\((start|mid|end|center) ([\-0-9.]+) ([\-0-9.]+)\)", block)}
+            if tok == "(gr_line":
+                lines.append(LineString([pt["start"], pt["end"]]))
+            elif tok == "(gr_arc":
+                lines.append(LineString(_arc_points(pt["start"], pt["mid"],
+                                                    pt["end"])))
+            elif tok == "(gr_rect":
+                (x1, y1), (x2, y2) = pt["start"], pt["end"]
+                lines.append(box(x1, y1, x2, y2).exterior)
+            elif tok == "(gr_circle":
+                (cx, cy), (ex, ey) = pt["center"], pt["end"]
+                r = math.hypot(ex - cx, ey - cy)
+                lines.append(_grow(Point(cx, cy), r).exterior)
+            else:
+                pts = [(float(a), float(b)) for a, b in _XY_RE.findall(block)]
+                lines.append(LineString(pts + pts[:1]))
+    faces = list(polygonize(unary_union(lines)))
+    if not faces:
+        return None
+    # even-odd over the closed outlines: inside the board edge is board,
+    # inside a cut-out in it is not, inside an island in the cut-out is again
+    board = Polygon(faces[0].exterior)
+    for face in faces[1:]:
+        board = board.symmetric_difference(Polygon(face.exterior))
+    return board
+
+
+def _parse_zone(z, sx, zs, ze):
+    layers = _num(r'\(layer "([^"]+)"\)', z[:z.find("(polygon")], cast=str)
+    if layers:
+        layers = (layers,)
+    else:
+        layers = tuple(re.findall(r'"([^"]+)"', _num(
+            r"\(layers ([^)]*)\)", z, "", cast=str)))
+    connect = re.search(r"\(connect_pads(?:\s+(yes|no|thru_hole_only))?", z)
+    mode = connect.group(1) if connect else None
+    outline = []
+    for block in sx.blocks("(polygon", zs, ze):
+        outline.append(Polygon([(float(a), float(b))
+                                for a, b in _XY_RE.findall(block)]))
+    fills = {}
+    for block in sx.blocks("(filled_polygon", zs, ze):
+        layer = _num(r'\(layer "([^"]+)"\)', block, layers[0], cast=str)
+        pts = [(float(a), float(b)) for a, b in _XY_RE.findall(block)]
+        if len(pts) >= 3:
+            fills.setdefault(layer, []).append(Polygon(pts).buffer(0))
+    return Zone(
+        uuid=_num(r'\(uuid "([^"]+)"\)', z, cast=str),
+        net=_num(r"\(net (\d+)\)", z, 0, cast=int),
+        layers=layers,
+        priority=_num(r"\(priority (\d+)\)", z, 0, cast=int),
+        clearance=_num(r"\(connect_pads[^()]*\(clearance ([\d.]+)\)", z, 0.0),
+        min_thickness=_num(r"\(min_thickness ([\d.]+)\)", z, 0.25),
+        connect={"yes": "solid", "no": "none"}.get(mode, "thermal"),
+        thermal_gap=_num(r"\(thermal_gap ([\d.]+)\)", z, 0.5),
+        spoke_width=_num(r"\(thermal_bridge_width ([\d.]+)\)", z, 0.5),
+        islands=_num(r"\(island_removal_mode (\d)\)", z, 0, cast=int),
+        island_min=_num(r"\(island_area_min ([\d.]+)\)", z, 0.0),
+        outline=unary_union(outline),
+        fills=fills,
+    )
+
+
+def board_items(text, pcb_path=None):
+    """Parse a board into BoardItems.
+
+    Rule areas (keepouts) are not filled. Every via is a through via: the
+    stackup in this repo has no blind or buried ones.
+    """
+    sx = kicad_sexpr.index(text)
+    edge, hole = board_rules(pcb_path or DEFAULT_PCB)
+
+    zones = []
+    for zs, ze in sx.find_blocks("(zone"):
+        z = text[zs:ze + 1]
+        if "(keepout" in z or "(rule_area" in z:
+            continue
+        zones.append(_parse_zone(z, sx, zs, ze))
+
+    items = []
+    every = frozenset(COPPER_LAYERS)
+    for v in sx.blocks("(via"):
+        x, y = (float(a) for a in re.search(
+            r"\(at ([\-0-9.]+) ([\-0-9.]+)", v).groups())
+        size = _num(r"\(size ([\d.]+)\)", v, 0.6)
+        items.append(Item("via", _num(r"\(net (\d+)", v, 0, cast=int), every,
+                          Point(x, y), size / 2, None, (x, y), 0.0, "circle"))
+
+    for t in sx.blocks("(segment"):
+        layer = _num(r'\(layer "([^"]+)"\)', t, cast=str)
+        (x1, y1), (x2, y2) = [(float(a), float(b)) for a, b in re.findall(
+            r"\((?:start|end) ([\-0-9.]+) ([\-0-9.]+)\)", t)]
+        w = _num(r"\(width ([\d.]+)\)", t, 0.25)
+        items.append(Item("track", _num(r"\(net (\d+)", t, 0, cast=int),
+                          frozenset({layer}), LineString([(x1, y1), (x2, y2)]),
+                          w / 2, None, (x1, y1), 0.0, None))
+    for t in sx.blocks("(arc"):
+        layer = _num(r'\(layer "([^"]+)"\)', t, cast=str)
+        pt = {k: (float(a), float(b)) for k, a, b in re.findall(
+            r"\((start|mid|end) ([\-0-9.]+) ([\-0-9.]+)\)", t)}
+        w = _num(r"\(width ([\d.]+)\)", t, 0.25)
+        items.append(Item("track", _num(r"\(net (\d+)", t, 0, cast=int),
+                          frozenset({layer}),
+                          LineString(_arc_points(pt["start"], pt["mid"],
+                                                 pt["end"])),
+                          w / 2, None, pt["start"], 0.0, None))
+
+    for fs, fe in sx.find_blocks("(footprint "):
+        f = text[fs:fe + 1]
+        head = f[:f.find("(property")] if "(property" in f else f[:300]
+        at = re.search(r"\(at ([\-0-9.]+) ([\-0-9.]+)(?:\s+([\-0-9.]+))?\)", head)
+        fx, fy = float(at.group(1)), float(at.group(2))
+        rot = float(at.group(3) or 0)
+        cos_r, sin_r = math.cos(math.radians(rot)), math.sin(math.radians(rot))
+        for p in sx.blocks('(pad "', fs, fe):
+            m = re.match(r'\(pad "[^"]*"\s+(\w+)\s+(\w+)', p)
+            kind, shape = m.group(1), m.group(2)
+            pa = re.search(r"\(at ([\-0-9.]+) ([\-0-9.]+)(?:\s+([\-0-9.]+))?\)", p)
+            lx, ly = float(pa.group(1)), float(pa.group(2))
+            angle = float(pa.group(3) or 0)
+            # KiCad RotatePoint: the pad angle in the file is already absolute
+            x, y = fx + lx * cos_r + ly * sin_r, fy - lx * sin_r + ly * cos_r
+            w, h = (float(a) for a in re.search(
+                r"\(size ([\d.]+) ([\d.]+)\)", p).groups())
+            drill = re.search(r"\(drill(?: (oval))? ([\d.]+)(?: ([\d.]+))?", p)
+            drilled = None
+            if drill:
+                dw = float(drill.group(2))
+                dh = float(drill.group(3) or dw)
+                drilled = _pad_core("oval" if drill.group(1) else "circle",
+                                    x, y, dw, dh, angle)
+            layers = _layers(_num(r"\(layers ([^)]*)\)", p, "", cast=str))
+            net = _num(r"\(net (\d+)", p, 0, cast=int)
+            if kind == "np_thru_hole" and drilled:
+                items.append(Item("hole", 0, every, *drilled, drilled,
+                                  (x, y), angle, shape))
+            elif kind != "np_thru_hole" and layers:
+                items.append(Item("pad", net, layers,
+                                  *_pad_core(shape, x, y, w, h, angle),
+                                  drilled, (x, y), angle, shape))
+
+    return BoardItems(zones, items, _board_outline(text, sx), edge, hole)
+
+
+# ── Filling ─────────────────────────────────────────────────────────
+
+def _spokes(item, zone):
+    """Thermal spokes of a same-net pad, built min_thickness narrower.
+
+    They are added to the fill while it is shrunk by min_thickness / 2 and
+    grow back with it, ending up thermal_bridge_width wide. Round pads
+    take them at 45 degrees, everything else square to the pad. They start
+    at the pad's edge: the pad is the pad's copper, not the zone's.
+    """
+    x, y = item.center
+    copper = _copper(item)
+    minx, miny, maxx, maxy = copper.bounds
+    reach = max(maxx - minx, maxy - miny) / 2 + zone.thermal_gap + zone.min_thickness
+    half = max(zone.spoke_width - zone.min_thickness, MAX_ERROR) / 2
+    arms = unary_union([box(x - reach, y - half, x + reach, y + half),
+                        box(x - half, y - reach, x + half, y + reach)])
+    angle = item.angle + (45.0 if item.shape == "circle" else 0.0)
+    if angle:
+        arms = affinity.rotate(arms, -angle, origin=(x, y))
+    return arms.difference(copper)
+
+
+def _fill_layer(items, zone, layer, above):
+    """Zone `zone`'s islands on `layer`, as a list of polygons.
+
+    `above` is {zone index: [(layer, island), ...]} for every other-net zone
+    of higher priority sharing a layer with this one.
+    """
+    area = zone.outline
+    if items.outline is not None:
+        area = area.intersection(_grow(items.outline, -items.edge_clearance))
+    clearance = zone.clearance
+    holes, thermal, anchors, spokes = [], [], [], []
+    for item in items.items:
+        if layer not in item.layers:
+            continue
+        if item.kind == "hole":
+            holes.append(_copper(item, items.hole_clearance, outside=True))
+        elif item.net != zone.net or zone.connect == "none":
+            holes.append(_copper(item, clearance, outside=True))
+        elif item.kind == "pad" and zone.connect == "thermal":
+            thermal.append(_copper(item, zone.thermal_gap, outside=True))
+            spokes.append(item)
+            anchors.append(_copper(item))
+        else:
+            anchors.append(_copper(item))
+    for index, other in enumerate(items.zones):
+        if (other is zone or layer not in other.layers
+                or other.priority <= zone.priority):
+            continue
+        if other.net == zone.net:
+            holes.append(other.outline)
+        else:
+            islands = [p for ly, p in above[index] if ly == layer]
+            if islands:
+                holes.append(_grow(unary_union(islands), clearance,
+                                   outside=True))
+
+    allowed = area.difference(unary_union(holes))
+    fill = allowed.difference(unary_union(thermal)) if thermal else allowed
+
+    half = zone.min_thickness / 2
+    if half > 0:
+        fill = _grow(fill, -half)
+        if spokes:
+            arms = unary_union([_spokes(item, zone) for item in spokes])
+            arms = shapely.get_parts(arms.intersection(_grow(allowed, -half)))
+            # only the spokes that reach what is left of the pour
+            fill = unary_union([fill, *(arm for arm in arms
+                                        if arm.intersects(fill))])
+        fill = _grow(fill, half).intersection(allowed)
+        if thermal:
+            fill = fill.difference(unary_union(
+                [_copper(item) for item in spokes]))
+
+    islands = [p for p in shapely.get_parts(fill)
+               if isinstance(p, Polygon) and not p.is_empty]
+    if zone.islands != 1:
+        tree = shapely.STRtree(anchors)
+        islands = [p for p in islands
+                   if len(tree.query(p, predicate="intersects"))
+                   or (zone.islands == 2 and p.area >= zone.island_min)]
+    return sorted(islands, key=lambda p: (p.bounds[0], p.bounds[1]))
+
+
+def _above(items, index):
+    """Indices of the other-net zones whose fill zone `index` knocks out."""
+    zone = items.zones[index]
+    return [i for i, other in enumerate(items.zones)
+            if other.priority > zone.priority and other.net != zone.net
+            and set(other.layers) & set(zone.layers)]
+
+
+def fill_zone(items, index, above=None):
+    """[(layer, Polygon), ...] for zone `index` of `items`, layer by layer.
+
+    `above` holds the fills of the zones _above() it, as fill_zones()
+    passes them; without it they are filled here first.
+    """
+    if above is None:
+        above = {i: fill_zone(items, i) for i in _above(items, index)}
+    zone = items.zones[index]
+    return [(layer, island) for layer in zone.layers
+            for island in _fill_layer(items, zone, layer, above)]
+
+
+def _waves(items):
+    """Zone indices in fill order: each wave only after the zones it reads."""
+    wave = {}
+
+    def depth(i):
+        if i not in wave:
+            wave[i] = 1 + max((depth(j) for j in _above(items, i)), default=-1)
+        return wave[i]
+
+    for i in range(len(items.zones)):
+        depth(i)
+    return [[i for i in sorted(wave) if wave[i] == w]
+            for w in range(max(wave.values(), default=-1) + 1)]
+
+
+# (BoardItems, fills so far) for forked zone workers; inherited, never pickled.
+_WORK = None
+
+
+def _fill_zone_worker(index):
+    items, done = _WORK
+    return fill_zone(items, index, {i: done[i] for i in _above(items, index)})
+
+
+def fill_zones(items, jobs=None):
+    """fill_zone() for every zone, results in zone order.
+
+    Waves run one after another. With more than one CPU the zones of a wave
+    each get a forked worker. On one CPU it is a plain loop.
+    """
+    global _WORK
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    done = {}
+    for wave in _waves(items):
+        if jobs <= 1 or len(wave) <= 1:
+            for i in wave:
+                done[i] = fill_zone(items, i,
+                                    {j: done[j] for j in _above(items, i)})
+            continue
+        _WORK = (items, done)
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                    min(jobs, len(wave))) as pool:
+                done.update(zip(wave, pool.map(_fill_zone_worker, wave)))
+        finally:
+            _WORK = None
+    return [done[i] for i in range(len(items.zones))]
+
+
+# ── Output ──────────────────────────────────────────────────────────
+
+def _fracture(poly):
+    """One ring for a polygon with holes, the way KiCad stores a fill.
+
+    A filled_polygon has no syntax for holes: KiCad bridges each hole to the
+    outline with a zero-width cut and writes the result as one ring. Holes
+    are joined left to right, each from its leftmost vertex to the nearest
+    edge straight to its left. By then that edge belongs to the outline or
+    to a hole already joined, never to one still waiting.
+    """
+    poly = orient(poly, 1.0)
+    ring = np.asarray(poly.exterior.coords)[:-1]
+    holes = [np.asarray(h.coords)[:-1] for h in poly.interiors]
+    holes.sort(key=lambda h: tuple(h[np.lexsort((h[:, 1], h[:, 0]))[0]]))
+    for hole in holes:
+        k = np.lexsort((hole[:, 1], hole[:, 0]))[0]
+        px, py = hole[k]
+        a, b = ring, np.roll(ring, -1, axis=0)
+        crosses = (a[:, 1] <= py) != (b[:, 1] <= py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        x = np.where(crosses & (x <= px), x, -np.inf)
+        i = int(np.argmax(x))
+        bridge = np.array([[x[i], py]])
+        ring = np.concatenate([ring[:i + 1], bridge, np.roll(hole, -k, axis=0),
+                               hole[k:k + 1], bridge, ring[i + 1:]])
+    return ring
+
+
+def _fmt(v):
+    s = f"{v:.6f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+def filled_polygon_text(islands):
+    """filled_polygon blocks for [(layer, Polygon), ...], 4-space indented.
+
+    The same layout kicad_fill_zones' extractor produces, so
+    zone_fill_inject.strip_existing_fills() removes it again.
+    """
+    blocks = []
+    for layer, poly in islands:
+        pts = [f"(xy {_fmt(x)} {_fmt(y)})" for x, y in _fracture(poly)]
+        lines = ["        " + " ".join(pts[i:i + 5])
+                 for i in range(0, len(pts), 5)]
+        blocks.append(f'    (filled_polygon\n      (layer "{layer}")\n'
+                      f'      (pts\n' + "\n".join(lines) + "\n      )\n    )")
+    return "\n".join(blocks)
+
+
+def native_fills(text, pcb_path=None, jobs=None):
+    """{zone uuid: filled_polygon text} for every zone of the board text."""
+    items = board_items(text, pcb_path)
+    return {zone.uuid: filled_polygon_text(islands)
+            for zone, islands in zip(items.zones, fill_zones(items, jobs))}
+
+
+# ── Comparison ──────────────────────────────────────────────────────
+
+ZoneDiff = namedtuple("ZoneDiff", "uuid net layer kicad_islands native_islands "
+                                  "kicad_area native_area xor_area")
+
+
+def compare_fills(reference, native_text):
+    """[ZoneDiff] per zone and layer: `reference`'s fill vs `native_text`'s.
+
+    Both are board texts; the fills are re-read from the text, so the
+    comparison covers the written (fractured) form, not just the geometry.
+    """
+    want = board_items(reference).zones
+    got = {z.uuid: z for z in board_items(native_text).zones}
+    rows = []
+    for zone in want:
+        mine = got.get(zone.uuid)
+        for layer in zone.layers:
+            a = zone.fills.get(layer, [])
+            b = mine.fills.get(layer, []) if mine else []
+            ua, ub = unary_union(a), unary_union(b)
+            rows.append(ZoneDiff(zone.uuid, zone.net, layer, len(a), len(b),
+                                 ua.area, ub.area,
+                                 ua.symmetric_difference(ub).area))
+    return rows
+
+
+def diff_ok(row):
+    """True when a ZoneDiff is within COMPARE_TOLERANCE of KiCad."""
+    return (row.kicad_islands == row.native_islands
+            and row.xor_area <= COMPARE_TOLERANCE * max(row.kicad_area, 1e-9))
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("pcb", nargs="?", default=str(DEFAULT_PCB))
+    ap.add_argument("--compare", action="store_true",
+                    help="diff against the board's own (KiCad) fill; "
+                         "write nothing")
+    ap.add_argument("--jobs", "-j", type=int, default=None,
+                    help="zones filled in parallel (default: one per CPU)")
+    args = ap.parse_args(argv)
+    pcb_path = args.pcb
+
+    if args.compare:
+        original = kicad_sexpr.read_text(pcb_path)
+        t0 = time.perf_counter()
+        filled, missing = inject_fills(
+            original, native_fills(original, pcb_path, args.jobs))
+        elapsed = time.perf_counter() - t0
+        rows = compare_fills(original, filled)
+        print(f"  {'zone':<10} {'layer':<7} {'islands':>9} "
+              f"{'KiCad mm²':>10} {'native mm²':>11} {'xor mm²':>8}")
+        for r in rows:
+            print(f"  {'PASS' if diff_ok(r) else 'FAIL'}  net {r.net:<4} "
+                  f"{r.layer:<7} {r.kicad_islands:>3} /{r.native_islands:>3} "
+                  f"{r.kicad_area:>10.2f} {r.native_area:>11.2f} "
+                  f"{r.xor_area:>8.3f}")
+        print(f"  native fill: {elapsed * 1000:.0f} ms")
+        if any(not r.kicad_islands for r in rows):
+            print("  NOTE: a zone has no KiCad fill to compare against")
+        return 0 if all(diff_ok(r) for r in rows) and not missing else 1
+
+    print(f"Filling zones natively: {pcb_path}")
+    lock_path = pcb_path + ".fill.lock"
+    with fill_lock(lock_path):
+        original = kicad_sexpr.read_text(pcb_path)
+        t0 = time.perf_counter()
+        fills = native_fills(original, pcb_path, args.jobs)
+        result, missing = inject_fills(original, fills)
+        if missing:
+            print(f"ERROR: {len(missing)} zone(s) could not be injected: {missing}")
+            return 1
+        atomic_write(pcb_path, result)
+    print(f"Filled {len(fills)} zones in "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms: {pcb_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -45,6 +45,21 @@ static const struct { float soc; float v; } VB_BAT_OCV[VB_BAT_OCV_POINTS] = {
 static const unsigned char VB_LCD_BUS_MAP[8] = { 0, 1, 2, 3, 4, 5, 6, 7 };
 #define VB_LCD_MODE_8080_8BIT 1 /* IM straps, derived from copper */
 
+/* ILI9488 protocol — models/ds1_ili9488.py, each value cited there.
+ * With VB_I80_TRACE=<file> set, vbench_hal.c records the bytes the
+ * panel would receive, framed by these, for i80_trace.py to replay
+ * through the controller model. */
+#define VB_ILI_CMD_SLPOUT 0x11
+#define VB_ILI_CMD_DISPON 0x29
+#define VB_ILI_CMD_CASET 0x2A
+#define VB_ILI_CMD_PASET 0x2B
+#define VB_ILI_CMD_RAMWR 0x2C
+#define VB_ILI_CMD_MADCTL 0x36
+#define VB_ILI_CMD_COLMOD 0x3A
+#define VB_ILI_MADCTL_MV 0x20
+#define VB_ILI_MADCTL_MX 0x40
+#define VB_ILI_COLMOD_RGB565 0x55
+
 /* Buttons — buttons.py: release edge to 70% of rail through the
  * 10k x 100nF network. Bit order matches sim_hal.h SIM_BTN_*. A
  * clear bit in VB_BTN_RC_MASK = no external RC (BTN_L: R14 is DNP
@@ -15,6 +15,11 @@
  *            board the map is the identity, so the picture is untouched —
  *            but cross two data lines in the design and the simulator's
  *            picture scrambles. The bug becomes a thing you can see.
+ *            With VB_I80_TRACE=<file> set, those bytes are also recorded,
+ *            framed by the commands the firmware sends — opcodes and
+ *            parameters permuted by the same map, as the panel would
+ *            receive them — for scripts/vbench/i80_trace.py to replay
+ *            through the ILI9488 controller model offline.
  *
  *   BUTTONS  pass through the RC network: a press shorts the node (fast),
  *            a release rises through 10k x 100nF and only reads HIGH after
@@ -114,6 +119,72 @@ static inline uint16_t vb_bus_px(uint16_t px) {
     return (uint16_t)((g_bus_lut[(px >> 8) & 0xFF] << 8) | g_bus_lut[px & 0xFF]);
 }
 
+/* ── i80 trace (format: scripts/vbench/i80_trace.py) ─────── */
+
+/* The simulator's 480x320 window is the panel turned a quarter: MADCTL
+ * MV|MX, so CASET addresses the window's x and PASET its y. The write
+ * clock is not modelled here, so the header's clock and every run's
+ * period are 0; a run's t0 is wall time since init, never decreasing. */
+static FILE    *g_trace = NULL;
+static uint64_t g_trace_t0;
+static uint64_t g_trace_ns;
+static uint8_t  g_trace_buf[SIM_LCD_WIDTH * SIM_LCD_HEIGHT * 2];
+
+static void vb_trace_le(uint8_t *p, uint64_t v, int n) {
+    for (int i = 0; i < n; i++) p[i] = (uint8_t)(v >> (8 * i));
+}
+
+static void vb_trace_record(uint8_t kind, const uint8_t *data, uint32_t n) {
+    uint64_t now = (uint64_t)((double)(SDL_GetPerformanceCounter() - g_trace_t0)
+                              * 1e9 / (double)SDL_GetPerformanceFrequency());
+    if (now < g_trace_ns) now = g_trace_ns;
+    g_trace_ns = now;
+    uint8_t rec[17];                    /* "<BIQI" kind, count, t0, period */
+    rec[0] = kind;
+    vb_trace_le(rec + 1, n, 4);
+    vb_trace_le(rec + 5, now, 8);
+    vb_trace_le(rec + 13, 0, 4);
+    fwrite(rec, 1, sizeof rec, g_trace);
+    if (n) fwrite(data, 1, n, g_trace);
+}
+
+static void vb_trace_cmd(uint8_t opcode, const uint8_t *params, uint32_t n) {
+    /* Commands cross the same DB[7:0] as pixels: a crossed data line
+     * garbles opcodes and CASET/PASET/MADCTL/COLMOD values as well. */
+    uint8_t bus[4];
+    bus[0] = g_bus_lut[opcode];
+    vb_trace_record(0, bus, 1);         /* D/CX low: the command   */
+    for (uint32_t i = 0; i < n; i++) bus[i] = g_bus_lut[params[i]];
+    if (n) vb_trace_record(1, bus, n);  /* D/CX high: parameters */
+}
+
+static void vb_trace_window(uint8_t opcode, int lo, int hi) {
+    const uint8_t p[4] = { (uint8_t)(lo >> 8), (uint8_t)lo,
+                           (uint8_t)(hi >> 8), (uint8_t)hi };
+    vb_trace_cmd(opcode, p, 4);
+}
+
+static void vb_trace_open(void) {
+    const char *path = getenv("VB_I80_TRACE");
+    if (!path || !*path) return;
+    g_trace = fopen(path, "wb");
+    if (!g_trace) { perror(path); return; }
+    uint8_t hdr[12] = { 'I', '8', '0', 'T' };   /* "<4sHHI" */
+    vb_trace_le(hdr + 4, 1, 2);                 /* version           */
+    vb_trace_le(hdr + 6, sizeof hdr, 2);        /* header size       */
+    vb_trace_le(hdr + 8, 0, 4);                 /* clock: not modelled */
+    fwrite(hdr, 1, sizeof hdr, g_trace);
+    g_trace_t0 = SDL_GetPerformanceCounter();
+    g_trace_ns = 0;
+    const uint8_t madctl = VB_ILI_MADCTL_MV | VB_ILI_MADCTL_MX;
+    const uint8_t colmod = VB_ILI_COLMOD_RGB565;
+    vb_trace_cmd(VB_ILI_CMD_SLPOUT, NULL, 0);
+    vb_trace_cmd(VB_ILI_CMD_MADCTL, &madctl, 1);
+    vb_trace_cmd(VB_ILI_CMD_COLMOD, &colmod, 1);
+    vb_trace_cmd(VB_ILI_CMD_DISPON, NULL, 0);
+    printf("[VBENCH] i80 trace -> %s\n", path);
+}
+
 /* ── Text on the framebuffer (font8x8) ───────────────────── */
 
 static void vb_char(int x, int y, char c, uint16_t fg) {
@@ -149,6 +220,7 @@ int sim_display_init(void) {
     SDL_RenderSetLogicalSize(g_renderer, VB_WIN_W, VB_WIN_H);
     memset(g_framebuffer, 0, sizeof(g_framebuffer));
     vb_build_bus_lut();
+    vb_trace_open();
     printf("[VBENCH] window %dx%d: %dx%d LCD through the i80 model + %dpx instruments\n",
            VB_WIN_W, VB_WIN_H, SIM_LCD_WIDTH, SIM_LCD_HEIGHT, VB_PANEL_H);
     printf("[VBENCH] board %.24s...  calibration: %s\n", VB_PCB_HASH, VB_CALIBRATION);
@@ -159,13 +231,30 @@ void sim_display_write(const uint16_t *pixels, int x, int y, int w, int h) {
     /* In download mode the app is not running — the boot ROM owns the
      * screen, so app writes are dropped, as on the real chip. */
     if (g_download_mode || !VB_LCD_MODE_8080_8BIT) return;
-    for (int row = 0; row < h && (y + row) < SIM_LCD_HEIGHT; row++) {
+    int copy_w = (x + w > SIM_LCD_WIDTH) ? (SIM_LCD_WIDTH - x) : w;
+    int rows = 0;
+    for (int row = 0; row < h && (y + row) < SIM_LCD_HEIGHT; row++, rows++) {
         uint16_t *dst = &g_framebuffer[(y + row) * VB_WIN_W + x];
         const uint16_t *src = &pixels[row * w];
-        int copy_w = (x + w > SIM_LCD_WIDTH) ? (SIM_LCD_WIDTH - x) : w;
         for (int i = 0; i < copy_w; i++)
             dst[i] = vb_bus_px(src[i]);
     }
+    if (g_trace && copy_w > 0 && rows > 0) {
+        /* Under MV the controller steps the page (window y) first and
+         * the column after it (p.179), so the rectangle goes out column
+         * by column, each pixel high byte first (p.113 note 2). */
+        uint8_t *out = g_trace_buf;
+        for (int i = 0; i < copy_w; i++)
+            for (int row = 0; row < rows; row++) {
+                uint16_t px = g_framebuffer[(y + row) * VB_WIN_W + x + i];
+                *out++ = (uint8_t)(px >> 8);
+                *out++ = (uint8_t)px;
+            }
+        vb_trace_window(VB_ILI_CMD_CASET, x, x + copy_w - 1);
+        vb_trace_window(VB_ILI_CMD_PASET, y, y + rows - 1);
+        vb_trace_cmd(VB_ILI_CMD_RAMWR, NULL, 0);
+        vb_trace_record(1, g_trace_buf, (uint32_t)(out - g_trace_buf));
+    }
 }
 
 /* ── The instruments (T4.4) ──────────────────────────────── */
@@ -257,6 +346,7 @@ void sim_display_flush(void) {
         vb_text(72, 156, "select 8080 8-bit - no picture", COL_BAD);
     }
     vb_draw_instruments();
+    if (g_trace) vb_trace_record(2, NULL, 0);   /* frame boundary */
     SDL_UpdateTexture(g_texture, NULL, g_framebuffer, VB_WIN_W * sizeof(uint16_t));
     SDL_RenderClear(g_renderer);
     SDL_RenderCopy(g_renderer, g_texture, NULL, NULL);
@@ -264,6 +354,7 @@ void sim_display_flush(void) {
 }
 
 void sim_display_destroy(void) {
+    if (g_trace) { fclose(g_trace); g_trace = NULL; }
     if (g_texture)  SDL_DestroyTexture(g_texture);
     if (g_renderer) SDL_DestroyRenderer(g_renderer);
     if (g_window)   SDL_DestroyWindow(g_window);